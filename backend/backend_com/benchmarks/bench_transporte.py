@@ -0,0 +1,110 @@
+"""
+Benchmark do HTTPClient: rede (uvicorn em loopback) x in-process (ASGITransport).
+
+O mesmo app do backend_mq é servido por um uvicorn local e montado via
+`httpx.ASGITransport`; os dois HTTPClient fazem as mesmas chamadas
+(sem coalescing, cache de ETag ou retries) e o script compara latência
+sequencial e vazão com requisições concorrentes.
+
+Execução (a partir da raiz do repositório):
+
+    python -m backend.backend_com.benchmarks.bench_transporte [n_requisicoes] [concorrencia] [endpoint] [app]
+
+Padrões: 500 requisições, concorrência 20, endpoint "/health", app "app.main:app"
+(de backend_bd/backend_mq). Requer `uvicorn` instalado.
+"""
+
+import asyncio
+import logging
+import socket
+import statistics
+import sys
+import threading
+import time
+
+import httpx
+import uvicorn
+
+from backend.backend_com.gateways.http_client import HTTPClient, RequestConfig
+from backend.backend_com.gateways.inprocess import load_asgi_app
+
+
+def porta_livre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def iniciar_servidor(app, porta: int) -> uvicorn.Server:
+    servidor = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=porta, log_level="warning"))
+    threading.Thread(target=servidor.run, daemon=True).start()
+    while not servidor.started:
+        time.sleep(0.05)
+    return servidor
+
+
+def criar_cliente(base_url: str, transport=None) -> HTTPClient:
+    config = RequestConfig(max_retries=0, coalesce=False, etag_cache_size=0)
+    cliente = HTTPClient(base_url, config, transport=transport)
+    cliente.logger.setLevel(logging.WARNING)  # sem log por requisição durante a medição
+    return cliente
+
+
+async def medir(nome: str, cliente: HTTPClient, endpoint: str, n: int, concorrencia: int) -> float:
+    for _ in range(20):  # aquecimento (conexões, caches de import)
+        await cliente.get(endpoint)
+
+    latencias = []
+    for _ in range(n):
+        inicio = time.perf_counter()
+        resposta = await cliente.get(endpoint)
+        latencias.append((time.perf_counter() - inicio) * 1000)
+    if not resposta.is_success:
+        print(f"  aviso: {endpoint} respondeu {resposta.status_code}")
+
+    semaforo = asyncio.Semaphore(concorrencia)
+
+    async def uma():
+        async with semaforo:
+            await cliente.get(endpoint)
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(uma() for _ in range(n)))
+    vazao = n / (time.perf_counter() - inicio)
+
+    latencias.sort()
+    print(
+        f"{nome:<11} média {statistics.mean(latencias):7.3f} ms  "
+        f"p50 {latencias[len(latencias) // 2]:7.3f} ms  "
+        f"p99 {latencias[int(len(latencias) * 0.99) - 1]:7.3f} ms  "
+        f"{vazao:8.0f} req/s (concorrência {concorrencia})"
+    )
+    return statistics.mean(latencias)
+
+
+async def main(n: int, concorrencia: int, endpoint: str, app_spec: str) -> None:
+    app = load_asgi_app(app_spec)
+    porta = porta_livre()
+    servidor = iniciar_servidor(app, porta)
+
+    rede = criar_cliente(f"http://127.0.0.1:{porta}")
+    in_process = criar_cliente("http://backend-bd", transport=httpx.ASGITransport(app=app))
+
+    print(f"GET {endpoint}: {n} requisições sequenciais + {n} concorrentes")
+    try:
+        t_rede = await medir("rede", rede, endpoint, n, concorrencia)
+        t_asgi = await medir("in-process", in_process, endpoint, n, concorrencia)
+        print(f"speedup     {t_rede / t_asgi:7.1f}x (latência média)")
+    finally:
+        await rede.close()
+        await in_process.close()
+        servidor.should_exit = True
+
+
+if __name__ == "__main__":
+    asyncio.run(main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 500,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 20,
+        sys.argv[3] if len(sys.argv) > 3 else "/health",
+        sys.argv[4] if len(sys.argv) > 4 else "app.main:app",
+    ))
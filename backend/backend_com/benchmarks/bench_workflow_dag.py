@@ -0,0 +1,105 @@
+"""
+Benchmark do agendador paralelo do WorkflowEngine em DAGs grandes.
+
+Os passos não fazem I/O (apenas `await asyncio.sleep(0)`), então o tempo
+medido é praticamente todo do agendador: seleção de passos prontos,
+criação de tasks e liberação de dependentes.
+
+Formatos de DAG (n passos):
+- largo:   n passos independentes
+- cadeia:  n passos em sequência
+- camadas: camadas de 100 passos, cada passo depende de 3 da camada anterior
+- fan-in:  n-1 passos independentes e um final que depende de todos
+
+Execução (a partir da raiz do repositório):
+
+    python -m backend.backend_com.benchmarks.bench_workflow_dag [n_passos] [repeticoes] [max_concorrencia]
+
+Padrões: 1000 passos, 5 repetições, sem limite de concorrência.
+"""
+
+import asyncio
+import logging
+import random
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+from backend.backend_com.orchestration.workflow_engine import WorkflowEngine, WorkflowStep
+
+
+async def passo_vazio() -> None:
+    await asyncio.sleep(0)
+
+
+def criar_passo(nome: str, depends_on: Optional[List[str]] = None) -> WorkflowStep:
+    return WorkflowStep(name=nome, function=passo_vazio, max_retries=0,
+                        depends_on=depends_on or [], pass_context=False)
+
+
+def dag_largo(n: int) -> List[WorkflowStep]:
+    return [criar_passo(f"p{i}") for i in range(n)]
+
+
+def dag_cadeia(n: int) -> List[WorkflowStep]:
+    return [criar_passo(f"p{i}", [f"p{i - 1}"] if i else None) for i in range(n)]
+
+
+def dag_camadas(n: int, largura: int = 100, grau: int = 3) -> List[WorkflowStep]:
+    aleatorio = random.Random(42)
+    passos = []
+    for i in range(n):
+        camada_anterior = range((i // largura - 1) * largura, (i // largura) * largura)
+        deps = [f"p{j}" for j in aleatorio.sample(camada_anterior, grau)] if i >= largura else None
+        passos.append(criar_passo(f"p{i}", deps))
+    return passos
+
+
+def dag_fan_in(n: int) -> List[WorkflowStep]:
+    passos = [criar_passo(f"p{i}") for i in range(n - 1)]
+    passos.append(criar_passo("final", [p.name for p in passos]))
+    return passos
+
+
+FORMATOS: Dict[str, Callable[[int], List[WorkflowStep]]] = {
+    "largo": dag_largo,
+    "cadeia": dag_cadeia,
+    "camadas": dag_camadas,
+    "fan-in": dag_fan_in,
+}
+
+
+async def medir(engine: WorkflowEngine, formato: str, n: int, repeticoes: int,
+                max_concorrencia: Optional[int]) -> None:
+    kwargs = {"max_concurrency": max_concorrencia} if max_concorrencia else {}
+    tempos = []
+    for _ in range(repeticoes):
+        passos = FORMATOS[formato](n)
+        inicio = time.perf_counter()
+        resultado = await engine.execute_ad_hoc_workflow(passos, {}, parallel_execution=True, **kwargs)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+        if resultado.completed_steps != n:
+            print(f"  aviso: {formato} concluiu {resultado.completed_steps}/{n} passos")
+
+    media = statistics.mean(tempos)
+    print(f"{formato:<8} média {media:9.1f} ms  mín {min(tempos):9.1f} ms  "
+          f"{media * 1000 / n:7.1f} µs/passo")
+
+
+async def main(n: int, repeticoes: int, max_concorrencia: Optional[int]) -> None:
+    engine = WorkflowEngine("bench")
+    engine.logger.setLevel(logging.WARNING)  # sem log por passo durante a medição
+
+    limite = max_concorrencia or "sem limite"
+    print(f"DAGs de {n} passos, {repeticoes} repetições, concorrência: {limite}")
+    for formato in FORMATOS:
+        await medir(engine, formato, n, repeticoes, max_concorrencia)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 1000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 5,
+        int(sys.argv[3]) if len(sys.argv) > 3 else None,
+    ))
@@ -7,6 +7,7 @@ Configuração central da camada Backend Communication.
 """
 
 from __future__ import annotations
+import os
 from typing import List, Optional
 
 # ── Import condicional compatível Pydantic v1/v2 ─────────────────────────
@@ -44,7 +45,69 @@ class Settings(BaseSettings):
 
     # ── Integração Backend_BD ───────────────────────────────────────────────
     backend_bd_url: AnyHttpUrl = Field(default="http://127.0.0.1:8001")
-    backend_bd_timeout: int = Field(default=30)
+    backend_bd_timeout: int = Field(default=30)                  # leitura/escrita (s)
+    backend_bd_connect_timeout: float = Field(default=5.0)       # abertura de conexão (s)
+    backend_bd_pool_timeout: float = Field(default=5.0)          # espera por conexão livre no pool (s)
+    backend_bd_max_connections: int = Field(default=100)
+    backend_bd_max_keepalive_connections: int = Field(default=20)
+    backend_bd_keepalive_expiry: float = Field(default=30.0)     # conexões ociosas (s)
+    backend_bd_http2: bool = Field(default=False)                # requer o pacote `h2`
+    backend_bd_breaker_failure_threshold: int = Field(default=5)
+    backend_bd_breaker_recovery_timeout: float = Field(default=30.0)
+    backend_bd_concurrency_initial_limit: int = Field(default=20)
+    backend_bd_concurrency_min_limit: int = Field(default=2)
+    backend_bd_latency_threshold_ms: float = Field(default=2000.0)  # acima disso o limite reduz
+    backend_bd_etag_cache_size: int = Field(default=256)         # GET condicional (0 desativa)
+    backend_bd_retry_budget_ratio: float = Field(default=0.1)    # retries: no máximo ~10% de carga extra
+    backend_bd_retry_max_delay: float = Field(default=10.0)      # teto do backoff com jitter (s)
+    backend_bd_request_deadline: float = Field(default=45.0)     # prazo total por operação, com retries (s)
+    backend_bd_transport: str = Field(default="http")            # "http" (rede) ou "asgi" (mesmo processo)
+    backend_bd_asgi_app: str = Field(default="app.main:app")     # app do backend_mq no modo "asgi"
+    backend_bd_asgi_dir: Optional[str] = Field(default=None)     # padrão: backend_bd/backend_mq
+
+    # ── Orquestração ────────────────────────────────────────────────────────
+    orchestration_step_timeout: float = Field(default=15.0)      # timeout padrão por passo (s)
+    orchestration_thread_workers: Optional[int] = Field(default=None)   # passos "thread" (padrão: min(32, CPUs + 4))
+    orchestration_process_workers: Optional[int] = Field(default=None)  # passos "process" (padrão: CPUs)
+    workflow_state_backend: str = Field(default="memory")        # "memory" (por processo) ou "sqlite" (compartilhado)
+    workflow_state_path: str = Field(                            # arquivo do backend "sqlite" (fora do diretório de trabalho)
+        default=os.path.join(os.path.expanduser("~"), ".vlabs", "backend_com_workflows.sqlite3")
+    )
+    workflow_state_ttl: float = Field(default=3600.0)            # validade após a última atualização (s)
+    workflow_state_max_entries: int = Field(default=10000)       # limite LRU do backend "memory"
+    workflow_state_eviction_interval: float = Field(default=60.0)  # remoção periódica dos expirados (s)
+
+    # ── Senhas (bcrypt) ─────────────────────────────────────────────────────
+    password_hash_workers: Optional[int] = Field(default=None)   # hashes simultâneos (padrão: min(4, CPUs))
+    password_hash_max_pending: int = Field(default=64)           # fila de hashes; acima disso o login é recusado
+    password_hash_rounds: int = Field(default=12)                # custo usado sem calibração
+    password_hash_calibrate: bool = Field(default=True)          # mede o bcrypt na inicialização
+    password_hash_target_ms: float = Field(default=250.0)        # tempo-alvo por hash na calibração
+    password_hash_min_rounds: int = Field(default=10)
+    password_hash_max_rounds: int = Field(default=14)
+
+    # ── Tokens de acesso ────────────────────────────────────────────────────
+    auth_token_secret: Optional[str] = Field(default=None)       # HS256; obrigatório (a inicialização falha sem ele)
+    auth_allow_random_secret: bool = Field(default=False)        # só desenvolvimento: segredo aleatório por processo
+    auth_access_token_ttl: float = Field(default=7200.0)         # validade do access token (s)
+    auth_remember_me_token_ttl: float = Field(default=86400.0)   # validade com "lembrar de mim" (s)
+    auth_refresh_token_ttl: float = Field(default=2592000.0)     # validade do refresh token (s)
+    auth_token_cache_size: int = Field(default=4096)             # tokens já verificados mantidos em LRU
+    auth_revocation_sync_interval: float = Field(default=30.0)   # busca de logouts de outros workers (s)
+
+    # ── Jobs em segundo plano ───────────────────────────────────────────────
+    jobs_enabled: bool = Field(default=True)                     # False: etapas adiadas rodam na requisição
+    jobs_store_path: str = Field(                                # arquivo SQLite da fila (fora do diretório de trabalho)
+        default=os.path.join(os.path.expanduser("~"), ".vlabs", "backend_com_jobs.sqlite3")
+    )
+    jobs_concurrency: int = Field(default=4)                     # jobs simultâneos por processo
+    jobs_max_attempts: int = Field(default=5)                    # depois disso: dead-letter
+    jobs_retry_base_delay: float = Field(default=2.0)            # base do backoff com jitter (s)
+    jobs_retry_max_delay: float = Field(default=300.0)           # teto do backoff (s)
+    jobs_poll_interval: float = Field(default=1.0)               # consulta à fila quando ociosa (s)
+    jobs_lease_timeout: float = Field(default=120.0)             # tempo máximo por execução (s)
+    jobs_retention: float = Field(default=604800.0)              # jobs finalizados consultáveis por 7 dias (s)
+    jobs_purge_interval: float = Field(default=3600.0)           # remoção dos finalizados expirados (s)
 
     # ── Mongo / Qdrant (exemplo) ────────────────────────────────────────────
     mongodb_uri: MongoDsn = Field(default="mongodb://localhost:27017")
@@ -0,0 +1,189 @@
+"""
+Dependências FastAPI para recursos compartilhados da aplicação.
+
+O gateway de persistência (e seu HTTPClient com pool keep-alive), a fila
+de jobs em segundo plano, o store de estado dos workflows (com a expiração
+periódica), os executores de passos que usam CPU, o pool de bcrypt, o
+serviço de tokens (com o sincronismo das revogações) e os orquestradores
+são criados uma única vez no
+`lifespan` de backend/main.py e guardados em `app.state`; os handlers os
+recebem via `Depends`.
+"""
+
+import logging
+import secrets
+from typing import Optional
+
+from fastapi import Request
+
+from .config import get_settings
+from .gateways import PersistenceGateway, HTTPClient
+from .jobs import JobQueue, SQLiteJobStore
+from .orchestration import (
+    EducationalOrchestrator,
+    PasswordHasher,
+    StepExecutors,
+    UserOrchestrator,
+    create_state_store,
+)
+from .utils import TokenService
+from .utils.backend_bd_client import get_backend_bd_client
+
+logger = logging.getLogger(__name__)
+
+
+async def create_app_resources(app) -> None:
+    """
+    Cria os recursos compartilhados e os registra em `app.state`.
+
+    Args:
+        app: Instância FastAPI
+    """
+    settings = get_settings()
+
+    # Validado antes de iniciar tarefas e executores: a falha não deixa nada rodando
+    token_secret = settings.auth_token_secret
+    if not token_secret:
+        if not settings.auth_allow_random_secret:
+            raise RuntimeError(
+                "AUTH_TOKEN_SECRET is not set. Configure it (shared by all workers) "
+                "or set AUTH_ALLOW_RANDOM_SECRET=true for local development."
+            )
+        # Só para desenvolvimento: tokens não valem em outros workers nem após reinício
+        logger.warning("AUTH_TOKEN_SECRET is not set; using a random per-process secret (development only)")
+        token_secret = secrets.token_urlsafe(32)
+
+    persistence_gateway = PersistenceGateway()
+
+    job_queue = None
+    if settings.jobs_enabled:
+        job_queue = JobQueue(
+            SQLiteJobStore(settings.jobs_store_path),
+            concurrency=settings.jobs_concurrency,
+            max_attempts=settings.jobs_max_attempts,
+            retry_base_delay=settings.jobs_retry_base_delay,
+            retry_max_delay=settings.jobs_retry_max_delay,
+            poll_interval=settings.jobs_poll_interval,
+            lease_timeout=settings.jobs_lease_timeout,
+            retention=settings.jobs_retention,
+            purge_interval=settings.jobs_purge_interval
+        )
+
+    state_store = create_state_store(settings)
+    state_store.start_eviction(settings.workflow_state_eviction_interval)
+    executors = StepExecutors(settings.orchestration_thread_workers, settings.orchestration_process_workers)
+
+    password_hasher = PasswordHasher(
+        settings.password_hash_workers,
+        settings.password_hash_max_pending,
+        settings.password_hash_rounds
+    )
+    if settings.password_hash_calibrate:
+        await password_hasher.calibrate(
+            settings.password_hash_target_ms,
+            settings.password_hash_min_rounds,
+            settings.password_hash_max_rounds
+        )
+
+    token_service = TokenService(
+        token_secret,
+        access_ttl=settings.auth_access_token_ttl,
+        remember_me_access_ttl=settings.auth_remember_me_token_ttl,
+        refresh_ttl=settings.auth_refresh_token_ttl,
+        cache_size=settings.auth_token_cache_size
+    )
+
+    app.state.persistence_gateway = persistence_gateway
+    app.state.http_client = persistence_gateway.http_client
+    app.state.job_queue = job_queue
+    app.state.workflow_state_store = state_store
+    app.state.step_executors = executors
+    app.state.password_hasher = password_hasher
+    app.state.token_service = token_service
+    app.state.educational_orchestrator = EducationalOrchestrator(persistence_gateway, job_queue, state_store, executors)
+    app.state.user_orchestrator = UserOrchestrator(
+        persistence_gateway, job_queue, state_store, executors, password_hasher, token_service
+    )
+    token_service.start_sync(
+        app.state.user_orchestrator.load_token_revocations,
+        settings.auth_revocation_sync_interval
+    )
+
+    # Depois dos orquestradores, que registram os handlers
+    if job_queue is not None:
+        await job_queue.start()
+
+
+async def close_app_resources(app) -> None:
+    """
+    Fecha os recursos criados por `create_app_resources`.
+
+    Args:
+        app: Instância FastAPI
+    """
+    # Jobs em execução ainda usam o gateway: a fila para primeiro
+    job_queue = getattr(app.state, "job_queue", None)
+    if job_queue is not None:
+        await job_queue.stop()
+
+    state_store = getattr(app.state, "workflow_state_store", None)
+    if state_store is not None:
+        await state_store.close()
+
+    executors = getattr(app.state, "step_executors", None)
+    if executors is not None:
+        await executors.close()
+
+    token_service = getattr(app.state, "token_service", None)
+    if token_service is not None:
+        await token_service.close()
+
+    password_hasher = getattr(app.state, "password_hasher", None)
+    if password_hasher is not None:
+        await password_hasher.close()
+
+    persistence_gateway = getattr(app.state, "persistence_gateway", None)
+    if persistence_gateway is not None:
+        await persistence_gateway.close()
+
+    await get_backend_bd_client().close()
+
+
+def get_persistence_gateway(request: Request) -> PersistenceGateway:
+    """Gateway de persistência compartilhado."""
+    return request.app.state.persistence_gateway
+
+
+def get_http_client(request: Request) -> HTTPClient:
+    """HTTPClient compartilhado (pool de conexões com o backend_bd)."""
+    return request.app.state.http_client
+
+
+def get_job_queue(request: Request) -> Optional[JobQueue]:
+    """Fila de jobs em segundo plano (None se desativada)."""
+    return request.app.state.job_queue
+
+
+def get_step_executors(request: Request) -> StepExecutors:
+    """Executores compartilhados dos passos que usam CPU."""
+    return request.app.state.step_executors
+
+
+def get_password_hasher(request: Request) -> PasswordHasher:
+    """Pool de bcrypt compartilhado."""
+    return request.app.state.password_hasher
+
+
+def get_token_service(request: Request) -> TokenService:
+    """Emissão e verificação local dos tokens de acesso."""
+    return request.app.state.token_service
+
+
+def get_educational_orchestrator(request: Request) -> EducationalOrchestrator:
+    """Orquestrador educacional compartilhado."""
+    return request.app.state.educational_orchestrator
+
+
+def get_user_orchestrator(request: Request) -> UserOrchestrator:
+    """Orquestrador de usuários compartilhado."""
+    return request.app.state.user_orchestrator
@@ -0,0 +1,47 @@
+"""
+Gateways de comunicação com serviços externos (backend_bd).
+"""
+
+from .base_gateway import (
+    BaseGateway,
+    GatewayResponse,
+    GatewayError,
+    ConnectionError,
+    TimeoutError,
+    ServiceUnavailableError,
+    CircuitOpenError,
+    AuthenticationError,
+    ValidationError,
+)
+from .http_client import HTTPClient, HTTPResponse, RequestConfig, StreamingHTTPResponse
+from .deadline import DEADLINE_HEADER, deadline_scope
+from .resilience import CircuitBreaker, CircuitState, AdaptiveConcurrencyLimiter, RetryBudget
+from .dataloader import DataLoader, GatewayLoaders
+from .persistence_gateway import PersistenceGateway, MongoDBOperations, QdrantOperations
+
+__all__ = [
+    "BaseGateway",
+    "GatewayResponse",
+    "GatewayError",
+    "ConnectionError",
+    "TimeoutError",
+    "ServiceUnavailableError",
+    "CircuitOpenError",
+    "AuthenticationError",
+    "ValidationError",
+    "HTTPClient",
+    "HTTPResponse",
+    "RequestConfig",
+    "StreamingHTTPResponse",
+    "DEADLINE_HEADER",
+    "deadline_scope",
+    "CircuitBreaker",
+    "CircuitState",
+    "AdaptiveConcurrencyLimiter",
+    "RetryBudget",
+    "DataLoader",
+    "GatewayLoaders",
+    "PersistenceGateway",
+    "MongoDBOperations",
+    "QdrantOperations",
+]
@@ -40,6 +40,11 @@ class ServiceUnavailableError(GatewayError):
     pass
 
 
+class CircuitOpenError(ServiceUnavailableError):
+    """Circuit breaker aberto: a requisição falhou sem chegar ao serviço."""
+    pass
+
+
 class AuthenticationError(GatewayError):
     """Erro de autenticação com serviço externo."""
     pass
@@ -0,0 +1,150 @@
+"""
+Agrupamento de buscas por item (padrão DataLoader) para o gateway.
+
+Chamadas `load(chave)` feitas no mesmo tick do event loop são reunidas e
+resolvidas por uma única chamada em lote ao backend_bd (`$in`), em vez de
+uma requisição HTTP por item.
+
+Os loaders são por requisição: o cache interno vale apenas enquanto a
+instância existir, então crie um `GatewayLoaders` por operação.
+"""
+
+import asyncio
+from typing import (
+    TYPE_CHECKING, Any, Awaitable, Callable, Dict, Generic, Hashable,
+    Iterable, List, Optional, Set, Tuple, TypeVar
+)
+
+from .base_gateway import GatewayError
+
+if TYPE_CHECKING:
+    from .persistence_gateway import PersistenceGateway
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class DataLoader(Generic[K, V]):
+    """
+    Reúne chamadas `load` do mesmo tick em uma chamada de `batch_load_fn`.
+
+    `batch_load_fn` recebe a lista de chaves (sem repetição) e devolve um
+    dicionário chave -> valor; chaves ausentes resolvem para
+    `default_factory()` (ou None).
+    """
+
+    def __init__(self, batch_load_fn: Callable[[List[K]], Awaitable[Dict[K, V]]],
+                 max_batch_size: int = 100, default_factory: Optional[Callable[[], V]] = None,
+                 cache: bool = True):
+        self.batch_load_fn = batch_load_fn
+        self.max_batch_size = max_batch_size
+        self.default_factory = default_factory
+        self.cache = cache
+
+        self._queue: List[Tuple[K, "asyncio.Future[V]"]] = []
+        self._futures: Dict[K, "asyncio.Future[V]"] = {}
+        self._scheduled = False
+        # O loop guarda só referências fracas às tasks: sem esta, um lote
+        # em andamento pode ser coletado e seus futures nunca resolvem
+        self._tasks: Set["asyncio.Task[None]"] = set()
+        self.batches = 0
+        self.loads = 0
+
+    def load(self, key: K) -> "asyncio.Future[V]":
+        """
+        Agenda a busca de `key` e retorna um awaitable com o valor.
+
+        Não é corrotina de propósito: a chave entra na fila no momento da
+        chamada, para que `gather` de vários `load` forme um único lote.
+        """
+        self.loads += 1
+        if self.cache and key in self._futures:
+            return self._futures[key]
+
+        loop = asyncio.get_running_loop()
+        future: "asyncio.Future[V]" = loop.create_future()
+        self._queue.append((key, future))
+        if self.cache:
+            self._futures[key] = future
+
+        if not self._scheduled:
+            self._scheduled = True
+            loop.call_soon(self._dispatch)
+        return future
+
+    async def load_many(self, keys: Iterable[K]) -> List[V]:
+        """Busca várias chaves (mesmo lote) preservando a ordem."""
+        return list(await asyncio.gather(*(self.load(k) for k in keys)))
+
+    def clear(self, key: K) -> None:
+        """Remove uma chave do cache do loader."""
+        self._futures.pop(key, None)
+
+    def _dispatch(self) -> None:
+        queue, self._queue = self._queue, []
+        self._scheduled = False
+        for i in range(0, len(queue), self.max_batch_size):
+            task = asyncio.create_task(self._run_batch(queue[i:i + self.max_batch_size]))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: List[Tuple[K, "asyncio.Future[V]"]]) -> None:
+        keys = list(dict.fromkeys(key for key, _ in batch))
+        self.batches += 1
+        try:
+            results = await self.batch_load_fn(keys)
+        except Exception as e:
+            for key, future in batch:
+                self._futures.pop(key, None)  # falhas não ficam em cache
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for key, future in batch:
+            if not future.done():
+                if key in results:
+                    future.set_result(results[key])
+                else:
+                    future.set_result(self.default_factory() if self.default_factory else None)
+
+
+class GatewayLoaders:
+    """
+    Loaders por requisição sobre o PersistenceGateway.
+
+    Exemplo:
+        loaders = GatewayLoaders(persistence_gateway)
+        avaliacoes = await loaders.evaluations_by_answer.load_many(answer_ids)
+    """
+
+    def __init__(self, persistence_gateway: "PersistenceGateway", max_batch_size: int = 100,
+                 evaluations_per_answer: int = 20):
+        self.persistence_gateway = persistence_gateway
+        self.max_batch_size = max_batch_size
+        self.evaluations_per_answer = evaluations_per_answer
+        self._documents: Dict[str, DataLoader[str, Optional[Dict[str, Any]]]] = {}
+        self.evaluations_by_answer: DataLoader[str, List[Dict[str, Any]]] = DataLoader(
+            self._load_evaluations, max_batch_size=max_batch_size, default_factory=list
+        )
+
+    def documents(self, collection: str) -> DataLoader[str, Optional[Dict[str, Any]]]:
+        """Loader de documentos por ID de uma coleção (None se não existir)."""
+        loader = self._documents.get(collection)
+        if loader is None:
+            async def load(ids: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+                response = await self.persistence_gateway.mongodb.get_documents_by_ids(collection, ids)
+                if not response.success:
+                    raise GatewayError(response.error_message, status_code=response.status_code)
+                return response.data.get("items", {})
+
+            loader = DataLoader(load, max_batch_size=self.max_batch_size)
+            self._documents[collection] = loader
+        return loader
+
+    async def _load_evaluations(self, answer_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        response = await self.persistence_gateway.get_evaluations_by_answers(
+            answer_ids, limit_per_answer=self.evaluations_per_answer
+        )
+        if not response.success:
+            raise GatewayError(response.error_message, status_code=response.status_code)
+        return response.data.get("groups", {})
@@ -0,0 +1,86 @@
+"""
+Prazo (deadline) por operação, propagado até o backend_bd.
+
+O prazo é guardado em uma ContextVar como instante absoluto do relógio
+monotônico; `deadline_scope` só pode encurtá-lo, nunca estendê-lo. O
+HTTPClient limita os timeouts e os retries ao tempo restante e o envia ao
+backend_bd no header `X-Request-Deadline-Ms` (milissegundos restantes, para
+não depender de relógios sincronizados), que o converte em `maxTimeMS` do
+MongoDB e em timeouts do Qdrant.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+DEADLINE_HEADER = "X-Request-Deadline-Ms"
+
+_deadline: ContextVar[Optional[float]] = ContextVar("gateway_deadline", default=None)
+
+
+def current_deadline() -> Optional[float]:
+    """Prazo atual (time.monotonic) ou None se não houver."""
+    return _deadline.get()
+
+
+def remaining(deadline: Optional[float] = None) -> Optional[float]:
+    """
+    Segundos restantes até o prazo (pode ser negativo).
+
+    Args:
+        deadline: Prazo absoluto; usa o prazo do contexto se omitido
+
+    Returns:
+        float: Tempo restante, ou None se não houver prazo
+    """
+    deadline = _deadline.get() if deadline is None else deadline
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def earliest(*deadlines: Optional[float]) -> Optional[float]:
+    """Menor prazo entre os informados (ignora None)."""
+    candidates = [d for d in deadlines if d is not None]
+    return min(candidates) if candidates else None
+
+
+@contextmanager
+def deadline_scope(seconds: Optional[float]) -> Iterator[Optional[float]]:
+    """
+    Define um prazo de `seconds` a partir de agora para o bloco.
+
+    Se já houver um prazo menor no contexto, ele é mantido.
+
+    Args:
+        seconds: Tempo máximo do bloco (None mantém o prazo atual)
+
+    Yields:
+        float: Prazo efetivo do bloco (ou None)
+    """
+    if seconds is None:
+        yield _deadline.get()
+        return
+
+    deadline = earliest(_deadline.get(), time.monotonic() + seconds)
+    token = _deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _deadline.reset(token)
+
+
+@contextmanager
+def detached_deadline() -> Iterator[None]:
+    """
+    Remove o prazo do contexto no bloco.
+
+    Usado pela chamada compartilhada de requisições agrupadas, que não deve
+    herdar o prazo de quem a iniciou; cada chamador limita a própria espera.
+    """
+    token = _deadline.set(None)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
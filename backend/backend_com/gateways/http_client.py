@@ -6,10 +6,14 @@ timeout e tratamento de erros robusto.
 """
 
 import asyncio
+import copy
+import importlib.util
 import json
+import random
 import time
-from typing import Any, Dict, Optional, Union
-from dataclasses import dataclass
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, Optional, Tuple, Union
+from dataclasses import dataclass, replace
 import httpx
 
 from .base_gateway import (
@@ -18,6 +22,21 @@ from .base_gateway import (
     TimeoutError, 
     ServiceUnavailableError
 )
+from .deadline import DEADLINE_HEADER, current_deadline, detached_deadline, earliest, remaining
+from .resilience import AdaptiveConcurrencyLimiter, CircuitBreaker, RetryBudget
+
+# Métodos que podem ser repetidos sem risco de efeito duplicado
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+# Respostas que indicam falha transitória do upstream
+RETRYABLE_STATUS_CODES = {502, 503, 504}
+# 409 do backend_bd para uma repetição cuja original (mesma Idempotency-Key) ainda executa
+IDEMPOTENCY_STATUS_HEADER = "idempotency-status"
+IDEMPOTENCY_IN_PROGRESS = "in-progress"
+# Headers da conexão com o upstream que não devem ser repassados ao cliente
+HOP_BY_HOP_HEADERS = {
+    "connection", "keep-alive", "proxy-authenticate", "proxy-authorization",
+    "te", "trailer", "transfer-encoding", "upgrade", "server", "date"
+}
 from ..utils.logging import setup_logger
 
 
@@ -25,12 +44,115 @@ from ..utils.logging import setup_logger
 class RequestConfig:
     """Configuração para requisições HTTP."""
     
-    timeout: int = 30
+    timeout: int = 30                         # leitura/escrita
     max_retries: int = 3
-    retry_delay: float = 1.0
+    retry_delay: float = 1.0                  # base do backoff exponencial com full jitter
     retry_backoff: float = 2.0
+    retry_max_delay: float = 10.0
     headers: Optional[Dict[str, str]] = None
     verify_ssl: bool = True
+    connect_timeout: Optional[float] = None   # None = mesmo valor de `timeout`
+    pool_timeout: Optional[float] = None      # None = mesmo valor de `timeout`
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 5.0
+    http2: bool = False
+    coalesce: bool = True                     # agrupa GETs idênticos em andamento
+    etag_cache_size: int = 256                # validadores guardados (0 desativa GET condicional)
+    deadline: Optional[float] = None          # orçamento total da operação, incluindo retries (s)
+    
+    def build_timeout(self, time_left: Optional[float] = None) -> httpx.Timeout:
+        """
+        Converte a configuração em `httpx.Timeout` (connect/read/write/pool).
+        
+        Com `time_left`, nenhum componente ultrapassa o tempo restante do prazo.
+        """
+        def cap(value: float) -> float:
+            return value if time_left is None else max(min(value, time_left), 0.001)
+        
+        return httpx.Timeout(
+            cap(self.timeout),
+            connect=cap(self.connect_timeout if self.connect_timeout is not None else self.timeout),
+            pool=cap(self.pool_timeout if self.pool_timeout is not None else self.timeout)
+        )
+
+
+def http2_disponivel() -> bool:
+    """Verifica se o pacote `h2` (extra `httpx[http2]`) está instalado."""
+    return importlib.util.find_spec("h2") is not None
+
+
+@dataclass
+class PoolMetrics:
+    """
+    Métricas de espera por conexão no pool.
+    
+    `pool_wait` é o tempo entre o envio da requisição e o momento em que ela
+    obtém uma conexão (nova ou reaproveitada). Espera alta com `upstream`
+    baixo indica pool saturado; o contrário indica lentidão do backend_bd.
+    """
+    
+    requests: int = 0
+    new_connections: int = 0
+    pool_timeouts: int = 0
+    pool_wait_total_ms: float = 0.0
+    pool_wait_max_ms: float = 0.0
+    connect_total_ms: float = 0.0
+    upstream_total_ms: float = 0.0
+    
+    def record(self, pool_wait_ms: float, connect_ms: Optional[float], upstream_ms: float) -> None:
+        """Registra uma requisição concluída."""
+        self.requests += 1
+        self.pool_wait_total_ms += pool_wait_ms
+        self.pool_wait_max_ms = max(self.pool_wait_max_ms, pool_wait_ms)
+        self.upstream_total_ms += upstream_ms
+        if connect_ms is not None:
+            self.new_connections += 1
+            self.connect_total_ms += connect_ms
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Resumo para health checks e logs."""
+        n = self.requests or 1
+        return {
+            "requests": self.requests,
+            "new_connections": self.new_connections,
+            "reused_connections": self.requests - self.new_connections,
+            "pool_timeouts": self.pool_timeouts,
+            "pool_wait_avg_ms": round(self.pool_wait_total_ms / n, 2),
+            "pool_wait_max_ms": round(self.pool_wait_max_ms, 2),
+            "connect_avg_ms": round(self.connect_total_ms / (self.new_connections or 1), 2),
+            "upstream_avg_ms": round(self.upstream_total_ms / n, 2),
+        }
+
+
+class _ConnectionTrace:
+    """
+    Callback da extensão `trace` do httpx/httpcore para uma requisição.
+    
+    O primeiro evento emitido (connect_tcp em conexão nova ou
+    send_request_headers em conexão reaproveitada) marca a saída do pool.
+    """
+    
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.acquired: Optional[float] = None
+        self._connect_started: Optional[float] = None
+        self.connect_ms: Optional[float] = None
+    
+    async def __call__(self, event_name: str, info: Dict[str, Any]) -> None:
+        now = time.perf_counter()
+        if self.acquired is None:
+            self.acquired = now
+        if event_name == "connection.connect_tcp.started":
+            self._connect_started = now
+        elif event_name in ("connection.start_tls.complete", "connection.connect_tcp.complete"):
+            if self._connect_started is not None:
+                self.connect_ms = (now - self._connect_started) * 1000
+    
+    @property
+    def pool_wait_ms(self) -> float:
+        fim = self.acquired if self.acquired is not None else time.perf_counter()
+        return (fim - self.started) * 1000
 
 
 @dataclass 
@@ -42,6 +164,7 @@ class HTTPResponse:
     headers: Dict[str, str]
     duration_ms: float
     url: str
+    pool_wait_ms: float = 0.0
     
     @property
     def is_success(self) -> bool:
@@ -54,6 +177,104 @@ class HTTPResponse:
         return isinstance(self.content, dict)
 
 
+class ValidatorCache:
+    """
+    LRU limitado de respostas GET com ETag, para revalidação via If-None-Match.
+    
+    Guarda uma cópia do conteúdo; quem lê recebe outra cópia, então
+    alterações feitas pelos chamadores não afetam o cache.
+    """
+    
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, Tuple[str, HTTPResponse]]" = OrderedDict()
+    
+    def get(self, key: Tuple) -> Optional[Tuple[str, HTTPResponse]]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+    
+    def set(self, key: Tuple, etag: str, response: HTTPResponse) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (etag, replace(response, content=copy.deepcopy(response.content)))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def discard(self, key: Tuple) -> None:
+        self._entries.pop(key, None)
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class StreamingHTTPResponse:
+    """
+    Resposta cujo corpo é lido do upstream sob demanda (modo pass-through).
+    
+    O corpo não é decodificado nem convertido em objetos Python: os bytes
+    (inclusive comprimidos) seguem para o cliente à medida que chegam. A
+    conexão volta ao pool em `aclose()`, que deve sempre ser chamado.
+    """
+    
+    def __init__(self, response: httpx.Response, url: str, duration_ms: float,
+                 pool_wait_ms: float = 0.0, on_close=None):
+        self._response = response
+        self.url = url
+        self.duration_ms = duration_ms
+        self.pool_wait_ms = pool_wait_ms
+        self.bytes_streamed = 0
+        self._on_close = on_close
+        self._closed = False
+    
+    @property
+    def status_code(self) -> int:
+        return self._response.status_code
+    
+    @property
+    def is_success(self) -> bool:
+        """Verifica se resposta foi bem-sucedida."""
+        return 200 <= self.status_code < 300
+    
+    @property
+    def media_type(self) -> Optional[str]:
+        return self._response.headers.get("content-type")
+    
+    def forward_headers(self) -> Dict[str, str]:
+        """Headers do upstream que podem ser repassados ao cliente."""
+        return {
+            name: value for name, value in self._response.headers.items()
+            if name.lower() not in HOP_BY_HOP_HEADERS
+        }
+    
+    async def aiter_bytes(self, chunk_size: Optional[int] = None) -> AsyncIterator[bytes]:
+        """Itera sobre o corpo bruto do upstream, sem descomprimir."""
+        async for chunk in self._response.aiter_raw(chunk_size):
+            self.bytes_streamed += len(chunk)
+            yield chunk
+    
+    async def read(self) -> bytes:
+        """Lê o corpo inteiro (descomprimido) — para respostas de erro pequenas."""
+        return await self._response.aread()
+    
+    async def aclose(self) -> None:
+        """Libera a conexão com o upstream."""
+        if self._closed:
+            return
+        self._closed = True
+        await self._response.aclose()
+        if self._on_close:
+            self._on_close(self)
+    
+    async def __aenter__(self) -> "StreamingHTTPResponse":
+        return self
+    
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+
 class HTTPClient:
     """
     Cliente HTTP assíncrono com recursos avançados.
@@ -62,22 +283,98 @@ class HTTPClient:
     tratamento de erros para comunicação com APIs externas.
     """
     
-    def __init__(self, base_url: str, default_config: Optional[RequestConfig] = None):
+    def __init__(self, base_url: str, default_config: Optional[RequestConfig] = None,
+                 circuit_breaker: Optional[CircuitBreaker] = None,
+                 limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+                 retry_budget: Optional[RetryBudget] = None,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
         self.base_url = base_url.rstrip('/')
         self.default_config = default_config or RequestConfig()
+        # Um breaker e um limitador por upstream (este cliente = um base_url)
+        self.circuit_breaker = circuit_breaker or CircuitBreaker(self.base_url)
+        self.limiter = limiter or AdaptiveConcurrencyLimiter(
+            max_limit=self.default_config.max_connections
+        )
+        self.retry_budget = retry_budget or RetryBudget()
+        
+        # Respostas em modo pass-through (stream)
+        self.open_streams = 0
+        self.streamed_responses = 0
+        self.streamed_bytes = 0
         self.logger = setup_logger("http_client")
         self._client: Optional[httpx.AsyncClient] = None
+        # Transport explícito (ex.: ASGITransport no modo in-process) substitui o pool de rede
+        self._transport = transport
+        self.pool_metrics = PoolMetrics()
+        self._http2_enabled = False
+        self._inflight: Dict[Tuple, "asyncio.Task[HTTPResponse]"] = {}
+        self.coalesced_requests = 0
+        self._validators = ValidatorCache(self.default_config.etag_cache_size)
+        self.not_modified_responses = 0
     
     async def _get_client(self) -> httpx.AsyncClient:
         """Obtém cliente HTTP reutilizável."""
         if self._client is None:
+            config = self.default_config
+            if self._transport is not None:
+                self._client = httpx.AsyncClient(timeout=config.build_timeout(), transport=self._transport)
+                return self._client
+            
+            http2 = config.http2
+            if http2 and not http2_disponivel():
+                self.logger.warning("HTTP/2 solicitado mas o pacote 'h2' não está instalado; usando HTTP/1.1")
+                http2 = False
+            self._http2_enabled = http2
+            
             self._client = httpx.AsyncClient(
-                timeout=httpx.Timeout(self.default_config.timeout),
-                verify=self.default_config.verify_ssl,
-                limits=httpx.Limits(max_keepalive_connections=20, max_connections=100)
+                timeout=config.build_timeout(),
+                verify=config.verify_ssl,
+                http2=http2,
+                limits=httpx.Limits(
+                    max_keepalive_connections=config.max_keepalive_connections,
+                    max_connections=config.max_connections,
+                    keepalive_expiry=config.keepalive_expiry
+                )
             )
         return self._client
     
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """
+        Retorna configuração e métricas do pool de conexões.
+        
+        Returns:
+            dict: Limites configurados e métricas de espera/conexão
+        """
+        config = self.default_config
+        return {
+            "transport": "network" if self._transport is None else type(self._transport).__name__,
+            "http2": self._http2_enabled,
+            "max_connections": config.max_connections,
+            "max_keepalive_connections": config.max_keepalive_connections,
+            "keepalive_expiry": config.keepalive_expiry,
+            **self.pool_metrics.to_dict(),
+            "inflight_gets": len(self._inflight),
+            "coalesced_requests": self.coalesced_requests,
+            "etag_cache_entries": len(self._validators),
+            "not_modified_responses": self.not_modified_responses,
+            "open_streams": self.open_streams,
+            "streamed_responses": self.streamed_responses,
+            "streamed_bytes": self.streamed_bytes
+        }
+    
+    def get_resilience_stats(self) -> Dict[str, Any]:
+        """
+        Retorna estado do circuit breaker e do limite adaptativo de concorrência.
+        
+        Returns:
+            dict: Estado do breaker e limites atuais
+        """
+        return {
+            "circuit_breaker": self.circuit_breaker.to_dict(),
+            "concurrency": self.limiter.to_dict(),
+            "retry_budget": self.retry_budget.to_dict()
+        }
+    
     async def get(self, endpoint: str, params: Optional[Dict[str, Any]] = None,
                   config: Optional[RequestConfig] = None) -> HTTPResponse:
         """
@@ -91,25 +388,257 @@ class HTTPClient:
         Returns:
             HTTPResponse: Resposta da requisição
         """
-        return await self._request("GET", endpoint, params=params, config=config)
+        req_config = config or self.default_config
+        if not req_config.coalesce:
+            return await self._conditional_get(endpoint, params, req_config)
+        return await self._coalesced("GET", endpoint, params, req_config)
+    
+    async def _conditional_get(self, endpoint: str, params: Optional[Dict[str, Any]],
+                               config: RequestConfig) -> HTTPResponse:
+        """
+        GET com revalidação: se há ETag guardado envia If-None-Match e,
+        em 304, devolve o corpo guardado em vez de baixá-lo novamente.
+        """
+        if config.etag_cache_size <= 0:
+            return await self._request("GET", endpoint, params=params, config=config)
+        
+        key = self._coalesce_key("GET", endpoint, params, config)
+        cached = self._validators.get(key)
+        extra_headers = {"If-None-Match": cached[0]} if cached else None
+        
+        response = await self._request("GET", endpoint, params=params, config=config,
+                                       extra_headers=extra_headers)
+        
+        if response.status_code == 304 and cached:
+            self.not_modified_responses += 1
+            cached_response = cached[1]
+            return replace(cached_response, content=copy.deepcopy(cached_response.content),
+                           headers=dict(cached_response.headers),
+                           duration_ms=response.duration_ms, pool_wait_ms=response.pool_wait_ms)
+        
+        etag = response.headers.get("etag")
+        if response.is_success and etag:
+            self._validators.set(key, etag, response)
+        else:
+            self._validators.discard(key)
+        return response
+    
+    def _coalesce_key(self, method: str, endpoint: str, params: Optional[Dict[str, Any]],
+                      config: RequestConfig) -> Tuple:
+        """
+        Chave de agrupamento: método, URL, parâmetros, escopo de autenticação
+        e os limites da config (a chamada compartilhada usa a config de quem
+        a iniciou).
+        """
+        headers = self._prepare_headers(config.headers)
+        return (
+            method,
+            self._build_url(endpoint),
+            tuple(sorted((k, str(v)) for k, v in (params or {}).items())),
+            headers.get("Authorization"),
+            (config.timeout, config.connect_timeout, config.pool_timeout,
+             config.max_retries, config.deadline, config.etag_cache_size),
+        )
+    
+    async def _coalesced(self, method: str, endpoint: str, params: Optional[Dict[str, Any]],
+                         config: RequestConfig) -> HTTPResponse:
+        """
+        Singleflight: requisições idênticas em andamento compartilham uma única
+        chamada ao upstream.
+        
+        A chamada roda em uma task própria, então o cancelamento de um dos
+        chamadores (inclusive o primeiro) não afeta os demais. Ela não herda
+        o prazo de quem a iniciou (só o `deadline` da config); cada chamador
+        espera no máximo o próprio tempo restante.
+        
+        O resultado da task é o retrato da resposta e nunca sai dela: todos
+        os chamadores, inclusive o líder, recebem cópia. Assim o que um deles
+        altera no conteúdo não chega aos que ainda vão retomar.
+        """
+        key = self._coalesce_key(method, endpoint, params, config)
+        task = self._inflight.get(key)
+        
+        if task is None:
+            task = asyncio.ensure_future(self._shared_get(endpoint, params, config))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._finish_inflight(key, t))
+        else:
+            self.coalesced_requests += 1
+        
+        response = await self._wait_shared(task, endpoint)
+        return replace(response, content=copy.deepcopy(response.content),
+                       headers=dict(response.headers))
+    
+    async def _shared_get(self, endpoint: str, params: Optional[Dict[str, Any]],
+                          config: RequestConfig) -> HTTPResponse:
+        # A task copia o contexto do líder: o prazo dele é removido só aqui dentro
+        with detached_deadline():
+            return await self._conditional_get(endpoint, params, config)
+    
+    async def _wait_shared(self, task: "asyncio.Task[HTTPResponse]", endpoint: str) -> HTTPResponse:
+        """Espera a chamada compartilhada até o prazo deste chamador."""
+        time_left = remaining(current_deadline())
+        if time_left is None:
+            return await asyncio.shield(task)
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), max(time_left, 0.0))
+        except asyncio.TimeoutError:
+            raise TimeoutError(
+                f"Deadline exceeded waiting for {self._build_url(endpoint)}",
+                details={"deadline_exceeded": True, "coalesced": True}
+            )
+    
+    def _finish_inflight(self, key: Tuple, task: "asyncio.Task[HTTPResponse]") -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # evita aviso de exceção não recuperada se todos cancelaram
+    
+    async def stream(self, method: str, endpoint: str,
+                     params: Optional[Dict[str, Any]] = None,
+                     config: Optional[RequestConfig] = None,
+                     extra_headers: Optional[Dict[str, str]] = None) -> StreamingHTTPResponse:
+        """
+        Executa requisição e devolve o corpo como stream (modo pass-through).
+        
+        Para rotas que apenas repassam a resposta do backend_bd (listas,
+        exportações): a memória não cresce com o tamanho do corpo e o
+        primeiro byte chega ao cliente sem esperar o download completo.
+        Não há retry — o corpo pode já estar sendo entregue — nem
+        coalescing/ETag; o circuit breaker e o limite de concorrência
+        valem até a chegada dos headers.
+        
+        Args:
+            method: Método HTTP
+            endpoint: Endpoint para requisição
+            params: Parâmetros de query
+            config: Configuração da requisição
+            extra_headers: Headers adicionais só desta requisição
+            
+        Returns:
+            StreamingHTTPResponse: Resposta com corpo ainda não lido
+            
+        Raises:
+            GatewayError: Em falha de conexão, timeout ou circuito aberto
+        """
+        req_config = config or self.default_config
+        client = await self._get_client()
+        url = self._build_url(endpoint)
+        
+        headers = self._prepare_headers(req_config.headers)
+        # O corpo é repassado como veio (sem descomprimir): por padrão pede
+        # identity; quem repassa pode enviar o Accept-Encoding do cliente final
+        headers["Accept-Encoding"] = "identity"
+        if extra_headers:
+            headers.update(extra_headers)
+        
+        time_left = remaining(earliest(
+            current_deadline(),
+            time.monotonic() + req_config.deadline if req_config.deadline else None
+        ))
+        if time_left is not None:
+            if time_left <= 0:
+                raise TimeoutError(f"Deadline exceeded before request to {url}",
+                                   details={"deadline_exceeded": True})
+            headers[DEADLINE_HEADER] = str(int(time_left * 1000))
+        
+        self.circuit_breaker.before_call()
+        start_time = time.time()
+        try:
+            async with self.limiter.slot():
+                start_time = time.time()
+                trace = _ConnectionTrace()
+                request = client.build_request(
+                    method, url, params=params, headers=headers,
+                    timeout=req_config.build_timeout(time_left), extensions={"trace": trace}
+                )
+                response = await client.send(request, stream=True)
+        except httpx.ConnectError as e:
+            self.circuit_breaker.record_failure()
+            raise ConnectionError(f"Failed to connect to {url}", details={"original_error": str(e)})
+        except httpx.PoolTimeout as e:
+            self.pool_metrics.pool_timeouts += 1
+            self.circuit_breaker.cancel_call()
+            raise TimeoutError(
+                f"Connection pool exhausted waiting for {url}",
+                details={"original_error": str(e), "pool_exhausted": True}
+            )
+        except httpx.TimeoutException as e:
+            self.circuit_breaker.record_failure()
+            self.limiter.on_sample((time.time() - start_time) * 1000, overloaded=True)
+            raise TimeoutError(
+                f"Request to {url} timed out after {req_config.timeout}s",
+                details={"original_error": str(e)}
+            )
+        except GatewayError:
+            self.circuit_breaker.cancel_call()
+            raise
+        
+        # Tempo até os headers (o corpo ainda não foi lido)
+        duration_ms = (time.time() - start_time) * 1000
+        pool_wait_ms = trace.pool_wait_ms
+        upstream_ms = max(duration_ms - pool_wait_ms, 0.0)
+        self.pool_metrics.record(pool_wait_ms, trace.connect_ms, upstream_ms)
+        
+        if response.status_code >= 500:
+            self.circuit_breaker.record_failure()
+            self.limiter.on_sample(upstream_ms, overloaded=response.status_code in RETRYABLE_STATUS_CODES)
+        else:
+            self.circuit_breaker.record_success()
+            self.limiter.on_sample(upstream_ms)
+        
+        self.open_streams += 1
+        self.streamed_responses += 1
+        
+        self.logger.info(
+            f"HTTP {method} stream opened",
+            extra={
+                "method": method,
+                "url": url,
+                "status_code": response.status_code,
+                "duration_ms": duration_ms,
+                "pool_wait_ms": pool_wait_ms
+            }
+        )
+        
+        return StreamingHTTPResponse(
+            response, url, duration_ms, pool_wait_ms, on_close=self._stream_closed
+        )
+    
+    def _stream_closed(self, stream: StreamingHTTPResponse) -> None:
+        self.open_streams -= 1
+        self.streamed_bytes += stream.bytes_streamed
     
     async def post(self, endpoint: str, data: Optional[Dict[str, Any]] = None,
                    json_data: Optional[Dict[str, Any]] = None,
-                   config: Optional[RequestConfig] = None) -> HTTPResponse:
+                   config: Optional[RequestConfig] = None,
+                   idempotency_key: Optional[str] = None,
+                   idempotent: bool = False) -> HTTPResponse:
         """
         Executa requisição POST.
         
+        POST só é repetido após falha se levar `idempotency_key` (o backend_bd
+        deduplica pelo header Idempotency-Key) ou se for marcado como
+        `idempotent` (ex.: buscas e cálculos sem efeito colateral). Se a
+        repetição chega enquanto a original ainda executa (409 "in-progress"),
+        espera e repete dentro do prazo até receber a resposta guardada.
+        
         Args:
             endpoint: Endpoint para requisição
             data: Dados para enviar como form-data
             json_data: Dados para enviar como JSON
             config: Configuração da requisição
+            idempotency_key: Chave de idempotência da operação lógica
+            idempotent: Se a operação pode ser repetida sem efeito duplicado
             
         Returns:
             HTTPResponse: Resposta da requisição
         """
+        extra_headers = {"Idempotency-Key": idempotency_key} if idempotency_key else None
         return await self._request("POST", endpoint, data=data, 
-                                 json_data=json_data, config=config)
+                                 json_data=json_data, config=config,
+                                 extra_headers=extra_headers,
+                                 idempotent=idempotent or bool(idempotency_key))
     
     async def put(self, endpoint: str, data: Optional[Dict[str, Any]] = None,
                   json_data: Optional[Dict[str, Any]] = None,
@@ -144,11 +673,24 @@ class HTTPClient:
         """
         return await self._request("DELETE", endpoint, params=params, config=config)
     
+    @staticmethod
+    def _backoff_delay(config: RequestConfig, attempt: int) -> float:
+        """
+        Backoff exponencial com full jitter.
+        
+        Espera um valor aleatório entre 0 e o teto exponencial, para que
+        clientes que falharam juntos não repitam a requisição em sincronia.
+        """
+        cap = min(config.retry_max_delay, config.retry_delay * (config.retry_backoff ** attempt))
+        return random.uniform(0, cap)
+    
     async def _request(self, method: str, endpoint: str,
                       params: Optional[Dict[str, Any]] = None,
                       data: Optional[Dict[str, Any]] = None,
                       json_data: Optional[Dict[str, Any]] = None,
-                      config: Optional[RequestConfig] = None) -> HTTPResponse:
+                      config: Optional[RequestConfig] = None,
+                      extra_headers: Optional[Dict[str, str]] = None,
+                      idempotent: bool = False) -> HTTPResponse:
         """
         Executa requisição HTTP com retry e tratamento de erros.
         
@@ -159,6 +701,9 @@ class HTTPClient:
             data: Dados form-data
             json_data: Dados JSON
             config: Configuração da requisição
+            extra_headers: Headers adicionais só desta requisição
+            idempotent: Permite retry de método não idempotente (ex.: POST com
+                Idempotency-Key)
             
         Returns:
             HTTPResponse: Resposta da requisição
@@ -169,11 +714,38 @@ class HTTPClient:
         req_config = config or self.default_config
         url = self._build_url(endpoint)
         headers = self._prepare_headers(req_config.headers)
+        if extra_headers:
+            headers.update(extra_headers)
+        
+        # Só repete após envio métodos idempotentes ou operações com chave de idempotência
+        retryable = idempotent or method in IDEMPOTENT_METHODS
+        self.retry_budget.record_request()
+        
+        # Prazo da operação: o menor entre o do contexto (ex.: timeout do passo) e o da config
+        deadline = earliest(
+            current_deadline(),
+            time.monotonic() + req_config.deadline if req_config.deadline else None
+        )
         
         last_exception = None
         
         for attempt in range(req_config.max_retries + 1):
+            time_left = remaining(deadline)
+            if time_left is not None:
+                if time_left <= 0:
+                    last_exception = TimeoutError(
+                        f"Deadline exceeded before request to {url}",
+                        details={"deadline_exceeded": True, "attempts": attempt}
+                    )
+                    break
+                headers[DEADLINE_HEADER] = str(int(time_left * 1000))
+            
+            # Circuito aberto: falha imediatamente, sem novas tentativas
+            self.circuit_breaker.before_call()
             start_time = time.time()
+            request_sent = True
+            retry_response: Optional[HTTPResponse] = None
+            in_progress = False
             
             try:
                 self.logger.info(
@@ -193,7 +765,7 @@ class HTTPClient:
                     "method": method,
                     "url": url,
                     "headers": headers,
-                    "timeout": req_config.timeout
+                    "timeout": req_config.build_timeout(time_left)
                 }
                 
                 if params:
@@ -204,14 +776,49 @@ class HTTPClient:
                 elif data:
                     request_kwargs["data"] = data
                 
-                # Executa requisição
-                response = await client.request(**request_kwargs)
+                # Executa requisição (dentro do limite adaptativo de concorrência)
+                async with self.limiter.slot():
+                    start_time = time.time()
+                    trace = _ConnectionTrace()
+                    request_kwargs["extensions"] = {"trace": trace}
+                    response = await client.request(**request_kwargs)
                 duration_ms = (time.time() - start_time) * 1000
+                pool_wait_ms = trace.pool_wait_ms
+                upstream_ms = max(duration_ms - pool_wait_ms, 0.0)
+                self.pool_metrics.record(pool_wait_ms, trace.connect_ms, upstream_ms)
+                
+                if response.status_code >= 500:
+                    self.circuit_breaker.record_failure()
+                    self.limiter.on_sample(upstream_ms, overloaded=response.status_code in (502, 503, 504))
+                else:
+                    self.circuit_breaker.record_success()
+                    self.limiter.on_sample(upstream_ms)
                 
                 # Processa resposta
                 http_response = await self._process_response(
                     response, url, duration_ms
                 )
+                http_response.pool_wait_ms = pool_wait_ms
+                
+                if (response.status_code in RETRYABLE_STATUS_CODES and retryable
+                        and attempt < req_config.max_retries):
+                    # Falha transitória: tenta de novo (se o orçamento permitir)
+                    retry_response = http_response
+                    raise ServiceUnavailableError(
+                        f"Server error {response.status_code} from {url}",
+                        status_code=response.status_code
+                    )
+                
+                if (response.status_code == 409 and attempt < req_config.max_retries
+                        and response.headers.get(IDEMPOTENCY_STATUS_HEADER) == IDEMPOTENCY_IN_PROGRESS):
+                    # A tentativa anterior ainda executa no backend_bd: espera e
+                    # repete para receber a resposta guardada
+                    retry_response = http_response
+                    in_progress = True
+                    raise GatewayError(
+                        f"Request with the same Idempotency-Key still in progress at {url}",
+                        status_code=409
+                    )
                 
                 self.logger.info(
                     f"HTTP {method} request successful",
@@ -220,6 +827,8 @@ class HTTPClient:
                         "url": url,
                         "status_code": response.status_code,
                         "duration_ms": duration_ms,
+                        "pool_wait_ms": pool_wait_ms,
+                        "http_version": response.http_version,
                         "attempt": attempt + 1
                     }
                 )
@@ -227,12 +836,28 @@ class HTTPClient:
                 return http_response
                 
             except httpx.ConnectError as e:
+                self.circuit_breaker.record_failure()
+                request_sent = False
                 last_exception = ConnectionError(
                     f"Failed to connect to {url}",
                     details={"original_error": str(e)}
                 )
                 
+            except httpx.PoolTimeout as e:
+                # Nenhuma conexão livre no pool: saturação local, não lentidão do backend_bd
+                self.pool_metrics.pool_timeouts += 1
+                self.circuit_breaker.cancel_call()
+                request_sent = False
+                last_exception = TimeoutError(
+                    f"Connection pool exhausted waiting for {url} "
+                    f"(max_connections={self.default_config.max_connections})",
+                    details={"original_error": str(e), "pool_exhausted": True}
+                )
+                
             except httpx.TimeoutException as e:
+                self.circuit_breaker.record_failure()
+                self.limiter.on_sample((time.time() - start_time) * 1000, overloaded=True)
+                request_sent = not isinstance(e, httpx.ConnectTimeout)
                 last_exception = TimeoutError(
                     f"Request to {url} timed out after {req_config.timeout}s",
                     details={"original_error": str(e)}
@@ -254,15 +879,34 @@ class HTTPClient:
                     details={"response_text": e.response.text}
                 )
                 
+            except GatewayError as e:
+                if retry_response is None:
+                    # Rejeição local do limitador de concorrência
+                    self.circuit_breaker.cancel_call()
+                    request_sent = False
+                last_exception = e
+                
             except Exception as e:
+                self.circuit_breaker.cancel_call()
                 last_exception = GatewayError(
                     f"Unexpected error during request to {url}",
                     details={"original_error": str(e)}
                 )
             
-            # Log do erro e aguarda antes do próximo retry
+            # Log do erro e decide se há nova tentativa
             duration_ms = (time.time() - start_time) * 1000
             
+            # Requisição que não chegou ao upstream pode ser repetida mesmo sem idempotência
+            will_retry = attempt < req_config.max_retries and (retryable or not request_sent)
+            delay = self._backoff_delay(req_config, attempt) if will_retry else 0.0
+            time_left = remaining(deadline)
+            if will_retry and time_left is not None and time_left <= delay:
+                # Não há tempo para esperar e tentar de novo dentro do prazo
+                will_retry = False
+            # Esperar a original não é carga extra de falha: não consome o orçamento
+            if will_retry and not in_progress and not self.retry_budget.try_acquire():
+                will_retry = False
+            
             self.logger.warning(
                 f"HTTP {method} request failed, attempt {attempt + 1}",
                 extra={
@@ -271,18 +915,21 @@ class HTTPClient:
                     "error": str(last_exception),
                     "duration_ms": duration_ms,
                     "attempt": attempt + 1,
-                    "will_retry": attempt < req_config.max_retries
+                    "will_retry": will_retry
                 }
             )
             
-            # Aguarda antes do próximo retry (com backoff exponencial)
-            if attempt < req_config.max_retries:
-                delay = req_config.retry_delay * (req_config.retry_backoff ** attempt)
-                await asyncio.sleep(delay)
+            if not will_retry:
+                if retry_response is not None:
+                    # Sem orçamento ou prazo para retry: devolve a resposta (5xx ou 409)
+                    return retry_response
+                break
+            
+            await asyncio.sleep(delay)
         
         # Todas as tentativas falharam
         self.logger.error(
-            f"HTTP {method} request failed after {req_config.max_retries + 1} attempts",
+            f"HTTP {method} request failed after {attempt + 1} attempts",
             extra={
                 "method": method,
                 "url": url,
@@ -0,0 +1,93 @@
+"""
+Modo in-process: o backend_mq montado no mesmo processo do gateway.
+
+Em implantações pequenas os dois serviços rodam no mesmo host; com
+`BACKEND_BD_TRANSPORT=asgi` o HTTPClient usa `httpx.ASGITransport` e chama
+o app FastAPI do backend_mq diretamente, sem TCP de loopback, sem framing
+HTTP e sem passar pelo uvicorn. O contrato (rotas, headers, JSON) é o
+mesmo do modo de rede, então o restante do gateway não muda.
+
+Limitações do modo in-process:
+- eventos de lifespan/startup do backend_mq não são executados (as
+  conexões com MongoDB/Qdrant são abertas na importação dos módulos);
+- `ASGITransport` entrega o corpo inteiro de uma vez, então `stream()`
+  funciona, mas sem ganho de memória;
+- métricas de espera por conexão do pool ficam zeradas.
+"""
+
+import importlib
+import sys
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Optional
+
+import httpx
+
+TRANSPORT_HTTP = "http"
+TRANSPORT_ASGI = "asgi"
+
+# backend/backend_com/gateways -> raiz do repositório
+_REPO_ROOT = Path(__file__).resolve().parents[3]
+DEFAULT_APP_DIR = _REPO_ROOT / "backend_bd" / "backend_mq"
+
+
+def load_asgi_app(app_spec: str, app_dir: Optional[str] = None) -> Any:
+    """
+    Importa um app ASGI a partir de "modulo:atributo".
+
+    Args:
+        app_spec: Referência ao app (ex.: "app.main:app")
+        app_dir: Diretório adicionado ao sys.path antes da importação
+
+    Returns:
+        Aplicação ASGI
+
+    Raises:
+        ValueError: Se a referência for inválida
+    """
+    module_name, _, attribute = app_spec.partition(":")
+    if not module_name or not attribute:
+        raise ValueError(f"Invalid ASGI app reference '{app_spec}' (expected 'module:attribute')")
+
+    directory = str(Path(app_dir) if app_dir else DEFAULT_APP_DIR)
+    if directory not in sys.path:
+        sys.path.insert(0, directory)
+
+    module = importlib.import_module(module_name)
+    return getattr(module, attribute)
+
+
+@lru_cache(maxsize=None)
+def get_asgi_transport(app_spec: str, app_dir: Optional[str] = None) -> httpx.ASGITransport:
+    """
+    Transport ASGI compartilhado para o app indicado (importado uma vez).
+
+    Args:
+        app_spec: Referência ao app (ex.: "app.main:app")
+        app_dir: Diretório do app (padrão: backend_bd/backend_mq)
+
+    Returns:
+        httpx.ASGITransport: Transport para `httpx.AsyncClient(transport=...)`
+    """
+    return httpx.ASGITransport(app=load_asgi_app(app_spec, app_dir))
+
+
+def transport_from_settings(settings) -> Optional[httpx.ASGITransport]:
+    """
+    Transport configurado para o backend_bd (None = rede).
+
+    Args:
+        settings: Configurações da aplicação
+
+    Returns:
+        httpx.ASGITransport ou None no modo de rede
+
+    Raises:
+        ValueError: Se `backend_bd_transport` for desconhecido
+    """
+    mode = settings.backend_bd_transport.lower()
+    if mode == TRANSPORT_HTTP:
+        return None
+    if mode == TRANSPORT_ASGI:
+        return get_asgi_transport(settings.backend_bd_asgi_app, settings.backend_bd_asgi_dir)
+    raise ValueError(f"Unknown backend_bd_transport '{settings.backend_bd_transport}' (use 'http' or 'asgi')")
@@ -5,12 +5,16 @@ Gerencia operações com MongoDB e Qdrant através do backend_bd,
 fornecendo interface unificada para o sistema de persistência.
 """
 
+import json
 import time
+import uuid
 from typing import Any, Dict, List, Optional, Union
 from datetime import datetime
 
 from .base_gateway import BaseGateway, GatewayResponse, GatewayError
-from .http_client import HTTPClient, RequestConfig
+from .http_client import HTTPClient, RequestConfig, StreamingHTTPResponse
+from .inprocess import transport_from_settings
+from .resilience import AdaptiveConcurrencyLimiter, CircuitBreaker, RetryBudget
 from ..config import get_settings
 from ..models import PaginationParams
 
@@ -35,9 +39,11 @@ class MongoDBOperations:
             GatewayResponse: Resultado da operação
         """
         try:
+            # Chave por operação lógica: retries não duplicam o documento
             response = await self.client.post(
                 f"/mongodb/{collection}",
-                json_data=document
+                json_data=document,
+                idempotency_key=uuid.uuid4().hex
             )
             
             if response.is_success:
@@ -57,19 +63,22 @@ class MongoDBOperations:
                 error_message=f"Error creating document: {str(e)}"
             )
     
-    async def get_document(self, collection: str, document_id: str) -> GatewayResponse:
+    async def get_document(self, collection: str, document_id: str,
+                          fields: Optional[List[str]] = None) -> GatewayResponse:
         """
         Busca documento por ID.
         
         Args:
             collection: Nome da coleção
             document_id: ID do documento
+            fields: Campos a retornar (None para o documento completo)
             
         Returns:
             GatewayResponse: Documento encontrado ou erro
         """
         try:
-            response = await self.client.get(f"/mongodb/{collection}/{document_id}")
+            params = {"fields": ",".join(fields)} if fields else None
+            response = await self.client.get(f"/mongodb/{collection}/{document_id}", params=params)
             
             if response.is_success:
                 return GatewayResponse.success_response(
@@ -124,6 +133,50 @@ class MongoDBOperations:
                 error_message=f"Error updating document: {str(e)}"
             )
     
+    async def atomic_update_document(self, collection: str, document_id: str,
+                                     operators: Dict[str, Any],
+                                     upsert: bool = False) -> GatewayResponse:
+        """
+        Atualiza documento com operadores atômicos (`$inc`, `$set`, `$push`).
+        
+        A alteração é aplicada pelo MongoDB em uma única operação, sem ler o
+        documento antes: incrementos concorrentes não se perdem.
+        
+        Args:
+            collection: Nome da coleção
+            document_id: ID do documento
+            operators: Operadores, ex.: {"$inc": {"respostas_count": 1}}
+            upsert: Cria o documento se não existir
+            
+        Returns:
+            GatewayResponse: Documento atualizado
+        """
+        try:
+            # Chave por operação lógica: um retry não aplica o $inc duas vezes
+            endpoint = f"/mongodb/{collection}/{document_id}/atomic"
+            response = await self.client.post(
+                f"{endpoint}?upsert=true" if upsert else endpoint,
+                json_data=operators,
+                idempotency_key=uuid.uuid4().hex
+            )
+            
+            if response.is_success:
+                return GatewayResponse.success_response(
+                    data=response.content,
+                    duration_ms=response.duration_ms
+                )
+            else:
+                return GatewayResponse.error_response(
+                    error_message=f"Failed to update document: {response.content}",
+                    status_code=response.status_code,
+                    duration_ms=response.duration_ms
+                )
+                
+        except Exception as e:
+            return GatewayResponse.error_response(
+                error_message=f"Error updating document: {str(e)}"
+            )
+    
     async def delete_document(self, collection: str, document_id: str) -> GatewayResponse:
         """
         Remove documento do MongoDB.
@@ -157,7 +210,8 @@ class MongoDBOperations:
     
     async def find_documents(self, collection: str, query: Dict[str, Any],
                            pagination: Optional[PaginationParams] = None,
-                           sort: Optional[Dict[str, int]] = None) -> GatewayResponse:
+                           sort: Optional[Dict[str, int]] = None,
+                           fields: Optional[List[str]] = None) -> GatewayResponse:
         """
         Busca documentos com filtros e paginação.
         
@@ -166,22 +220,13 @@ class MongoDBOperations:
             query: Filtros de busca
             pagination: Parâmetros de paginação
             sort: Critérios de ordenação
+            fields: Campos a retornar (projeção aplicada no MongoDB)
             
         Returns:
             GatewayResponse: Lista de documentos encontrados
         """
         try:
-            params = {"query": query}
-            
-            if pagination:
-                params.update({
-                    "page": pagination.page,
-                    "page_size": pagination.page_size
-                })
-            
-            if sort:
-                params["sort"] = sort
-            
+            params = self._search_params(query, pagination, sort, fields)
             response = await self.client.get(f"/mongodb/{collection}/search", params=params)
             
             if response.is_success:
@@ -200,6 +245,141 @@ class MongoDBOperations:
             return GatewayResponse.error_response(
                 error_message=f"Error searching documents: {str(e)}"
             )
+    
+    async def stream_documents(self, collection: str, query: Dict[str, Any],
+                               pagination: Optional[PaginationParams] = None,
+                               sort: Optional[Dict[str, int]] = None,
+                               fields: Optional[List[str]] = None,
+                               headers: Optional[Dict[str, str]] = None) -> StreamingHTTPResponse:
+        """
+        Mesma busca de `find_documents`, com o corpo em modo pass-through.
+        
+        O JSON do backend_bd não é decodificado: use para rotas que só
+        repassam a lista ao cliente. Quem chama deve fechar a resposta.
+        
+        Args:
+            collection: Nome da coleção
+            query: Filtros de busca
+            pagination: Parâmetros de paginação
+            sort: Critérios de ordenação
+            fields: Campos a retornar (projeção aplicada no MongoDB)
+            headers: Headers adicionais (ex.: Accept-Encoding do cliente final)
+            
+        Returns:
+            StreamingHTTPResponse: Resposta do backend_bd ainda não lida
+        """
+        params = self._search_params(query, pagination, sort, fields)
+        return await self.client.stream("GET", f"/mongodb/{collection}/search",
+                                        params=params, extra_headers=headers)
+    
+    @staticmethod
+    def _search_params(query: Dict[str, Any], pagination: Optional[PaginationParams],
+                       sort: Optional[Dict[str, int]], fields: Optional[List[str]]) -> Dict[str, Any]:
+        # Filtros e ordenação seguem como JSON na query string
+        params = {"query": json.dumps(query, default=str)}
+        
+        if pagination:
+            params.update({
+                "page": pagination.page,
+                "page_size": pagination.page_size
+            })
+        
+        if sort:
+            params["sort"] = json.dumps(sort)
+        
+        if fields:
+            params["fields"] = ",".join(fields)
+        
+        return params
+    
+    async def get_documents_by_ids(self, collection: str, document_ids: List[str],
+                                   fields: Optional[List[str]] = None) -> GatewayResponse:
+        """
+        Busca vários documentos por ID em uma única chamada (`$in`).
+        
+        Args:
+            collection: Nome da coleção
+            document_ids: IDs dos documentos
+            fields: Campos a retornar (None para o documento completo)
+            
+        Returns:
+            GatewayResponse: `{"items": {id: documento}, "missing": [ids]}`
+        """
+        try:
+            payload: Dict[str, Any] = {"ids": list(document_ids)}
+            if fields:
+                payload["fields"] = ",".join(fields)
+            
+            response = await self.client.post(f"/mongodb/{collection}/by-ids", json_data=payload,
+                                              idempotent=True)
+            
+            if response.is_success:
+                return GatewayResponse.success_response(
+                    data=response.content,
+                    duration_ms=response.duration_ms
+                )
+            else:
+                return GatewayResponse.error_response(
+                    error_message=f"Batch lookup failed: {response.content}",
+                    status_code=response.status_code,
+                    duration_ms=response.duration_ms
+                )
+                
+        except Exception as e:
+            return GatewayResponse.error_response(
+                error_message=f"Error in batch lookup: {str(e)}"
+            )
+    
+    async def find_documents_by_field(self, collection: str, field: str, values: List[Any],
+                                      query: Optional[Dict[str, Any]] = None,
+                                      sort: Optional[Dict[str, int]] = None,
+                                      fields: Optional[List[str]] = None,
+                                      limit_per_value: int = 100) -> GatewayResponse:
+        """
+        Busca documentos cujo `field` está em `values`, agrupados por valor.
+        
+        Args:
+            collection: Nome da coleção
+            field: Campo comparado (ex.: "resposta_id")
+            values: Valores buscados
+            query: Filtros adicionais
+            sort: Critérios de ordenação dentro de cada grupo
+            fields: Campos a retornar
+            limit_per_value: Máximo de documentos por valor
+            
+        Returns:
+            GatewayResponse: `{"groups": {valor: [documentos]}}`
+        """
+        try:
+            payload: Dict[str, Any] = {
+                "field": field,
+                "values": list(values),
+                "query": query or {},
+                "sort": sort or {},
+                "limit_per_value": limit_per_value
+            }
+            if fields:
+                payload["fields"] = ",".join(fields)
+            
+            response = await self.client.post(f"/mongodb/{collection}/by-field", json_data=payload,
+                                              idempotent=True)
+            
+            if response.is_success:
+                return GatewayResponse.success_response(
+                    data=response.content,
+                    duration_ms=response.duration_ms
+                )
+            else:
+                return GatewayResponse.error_response(
+                    error_message=f"Batch search failed: {response.content}",
+                    status_code=response.status_code,
+                    duration_ms=response.duration_ms
+                )
+                
+        except Exception as e:
+            return GatewayResponse.error_response(
+                error_message=f"Error in batch search: {str(e)}"
+            )
 
 
 class QdrantOperations:
@@ -210,13 +390,18 @@ class QdrantOperations:
     def __init__(self, client: HTTPClient):
         self.client = client
     
-    async def create_embedding(self, text: str, metadata: Optional[Dict[str, Any]] = None) -> GatewayResponse:
+    async def create_embedding(self, text: str, metadata: Optional[Dict[str, Any]] = None,
+                               store: bool = True) -> GatewayResponse:
         """
         Cria embedding para texto.
         
+        A resposta traz o vetor em `vector`, que pode ser reutilizado em
+        `search_similar(vector=...)` e `store_vector` sem nova inferência.
+        
         Args:
             text: Texto para gerar embedding
             metadata: Metadados associados
+            store: Se False, apenas calcula e devolve o vetor (não indexa)
             
         Returns:
             GatewayResponse: Embedding gerado
@@ -224,10 +409,12 @@ class QdrantOperations:
         try:
             request_data = {
                 "text": text,
-                "metadata": metadata or {}
+                "metadata": metadata or {},
+                "store": store
             }
             
-            response = await self.client.post("/qdrant/embeddings", json_data=request_data)
+            response = await self.client.post("/qdrant/embeddings", json_data=request_data,
+                                              idempotent=True)
             
             if response.is_success:
                 return GatewayResponse.success_response(
@@ -246,30 +433,45 @@ class QdrantOperations:
                 error_message=f"Error creating embedding: {str(e)}"
             )
     
-    async def search_similar(self, query_text: str, limit: int = 10,
+    async def search_similar(self, query_text: Optional[str] = None, limit: int = 10,
                            score_threshold: float = 0.7,
-                           filters: Optional[Dict[str, Any]] = None) -> GatewayResponse:
+                           filters: Optional[Dict[str, Any]] = None,
+                           vector: Optional[List[float]] = None) -> GatewayResponse:
         """
         Busca por similaridade semântica.
         
+        Com `vector` (ex.: retornado por `create_embedding`) o backend_bd
+        busca direto no Qdrant, sem gerar o embedding de novo.
+        
         Args:
-            query_text: Texto da consulta
+            query_text: Texto da consulta (ignorado se `vector` for informado)
             limit: Número máximo de resultados
             score_threshold: Score mínimo de similaridade
             filters: Filtros adicionais
+            vector: Vetor da consulta já calculado
             
         Returns:
             GatewayResponse: Resultados da busca semântica
         """
+        if query_text is None and vector is None:
+            return GatewayResponse.error_response(
+                error_message="Semantic search requires query_text or vector",
+                status_code=400
+            )
+        
         try:
             request_data = {
-                "query": query_text,
                 "limit": limit,
                 "score_threshold": score_threshold,
                 "filters": filters or {}
             }
+            if vector is not None:
+                request_data["vector"] = vector
+            else:
+                request_data["query"] = query_text
             
-            response = await self.client.post("/qdrant/search", json_data=request_data)
+            response = await self.client.post("/qdrant/search", json_data=request_data,
+                                              idempotent=True)
             
             if response.is_success:
                 return GatewayResponse.success_response(
@@ -308,7 +510,9 @@ class QdrantOperations:
                 "payload": payload or {}
             }
             
-            response = await self.client.post("/qdrant/vectors", json_data=request_data)
+            # Upsert pelo vector_id: repetir não duplica o ponto
+            response = await self.client.post("/qdrant/vectors", json_data=request_data,
+                                              idempotent=True)
             
             if response.is_success:
                 return GatewayResponse.success_response(
@@ -364,13 +568,16 @@ class PersistenceGateway(BaseGateway):
     
     Unifica acesso ao MongoDB e Qdrant através do backend_bd,
     fornecendo interface única para todas as operações de dados.
+    
+    Deve ser criado uma única vez por aplicação (ver backend/main.py) para
+    reaproveitar o pool de conexões keep-alive do HTTPClient.
     """
     
-    def __init__(self):
+    def __init__(self, http_client: Optional[HTTPClient] = None):
         settings = get_settings()
         super().__init__(
             service_name="backend_bd",
-            base_url=settings.backend_bd_url,
+            base_url=str(settings.backend_bd_url),
             timeout=settings.backend_bd_timeout
         )
         
@@ -379,10 +586,38 @@ class PersistenceGateway(BaseGateway):
             timeout=settings.backend_bd_timeout,
             max_retries=3,
             retry_delay=1.0,
-            retry_backoff=2.0
+            retry_backoff=2.0,
+            retry_max_delay=settings.backend_bd_retry_max_delay,
+            deadline=settings.backend_bd_request_deadline,
+            connect_timeout=settings.backend_bd_connect_timeout,
+            pool_timeout=settings.backend_bd_pool_timeout,
+            max_connections=settings.backend_bd_max_connections,
+            max_keepalive_connections=settings.backend_bd_max_keepalive_connections,
+            keepalive_expiry=settings.backend_bd_keepalive_expiry,
+            http2=settings.backend_bd_http2,
+            etag_cache_size=settings.backend_bd_etag_cache_size
         )
         
-        self.http_client = HTTPClient(settings.backend_bd_url, config)
+        # Cliente externo é compartilhado: quem o criou é responsável por fechá-lo
+        self._owns_client = http_client is None
+        self.http_client = http_client or HTTPClient(
+            str(settings.backend_bd_url),
+            config,
+            circuit_breaker=CircuitBreaker(
+                "backend_bd",
+                failure_threshold=settings.backend_bd_breaker_failure_threshold,
+                recovery_timeout=settings.backend_bd_breaker_recovery_timeout
+            ),
+            limiter=AdaptiveConcurrencyLimiter(
+                initial_limit=settings.backend_bd_concurrency_initial_limit,
+                min_limit=settings.backend_bd_concurrency_min_limit,
+                max_limit=settings.backend_bd_max_connections,
+                latency_threshold_ms=settings.backend_bd_latency_threshold_ms,
+                acquire_timeout=settings.backend_bd_pool_timeout
+            ),
+            retry_budget=RetryBudget(ratio=settings.backend_bd_retry_budget_ratio),
+            transport=transport_from_settings(settings)
+        )
         self.mongodb = MongoDBOperations(self.http_client)
         self.qdrant = QdrantOperations(self.http_client)
     
@@ -471,6 +706,43 @@ class PersistenceGateway(BaseGateway):
                 status_code=404
             )
     
+    async def get_user_credentials(self, email: Optional[str] = None,
+                                   user_id: Optional[str] = None) -> GatewayResponse:
+        """
+        Busca usuário com o hash de senha (por email ou ID).
+        
+        As leituras genéricas (`get_user`, `get_user_by_email`) não trazem
+        `senha`; este é o único caminho para verificá-la.
+        
+        Args:
+            email: Email do usuário
+            user_id: ID do usuário
+            
+        Returns:
+            GatewayResponse: Dados do usuário, incluindo `senha`
+        """
+        payload = {"email": email} if email is not None else {"user_id": user_id}
+        try:
+            response = await self.http_client.post("/mongodb/usuarios/credenciais", json_data=payload,
+                                                   idempotent=True)
+            
+            if response.is_success:
+                return GatewayResponse.success_response(
+                    data=response.content,
+                    duration_ms=response.duration_ms
+                )
+            else:
+                return GatewayResponse.error_response(
+                    error_message="User not found",
+                    status_code=response.status_code,
+                    duration_ms=response.duration_ms
+                )
+                
+        except Exception as e:
+            return GatewayResponse.error_response(
+                error_message=f"Error getting user credentials: {str(e)}"
+            )
+    
     async def update_user(self, user_id: str, update_data: Dict[str, Any]) -> GatewayResponse:
         """
         Atualiza dados do usuário.
@@ -487,12 +759,15 @@ class PersistenceGateway(BaseGateway):
     
     # === OPERAÇÕES DE PERGUNTA ===
     
-    async def create_question(self, question_data: Dict[str, Any]) -> GatewayResponse:
+    async def create_question(self, question_data: Dict[str, Any],
+                              embed: bool = True) -> GatewayResponse:
         """
         Cria nova pergunta no sistema.
         
         Args:
             question_data: Dados da pergunta
+            embed: Se deve indexar o embedding aqui (False quando quem chama
+                já gera e armazena o vetor, ex.: EducationalOrchestrator)
             
         Returns:
             GatewayResponse: Pergunta criada
@@ -503,7 +778,7 @@ class PersistenceGateway(BaseGateway):
         # Cria pergunta no MongoDB
         mongo_result = await self.mongodb.create_document("perguntas", question_data)
         
-        if mongo_result.success:
+        if mongo_result.success and embed:
             # Cria embedding para busca semântica
             question_text = question_data.get("conteudo", "")
             if question_text:
@@ -519,34 +794,58 @@ class PersistenceGateway(BaseGateway):
         
         return mongo_result
     
-    async def get_question(self, question_id: str) -> GatewayResponse:
+    async def get_question(self, question_id: str,
+                          fields: Optional[List[str]] = None) -> GatewayResponse:
         """
         Busca pergunta por ID.
         
         Args:
             question_id: ID da pergunta
+            fields: Campos a retornar
             
         Returns:
             GatewayResponse: Dados da pergunta
         """
-        return await self.mongodb.get_document("perguntas", question_id)
+        return await self.mongodb.get_document("perguntas", question_id, fields)
     
     async def search_questions(self, query: Dict[str, Any],
-                             pagination: Optional[PaginationParams] = None) -> GatewayResponse:
+                             pagination: Optional[PaginationParams] = None,
+                             fields: Optional[List[str]] = None) -> GatewayResponse:
         """
         Busca perguntas com filtros.
         
         Args:
             query: Filtros de busca
             pagination: Parâmetros de paginação
+            fields: Campos a retornar
             
         Returns:
             GatewayResponse: Lista de perguntas
         """
-        return await self.mongodb.find_documents("perguntas", query, pagination)
+        return await self.mongodb.find_documents("perguntas", query, pagination, fields=fields)
     
-    async def search_questions_semantic(self, query_text: str, limit: int = 10,
-                                      filters: Optional[Dict[str, Any]] = None) -> GatewayResponse:
+    async def stream_questions(self, query: Dict[str, Any],
+                               pagination: Optional[PaginationParams] = None,
+                               fields: Optional[List[str]] = None,
+                               headers: Optional[Dict[str, str]] = None) -> StreamingHTTPResponse:
+        """
+        Busca perguntas com o corpo repassado sem decodificar (exportação).
+        
+        Args:
+            query: Filtros de busca
+            pagination: Parâmetros de paginação
+            fields: Campos a retornar
+            headers: Headers adicionais para o backend_bd
+            
+        Returns:
+            StreamingHTTPResponse: Resposta do backend_bd ainda não lida
+        """
+        return await self.mongodb.stream_documents("perguntas", query, pagination,
+                                                   fields=fields, headers=headers)
+    
+    async def search_questions_semantic(self, query_text: Optional[str] = None, limit: int = 10,
+                                      filters: Optional[Dict[str, Any]] = None,
+                                      vector: Optional[List[float]] = None) -> GatewayResponse:
         """
         Busca perguntas por similaridade semântica.
         
@@ -554,6 +853,7 @@ class PersistenceGateway(BaseGateway):
             query_text: Texto da consulta
             limit: Número máximo de resultados
             filters: Filtros adicionais
+            vector: Vetor da consulta já calculado (evita nova inferência)
             
         Returns:
             GatewayResponse: Perguntas similares
@@ -562,16 +862,19 @@ class PersistenceGateway(BaseGateway):
         if filters:
             search_filters.update(filters)
         
-        return await self.qdrant.search_similar(query_text, limit, 0.7, search_filters)
+        return await self.qdrant.search_similar(query_text, limit, 0.7, search_filters, vector=vector)
     
     # === OPERAÇÕES DE RESPOSTA ===
     
-    async def create_answer(self, answer_data: Dict[str, Any]) -> GatewayResponse:
+    async def create_answer(self, answer_data: Dict[str, Any],
+                            embed: bool = True) -> GatewayResponse:
         """
         Cria nova resposta no sistema.
         
         Args:
             answer_data: Dados da resposta
+            embed: Se deve indexar o embedding aqui (False quando quem chama
+                já gera e armazena o vetor)
             
         Returns:
             GatewayResponse: Resposta criada
@@ -582,7 +885,7 @@ class PersistenceGateway(BaseGateway):
         # Cria resposta no MongoDB
         mongo_result = await self.mongodb.create_document("respostas", answer_data)
         
-        if mongo_result.success:
+        if mongo_result.success and embed:
             # Cria embedding para busca semântica
             answer_text = answer_data.get("conteudo", "")
             if answer_text:
@@ -611,13 +914,15 @@ class PersistenceGateway(BaseGateway):
         return await self.mongodb.get_document("respostas", answer_id)
     
     async def get_answers_by_question(self, question_id: str,
-                                    pagination: Optional[PaginationParams] = None) -> GatewayResponse:
+                                    pagination: Optional[PaginationParams] = None,
+                                    fields: Optional[List[str]] = None) -> GatewayResponse:
         """
         Busca respostas de uma pergunta específica.
         
         Args:
             question_id: ID da pergunta
             pagination: Parâmetros de paginação
+            fields: Campos a retornar
             
         Returns:
             GatewayResponse: Lista de respostas
@@ -625,7 +930,7 @@ class PersistenceGateway(BaseGateway):
         query = {"pergunta_id": question_id, "status": {"$ne": "deleted"}}
         sort = {"created_at": -1}  # Mais recentes primeiro
         
-        return await self.mongodb.find_documents("respostas", query, pagination, sort)
+        return await self.mongodb.find_documents("respostas", query, pagination, sort, fields)
     
     # === OPERAÇÕES DE AVALIAÇÃO ===
     
@@ -661,6 +966,60 @@ class PersistenceGateway(BaseGateway):
         
         return await self.mongodb.find_documents("avaliacoes", query, pagination, sort)
     
+    async def get_evaluations_by_answers(self, answer_ids: List[str],
+                                         limit_per_answer: int = 20) -> GatewayResponse:
+        """
+        Busca avaliações de várias respostas em uma única chamada.
+        
+        Args:
+            answer_ids: IDs das respostas
+            limit_per_answer: Máximo de avaliações por resposta
+            
+        Returns:
+            GatewayResponse: `{"groups": {answer_id: [avaliações]}}`
+        """
+        return await self.mongodb.find_documents_by_field(
+            "avaliacoes", "resposta_id", answer_ids,
+            query={"status": {"$ne": "deleted"}},
+            sort={"created_at": -1},
+            limit_per_value=limit_per_answer
+        )
+
+    # === OPERAÇÕES DE ESTATÍSTICAS ===
+
+    async def get_user_educational_stats(self, user_id: str) -> GatewayResponse:
+        """
+        Busca estatísticas educacionais agregadas de um usuário.
+
+        As contagens e médias são calculadas no backend_bd com uma única
+        agregação, sem transferir perguntas e respostas para o gateway.
+
+        Args:
+            user_id: ID do usuário
+
+        Returns:
+            GatewayResponse: Estatísticas do usuário
+        """
+        try:
+            response = await self.http_client.get(f"/api/estatisticas/usuarios/{user_id}")
+
+            if response.is_success:
+                return GatewayResponse.success_response(
+                    data=response.content,
+                    duration_ms=response.duration_ms
+                )
+            else:
+                return GatewayResponse.error_response(
+                    error_message=f"Failed to get user stats: {response.content}",
+                    status_code=response.status_code,
+                    duration_ms=response.duration_ms
+                )
+
+        except Exception as e:
+            return GatewayResponse.error_response(
+                error_message=f"Error getting user stats: {str(e)}"
+            )
+
     # === OPERAÇÕES DE LOG ===
     
     async def create_log_entry(self, log_data: Dict[str, Any]) -> GatewayResponse:
@@ -681,5 +1040,6 @@ class PersistenceGateway(BaseGateway):
         """
         Fecha conexões e limpa recursos.
         """
-        await self.http_client.close()
+        if self._owns_client:
+            await self.http_client.close()
         await super().close()
\ No newline at end of file
@@ -0,0 +1,246 @@
+"""
+Mecanismos de resiliência por upstream usados pelo HTTPClient.
+
+- CircuitBreaker: falha rápido quando o upstream está claramente fora
+  (closed → open → half-open → closed).
+- AdaptiveConcurrencyLimiter: limita requisições simultâneas com AIMD
+  (aumento aditivo enquanto a latência está saudável, redução
+  multiplicativa em timeouts, erros 5xx ou latência acima do alvo).
+- RetryBudget: limita retries a uma fração das requisições originais.
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from enum import Enum
+from typing import Any, AsyncIterator, Dict, Optional
+
+from .base_gateway import CircuitOpenError, ServiceUnavailableError
+
+
+class CircuitState(Enum):
+    """Estados do circuit breaker."""
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker por upstream.
+
+    Abre após `failure_threshold` falhas consecutivas; depois de
+    `recovery_timeout` segundos permite até `half_open_max_calls` requisições
+    de teste. Um sucesso no half-open fecha o circuito, uma falha o reabre.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5,
+                 recovery_timeout: float = 30.0, half_open_max_calls: int = 1):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.rejected_calls = 0
+        self.times_opened = 0
+        self._half_open_calls = 0
+        self._half_open_since = 0.0
+
+    def _retry_after(self) -> float:
+        if self.opened_at is None:
+            return 0.0
+        return max(self.recovery_timeout - (time.monotonic() - self.opened_at), 0.0)
+
+    def before_call(self) -> None:
+        """
+        Verifica se a chamada pode prosseguir.
+
+        Raises:
+            CircuitOpenError: Se o circuito estiver aberto
+        """
+        if self.state == CircuitState.OPEN:
+            if self._retry_after() > 0:
+                self.rejected_calls += 1
+                raise CircuitOpenError(
+                    f"Circuit breaker for {self.name} is open",
+                    status_code=503,
+                    details={"retry_after_seconds": round(self._retry_after(), 1)}
+                )
+            self.state = CircuitState.HALF_OPEN
+            self._half_open_calls = 0
+            self._half_open_since = time.monotonic()
+
+        if self.state == CircuitState.HALF_OPEN:
+            # Sonda que nunca reportou resultado (ex.: cancelada) não bloqueia para sempre
+            if time.monotonic() - self._half_open_since > self.recovery_timeout:
+                self._half_open_calls = 0
+                self._half_open_since = time.monotonic()
+            if self._half_open_calls >= self.half_open_max_calls:
+                self.rejected_calls += 1
+                raise CircuitOpenError(
+                    f"Circuit breaker for {self.name} is half-open (probe in progress)",
+                    status_code=503
+                )
+            self._half_open_calls += 1
+
+    def cancel_call(self) -> None:
+        """Libera a vaga de sonda de uma chamada que não chegou ao upstream."""
+        if self.state == CircuitState.HALF_OPEN and self._half_open_calls > 0:
+            self._half_open_calls -= 1
+
+    def record_success(self) -> None:
+        """Registra chamada bem-sucedida."""
+        self.consecutive_failures = 0
+        if self.state != CircuitState.CLOSED:
+            self.state = CircuitState.CLOSED
+            self.opened_at = None
+
+    def record_failure(self) -> None:
+        """Registra falha de conexão, timeout ou erro 5xx."""
+        self.consecutive_failures += 1
+        if self.state == CircuitState.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != CircuitState.OPEN:
+                self.times_opened += 1
+            self.state = CircuitState.OPEN
+            self.opened_at = time.monotonic()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Estado atual para health checks."""
+        return {
+            "state": self.state.value,
+            "consecutive_failures": self.consecutive_failures,
+            "failure_threshold": self.failure_threshold,
+            "retry_after_seconds": round(self._retry_after(), 1) if self.state == CircuitState.OPEN else 0.0,
+            "times_opened": self.times_opened,
+            "rejected_calls": self.rejected_calls
+        }
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Limite de concorrência AIMD.
+
+    A cada resposta com latência até `latency_threshold_ms` o limite cresce
+    `1/limite` (≈ +1 por janela completa); em sobrecarga é multiplicado por
+    `backoff_ratio`. Requisições acima do limite esperam até
+    `acquire_timeout` segundos por uma vaga.
+    """
+
+    def __init__(self, initial_limit: int = 20, min_limit: int = 1, max_limit: int = 100,
+                 latency_threshold_ms: float = 2000.0, backoff_ratio: float = 0.9,
+                 acquire_timeout: float = 5.0):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_threshold_ms = latency_threshold_ms
+        self.backoff_ratio = backoff_ratio
+        self.acquire_timeout = acquire_timeout
+
+        self._limit = float(min(max(initial_limit, min_limit), max_limit))
+        self.in_flight = 0
+        self.rejected = 0
+        self._condition = asyncio.Condition()
+
+    @property
+    def limit(self) -> int:
+        return max(int(self._limit), self.min_limit)
+
+    async def _acquire(self) -> None:
+        async with self._condition:
+            try:
+                await asyncio.wait_for(
+                    self._condition.wait_for(lambda: self.in_flight < self.limit),
+                    timeout=self.acquire_timeout
+                )
+            except asyncio.TimeoutError:
+                self.rejected += 1
+                raise ServiceUnavailableError(
+                    f"Concurrency limit reached ({self.in_flight}/{self.limit})",
+                    status_code=503,
+                    details={"concurrency_limit": self.limit}
+                )
+            self.in_flight += 1
+
+    async def _release(self) -> None:
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def on_sample(self, latency_ms: float, overloaded: bool = False) -> None:
+        """Ajusta o limite com base em uma resposta observada."""
+        if overloaded or latency_ms > self.latency_threshold_ms:
+            self._limit = max(self._limit * self.backoff_ratio, float(self.min_limit))
+        else:
+            self._limit = min(self._limit + 1.0 / self._limit, float(self.max_limit))
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Ocupa uma vaga de concorrência durante o bloco."""
+        await self._acquire()
+        try:
+            yield
+        finally:
+            await self._release()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Estado atual para health checks."""
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "min_limit": self.min_limit,
+            "max_limit": self.max_limit,
+            "latency_threshold_ms": self.latency_threshold_ms,
+            "rejected": self.rejected
+        }
+
+
+class RetryBudget:
+    """
+    Orçamento de retries em token bucket.
+
+    Cada requisição original deposita `ratio` tokens e cada retry consome
+    um; com `ratio=0.1` os retries somam no máximo ~10% de carga extra.
+    `min_per_second` garante alguns retries mesmo com pouco tráfego.
+    """
+
+    def __init__(self, ratio: float = 0.1, min_per_second: float = 1.0, max_tokens: float = 10.0):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_tokens = max_tokens
+
+        self._tokens = max_tokens
+        self._last_refill = time.monotonic()
+        self.retries_allowed = 0
+        self.retries_denied = 0
+
+    def _refill(self, amount: float = 0.0) -> None:
+        now = time.monotonic()
+        amount += (now - self._last_refill) * self.min_per_second
+        self._last_refill = now
+        self._tokens = min(self._tokens + amount, self.max_tokens)
+
+    def record_request(self) -> None:
+        """Registra uma requisição original (não retry)."""
+        self._refill(self.ratio)
+
+    def try_acquire(self) -> bool:
+        """Consome um token para um retry; False se o orçamento acabou."""
+        self._refill()
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            self.retries_allowed += 1
+            return True
+        self.retries_denied += 1
+        return False
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Estado atual para health checks."""
+        self._refill()
+        return {
+            "ratio": self.ratio,
+            "tokens": round(self._tokens, 2),
+            "retries_allowed": self.retries_allowed,
+            "retries_denied": self.retries_denied
+        }
@@ -0,0 +1,15 @@
+"""
+Jobs em segundo plano: etapas de orquestração que não seguram a resposta HTTP.
+"""
+
+from .queue import JobHandler, JobQueue
+from .store import Job, JobState, JobStore, SQLiteJobStore
+
+__all__ = [
+    "Job",
+    "JobHandler",
+    "JobQueue",
+    "JobState",
+    "JobStore",
+    "SQLiteJobStore",
+]
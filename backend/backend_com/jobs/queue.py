@@ -0,0 +1,301 @@
+"""
+Fila de jobs em segundo plano com pool de workers assíncronos.
+
+Os orquestradores enfileiram as etapas que não precisam segurar a resposta
+HTTP (configurações e mensagens do registro, indexação de perguntas) e
+devolvem o ID do job; o cliente acompanha o resultado em `GET /jobs/{id}`.
+
+- Concorrência limitada: no máximo `concurrency` jobs rodam ao mesmo tempo
+  neste processo.
+- Retries com backoff exponencial e full jitter; após `max_attempts`
+  tentativas o job vai para a dead-letter (estado `dead`).
+- Cada execução tem o lease do armazenamento como timeout, para que o job
+  não seja reservado por outro worker enquanto ainda roda; se mesmo assim o
+  lease se perder, o desfecho desta execução é descartado (fencing no store).
+- Jobs concluídos e na dead-letter são removidos após `retention` segundos.
+"""
+
+import asyncio
+import random
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from ..utils.logging import setup_logger
+from .store import Job, JobStore
+
+JobHandler = Callable[[Job], Awaitable[Any]]
+
+
+class JobQueue:
+    """
+    Fila durável de jobs com workers assíncronos.
+
+    Handlers são registrados por tipo (`register`) e recebem o `Job`; o
+    valor retornado vira `job.result` e deve ser serializável em JSON.
+    """
+
+    def __init__(self, store: JobStore, concurrency: int = 4, max_attempts: int = 5,
+                 retry_base_delay: float = 1.0, retry_max_delay: float = 60.0,
+                 poll_interval: float = 1.0, lease_timeout: float = 300.0,
+                 retention: float = 7 * 86400.0, purge_interval: float = 3600.0):
+        """
+        Inicializa a fila.
+
+        Args:
+            store: Armazenamento durável dos jobs
+            concurrency: Jobs executando simultaneamente neste processo
+            max_attempts: Tentativas padrão antes da dead-letter
+            retry_base_delay: Base do backoff exponencial (s)
+            retry_max_delay: Teto do backoff (s)
+            poll_interval: Intervalo de consulta ao armazenamento quando ocioso (s)
+            lease_timeout: Tempo máximo de uma execução (s)
+            retention: Tempo que jobs finalizados ficam consultáveis (s)
+            purge_interval: Intervalo entre remoções dos jobs finalizados expirados (s)
+        """
+        self.store = store
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.poll_interval = poll_interval
+        self.lease_timeout = lease_timeout
+        self.retention = retention
+        self.purge_interval = purge_interval
+
+        self.logger = setup_logger("jobs.queue")
+        self._handlers: Dict[str, JobHandler] = {}
+        self._running: Set[asyncio.Task] = set()
+        self._finished: Dict[str, asyncio.Event] = {}
+        self._waiters: Dict[str, int] = {}
+        self._wakeup = asyncio.Event()
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._next_purge = 0.0
+
+        self._stats = {"enqueued": 0, "succeeded": 0, "retried": 0, "dead_lettered": 0,
+                       "lost_leases": 0, "purged": 0}
+
+    def register(self, job_type: str, handler: JobHandler) -> None:
+        """
+        Registra o handler de um tipo de job.
+
+        Args:
+            job_type: Tipo do job (ex.: "user.post_registration")
+            handler: Corrotina que recebe o Job
+        """
+        self._handlers[job_type] = handler
+
+    async def enqueue(self, job_type: str, payload: Dict[str, Any],
+                      max_attempts: Optional[int] = None, delay: float = 0.0) -> Job:
+        """
+        Enfileira um job.
+
+        Args:
+            job_type: Tipo registrado com `register`
+            payload: Dados do job (serializáveis em JSON)
+            max_attempts: Tentativas antes da dead-letter (padrão da fila)
+            delay: Atraso antes da primeira execução (s)
+
+        Returns:
+            Job: Job persistido
+
+        Raises:
+            ValueError: Se não houver handler para o tipo
+        """
+        if job_type not in self._handlers:
+            raise ValueError(f"No handler registered for job type '{job_type}'")
+
+        job = Job(
+            id=uuid.uuid4().hex,
+            type=job_type,
+            payload=payload,
+            max_attempts=max_attempts or self.max_attempts,
+            run_at=time.time() + delay
+        )
+        await self.store.add(job)
+        self._stats["enqueued"] += 1
+        self._wakeup.set()
+        return job
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        """Busca um job pelo ID."""
+        return await self.store.get(job_id)
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[Job]:
+        """
+        Espera o job terminar (sucesso ou dead-letter) por até `timeout` segundos.
+
+        Jobs executados neste processo acordam a espera imediatamente; os
+        executados por outro processo são percebidos a cada `poll_interval`.
+
+        Args:
+            job_id: ID do job
+            timeout: Tempo máximo de espera (s)
+
+        Returns:
+            Job no estado mais recente, ou None se não existir
+        """
+        deadline = time.monotonic() + timeout
+        event = self._finished.setdefault(job_id, asyncio.Event())
+        self._waiters[job_id] = self._waiters.get(job_id, 0) + 1
+        try:
+            while True:
+                job = await self.store.get(job_id)
+                time_left = deadline - time.monotonic()
+                if job is None or job.finished or time_left <= 0:
+                    return job
+                try:
+                    await asyncio.wait_for(event.wait(), min(self.poll_interval, time_left))
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self._waiters[job_id] -= 1
+            if not self._waiters[job_id]:
+                del self._waiters[job_id]
+                self._finished.pop(job_id, None)
+
+    async def start(self) -> None:
+        """Inicia o despachante de jobs."""
+        if self._dispatcher is None:
+            self._stopping = False
+            self._dispatcher = asyncio.create_task(self._dispatch_loop())
+            self.logger.info(f"Job queue started (concurrency={self.concurrency})")
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """
+        Para de reservar jobs e aguarda os que estão em execução.
+
+        Jobs que não terminarem em `timeout` são cancelados e devolvidos à
+        fila sem consumir tentativa.
+
+        Args:
+            timeout: Tempo máximo de espera pelos jobs em execução (s)
+        """
+        self._stopping = True
+        self._wakeup.set()
+        if self._dispatcher is not None:
+            await self._dispatcher
+            self._dispatcher = None
+
+        if self._running:
+            _, pending = await asyncio.wait(self._running, timeout=timeout)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        await self.store.close()
+
+    async def _dispatch_loop(self) -> None:
+        while not self._stopping:
+            await self._purge_if_due()
+            # Limpa antes de consultar: um sinal durante a consulta não se perde
+            self._wakeup.clear()
+            free_slots = self.concurrency - len(self._running)
+            jobs = []
+            if free_slots > 0:
+                try:
+                    jobs = await self.store.claim(free_slots, self.lease_timeout)
+                except Exception as e:
+                    self.logger.error(f"Failed to claim jobs: {e}")
+
+            for job in jobs:
+                task = asyncio.create_task(self._execute(job))
+                self._running.add(task)
+                task.add_done_callback(self._on_task_done)
+
+            if jobs and len(jobs) == free_slots:
+                continue  # pode haver mais jobs prontos
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _purge_if_due(self) -> None:
+        now = time.monotonic()
+        if now < self._next_purge:
+            return
+        self._next_purge = now + self.purge_interval
+        try:
+            purged = await self.store.purge(time.time() - self.retention)
+        except Exception as e:
+            self.logger.warning(f"Failed to purge finished jobs: {e}")
+            return
+        if purged:
+            self._stats["purged"] += purged
+            self.logger.info(f"Purged {purged} finished jobs")
+
+    def _on_task_done(self, task: asyncio.Task) -> None:
+        self._running.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            # Falha ao gravar o desfecho: o job volta quando o lease expirar
+            self.logger.error(f"Failed to record job outcome: {task.exception()}")
+        self._wakeup.set()  # vaga liberada
+
+    def _backoff_delay(self, attempt: int) -> float:
+        """Backoff exponencial com full jitter."""
+        cap = min(self.retry_max_delay, self.retry_base_delay * (2 ** (attempt - 1)))
+        return random.uniform(0, cap)
+
+    async def _execute(self, job: Job) -> None:
+        handler = self._handlers.get(job.type)
+        try:
+            if handler is None:
+                raise LookupError(f"No handler registered for job type '{job.type}'")
+            result = await asyncio.wait_for(handler(job), self.lease_timeout)
+
+        except asyncio.CancelledError:
+            await self.store.release(job.id, job.progress, job.attempts)
+            raise
+
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+            if job.attempts >= job.max_attempts:
+                if not await self.store.dead_letter(job.id, error, job.progress, job.attempts):
+                    self._lost_lease(job)
+                    return
+                self._stats["dead_lettered"] += 1
+                self.logger.error(f"Job {job.type} {job.id} dead-lettered after {job.attempts} attempts: {error}")
+                self._notify(job.id)
+            else:
+                delay = self._backoff_delay(job.attempts)
+                if not await self.store.retry(job.id, error, time.time() + delay, job.progress, job.attempts):
+                    self._lost_lease(job)
+                    return
+                self._stats["retried"] += 1
+                self.logger.warning(
+                    f"Job {job.type} {job.id} failed (attempt {job.attempts}/{job.max_attempts}), "
+                    f"retrying in {delay:.1f}s: {error}"
+                )
+            return
+
+        if not await self.store.complete(job.id, result, job.attempts):
+            self._lost_lease(job)
+            return
+        self._stats["succeeded"] += 1
+        self._notify(job.id)
+
+    def _lost_lease(self, job: Job) -> None:
+        """Outro worker reservou o job depois que o lease expirou: o desfecho desta execução é descartado."""
+        self._stats["lost_leases"] += 1
+        self.logger.warning(f"Job {job.type} {job.id} lost its lease (attempt {job.attempts}); outcome discarded")
+
+    def _notify(self, job_id: str) -> None:
+        event = self._finished.get(job_id)
+        if event is not None:
+            event.set()
+
+    async def get_stats(self) -> Dict[str, Any]:
+        """
+        Estatísticas da fila.
+
+        Returns:
+            dict: Contadores deste processo e jobs por estado no armazenamento
+        """
+        return {
+            **self._stats,
+            "running": len(self._running),
+            "concurrency": self.concurrency,
+            "jobs_by_state": await self.store.count_by_state(),
+        }
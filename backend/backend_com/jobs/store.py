@@ -0,0 +1,325 @@
+"""
+Armazenamento durável dos jobs em segundo plano.
+
+`JobStore` define o contrato usado pelo `JobQueue`; `SQLiteJobStore` o
+implementa sobre um arquivo SQLite local (módulo `sqlite3` da biblioteca
+padrão, em modo WAL). Jobs pendentes sobrevivem a reinícios do processo, e
+vários processos do backend_com podem compartilhar o mesmo arquivo: a
+reserva de jobs (`claim`) é feita em uma transação `BEGIN IMMEDIATE`, então
+cada job é entregue a um único worker por vez.
+
+Um job reservado recebe um lease (`locked_until`). Se o processo morrer
+durante a execução, o job volta a ficar disponível quando o lease expira.
+Cada reserva incrementa `attempts`, que serve de token de fencing: o
+desfecho (`complete`, `retry`, `dead_letter`, `release`) só é gravado se o
+job ainda estiver em execução na mesma tentativa. Um worker cujo lease
+expirou e foi reservado por outro não sobrescreve o estado.
+
+Jobs concluídos e na dead-letter são removidos por `purge` após o período
+de retenção.
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Any, Dict, List, Optional
+
+
+class JobState(str, Enum):
+    """Estados possíveis de um job."""
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    DEAD = "dead"  # esgotou as tentativas (dead-letter)
+
+
+TERMINAL_STATES = {JobState.SUCCEEDED, JobState.DEAD}
+
+
+def _iso(timestamp: Optional[float]) -> Optional[str]:
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat()
+
+
+@dataclass
+class Job:
+    """
+    Job em segundo plano.
+
+    `progress` é um checkpoint do próprio handler: o que ele guardar ali é
+    persistido entre tentativas, para que um retry não repita etapas que
+    já tiveram sucesso.
+    """
+    id: str
+    type: str
+    payload: Dict[str, Any]
+    state: JobState = JobState.PENDING
+    attempts: int = 0
+    max_attempts: int = 5
+    run_at: float = field(default_factory=time.time)
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+    locked_until: Optional[float] = None
+    progress: Dict[str, Any] = field(default_factory=dict)
+    result: Optional[Any] = None
+    error: Optional[str] = None
+
+    @property
+    def finished(self) -> bool:
+        """Se o job chegou a um estado final."""
+        return self.state in TERMINAL_STATES
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Representação pública (sem payload nem checkpoint internos)."""
+        return {
+            "id": self.id,
+            "type": self.type,
+            "state": self.state.value,
+            "attempts": self.attempts,
+            "max_attempts": self.max_attempts,
+            "result": self.result,
+            "error": self.error,
+            "created_at": _iso(self.created_at),
+            "updated_at": _iso(self.updated_at),
+            "next_run_at": _iso(self.run_at) if self.state == JobState.PENDING else None,
+        }
+
+
+class JobStore(ABC):
+    """Contrato de armazenamento durável usado pelo JobQueue."""
+
+    @abstractmethod
+    async def add(self, job: Job) -> None:
+        """Persiste um job novo."""
+
+    @abstractmethod
+    async def get(self, job_id: str) -> Optional[Job]:
+        """Busca um job pelo ID."""
+
+    @abstractmethod
+    async def claim(self, limit: int, lease_seconds: float) -> List[Job]:
+        """
+        Reserva até `limit` jobs prontos para execução.
+
+        Inclui jobs pendentes cujo `run_at` já passou e jobs em execução com
+        lease expirado (worker que morreu). Cada reserva conta uma tentativa.
+        """
+
+    # Os desfechos recebem `attempt` (o `attempts` da reserva) e retornam
+    # False se o job já não está nessa tentativa (lease perdido)
+
+    @abstractmethod
+    async def complete(self, job_id: str, result: Any, attempt: int) -> bool:
+        """Marca o job como concluído."""
+
+    @abstractmethod
+    async def retry(self, job_id: str, error: str, run_at: float,
+                    progress: Dict[str, Any], attempt: int) -> bool:
+        """Devolve o job à fila para nova tentativa em `run_at`."""
+
+    @abstractmethod
+    async def dead_letter(self, job_id: str, error: str, progress: Dict[str, Any],
+                          attempt: int) -> bool:
+        """Move o job para a dead-letter (não será mais executado)."""
+
+    @abstractmethod
+    async def release(self, job_id: str, progress: Dict[str, Any], attempt: int) -> bool:
+        """Devolve à fila um job interrompido, sem consumir tentativa."""
+
+    @abstractmethod
+    async def purge(self, finished_before: float) -> int:
+        """Remove jobs concluídos ou na dead-letter atualizados antes de `finished_before`."""
+
+    @abstractmethod
+    async def count_by_state(self) -> Dict[str, int]:
+        """Quantidade de jobs por estado."""
+
+    async def close(self) -> None:
+        """Libera recursos do armazenamento."""
+
+
+class SQLiteJobStore(JobStore):
+    """
+    JobStore em arquivo SQLite.
+
+    As operações bloqueantes rodam em thread (`asyncio.to_thread`) para não
+    travar o event loop; uma única conexão é compartilhada e serializada
+    por um lock.
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            type TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            state TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            max_attempts INTEGER NOT NULL,
+            run_at REAL NOT NULL,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL,
+            locked_until REAL,
+            progress TEXT NOT NULL DEFAULT '{}',
+            result TEXT,
+            error TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_jobs_state_run_at ON jobs (state, run_at);
+        CREATE INDEX IF NOT EXISTS idx_jobs_state_updated_at ON jobs (state, updated_at);
+    """
+
+    def __init__(self, path: str):
+        """
+        Abre (ou cria) o banco de jobs.
+
+        Args:
+            path: Caminho do arquivo SQLite (":memory:" para testes locais)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30.0)
+        self._conn.row_factory = sqlite3.Row
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(self._SCHEMA)
+
+    async def _run(self, function, *args):
+        return await asyncio.to_thread(self._locked, function, *args)
+
+    def _locked(self, function, *args):
+        with self._lock:
+            return function(*args)
+
+    @staticmethod
+    def _to_job(row: sqlite3.Row) -> Job:
+        return Job(
+            id=row["id"],
+            type=row["type"],
+            payload=json.loads(row["payload"]),
+            state=JobState(row["state"]),
+            attempts=row["attempts"],
+            max_attempts=row["max_attempts"],
+            run_at=row["run_at"],
+            created_at=row["created_at"],
+            updated_at=row["updated_at"],
+            locked_until=row["locked_until"],
+            progress=json.loads(row["progress"]),
+            result=json.loads(row["result"]) if row["result"] is not None else None,
+            error=row["error"],
+        )
+
+    @staticmethod
+    def _dumps(value: Any) -> str:
+        return json.dumps(value, ensure_ascii=False, default=str)
+
+    def _finish(self, job_id: str, attempt: int, **values: Any) -> bool:
+        """Grava o desfecho só se o job ainda está em execução na tentativa `attempt`."""
+        values["updated_at"] = time.time()
+        assignments = ", ".join(f"{column} = ?" for column in values)
+        cursor = self._conn.execute(
+            f"UPDATE jobs SET {assignments} WHERE id = ? AND state = ? AND attempts = ?",
+            (*values.values(), job_id, JobState.RUNNING.value, attempt)
+        )
+        return cursor.rowcount == 1
+
+    async def add(self, job: Job) -> None:
+        def insert():
+            self._conn.execute(
+                "INSERT INTO jobs (id, type, payload, state, attempts, max_attempts, run_at, "
+                "created_at, updated_at, locked_until, progress, result, error) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job.id, job.type, self._dumps(job.payload), job.state.value, job.attempts,
+                 job.max_attempts, job.run_at, job.created_at, job.updated_at, job.locked_until,
+                 self._dumps(job.progress), None, None)
+            )
+        await self._run(insert)
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        def select():
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            return self._to_job(row) if row else None
+        return await self._run(select)
+
+    async def claim(self, limit: int, lease_seconds: float) -> List[Job]:
+        def reserve():
+            now = time.time()
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(
+                    "SELECT * FROM jobs "
+                    "WHERE (state = ? AND run_at <= ?) OR (state = ? AND locked_until <= ?) "
+                    "ORDER BY run_at LIMIT ?",
+                    (JobState.PENDING.value, now, JobState.RUNNING.value, now, limit)
+                ).fetchall()
+                jobs = []
+                for row in rows:
+                    job = self._to_job(row)
+                    job.state = JobState.RUNNING
+                    job.attempts += 1
+                    job.locked_until = now + lease_seconds
+                    job.updated_at = now
+                    self._conn.execute(
+                        "UPDATE jobs SET state = ?, attempts = ?, locked_until = ?, updated_at = ? "
+                        "WHERE id = ?",
+                        (job.state.value, job.attempts, job.locked_until, now, job.id)
+                    )
+                    jobs.append(job)
+                self._conn.execute("COMMIT")
+                return jobs
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return await self._run(reserve)
+
+    async def complete(self, job_id: str, result: Any, attempt: int) -> bool:
+        return await self._run(lambda: self._finish(
+            job_id, attempt, state=JobState.SUCCEEDED.value, result=self._dumps(result),
+            error=None, locked_until=None
+        ))
+
+    async def retry(self, job_id: str, error: str, run_at: float,
+                    progress: Dict[str, Any], attempt: int) -> bool:
+        return await self._run(lambda: self._finish(
+            job_id, attempt, state=JobState.PENDING.value, error=error, run_at=run_at,
+            progress=self._dumps(progress), locked_until=None
+        ))
+
+    async def dead_letter(self, job_id: str, error: str, progress: Dict[str, Any],
+                          attempt: int) -> bool:
+        return await self._run(lambda: self._finish(
+            job_id, attempt, state=JobState.DEAD.value, error=error,
+            progress=self._dumps(progress), locked_until=None
+        ))
+
+    async def release(self, job_id: str, progress: Dict[str, Any], attempt: int) -> bool:
+        return await self._run(lambda: self._finish(
+            job_id, attempt, state=JobState.PENDING.value, attempts=max(attempt - 1, 0),
+            run_at=time.time(), progress=self._dumps(progress), locked_until=None
+        ))
+
+    async def purge(self, finished_before: float) -> int:
+        def delete():
+            cursor = self._conn.execute(
+                "DELETE FROM jobs WHERE state IN (?, ?) AND updated_at < ?",
+                (JobState.SUCCEEDED.value, JobState.DEAD.value, finished_before)
+            )
+            return cursor.rowcount
+        return await self._run(delete)
+
+    async def count_by_state(self) -> Dict[str, int]:
+        def count():
+            rows = self._conn.execute("SELECT state, COUNT(*) AS total FROM jobs GROUP BY state").fetchall()
+            return {row["state"]: row["total"] for row in rows}
+        return await self._run(count)
+
+    async def close(self) -> None:
+        await self._run(self._conn.close)
@@ -175,6 +175,10 @@ class UsuarioResponse(TimestampedModel):
         None,
         description="Estatísticas do usuário"
     )
+    job_id: Optional[str] = Field(
+        None,
+        description="Job das etapas em segundo plano (GET /jobs/{job_id})"
+    )
 
 
 class LoginResponse(BaseModel):
@@ -253,6 +257,10 @@ class PerguntaResponse(TimestampedModel):
         None,
         description="Metadados adicionais"
     )
+    job_id: Optional[str] = Field(
+        None,
+        description="Job das etapas em segundo plano (GET /jobs/{job_id})"
+    )
 
 
 class RespostaResponse(TimestampedModel):
@@ -0,0 +1,47 @@
+"""
+Orquestração de fluxos que envolvem múltiplos serviços.
+"""
+
+from .coordinator import Coordinator, OrchestrationResult, OrchestrationError, OrchestrationStatus
+from .educational_orchestrator import EducationalOrchestrator
+from .executors import ExecutionClass, ExecutorSaturatedError, StepExecutor, StepExecutors
+from .password_hasher import PasswordHasher
+from .state_store import (
+    WorkflowStateStore,
+    InMemoryWorkflowStateStore,
+    SQLiteWorkflowStateStore,
+    create_state_store,
+)
+from .user_orchestrator import UserOrchestrator
+from .workflow_engine import (
+    WorkflowEngine,
+    WorkflowStep,
+    WorkflowResult,
+    WorkflowState,
+    StepState,
+    validate_workflow_steps,
+)
+
+__all__ = [
+    "Coordinator",
+    "OrchestrationResult",
+    "OrchestrationError",
+    "OrchestrationStatus",
+    "EducationalOrchestrator",
+    "ExecutionClass",
+    "ExecutorSaturatedError",
+    "PasswordHasher",
+    "StepExecutor",
+    "StepExecutors",
+    "WorkflowStateStore",
+    "InMemoryWorkflowStateStore",
+    "SQLiteWorkflowStateStore",
+    "create_state_store",
+    "UserOrchestrator",
+    "WorkflowEngine",
+    "WorkflowStep",
+    "WorkflowResult",
+    "WorkflowState",
+    "StepState",
+    "validate_workflow_steps",
+]
@@ -12,8 +12,13 @@ from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 
+from ..config import get_settings
 from ..gateways import PersistenceGateway
+from ..jobs import Job, JobQueue
 from ..utils.logging import setup_logger, RequestLogger
+from .executors import ExecutionClass, StepExecutors
+from .state_store import InMemoryWorkflowStateStore, WorkflowStateStore
+from .workflow_engine import StepState, WorkflowEngine, WorkflowStep
 
 
 class OrchestrationStatus(str, Enum):
@@ -123,11 +128,30 @@ class Coordinator(ABC):
     complexos que envolvem múltiplos serviços.
     """
     
-    def __init__(self, name: str):
+    def __init__(self, name: str, persistence_gateway: Optional[PersistenceGateway] = None,
+                 job_queue: Optional[JobQueue] = None,
+                 state_store: Optional[WorkflowStateStore] = None,
+                 executors: Optional[StepExecutors] = None):
         self.name = name
         self.logger = setup_logger(f"orchestration.{name}")
-        self.persistence_gateway = PersistenceGateway()
-        self._active_workflows: Dict[str, Dict[str, Any]] = {}
+        # Gateway, store e executores compartilhados (injetados) não são fechados pelo coordenador
+        self._owns_gateway = persistence_gateway is None
+        self.persistence_gateway = persistence_gateway or PersistenceGateway()
+        self._owns_state_store = state_store is None
+        # Estado dos workflows: com store compartilhado, o status é visível em qualquer worker
+        self.state_store = state_store or InMemoryWorkflowStateStore()
+        self._owns_executors = executors is None
+        # Pools para passos síncronos que usam CPU (bcrypt etc.)
+        self.executors = executors or StepExecutors()
+        self.workflow_engine = WorkflowEngine(name, state_store=self.state_store, executors=self.executors)
+        self.step_timeout = get_settings().orchestration_step_timeout
+        # Sem fila, as etapas adiáveis rodam dentro da própria requisição
+        self.job_queue = job_queue
+        if job_queue is not None:
+            self._register_jobs(job_queue)
+    
+    def _register_jobs(self, job_queue: JobQueue) -> None:
+        """Registra os handlers de jobs do coordenador (subclasses sobrescrevem)."""
     
     @abstractmethod
     async def execute(self, *args, **kwargs) -> OrchestrationResult:
@@ -140,7 +164,8 @@ class Coordinator(ABC):
         pass
     
     async def _execute_step(self, step_name: str, step_function,
-                           *args, **kwargs) -> Dict[str, Any]:
+                           *args, execution: ExecutionClass = ExecutionClass.LOOP,
+                           **kwargs) -> Dict[str, Any]:
         """
         Executa um passo da orquestração com logging e tratamento de erro.
         
@@ -148,6 +173,8 @@ class Coordinator(ABC):
             step_name: Nome do passo
             step_function: Função a ser executada
             *args: Argumentos posicionais
+            execution: `LOOP` para corrotinas; `THREAD`/`PROCESS` executam a
+                função síncrona no executor compartilhado
             **kwargs: Argumentos nomeados
             
         Returns:
@@ -160,7 +187,7 @@ class Coordinator(ABC):
         start_time = time.time()
         
         try:
-            result = await step_function(*args, **kwargs)
+            result = await self.executors.run(execution, step_function, *args, **kwargs)
             duration_ms = (time.time() - start_time) * 1000
             
             self.logger.info(
@@ -197,7 +224,163 @@ class Coordinator(ABC):
                 f"Step '{step_name}' failed: {str(e)}",
                 step=step_name,
                 details={"duration_ms": duration_ms}
-            )
+            ) from e
+    
+    def _step(self, name: str, function, *args, depends_on: Optional[List[str]] = None,
+              can_fail: bool = False, timeout: Optional[float] = None,
+              uses_context: bool = False, priority: int = 0,
+              execution: ExecutionClass = ExecutionClass.LOOP, **kwargs) -> WorkflowStep:
+        """
+        Declara um passo para `_run_steps`.
+        
+        Args:
+            name: Nome do passo
+            function: Corrotina a executar (função síncrona se `execution`
+                for `THREAD` ou `PROCESS`)
+            *args: Argumentos posicionais
+            depends_on: Passos que precisam terminar antes deste
+            can_fail: Se True, a falha não interrompe o fluxo
+            timeout: Timeout do passo (padrão: ORCHESTRATION_STEP_TIMEOUT)
+            uses_context: Se True, a função recebe `context=` com
+                `context["results"][passo]` dos passos anteriores
+            priority: Entre passos prontos, maior prioridade inicia antes
+            execution: Onde executar: event loop, pool de threads ou de processos
+            **kwargs: Argumentos nomeados
+            
+        Returns:
+            WorkflowStep: Passo configurado (sem retry; o HTTPClient já faz retry)
+            
+        Raises:
+            ValueError: Se um passo `PROCESS` pedir o contexto
+        """
+        if execution == ExecutionClass.PROCESS and uses_context:
+            raise ValueError(f"Process step '{name}' cannot receive the context")
+        return WorkflowStep(
+            name=name,
+            function=function,
+            args=args,
+            kwargs=kwargs,
+            max_retries=0,
+            timeout=timeout if timeout is not None else self.step_timeout,
+            depends_on=list(depends_on or []),
+            can_fail=can_fail,
+            pass_context=uses_context,
+            priority=priority,
+            execution=execution
+        )
+    
+    async def _run_steps(self, steps: List[WorkflowStep],
+                         context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Executa passos com dependências declaradas, concorrendo os independentes.
+        
+        A latência total passa a ser a do caminho crítico em vez da soma
+        dos passos.
+        
+        Args:
+            steps: Passos criados com `_step`
+            context: Contexto compartilhado entre os passos
+            
+        Returns:
+            dict: Resultado de cada passo concluído, por nome (passos opcionais
+            que falharam ou foram pulados não aparecem)
+            
+        Raises:
+            OrchestrationError: Se um passo obrigatório falhar ou não chegar a
+            executar (pulado ou pendente)
+        """
+        context = context if context is not None else {}
+        # Dependências com resultado já no contexto (ex.: passo feito na
+        # requisição ou em tentativa anterior de um job) contam como concluídas
+        resolved = context.get("results", {})
+        for step in steps:
+            step.depends_on = [name for name in step.depends_on if name not in resolved]
+        
+        result = await self.workflow_engine.execute_ad_hoc_workflow(
+            steps, context, parallel_execution=True
+        )
+        
+        for step in steps:
+            if step.state == StepState.FAILED and not step.can_fail:
+                error = step.exception if step.exception and str(step.exception) else step.error
+                raise OrchestrationError(
+                    f"Step '{step.name}' failed: {error}",
+                    step=step.name,
+                    details={"duration_ms": result.duration_ms}
+                )
+            if step.state != StepState.COMPLETED and not step.can_fail:
+                # Sem o resultado, quem chama quebraria ao lê-lo (KeyError)
+                raise OrchestrationError(
+                    f"Step '{step.name}' did not run ({step.state.value})",
+                    step=step.name,
+                    details={"duration_ms": result.duration_ms, "state": step.state.value}
+                )
+            if step.state == StepState.FAILED:
+                self.logger.warning(f"Optional step failed: {step.name}: {step.error}")
+        
+        return {
+            step.name: step.result
+            for step in steps if step.state == StepState.COMPLETED
+        }
+    
+    async def _defer(self, job_type: str, payload: Dict[str, Any]) -> Optional[str]:
+        """
+        Enfileira etapas que não precisam segurar a resposta.
+        
+        Args:
+            job_type: Tipo do job registrado em `_register_jobs`
+            payload: Dados do job (serializáveis em JSON, sem segredos)
+            
+        Returns:
+            str: ID do job, ou None se não há fila ou o enfileiramento falhou
+            (nesse caso quem chama executa as etapas na própria requisição)
+        """
+        if self.job_queue is None:
+            return None
+        
+        try:
+            job = await self.job_queue.enqueue(job_type, payload)
+        except Exception as e:
+            self.logger.warning(f"Failed to enqueue {job_type}, running inline: {e}")
+            return None
+        
+        return job.id
+    
+    async def _run_job_steps(self, job: Job, steps: List[WorkflowStep],
+                             context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Executa passos dentro de um job, com checkpoint por passo.
+        
+        Passos concluídos em tentativas anteriores (`job.progress`) não são
+        repetidos e seus resultados seguem disponíveis em `context["results"]`.
+        Todos os passos são obrigatórios para o job, mas os independentes
+        rodam até o fim mesmo que um deles falhe.
+        
+        Args:
+            job: Job em execução
+            steps: Passos criados com `_step`
+            context: Contexto inicial (ex.: resultado da criação do documento)
+            
+        Returns:
+            dict: Resultado de todos os passos, por nome
+            
+        Raises:
+            OrchestrationError: Se algum passo falhar (o JobQueue agenda retry)
+        """
+        context = context if context is not None else {}
+        context.setdefault("results", {}).update(job.progress)
+        
+        pending = [step for step in steps if step.name not in job.progress]
+        for step in pending:
+            step.can_fail = True
+        
+        job.progress.update(await self._run_steps(pending, context))
+        
+        missing = [step.name for step in pending if step.name not in job.progress]
+        if missing:
+            raise OrchestrationError(f"Deferred steps did not complete: {', '.join(missing)}")
+        
+        return dict(job.progress)
     
     async def _validate_input(self, data: Dict[str, Any],
                              required_fields: List[str]) -> OrchestrationResult:
@@ -234,6 +417,14 @@ class Coordinator(ABC):
             workflow_type: Tipo do workflow
             input_data: Dados de entrada (sem informações sensíveis)
         """
+        await self._save_workflow_state(workflow_id, {
+            "workflow_id": workflow_id,
+            "coordinator": self.name,
+            "type": workflow_type,
+            "start_time": time.time(),
+            "status": OrchestrationStatus.RUNNING.value
+        })
+        
         log_data = {
             "workflow_id": workflow_id,
             "workflow_type": workflow_type,
@@ -243,12 +434,6 @@ class Coordinator(ABC):
         }
         
         await self.persistence_gateway.create_log_entry(log_data)
-        
-        self._active_workflows[workflow_id] = {
-            "type": workflow_type,
-            "start_time": time.time(),
-            "status": OrchestrationStatus.RUNNING
-        }
     
     async def _log_workflow_end(self, workflow_id: str,
                                result: OrchestrationResult) -> None:
@@ -259,10 +444,22 @@ class Coordinator(ABC):
             workflow_id: ID do workflow
             result: Resultado final da orquestração
         """
-        workflow_info = self._active_workflows.get(workflow_id, {})
+        workflow_info = await self._load_workflow_state(workflow_id) or {}
         start_time = workflow_info.get("start_time", time.time())
         total_duration_ms = (time.time() - start_time) * 1000
         
+        # O registro fica no store (com status final) até expirar pelo TTL
+        if workflow_info:
+            await self._save_workflow_state(workflow_id, dict(
+                workflow_info,
+                status=result.status.value,
+                success=result.success,
+                end_time=time.time(),
+                duration_ms=total_duration_ms,
+                steps_completed=result.steps_completed,
+                total_steps=result.total_steps
+            ))
+        
         log_data = {
             "workflow_id": workflow_id,
             "workflow_type": workflow_info.get("type", "unknown"),
@@ -277,10 +474,24 @@ class Coordinator(ABC):
         }
         
         await self.persistence_gateway.create_log_entry(log_data)
-        
-        # Remove workflow dos ativos
-        if workflow_id in self._active_workflows:
-            del self._active_workflows[workflow_id]
+    
+    async def _save_workflow_state(self, workflow_id: str, record: Dict[str, Any]) -> None:
+        """Grava o estado do workflow; falhas do store não interrompem o fluxo."""
+        try:
+            await self.state_store.save(workflow_id, record)
+        except Exception as e:
+            self.logger.warning(f"Failed to persist workflow state {workflow_id}: {e}")
+    
+    async def _load_workflow_state(self, workflow_id: str) -> Optional[Dict[str, Any]]:
+        """Estado gravado do workflow deste coordenador, ou None."""
+        try:
+            record = await self.state_store.get(workflow_id)
+        except Exception as e:
+            self.logger.warning(f"Failed to read workflow state {workflow_id}: {e}")
+            return None
+        if record is None or record.get("coordinator") != self.name:
+            return None
+        return record
     
     def _sanitize_log_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -375,7 +586,7 @@ class Coordinator(ABC):
     
     async def get_workflow_status(self, workflow_id: str) -> Optional[Dict[str, Any]]:
         """
-        Obtém status de workflow ativo.
+        Obtém status de workflow em execução ou finalizado (até expirar no store).
         
         Args:
             workflow_id: ID do workflow
@@ -383,13 +594,12 @@ class Coordinator(ABC):
         Returns:
             dict: Status do workflow ou None se não encontrado
         """
-        if workflow_id not in self._active_workflows:
+        workflow_info = await self._load_workflow_state(workflow_id)
+        if workflow_info is None:
             return None
         
-        workflow_info = self._active_workflows[workflow_id].copy()
-        
         # Adiciona duração atual
-        if "start_time" in workflow_info:
+        if workflow_info["status"] == OrchestrationStatus.RUNNING.value and "start_time" in workflow_info:
             workflow_info["current_duration_ms"] = (
                 time.time() - workflow_info["start_time"]
             ) * 1000
@@ -406,12 +616,11 @@ class Coordinator(ABC):
         Returns:
             bool: True se cancelamento foi bem-sucedido
         """
-        if workflow_id not in self._active_workflows:
+        workflow_info = await self._load_workflow_state(workflow_id)
+        if workflow_info is None or workflow_info["status"] != OrchestrationStatus.RUNNING.value:
             return False
         
         try:
-            self._active_workflows[workflow_id]["status"] = OrchestrationStatus.CANCELLED
-            
             self.logger.info(f"Workflow cancelled: {workflow_id}")
             
             # Log do cancelamento
@@ -437,6 +646,11 @@ class Coordinator(ABC):
         """
         Limpa recursos e fecha conexões.
         """
-        await self.persistence_gateway.close()
+        if self._owns_gateway:
+            await self.persistence_gateway.close()
+        if self._owns_state_store:
+            await self.state_store.close()
+        if self._owns_executors:
+            await self.executors.close()
         
         self.logger.info(f"Coordinator {self.name} closed")
\ No newline at end of file
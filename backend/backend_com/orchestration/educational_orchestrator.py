@@ -5,14 +5,22 @@ Gerencia workflows complexos relacionados a perguntas, respostas,
 avaliações e busca semântica no contexto educacional.
 """
 
+import asyncio
 import time
 from typing import Any, Dict, List, Optional
 from dataclasses import dataclass
 from datetime import datetime
 
 from .coordinator import Coordinator, OrchestrationResult, OrchestrationError
+from ..gateways import GatewayLoaders, PersistenceGateway
+from ..jobs import Job, JobQueue
 from ..models import PaginationParams
 from ..utils import generate_uuid
+from .executors import StepExecutors
+from .state_store import WorkflowStateStore
+from .workflow_engine import WorkflowStep
+
+INDEX_QUESTION_JOB = "educational.index_question"
 
 
 @dataclass
@@ -22,6 +30,7 @@ class QuestionFlowResult:
     embedding_created: bool
     similar_questions: Optional[List[Dict[str, Any]]] = None
     recommendations: Optional[List[str]] = None
+    job_id: Optional[str] = None  # passos 3-5 adiados para a fila de jobs
 
 
 @dataclass
@@ -50,8 +59,14 @@ class EducationalOrchestrator(Coordinator):
     ao processo de ensino-aprendizagem.
     """
     
-    def __init__(self):
-        super().__init__("educational")
+    def __init__(self, persistence_gateway: Optional[PersistenceGateway] = None,
+                 job_queue: Optional[JobQueue] = None,
+                 state_store: Optional[WorkflowStateStore] = None,
+                 executors: Optional[StepExecutors] = None):
+        super().__init__("educational", persistence_gateway, job_queue, state_store, executors)
+    
+    def _register_jobs(self, job_queue: JobQueue) -> None:
+        job_queue.register(INDEX_QUESTION_JOB, self._index_question_job)
     
     async def execute(self, *args, **kwargs) -> OrchestrationResult:
         """
@@ -73,6 +88,11 @@ class EducationalOrchestrator(Coordinator):
         4. Buscar perguntas similares (opcional)
         5. Gerar recomendações de estudo (opcional)
         
+        O embedding é gerado uma única vez, em paralelo à escrita no MongoDB;
+        o mesmo vetor alimenta a busca de similares e a indexação no Qdrant.
+        Com fila de jobs, os passos 3-5 rodam no job `educational.index_question`
+        e o resultado traz apenas a pergunta criada e o `job_id`.
+        
         Args:
             question_data: Dados da pergunta
             find_similar: Se deve buscar perguntas similares
@@ -94,47 +114,33 @@ class EducationalOrchestrator(Coordinator):
                 question_data
             )
             
-            # Passo 2: Criar pergunta
-            create_step = await self._execute_step(
-                "create_question",
-                self._create_question,
-                question_data
-            )
-            
-            question_id = create_step["data"]["question_id"]
-            embedding_created = False
-            similar_questions = None
+            # Passos 2-4: a escrita no MongoDB e o embedding são independentes;
+            # a busca de similares só espera o vetor, e a indexação espera ambos
+            create_step = self._step("create_question", self._create_question, question_data)
+            index_steps = self._question_index_steps(question_data, find_similar)
+            
+            job_id = None
+            if self.job_queue is None:
+                results = await self._run_steps([create_step, *index_steps])
+            else:
+                # Só a escrita no MongoDB segura a resposta; os passos 3-5 vão para a fila
+                results = await self._run_steps([create_step])
+                job_id = await self._defer(INDEX_QUESTION_JOB, {
+                    "question_id": results["create_question"]["question_id"],
+                    "question_data": question_data,
+                    "find_similar": find_similar,
+                    "generate_recommendations": generate_recommendations
+                })
+                if job_id is None:
+                    results.update(await self._run_steps(index_steps, {"results": dict(results)}))
+            
+            question_id = results["create_question"]["question_id"]
+            embedding_created = "store_question_vector" in results
+            similar_questions = results.get("find_similar_questions")
             recommendations = None
             
-            # Passo 3: Gerar embedding
-            try:
-                embedding_step = await self._execute_step(
-                    "create_embedding",
-                    self._create_question_embedding,
-                    question_id,
-                    question_data["conteudo"]
-                )
-                embedding_created = True
-                
-            except OrchestrationError as e:
-                self.logger.warning(f"Failed to create embedding: {e.message}")
-            
-            # Passo 4: Buscar similares (opcional)
-            if find_similar and embedding_created:
-                try:
-                    similar_step = await self._execute_step(
-                        "find_similar_questions",
-                        self._find_similar_questions,
-                        question_data["conteudo"],
-                        question_data.get("disciplina")
-                    )
-                    similar_questions = similar_step["data"]
-                    
-                except OrchestrationError as e:
-                    self.logger.warning(f"Failed to find similar questions: {e.message}")
-            
-            # Passo 5: Gerar recomendações (opcional)
-            if generate_recommendations:
+            # Passo 5: Gerar recomendações (opcional; no job quando adiado)
+            if generate_recommendations and job_id is None:
                 try:
                     rec_step = await self._execute_step(
                         "generate_recommendations",
@@ -154,7 +160,8 @@ class EducationalOrchestrator(Coordinator):
                 question_id=question_id,
                 embedding_created=embedding_created,
                 similar_questions=similar_questions,
-                recommendations=recommendations
+                recommendations=recommendations,
+                job_id=job_id
             )
             
             result = OrchestrationResult.success_result(
@@ -193,6 +200,9 @@ class EducationalOrchestrator(Coordinator):
         5. Atualizar contador na pergunta
         6. Calcular score de qualidade (opcional)
         
+        O embedding é gerado em paralelo à escrita no MongoDB e indexado
+        com o ID da resposta assim que ambos terminam.
+        
         Args:
             answer_data: Dados da resposta
             calculate_quality: Se deve calcular qualidade
@@ -220,56 +230,30 @@ class EducationalOrchestrator(Coordinator):
                 answer_data["pergunta_id"]
             )
             
-            # Passo 3: Criar resposta
-            create_step = await self._execute_step(
-                "create_answer",
-                self._create_answer,
-                answer_data
-            )
-            
-            answer_id = create_step["data"]["answer_id"]
-            embedding_created = False
-            question_updated = False
-            quality_score = None
+            # Passos 3-6: embedding e qualidade não dependem da escrita no
+            # MongoDB; indexação e contador esperam a resposta criada
+            steps = [
+                self._step("create_answer", self._create_answer, answer_data),
+                self._step("embed_answer", self._embed_content,
+                           answer_data["conteudo"], can_fail=True),
+                self._step("store_answer_vector", self._store_answer_vector, answer_data,
+                           depends_on=["create_answer", "embed_answer"],
+                           uses_context=True, can_fail=True),
+                self._step("update_question_counter", self._update_question_answer_count,
+                           answer_data["pergunta_id"], depends_on=["create_answer"], can_fail=True),
+            ]
+            if calculate_quality:
+                steps.append(self._step(
+                    "calculate_answer_quality", self._calculate_answer_quality,
+                    answer_data["conteudo"], question_step["data"]["conteudo"], can_fail=True
+                ))
             
-            # Passo 4: Gerar embedding
-            try:
-                await self._execute_step(
-                    "create_answer_embedding",
-                    self._create_answer_embedding,
-                    answer_id,
-                    answer_data["conteudo"]
-                )
-                embedding_created = True
-                
-            except OrchestrationError as e:
-                self.logger.warning(f"Failed to create answer embedding: {e.message}")
+            results = await self._run_steps(steps)
             
-            # Passo 5: Atualizar contador da pergunta
-            try:
-                await self._execute_step(
-                    "update_question_counter",
-                    self._update_question_answer_count,
-                    answer_data["pergunta_id"]
-                )
-                question_updated = True
-                
-            except OrchestrationError as e:
-                self.logger.warning(f"Failed to update question counter: {e.message}")
-            
-            # Passo 6: Calcular qualidade (opcional)
-            if calculate_quality:
-                try:
-                    quality_step = await self._execute_step(
-                        "calculate_answer_quality",
-                        self._calculate_answer_quality,
-                        answer_data["conteudo"],
-                        question_step["data"]["conteudo"]
-                    )
-                    quality_score = quality_step["data"]["score"]
-                    
-                except OrchestrationError as e:
-                    self.logger.warning(f"Failed to calculate quality: {e.message}")
+            answer_id = results["create_answer"]["answer_id"]
+            embedding_created = "store_answer_vector" in results
+            question_updated = "update_question_counter" in results
+            quality_score = results.get("calculate_answer_quality", {}).get("score")
             
             # Resultado final
             duration_ms = (time.time() - start_time) * 1000
@@ -347,11 +331,16 @@ class EducationalOrchestrator(Coordinator):
             
             evaluation_id = create_step["data"]["evaluation_id"]
             
+            results = await self._run_steps([
+                self._step("update_answer_stats", self._update_answer_evaluation_stats,
+                           evaluation_data["resposta_id"], evaluation_data["nota"], can_fail=True),
+            ])
+            
             duration_ms = (time.time() - start_time) * 1000
             
             result_data = EvaluationFlowResult(
                 evaluation_id=evaluation_id,
-                answer_updated=True,
+                answer_updated="update_answer_stats" in results,
                 user_stats_updated=update_user_stats,
                 feedback_generated=generate_feedback
             )
@@ -359,7 +348,7 @@ class EducationalOrchestrator(Coordinator):
             result = OrchestrationResult.success_result(
                 data=result_data.__dict__,
                 duration_ms=duration_ms,
-                steps_completed=3,
+                steps_completed=3 + len(results),
                 total_steps=6
             )
             
@@ -394,7 +383,8 @@ class EducationalOrchestrator(Coordinator):
     
     async def _create_question(self, question_data: Dict[str, Any]) -> Dict[str, Any]:
         """Cria pergunta no banco de dados."""
-        response = await self.persistence_gateway.create_question(question_data)
+        # O embedding é gerado e indexado pelo próprio fluxo (um único vetor)
+        response = await self.persistence_gateway.create_question(question_data, embed=False)
         
         if not response.success:
             raise OrchestrationError(
@@ -406,32 +396,95 @@ class EducationalOrchestrator(Coordinator):
             "created_at": response.data.get("created_at")
         }
     
-    async def _create_question_embedding(self, question_id: str, content: str) -> Dict[str, Any]:
-        """Cria embedding para a pergunta."""
-        metadata = {
+    def _question_index_steps(self, question_data: Dict[str, Any],
+                              find_similar: bool) -> List[WorkflowStep]:
+        """
+        Passos 3-4 da criação de pergunta: embedding, indexação e similares.
+        
+        A indexação lê o ID em `context["results"]["create_question"]`, então
+        os passos servem tanto para o fluxo na requisição quanto para o job
+        `educational.index_question`.
+        """
+        steps = [
+            self._step("embed_question", self._embed_content,
+                       question_data["conteudo"], can_fail=True),
+            self._step("store_question_vector", self._store_question_vector, question_data,
+                       depends_on=["create_question", "embed_question"],
+                       uses_context=True, can_fail=True),
+        ]
+        if find_similar:
+            steps.append(self._step(
+                "find_similar_questions", self._find_similar_questions,
+                question_data.get("disciplina"),
+                depends_on=["embed_question"], uses_context=True, can_fail=True
+            ))
+        return steps
+    
+    async def _index_question_job(self, job: Job) -> Dict[str, Any]:
+        """Job `educational.index_question`: embedding, indexação, similares e recomendações."""
+        payload = job.payload
+        question_data = payload["question_data"]
+        results = await self._run_job_steps(
+            job, self._question_index_steps(question_data, payload["find_similar"]),
+            {"results": {"create_question": {"question_id": payload["question_id"]}}}
+        )
+        
+        similar_questions = results.get("find_similar_questions")
+        recommendations = None
+        if payload["generate_recommendations"]:
+            recommendations = await self._generate_study_recommendations(question_data, similar_questions)
+        
+        return {
+            "question_id": payload["question_id"],
+            "embedding_created": True,
+            "similar_questions": similar_questions,
+            "recommendations": recommendations
+        }
+    
+    async def _embed_content(self, content: str) -> List[float]:
+        """Gera o embedding do texto sem indexá-lo (o vetor é reutilizado pelo fluxo)."""
+        response = await self.persistence_gateway.qdrant.create_embedding(content, store=False)
+        
+        vector = response.data.get("vector") if response.success and isinstance(response.data, dict) else None
+        if not vector:
+            raise OrchestrationError(
+                f"Failed to create embedding: {response.error_message or 'no vector returned'}"
+            )
+        
+        return vector
+    
+    async def _store_question_vector(self, question_data: Dict[str, Any],
+                                   context: Dict[str, Any]) -> Dict[str, Any]:
+        """Indexa no Qdrant o vetor já gerado para a pergunta."""
+        question_id = context["results"]["create_question"]["question_id"]
+        payload = {
             "type": "question",
             "question_id": question_id,
+            "user_id": question_data.get("usuario_id"),
+            "disciplina": question_data.get("disciplina"),
             "created_at": datetime.utcnow().isoformat()
         }
         
-        response = await self.persistence_gateway.qdrant.create_embedding(content, metadata)
+        response = await self.persistence_gateway.qdrant.store_vector(
+            question_id, context["results"]["embed_question"], payload
+        )
         
         if not response.success:
             raise OrchestrationError(
-                f"Failed to create question embedding: {response.error_message}"
+                f"Failed to store question embedding: {response.error_message}"
             )
         
         return response.data
     
-    async def _find_similar_questions(self, content: str, 
-                                    disciplina: Optional[str] = None) -> List[Dict[str, Any]]:
-        """Busca perguntas similares usando busca semântica."""
+    async def _find_similar_questions(self, disciplina: Optional[str],
+                                    context: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Busca perguntas similares a partir do vetor já gerado."""
         filters = {"type": "question"}
         if disciplina:
             filters["disciplina"] = disciplina
         
         response = await self.persistence_gateway.search_questions_semantic(
-            content, limit=5, filters=filters
+            limit=5, filters=filters, vector=context["results"]["embed_question"]
         )
         
         if not response.success:
@@ -490,7 +543,8 @@ class EducationalOrchestrator(Coordinator):
     
     async def _create_answer(self, answer_data: Dict[str, Any]) -> Dict[str, Any]:
         """Cria resposta no banco de dados."""
-        response = await self.persistence_gateway.create_answer(answer_data)
+        # O embedding é gerado e indexado pelo próprio fluxo (um único vetor)
+        response = await self.persistence_gateway.create_answer(answer_data, embed=False)
         
         if not response.success:
             raise OrchestrationError(
@@ -502,15 +556,21 @@ class EducationalOrchestrator(Coordinator):
             "created_at": response.data.get("created_at")
         }
     
-    async def _create_answer_embedding(self, answer_id: str, content: str) -> Dict[str, Any]:
-        """Cria embedding para a resposta."""
-        metadata = {
+    async def _store_answer_vector(self, answer_data: Dict[str, Any],
+                                 context: Dict[str, Any]) -> Dict[str, Any]:
+        """Indexa no Qdrant o vetor já gerado para a resposta."""
+        answer_id = context["results"]["create_answer"]["answer_id"]
+        payload = {
             "type": "answer",
             "answer_id": answer_id,
+            "question_id": answer_data.get("pergunta_id"),
+            "user_id": answer_data.get("usuario_id"),
             "created_at": datetime.utcnow().isoformat()
         }
         
-        response = await self.persistence_gateway.qdrant.create_embedding(content, metadata)
+        response = await self.persistence_gateway.qdrant.store_vector(
+            answer_id, context["results"]["embed_answer"], payload
+        )
         
         if not response.success:
             raise OrchestrationError(
@@ -520,32 +580,40 @@ class EducationalOrchestrator(Coordinator):
         return response.data
     
     async def _update_question_answer_count(self, question_id: str) -> Dict[str, Any]:
-        """Atualiza contador de respostas na pergunta."""
-        # Busca pergunta atual
-        question_response = await self.persistence_gateway.get_question(question_id)
+        """Incrementa o contador de respostas na pergunta (atômico no MongoDB)."""
+        update_response = await self.persistence_gateway.mongodb.atomic_update_document(
+            "perguntas", question_id, {
+                "$inc": {"respostas_count": 1},
+                "$set": {"updated_at": datetime.utcnow().isoformat()}
+            }
+        )
         
-        if not question_response.success:
+        if not update_response.success:
             raise OrchestrationError(
-                f"Failed to get question for counter update: {question_response.error_message}"
+                f"Failed to update question counter: {update_response.error_message}"
             )
         
-        # Incrementa contador
-        current_count = question_response.data.get("respostas_count", 0)
-        update_data = {
-            "respostas_count": current_count + 1,
-            "updated_at": datetime.utcnow().isoformat()
-        }
-        
-        update_response = await self.persistence_gateway.mongodb.update_document(
-            "perguntas", question_id, update_data
+        return {"new_count": update_response.data.get("respostas_count")}
+    
+    async def _update_answer_evaluation_stats(self, answer_id: str, nota: float) -> Dict[str, Any]:
+        """Soma a avaliação às estatísticas da resposta (atômico no MongoDB)."""
+        update_response = await self.persistence_gateway.mongodb.atomic_update_document(
+            "respostas", answer_id, {
+                "$inc": {"avaliacoes_count": 1, "notas_soma": nota},
+                "$set": {"updated_at": datetime.utcnow().isoformat()}
+            }
         )
         
         if not update_response.success:
             raise OrchestrationError(
-                f"Failed to update question counter: {update_response.error_message}"
+                f"Failed to update answer stats: {update_response.error_message}"
             )
         
-        return {"new_count": current_count + 1}
+        answer = update_response.data
+        return {
+            "avaliacoes_count": answer.get("avaliacoes_count"),
+            "nota_media": answer.get("notas_soma", 0) / max(answer.get("avaliacoes_count", 1), 1)
+        }
     
     async def _calculate_answer_quality(self, answer_content: str, 
                                       question_content: str) -> Dict[str, Any]:
@@ -631,36 +699,47 @@ class EducationalOrchestrator(Coordinator):
         try:
             start_time = time.time()
             
-            # Busca pergunta
-            question_response = await self.persistence_gateway.get_question(question_id)
-            
-            if not question_response.success:
-                return OrchestrationResult.error_result(
-                    f"Question not found: {question_id}"
+            # Pergunta e respostas são buscadas concorrentemente;
+            # avaliações dependem apenas das respostas
+            async def get_question() -> Dict[str, Any]:
+                response = await self.persistence_gateway.get_question(question_id)
+                if not response.success:
+                    raise OrchestrationError(f"Question not found: {question_id}")
+                return response.data
+            
+            async def get_answers() -> List[Dict[str, Any]]:
+                response = await self.persistence_gateway.get_answers_by_question(
+                    question_id, PaginationParams(page=1, page_size=50)
                 )
+                return response.data.get("items", []) if response.success else []
+            
+            async def attach_evaluations(context: Dict[str, Any]) -> None:
+                # Uma chamada em lote para as avaliações de todas as respostas
+                loaders = GatewayLoaders(self.persistence_gateway, evaluations_per_answer=20)
+                answers_with_id = [a for a in context["results"]["get_answers"] if a.get("_id")]
+                evaluations = await asyncio.gather(
+                    *(loaders.evaluations_by_answer.load(str(a["_id"])) for a in answers_with_id),
+                    return_exceptions=True
+                )
+                for answer, answer_evaluations in zip(answers_with_id, evaluations):
+                    if not isinstance(answer_evaluations, Exception):
+                        answer["avaliacoes"] = answer_evaluations
+            
+            steps = [
+                self._step("get_question", get_question),
+                self._step("get_answers", get_answers, can_fail=True),
+            ]
+            if include_evaluations:
+                steps.append(self._step("attach_evaluations", attach_evaluations, uses_context=True,
+                                        depends_on=["get_answers"], can_fail=True))
             
-            question_data = question_response.data
+            try:
+                results = await self._run_steps(steps)
+            except OrchestrationError as e:
+                return OrchestrationResult.error_result(e.message)
             
-            # Busca respostas
-            answers_response = await self.persistence_gateway.get_answers_by_question(
-                question_id, PaginationParams(page=1, page_size=50)
-            )
-            
-            answers_data = []
-            if answers_response.success:
-                answers_data = answers_response.data.get("items", [])
-                
-                # Busca avaliações se solicitado
-                if include_evaluations:
-                    for answer in answers_data:
-                        answer_id = answer.get("_id")
-                        if answer_id:
-                            evaluations_response = await self.persistence_gateway.get_evaluations_by_answer(
-                                answer_id, PaginationParams(page=1, page_size=20)
-                            )
-                            
-                            if evaluations_response.success:
-                                answer["avaliacoes"] = evaluations_response.data.get("items", [])
+            question_data = results["get_question"]
+            answers_data = results.get("get_answers", [])
             
             # Monta resultado
             duration_ms = (time.time() - start_time) * 1000
@@ -701,8 +780,8 @@ class EducationalOrchestrator(Coordinator):
             
             all_results = []
             
-            # Busca por cada tipo de conteúdo
-            for content_type in content_types:
+            # Busca por cada tipo de conteúdo (buscas independentes, concorrentes)
+            async def search(content_type: str) -> List[Dict[str, Any]]:
                 search_filters = {"type": content_type}
                 if filters:
                     search_filters.update(filters)
@@ -711,14 +790,19 @@ class EducationalOrchestrator(Coordinator):
                     query, limit=limit // len(content_types), filters=search_filters
                 )
                 
-                if response.success:
-                    results = response.data.get("resultados", [])
-                    
-                    # Adiciona tipo ao resultado
-                    for result in results:
-                        result["content_type"] = content_type
-                    
-                    all_results.extend(results)
+                results = response.data.get("resultados", []) if response.success else []
+                
+                # Adiciona tipo ao resultado
+                for result in results:
+                    result["content_type"] = content_type
+                return results
+            
+            results_by_type = await self._run_steps([
+                self._step(f"search_{content_type}", search, content_type, can_fail=True)
+                for content_type in dict.fromkeys(content_types)
+            ])
+            for results in results_by_type.values():
+                all_results.extend(results)
             
             # Ordena por relevância (score)
             all_results.sort(key=lambda x: x.get("score", 0), reverse=True)
@@ -0,0 +1,193 @@
+"""
+Executores compartilhados para passos de workflow que usam CPU.
+
+Passos `loop` rodam no event loop (corrotinas com I/O). Passos `thread`
+e `process` são funções síncronas executadas fora dele:
+
+- `thread`: código que libera o GIL (bcrypt, hashlib, numpy) ou I/O
+  bloqueante; sem custo de serialização.
+- `process`: Python puro e pesado; função e argumentos precisam ser
+  serializáveis (pickle), então o passo não recebe `context`.
+
+Cada executor admite no máximo `max_workers` tarefas por vez; as demais
+esperam em um semáforo no próprio loop. Assim a fila fica observável
+(`queued`, `max_queued`, espera média) e uma tarefa que ainda não começou
+pode ser cancelada (timeout do passo) sem ocupar um worker. Com
+`max_queue`, a fila também é limitada: acima dela a tarefa é recusada na
+hora (`ExecutorSaturatedError`) em vez de esperar indefinidamente.
+"""
+
+import asyncio
+import functools
+import logging
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from enum import Enum
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutionClass(str, Enum):
+    """Onde um passo de workflow é executado."""
+    LOOP = "loop"
+    THREAD = "thread"
+    PROCESS = "process"
+
+
+class ExecutorSaturatedError(RuntimeError):
+    """Fila do executor cheia: a tarefa foi recusada sem executar."""
+
+
+class StepExecutor:
+    """Pool de threads ou processos com admissão limitada e métricas de fila."""
+
+    def __init__(self, name: str, execution: ExecutionClass, max_workers: int,
+                 max_queue: Optional[int] = None):
+        """
+        Args:
+            name: Nome usado em logs e métricas
+            execution: `THREAD` ou `PROCESS`
+            max_workers: Tamanho do pool (e tarefas simultâneas admitidas)
+            max_queue: Tarefas que podem aguardar um worker (None = sem limite)
+        """
+        if execution == ExecutionClass.LOOP:
+            raise ValueError("Loop steps do not use an executor")
+        self.name = name
+        self.execution = execution
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor: Optional[Executor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._stats = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "rejected": 0,
+            "queued": 0,
+            "running": 0,
+            "max_queued": 0,
+            "queue_wait_ms_total": 0.0,
+        }
+
+    def _ensure_started(self) -> None:
+        # Criação preguiçosa: o pool de processos só sobe se algum passo usar
+        if self._executor is None:
+            if self.execution == ExecutionClass.THREAD:
+                self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix=f"step-{self.name}")
+            else:
+                self._executor = ProcessPoolExecutor(self.max_workers)
+            self._slots = asyncio.Semaphore(self.max_workers)
+
+    async def run(self, function: Callable, /, *args, **kwargs) -> Any:
+        """
+        Executa `function(*args, **kwargs)` no pool.
+
+        Returns:
+            Any: Retorno da função
+
+        Raises:
+            ExecutorSaturatedError: Se a fila estiver cheia (`max_queue`)
+            Exception: A exceção levantada pela função
+        """
+        self._ensure_started()
+        executor, slots = self._executor, self._slots
+        stats = self._stats
+        if self.max_queue is not None and slots.locked() and stats["queued"] >= self.max_queue:
+            stats["rejected"] += 1
+            raise ExecutorSaturatedError(f"Executor '{self.name}' is saturated ({stats['queued']} tasks waiting)")
+        stats["submitted"] += 1
+        stats["queued"] += 1
+        stats["max_queued"] = max(stats["max_queued"], stats["queued"])
+        enqueued_at = time.perf_counter()
+
+        try:
+            await slots.acquire()
+        finally:
+            stats["queued"] -= 1
+        stats["queue_wait_ms_total"] += (time.perf_counter() - enqueued_at) * 1000
+
+        stats["running"] += 1
+        try:
+            future = asyncio.get_running_loop().run_in_executor(
+                executor, functools.partial(function, *args, **kwargs)
+            )
+            # Se o passo expirar, a tarefa termina no worker e só então libera o slot
+            result = await asyncio.shield(future)
+        except asyncio.CancelledError:
+            future.add_done_callback(lambda _: self._release(slots))
+            raise
+        except Exception:
+            stats["failed"] += 1
+            self._release(slots)
+            raise
+        stats["completed"] += 1
+        self._release(slots)
+        return result
+
+    def _release(self, slots: asyncio.Semaphore) -> None:
+        self._stats["running"] -= 1
+        slots.release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Contadores e profundidade da fila do executor."""
+        admitted = self._stats["submitted"] - self._stats["queued"]
+        return {
+            "execution": self.execution.value,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "pool_started": self._executor is not None,
+            **{key: value for key, value in self._stats.items() if key != "queue_wait_ms_total"},
+            "avg_queue_wait_ms": round(self._stats["queue_wait_ms_total"] / admitted, 3) if admitted else 0.0,
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Encerra o pool (tarefas já iniciadas terminam se `wait`)."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+            self._slots = None
+
+
+class StepExecutors:
+    """Executores de passos compartilhados pela aplicação (um por classe de execução)."""
+
+    def __init__(self, thread_workers: Optional[int] = None, process_workers: Optional[int] = None):
+        """
+        Args:
+            thread_workers: Threads do pool `thread` (padrão: min(32, CPUs + 4))
+            process_workers: Processos do pool `process` (padrão: número de CPUs)
+        """
+        cpus = os.cpu_count() or 1
+        self._executors = {
+            ExecutionClass.THREAD: StepExecutor("thread", ExecutionClass.THREAD,
+                                                thread_workers or min(32, cpus + 4)),
+            ExecutionClass.PROCESS: StepExecutor("process", ExecutionClass.PROCESS,
+                                                 process_workers or cpus),
+        }
+
+    def get(self, execution: ExecutionClass) -> StepExecutor:
+        """Executor da classe de execução `thread` ou `process`."""
+        return self._executors[ExecutionClass(execution)]
+
+    async def run(self, execution: ExecutionClass, function: Callable, /, *args, **kwargs) -> Any:
+        """
+        Executa a função conforme a classe de execução.
+
+        `loop` aguarda a corrotina diretamente; `thread`/`process` executam a
+        função síncrona no executor correspondente.
+        """
+        if ExecutionClass(execution) == ExecutionClass.LOOP:
+            return await function(*args, **kwargs)
+        return await self.get(execution).run(function, *args, **kwargs)
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Métricas por executor."""
+        return {executor.name: executor.get_stats() for executor in self._executors.values()}
+
+    async def close(self) -> None:
+        """Encerra os pools sem bloquear o loop."""
+        for executor in self._executors.values():
+            await asyncio.to_thread(executor.shutdown)
+        logger.info("Step executors closed")
@@ -0,0 +1,126 @@
+"""
+Hash e verificação de senhas (bcrypt) fora do event loop.
+
+Cada bcrypt leva ~100-300 ms de CPU. Executado direto numa corrotina, um
+pico de logins trava todas as outras requisições do processo. Aqui o
+bcrypt roda em um pool de threads dedicado (a biblioteca libera o GIL),
+com concorrência limitada a `workers` e fila limitada a `max_pending`:
+logins excedentes esperam a vez sem bloquear o loop e, com a fila cheia,
+são recusados na hora (`ExecutorSaturatedError`).
+
+O custo (`rounds`) pode ser calibrado na inicialização para um tempo-alvo
+por hash; hashes com custo menor que o atual são refeitos após o login
+(`needs_rehash`), só quando o pool está ocioso (`is_idle`).
+"""
+
+import asyncio
+import logging
+import math
+import os
+import time
+from typing import Any, Dict, Optional
+
+import bcrypt
+
+from ..utils import hash_password, verify_password
+from .executors import ExecutionClass, StepExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class PasswordHasher:
+    """bcrypt em pool dedicado, com admissão limitada e custo configurável."""
+
+    def __init__(self, workers: Optional[int] = None, max_pending: Optional[int] = 64,
+                 rounds: int = 12):
+        """
+        Args:
+            workers: Hashes simultâneos (padrão: min(4, CPUs))
+            max_pending: Hashes aguardando um worker antes de recusar (None = sem limite)
+            rounds: Custo do bcrypt para hashes novos
+        """
+        self.rounds = rounds
+        self.executor = StepExecutor(
+            "password", ExecutionClass.THREAD,
+            workers or min(4, os.cpu_count() or 1),
+            max_queue=max_pending
+        )
+
+    async def hash(self, password: str) -> str:
+        """
+        Gera o hash da senha com o custo atual.
+
+        Raises:
+            ExecutorSaturatedError: Se a fila de hashes estiver cheia
+        """
+        return await self.executor.run(hash_password, password, self.rounds)
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        """
+        Verifica a senha contra o hash armazenado.
+
+        Raises:
+            ExecutorSaturatedError: Se a fila de hashes estiver cheia
+        """
+        return await self.executor.run(verify_password, password, hashed)
+
+    def is_idle(self) -> bool:
+        """Indica se há worker livre e nenhum hash na fila (trabalho opcional pode rodar)."""
+        stats = self.executor.get_stats()
+        return stats["queued"] == 0 and stats["running"] < self.executor.max_workers
+
+    def needs_rehash(self, hashed: str) -> bool:
+        """
+        Indica se o hash usa custo menor que o atual.
+
+        O custo só aumenta: um hash mais forte que o configurado é mantido.
+
+        Args:
+            hashed: Hash bcrypt armazenado (`$2b$<custo>$...`)
+        """
+        try:
+            return int(hashed.split("$")[2]) < self.rounds
+        except (AttributeError, IndexError, ValueError):
+            return False
+
+    async def calibrate(self, target_ms: float, min_rounds: int = 10, max_rounds: int = 14) -> int:
+        """
+        Escolhe o maior custo cujo hash fica dentro de `target_ms` nesta máquina.
+
+        Mede o custo mínimo (melhor de 3 execuções) e extrapola: cada
+        round a mais dobra o tempo do bcrypt.
+
+        Args:
+            target_ms: Tempo-alvo por hash (ms)
+            min_rounds: Custo mínimo aceito, mesmo que exceda o alvo
+            max_rounds: Custo máximo
+
+        Returns:
+            int: Custo escolhido (também aplicado em `rounds`)
+        """
+        def measure() -> float:
+            salt = bcrypt.gensalt(min_rounds)
+            best = math.inf
+            for _ in range(3):
+                start = time.perf_counter()
+                bcrypt.hashpw(b"calibration", salt)
+                best = min(best, (time.perf_counter() - start) * 1000)
+            return best
+
+        base_ms = await self.executor.run(measure)
+        extra = math.floor(math.log2(target_ms / base_ms)) if base_ms < target_ms else 0
+        self.rounds = max(min_rounds, min(max_rounds, min_rounds + extra))
+
+        logger.info(
+            f"bcrypt calibrated: {self.rounds} rounds "
+            f"(~{base_ms * 2 ** (self.rounds - min_rounds):.0f} ms per hash, target {target_ms:.0f} ms)"
+        )
+        return self.rounds
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Custo atual e métricas da fila de hashes."""
+        return {"rounds": self.rounds, **self.executor.get_stats()}
+
+    async def close(self) -> None:
+        """Encerra o pool de hashes sem bloquear o loop."""
+        await asyncio.to_thread(self.executor.shutdown)
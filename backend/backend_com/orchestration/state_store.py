@@ -0,0 +1,272 @@
+"""
+Armazenamento do estado de workflows (Coordinator e WorkflowEngine).
+
+O estado é um dicionário serializável em JSON por `workflow_id`. Registros
+expiram `ttl_seconds` após a última atualização; a expiração é aplicada na
+leitura e removida de fato por `evict_expired`, que a aplicação executa
+periodicamente (`start_eviction`).
+
+Backends:
+- `InMemoryWorkflowStateStore`: LRU com TTL, limitado a `max_entries`;
+  visível apenas no próprio processo.
+- `SQLiteWorkflowStateStore`: arquivo SQLite em modo WAL; sobrevive a
+  reinícios e é compartilhado pelos workers do mesmo host, então
+  consultas de status funcionam em qualquer worker.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class WorkflowStateStore(ABC):
+    """Contrato dos backends de estado de workflow."""
+
+    def __init__(self, ttl_seconds: float = 3600.0):
+        self.ttl_seconds = ttl_seconds
+        self._eviction_task: Optional[asyncio.Task] = None
+
+    @abstractmethod
+    async def save(self, workflow_id: str, record: Dict[str, Any]) -> None:
+        """Grava (ou substitui) o estado do workflow e renova o TTL."""
+
+    @abstractmethod
+    async def get(self, workflow_id: str) -> Optional[Dict[str, Any]]:
+        """Estado do workflow, ou None se ausente ou expirado."""
+
+    @abstractmethod
+    async def delete(self, workflow_id: str) -> None:
+        """Remove o estado do workflow."""
+
+    @abstractmethod
+    async def list_records(self, statuses: Optional[Iterable[str]] = None,
+                           updated_before: Optional[float] = None,
+                           limit: Optional[int] = 100) -> List[Dict[str, Any]]:
+        """
+        Lista estados válidos, do mais antigo para o mais recente.
+
+        Args:
+            statuses: Filtra pelo campo `status` do registro
+            updated_before: Só registros atualizados antes deste instante (time.time)
+            limit: Máximo de registros (None = todos)
+        """
+
+    @abstractmethod
+    async def evict_expired(self) -> int:
+        """Remove registros expirados e retorna quantos foram removidos."""
+
+    async def close(self) -> None:
+        """Para a expiração periódica e libera recursos."""
+        await self.stop_eviction()
+
+    def start_eviction(self, interval: float = 60.0) -> None:
+        """
+        Inicia a task que remove registros expirados a cada `interval` segundos.
+
+        Args:
+            interval: Intervalo entre execuções (s)
+        """
+        if self._eviction_task is None:
+            self._eviction_task = asyncio.create_task(self._eviction_loop(interval))
+
+    async def stop_eviction(self) -> None:
+        """Para a task de expiração, se estiver rodando."""
+        if self._eviction_task is not None:
+            self._eviction_task.cancel()
+            await asyncio.gather(self._eviction_task, return_exceptions=True)
+            self._eviction_task = None
+
+    async def _eviction_loop(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                removed = await self.evict_expired()
+                if removed:
+                    logger.info(f"Evicted {removed} expired workflow states")
+            except Exception as e:
+                logger.error(f"Workflow state eviction failed: {e}")
+
+
+class InMemoryWorkflowStateStore(WorkflowStateStore):
+    """Estado em memória com LRU (`max_entries`) e TTL."""
+
+    def __init__(self, ttl_seconds: float = 3600.0, max_entries: int = 10000):
+        super().__init__(ttl_seconds)
+        self.max_entries = max_entries
+        self._records: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def _expired(self, record: Dict[str, Any], now: float) -> bool:
+        return record["updated_at"] + self.ttl_seconds <= now
+
+    async def save(self, workflow_id: str, record: Dict[str, Any]) -> None:
+        self._records[workflow_id] = dict(record, updated_at=time.time())
+        self._records.move_to_end(workflow_id)
+        while len(self._records) > self.max_entries:
+            self._records.popitem(last=False)
+
+    async def get(self, workflow_id: str) -> Optional[Dict[str, Any]]:
+        record = self._records.get(workflow_id)
+        if record is None:
+            return None
+        if self._expired(record, time.time()):
+            del self._records[workflow_id]
+            return None
+        self._records.move_to_end(workflow_id)
+        return dict(record)
+
+    async def delete(self, workflow_id: str) -> None:
+        self._records.pop(workflow_id, None)
+
+    async def list_records(self, statuses: Optional[Iterable[str]] = None,
+                           updated_before: Optional[float] = None,
+                           limit: Optional[int] = 100) -> List[Dict[str, Any]]:
+        now = time.time()
+        wanted = set(statuses) if statuses is not None else None
+        records = sorted(
+            (record for record in self._records.values()
+             if not self._expired(record, now)
+             and (wanted is None or record.get("status") in wanted)
+             and (updated_before is None or record["updated_at"] < updated_before)),
+            key=lambda record: record["updated_at"]
+        )
+        return [dict(record) for record in records[:limit]]
+
+    async def evict_expired(self) -> int:
+        now = time.time()
+        expired = [workflow_id for workflow_id, record in self._records.items()
+                   if self._expired(record, now)]
+        for workflow_id in expired:
+            del self._records[workflow_id]
+        return len(expired)
+
+
+class SQLiteWorkflowStateStore(WorkflowStateStore):
+    """
+    Estado em arquivo SQLite.
+
+    As operações rodam em thread (`asyncio.to_thread`) sobre uma conexão
+    compartilhada e serializada por um lock.
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS workflow_states (
+            workflow_id TEXT PRIMARY KEY,
+            status TEXT,
+            updated_at REAL NOT NULL,
+            expires_at REAL NOT NULL,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_workflow_states_expires_at ON workflow_states (expires_at);
+        CREATE INDEX IF NOT EXISTS idx_workflow_states_status ON workflow_states (status, updated_at);
+    """
+
+    def __init__(self, path: str, ttl_seconds: float = 3600.0):
+        """
+        Abre (ou cria) o banco de estados.
+
+        Args:
+            path: Caminho do arquivo SQLite (":memory:" para testes locais)
+            ttl_seconds: Validade de cada registro após a última atualização (s)
+        """
+        super().__init__(ttl_seconds)
+        self.path = path
+        self._lock = threading.Lock()
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30.0)
+        self._conn.row_factory = sqlite3.Row
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            # Em WAL, NORMAL mantém a consistência e evita fsync a cada commit
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self._SCHEMA)
+
+    async def _run(self, function, *args):
+        return await asyncio.to_thread(self._locked, function, *args)
+
+    def _locked(self, function, *args):
+        with self._lock:
+            return function(*args)
+
+    async def save(self, workflow_id: str, record: Dict[str, Any]) -> None:
+        now = time.time()
+        data = json.dumps(dict(record, updated_at=now), ensure_ascii=False, default=str)
+        await self._run(lambda: self._conn.execute(
+            "INSERT OR REPLACE INTO workflow_states (workflow_id, status, updated_at, expires_at, data) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (workflow_id, record.get("status"), now, now + self.ttl_seconds, data)
+        ))
+
+    async def get(self, workflow_id: str) -> Optional[Dict[str, Any]]:
+        def select():
+            return self._conn.execute(
+                "SELECT data FROM workflow_states WHERE workflow_id = ? AND expires_at > ?",
+                (workflow_id, time.time())
+            ).fetchone()
+        row = await self._run(select)
+        return json.loads(row["data"]) if row else None
+
+    async def delete(self, workflow_id: str) -> None:
+        await self._run(lambda: self._conn.execute(
+            "DELETE FROM workflow_states WHERE workflow_id = ?", (workflow_id,)
+        ))
+
+    async def list_records(self, statuses: Optional[Iterable[str]] = None,
+                           updated_before: Optional[float] = None,
+                           limit: Optional[int] = 100) -> List[Dict[str, Any]]:
+        conditions = ["expires_at > ?"]
+        params: List[Any] = [time.time()]
+        if statuses is not None:
+            statuses = list(statuses)
+            conditions.append(f"status IN ({', '.join('?' for _ in statuses)})")
+            params.extend(statuses)
+        if updated_before is not None:
+            conditions.append("updated_at < ?")
+            params.append(updated_before)
+        sql = f"SELECT data FROM workflow_states WHERE {' AND '.join(conditions)} ORDER BY updated_at"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        rows = await self._run(lambda: self._conn.execute(sql, params).fetchall())
+        return [json.loads(row["data"]) for row in rows]
+
+    async def evict_expired(self) -> int:
+        cursor = await self._run(lambda: self._conn.execute(
+            "DELETE FROM workflow_states WHERE expires_at <= ?", (time.time(),)
+        ))
+        return cursor.rowcount
+
+    async def close(self) -> None:
+        await super().close()
+        await self._run(self._conn.close)
+
+
+def create_state_store(settings) -> WorkflowStateStore:
+    """
+    Backend de estado configurado em `workflow_state_backend`.
+
+    Args:
+        settings: Configurações da aplicação
+
+    Returns:
+        WorkflowStateStore: Backend configurado
+
+    Raises:
+        ValueError: Se o backend for desconhecido
+    """
+    backend = settings.workflow_state_backend.lower()
+    if backend == "memory":
+        return InMemoryWorkflowStateStore(settings.workflow_state_ttl, settings.workflow_state_max_entries)
+    if backend == "sqlite":
+        return SQLiteWorkflowStateStore(settings.workflow_state_path, settings.workflow_state_ttl)
+    raise ValueError(f"Unknown workflow_state_backend '{settings.workflow_state_backend}' (use 'memory' or 'sqlite')")
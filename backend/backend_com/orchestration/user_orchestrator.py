@@ -5,13 +5,24 @@ Gerencia workflows relacionados a registro, autenticação,
 atualização de perfil e gestão de usuários.
 """
 
+import asyncio
 import time
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Set
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 
 from .coordinator import Coordinator, OrchestrationResult, OrchestrationError
-from ..utils import generate_uuid, hash_password, verify_password
+from ..gateways import PersistenceGateway
+from ..jobs import Job, JobQueue
+from ..models import PaginationParams
+from ..utils import TokenError, TokenService, generate_uuid
+from .executors import ExecutorSaturatedError, StepExecutors
+from .password_hasher import PasswordHasher
+from .state_store import WorkflowStateStore
+from .workflow_engine import WorkflowStep
+
+POST_REGISTRATION_JOB = "user.post_registration"
+TOKEN_REVOCATIONS_COLLECTION = "token_revocations"
 
 
 @dataclass
@@ -21,6 +32,7 @@ class UserRegistrationResult:
     email_verification_sent: bool
     welcome_message_sent: bool
     initial_settings_created: bool
+    job_id: Optional[str] = None  # etapas 5-7 adiadas para a fila de jobs
 
 
 @dataclass
@@ -29,8 +41,10 @@ class UserAuthenticationResult:
     user_id: str
     access_token: str
     refresh_token: Optional[str]
+    expires_in: int
     session_created: bool
     last_login_updated: bool
+    password_rehash_scheduled: bool = False  # refeito após a resposta, se o pool de hashes estiver ocioso
 
 
 class UserOrchestrator(Coordinator):
@@ -41,8 +55,25 @@ class UserOrchestrator(Coordinator):
     do usuário no sistema educacional.
     """
     
-    def __init__(self):
-        super().__init__("user")
+    def __init__(self, persistence_gateway: Optional[PersistenceGateway] = None,
+                 job_queue: Optional[JobQueue] = None,
+                 state_store: Optional[WorkflowStateStore] = None,
+                 executors: Optional[StepExecutors] = None,
+                 password_hasher: Optional[PasswordHasher] = None,
+                 token_service: Optional[TokenService] = None):
+        super().__init__("user", persistence_gateway, job_queue, state_store, executors)
+        # bcrypt em pool próprio: um pico de logins não disputa os executores dos demais passos
+        self._owns_password_hasher = password_hasher is None
+        self.password_hasher = password_hasher or PasswordHasher()
+        # Trabalho disparado após a resposta (ex.: rehash de senha)
+        self._background_tasks: Set[asyncio.Task] = set()
+        # O segredo vem da configuração (dependencies.py); não há fallback aleatório
+        if token_service is None:
+            raise ValueError("UserOrchestrator requires a TokenService")
+        self.token_service = token_service
+    
+    def _register_jobs(self, job_queue: JobQueue) -> None:
+        job_queue.register(POST_REGISTRATION_JOB, self._post_registration_job)
     
     async def execute(self, *args, **kwargs) -> OrchestrationResult:
         """
@@ -72,7 +103,8 @@ class UserOrchestrator(Coordinator):
             send_welcome: Se deve enviar mensagem de boas-vindas
             
         Returns:
-            OrchestrationResult: Resultado do registro
+            OrchestrationResult: Resultado do registro (com `job_id` quando
+            os passos 5-7 foram enfileirados)
         """
         workflow_id = generate_uuid()
         start_time = time.time()
@@ -80,84 +112,51 @@ class UserOrchestrator(Coordinator):
         await self._log_workflow_start(workflow_id, "register_user", user_data)
         
         try:
-            # Passo 1: Validação
-            await self._execute_step(
-                "validate_user_data",
-                self._validate_user_registration_data,
-                user_data
-            )
-            
-            # Passo 2: Verificar email existente
-            await self._execute_step(
-                "check_email_exists",
-                self._check_email_exists,
-                user_data["email"]
-            )
-            
-            # Passo 3: Hash da senha
-            hashed_step = await self._execute_step(
-                "hash_password",
-                self._hash_user_password,
-                user_data["senha"]
-            )
-            
-            user_data_with_hash = user_data.copy()
-            user_data_with_hash["senha"] = hashed_step["data"]["hashed_password"]
-            user_data_with_hash["email_verificado"] = False
-            user_data_with_hash["status"] = "active"
-            
-            # Passo 4: Criar usuário
-            create_step = await self._execute_step(
-                "create_user",
-                self._create_user,
-                user_data_with_hash
-            )
-            
-            user_id = create_step["data"]["user_id"]
+            # Passos 2 e 3 dependem só da validação e rodam concorrentemente;
+            # passos 5-7 dependem só da criação do usuário e também
+            async def create_user(context: Dict[str, Any]) -> Dict[str, Any]:
+                user_data_with_hash = user_data.copy()
+                user_data_with_hash["senha"] = context["results"]["hash_password"]["hashed_password"]
+                user_data_with_hash["email_verificado"] = False
+                user_data_with_hash["status"] = "active"
+                return await self._create_user(user_data_with_hash)
+            
+            steps = [
+                self._step("validate_user_data", self._validate_user_registration_data, user_data),
+                self._step("check_email_exists", self._check_email_exists, user_data["email"],
+                           depends_on=["validate_user_data"]),
+                self._step("hash_password", self._hash_user_password, user_data["senha"],
+                           depends_on=["validate_user_data"]),
+                self._step("create_user", create_user, uses_context=True,
+                           depends_on=["check_email_exists", "hash_password"]),
+            ]
+            # Só o necessário para o job (sem senha)
+            profile = {
+                "email": user_data["email"],
+                "nome": user_data["nome"],
+                "tipo_usuario": user_data.get("tipo_usuario", "student")
+            }
+            post_steps = self._post_registration_steps(profile, send_verification, send_welcome)
             
-            # Passo 5: Criar configurações iniciais
-            settings_created = False
-            try:
-                await self._execute_step(
-                    "create_initial_settings",
-                    self._create_user_initial_settings,
-                    user_id,
-                    user_data.get("tipo_usuario", "student")
-                )
-                settings_created = True
-                
-            except OrchestrationError as e:
-                self.logger.warning(f"Failed to create initial settings: {e.message}")
-            
-            # Passo 6: Enviar verificação de email (opcional)
-            email_sent = False
-            if send_verification:
-                try:
-                    await self._execute_step(
-                        "send_email_verification",
-                        self._send_email_verification,
-                        user_id,
-                        user_data["email"]
-                    )
-                    email_sent = True
-                    
-                except OrchestrationError as e:
-                    self.logger.warning(f"Failed to send verification email: {e.message}")
-            
-            # Passo 7: Enviar mensagem de boas-vindas (opcional)
-            welcome_sent = False
-            if send_welcome:
-                try:
-                    await self._execute_step(
-                        "send_welcome_message",
-                        self._send_welcome_message,
-                        user_id,
-                        user_data["nome"]
-                    )
-                    welcome_sent = True
-                    
-                except OrchestrationError as e:
-                    self.logger.warning(f"Failed to send welcome message: {e.message}")
+            job_id = None
+            if self.job_queue is None:
+                results = await self._run_steps(steps + post_steps)
+            else:
+                # Só a criação do usuário segura a resposta; os passos 5-7 vão para a fila
+                results = await self._run_steps(steps)
+                job_id = await self._defer(POST_REGISTRATION_JOB, {
+                    "user_id": results["create_user"]["user_id"],
+                    "profile": profile,
+                    "send_verification": send_verification,
+                    "send_welcome": send_welcome
+                })
+                if job_id is None:
+                    results.update(await self._run_steps(post_steps, {"results": dict(results)}))
+            
+            user_id = results["create_user"]["user_id"]
+            settings_created = "create_initial_settings" in results
+            email_sent = "send_email_verification" in results
+            welcome_sent = "send_welcome_message" in results
             
             # Resultado final
             duration_ms = (time.time() - start_time) * 1000
@@ -166,13 +165,14 @@ class UserOrchestrator(Coordinator):
                 user_id=user_id,
                 email_verification_sent=email_sent,
                 welcome_message_sent=welcome_sent,
-                initial_settings_created=settings_created
+                initial_settings_created=settings_created,
+                job_id=job_id
             )
             
             result = OrchestrationResult.success_result(
                 data=result_data.__dict__,
                 duration_ms=duration_ms,
-                steps_completed=7,
+                steps_completed=4 if job_id else 7,
                 total_steps=7
             )
             
@@ -219,14 +219,13 @@ class UserOrchestrator(Coordinator):
         await self._log_workflow_start(workflow_id, "authenticate_user", auth_data)
         
         try:
-            # Passo 1: Validar email
+            # Passos 1-4 são sequenciais (cada um depende do anterior)
             await self._execute_step(
                 "validate_email_format",
                 self._validate_email_format,
                 email
             )
             
-            # Passo 2: Buscar usuário
             user_step = await self._execute_step(
                 "find_user_by_email",
                 self._find_user_by_email,
@@ -236,7 +235,6 @@ class UserOrchestrator(Coordinator):
             user_data = user_step["data"]
             user_id = user_data["_id"]
             
-            # Passo 3: Verificar senha
             await self._execute_step(
                 "verify_password",
                 self._verify_user_password,
@@ -244,51 +242,38 @@ class UserOrchestrator(Coordinator):
                 user_data["senha"]
             )
             
-            # Passo 4: Verificar status da conta
             await self._execute_step(
                 "check_account_status",
                 self._check_account_status,
                 user_data
             )
             
-            # Passo 5: Gerar tokens
-            tokens_step = await self._execute_step(
-                "generate_auth_tokens",
-                self._generate_auth_tokens,
-                user_id,
-                remember_me
-            )
-            
-            access_token = tokens_step["data"]["access_token"]
-            refresh_token = tokens_step["data"].get("refresh_token")
-            
-            # Passo 6: Criar sessão
-            session_created = False
-            try:
-                await self._execute_step(
-                    "create_user_session",
-                    self._create_user_session,
-                    user_id,
-                    access_token,
-                    remember_me
-                )
-                session_created = True
-                
-            except OrchestrationError as e:
-                self.logger.warning(f"Failed to create session: {e.message}")
-            
-            # Passo 7: Atualizar último login
-            login_updated = False
-            try:
-                await self._execute_step(
-                    "update_last_login",
-                    self._update_user_last_login,
-                    user_id
-                )
-                login_updated = True
-                
-            except OrchestrationError as e:
-                self.logger.warning(f"Failed to update last login: {e.message}")
+            # Passo 5 (tokens) e 7 (último login) são independentes;
+            # o passo 6 (sessão) precisa do `sid` dos tokens
+            async def create_session(context: Dict[str, Any]) -> Dict[str, Any]:
+                tokens = context["results"]["generate_auth_tokens"]
+                return await self._create_user_session(user_id, tokens["session_id"], remember_me)
+            
+            steps = [
+                self._step("generate_auth_tokens", self._generate_auth_tokens, user_id, remember_me, user_data),
+                self._step("create_user_session", create_session, uses_context=True,
+                           depends_on=["generate_auth_tokens"], can_fail=True),
+                self._step("update_last_login", self._update_user_last_login, user_id, can_fail=True),
+            ]
+            results = await self._run_steps(steps)
+            
+            # Hash com custo abaixo do atual é refeito enquanto a senha está
+            # disponível, mas fora da resposta: um segundo bcrypt no login
+            # dobraria a fila de hashes justamente nos picos de login
+            rehash_scheduled = False
+            if self.password_hasher.needs_rehash(user_data["senha"]):
+                rehash_scheduled = self._schedule_password_rehash(user_id, password)
+            
+            access_token = results["generate_auth_tokens"]["access_token"]
+            refresh_token = results["generate_auth_tokens"].get("refresh_token")
+            expires_in = results["generate_auth_tokens"]["expires_in"]
+            session_created = "create_user_session" in results
+            login_updated = "update_last_login" in results
             
             # Resultado final
             duration_ms = (time.time() - start_time) * 1000
@@ -297,8 +282,10 @@ class UserOrchestrator(Coordinator):
                 user_id=user_id,
                 access_token=access_token,
                 refresh_token=refresh_token,
+                expires_in=expires_in,
                 session_created=session_created,
-                last_login_updated=login_updated
+                last_login_updated=login_updated,
+                password_rehash_scheduled=rehash_scheduled
             )
             
             result = OrchestrationResult.success_result(
@@ -314,16 +301,73 @@ class UserOrchestrator(Coordinator):
         except OrchestrationError as e:
             duration_ms = (time.time() - start_time) * 1000
             
-            result = OrchestrationResult.error_result(
-                errors=[e.message],
-                duration_ms=duration_ms
-            )
+            # Fila de bcrypt cheia: sobrecarga temporária, não credencial inválida
+            if isinstance(e.__cause__, ExecutorSaturatedError):
+                result = OrchestrationResult.error_result(
+                    errors=["Too many logins in progress, please retry shortly"],
+                    metadata={"overloaded": True},
+                    duration_ms=duration_ms
+                )
+            else:
+                result = OrchestrationResult.error_result(
+                    errors=[e.message],
+                    duration_ms=duration_ms
+                )
             
             await self._log_workflow_end(workflow_id, result)
             return result
     
     # === MÉTODOS AUXILIARES ===
     
+    def _post_registration_steps(self, profile: Dict[str, Any], send_verification: bool,
+                                 send_welcome: bool) -> List[WorkflowStep]:
+        """
+        Passos 5-7 do registro, que dependem só do usuário criado.
+        
+        Leem o ID em `context["results"]["create_user"]`, então servem tanto
+        para o fluxo na requisição quanto para o job `user.post_registration`.
+        """
+        def created_user_id(context: Dict[str, Any]) -> str:
+            return context["results"]["create_user"]["user_id"]
+        
+        async def create_settings(context: Dict[str, Any]) -> Dict[str, Any]:
+            return await self._create_user_initial_settings(created_user_id(context), profile["tipo_usuario"])
+        
+        async def send_verification_email(context: Dict[str, Any]) -> Dict[str, Any]:
+            return await self._send_email_verification(created_user_id(context), profile["email"])
+        
+        async def send_welcome_message(context: Dict[str, Any]) -> Dict[str, Any]:
+            return await self._send_welcome_message(created_user_id(context), profile["nome"])
+        
+        steps = [
+            self._step("create_initial_settings", create_settings, uses_context=True,
+                       depends_on=["create_user"], can_fail=True),
+        ]
+        if send_verification:
+            steps.append(self._step("send_email_verification", send_verification_email,
+                                    uses_context=True, depends_on=["create_user"], can_fail=True))
+        if send_welcome:
+            steps.append(self._step("send_welcome_message", send_welcome_message,
+                                    uses_context=True, depends_on=["create_user"], can_fail=True))
+        return steps
+    
+    async def _post_registration_job(self, job: Job) -> Dict[str, Any]:
+        """Job `user.post_registration`: configurações, verificação de email e boas-vindas."""
+        payload = job.payload
+        steps = self._post_registration_steps(
+            payload["profile"], payload["send_verification"], payload["send_welcome"]
+        )
+        results = await self._run_job_steps(
+            job, steps, {"results": {"create_user": {"user_id": payload["user_id"]}}}
+        )
+        
+        return {
+            "user_id": payload["user_id"],
+            "initial_settings_created": "create_initial_settings" in results,
+            "email_verification_sent": "send_email_verification" in results,
+            "welcome_message_sent": "send_welcome_message" in results
+        }
+    
     async def _validate_user_registration_data(self, user_data: Dict[str, Any]) -> Dict[str, Any]:
         """Valida dados de registro de usuário."""
         required_fields = ["nome", "email", "senha", "tipo_usuario"]
@@ -357,7 +401,7 @@ class UserOrchestrator(Coordinator):
     
     async def _hash_user_password(self, password: str) -> Dict[str, Any]:
         """Gera hash seguro da senha."""
-        hashed_password = hash_password(password)
+        hashed_password = await self.password_hasher.hash(password)
         
         return {"hashed_password": hashed_password}
     
@@ -458,8 +502,8 @@ class UserOrchestrator(Coordinator):
         return {"valid": True}
     
     async def _find_user_by_email(self, email: str) -> Dict[str, Any]:
-        """Busca usuário por email."""
-        response = await self.persistence_gateway.get_user_by_email(email)
+        """Busca usuário por email, com o hash de senha."""
+        response = await self.persistence_gateway.get_user_credentials(email=email)
         
         if not response.success:
             raise OrchestrationError("Invalid email or password")
@@ -468,11 +512,46 @@ class UserOrchestrator(Coordinator):
     
     async def _verify_user_password(self, password: str, hashed_password: str) -> Dict[str, Any]:
         """Verifica senha do usuário."""
-        if not verify_password(password, hashed_password):
+        if not await self.password_hasher.verify(password, hashed_password):
             raise OrchestrationError("Invalid email or password")
         
         return {"password_valid": True}
     
+    def _schedule_password_rehash(self, user_id: str, password: str) -> bool:
+        """
+        Agenda o rehash da senha para depois da resposta do login.
+        
+        A senha não pode ir para a fila de jobs (payload persistido, sem
+        segredos), então o rehash roda em uma task do próprio processo e só
+        se o pool de hashes estiver ocioso; caso contrário fica para um
+        próximo login.
+        """
+        async def rehash() -> None:
+            if not self.password_hasher.is_idle():
+                self.logger.debug(f"Password hasher busy, rehash of {user_id} postponed")
+                return
+            try:
+                await self._rehash_user_password(user_id, password)
+            except Exception as e:
+                self.logger.warning(f"Password rehash failed for {user_id}: {e}")
+        
+        task = asyncio.create_task(rehash())
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        return True
+    
+    async def _rehash_user_password(self, user_id: str, password: str) -> Dict[str, Any]:
+        """Regrava a senha com o custo atual do bcrypt."""
+        new_hash = await self.password_hasher.hash(password)
+        response = await self.persistence_gateway.update_user(user_id, {"senha": new_hash})
+        
+        if not response.success:
+            raise OrchestrationError(
+                f"Failed to rehash password: {response.error_message}"
+            )
+        
+        return {"rounds": self.password_hasher.rounds}
+    
     async def _check_account_status(self, user_data: Dict[str, Any]) -> Dict[str, Any]:
         """Verifica se conta está ativa e pode fazer login."""
         status = user_data.get("status", "active")
@@ -488,41 +567,33 @@ class UserOrchestrator(Coordinator):
         
         return {"account_active": True}
     
-    async def _generate_auth_tokens(self, user_id: str, remember_me: bool) -> Dict[str, Any]:
-        """Gera tokens de autenticação."""
-        # Em implementação real, usaria JWT ou similar
-        access_token = generate_uuid()
-        refresh_token = generate_uuid() if remember_me else None
-        
-        # Define expiração baseada em remember_me
-        access_expires = datetime.utcnow() + timedelta(hours=24 if remember_me else 2)
-        refresh_expires = datetime.utcnow() + timedelta(days=30) if remember_me else None
-        
-        # Armazena tokens no banco para validação
-        token_data = {
-            "user_id": user_id,
-            "access_token": access_token,
-            "refresh_token": refresh_token,
-            "access_expires_at": access_expires.isoformat(),
-            "refresh_expires_at": refresh_expires.isoformat() if refresh_expires else None,
-            "created_at": datetime.utcnow().isoformat(),
-            "active": True
-        }
-        
-        await self.persistence_gateway.mongodb.create_document("auth_tokens", token_data)
+    async def _generate_auth_tokens(self, user_id: str, remember_me: bool,
+                                    user_data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Gera tokens de autenticação assinados.
         
-        return {
-            "access_token": access_token,
-            "refresh_token": refresh_token,
-            "expires_in": int(access_expires.timestamp() - datetime.utcnow().timestamp())
+        Os claims bastam para identificar o usuário nas requisições
+        seguintes, então nada é gravado no banco: a verificação é local.
+        """
+        user_data = user_data or {}
+        claims = {
+            "email": user_data.get("email"),
+            "nome": user_data.get("nome"),
+            "tipo_usuario": user_data.get("tipo_usuario"),
         }
+        return self.token_service.issue_tokens(user_id, remember_me, claims)
     
-    async def _create_user_session(self, user_id: str, access_token: str, 
+    async def _create_user_session(self, user_id: str, session_id: str,
                                  remember_me: bool) -> Dict[str, Any]:
-        """Cria sessão do usuário."""
+        """
+        Cria sessão do usuário.
+        
+        Guarda o `sid` dos tokens, não o access token: o documento não serve
+        para se autenticar, e o logout acha a sessão pelo `sid` do token.
+        """
         session_data = {
             "user_id": user_id,
-            "access_token": access_token,
+            "session_id": session_id,
             "remember_me": remember_me,
             "ip_address": "0.0.0.0",  # Em implementação real, obteria do request
             "user_agent": "V-LABS-Client",  # Em implementação real, obteria do request
@@ -601,7 +672,7 @@ class UserOrchestrator(Coordinator):
                         return OrchestrationResult.error_result(
                             "Password must be at least 8 characters"
                         )
-                    update_data["senha"] = hash_password(update_data["senha"])
+                    update_data["senha"] = await self.password_hasher.hash(update_data["senha"])
             
             # Adiciona timestamp de atualização
             update_data["updated_at"] = datetime.utcnow().isoformat()
@@ -642,8 +713,8 @@ class UserOrchestrator(Coordinator):
         try:
             start_time = time.time()
             
-            # Busca usuário
-            user_response = await self.persistence_gateway.get_user(user_id)
+            # Busca usuário (com o hash de senha)
+            user_response = await self.persistence_gateway.get_user_credentials(user_id=user_id)
             
             if not user_response.success:
                 return OrchestrationResult.error_result("User not found")
@@ -651,7 +722,7 @@ class UserOrchestrator(Coordinator):
             user_data = user_response.data
             
             # Verifica senha atual
-            if not verify_password(current_password, user_data["senha"]):
+            if not await self.password_hasher.verify(current_password, user_data["senha"]):
                 return OrchestrationResult.error_result("Current password is incorrect")
             
             # Valida nova senha
@@ -661,7 +732,7 @@ class UserOrchestrator(Coordinator):
                 )
             
             # Hash nova senha
-            hashed_new_password = hash_password(new_password)
+            hashed_new_password = await self.password_hasher.hash(new_password)
             
             # Atualiza senha
             update_data = {
@@ -677,8 +748,9 @@ class UserOrchestrator(Coordinator):
                     f"Failed to update password: {response.error_message}"
                 )
             
-            # Invalida todas as sessões ativas (força novo login)
+            # Invalida todas as sessões e tokens ativos (força novo login)
             await self._invalidate_user_sessions(user_id)
+            await self._invalidate_user_tokens(user_id)
             
             duration_ms = (time.time() - start_time) * 1000
             
@@ -732,6 +804,58 @@ class UserOrchestrator(Coordinator):
                 f"Error during logout: {str(e)}"
             )
     
+    async def refresh_tokens_flow(self, refresh_token: str) -> OrchestrationResult:
+        """
+        Renova os tokens de uma sessão com rotação do refresh token.
+        
+        O refresh token apresentado é revogado e um novo é emitido na mesma
+        sessão (`sid`), então o logout da sessão também derruba os tokens
+        renovados.
+        
+        Args:
+            refresh_token: Refresh token atual
+            
+        Returns:
+            OrchestrationResult: access_token, refresh_token e expires_in
+        """
+        try:
+            start_time = time.time()
+            
+            try:
+                payload = self.token_service.verify(refresh_token, token_type="refresh")
+            except TokenError as e:
+                return OrchestrationResult.error_result(f"Invalid refresh token: {e}")
+            
+            # Refresh token só existe com "lembrar de mim"
+            claims = {key: payload.get(key) for key in ("email", "nome", "tipo_usuario")}
+            tokens = self.token_service.issue_tokens(
+                payload["sub"], remember_me=True, claims=claims, session_id=payload.get("sid")
+            )
+            
+            self.token_service.revocations.revoke_token(payload["jti"], payload["exp"])
+            await self._save_token_revocation({
+                "jti": payload["jti"],
+                "user_id": payload["sub"],
+                "expires_at": payload["exp"],
+                "created_at": time.time()
+            })
+            
+            duration_ms = (time.time() - start_time) * 1000
+            
+            return OrchestrationResult.success_result(
+                data={
+                    "access_token": tokens["access_token"],
+                    "refresh_token": tokens["refresh_token"],
+                    "expires_in": tokens["expires_in"]
+                },
+                duration_ms=duration_ms
+            )
+            
+        except Exception as e:
+            return OrchestrationResult.error_result(
+                f"Error refreshing tokens: {str(e)}"
+            )
+    
     # === MÉTODOS AUXILIARES ADICIONAIS ===
     
     async def _invalidate_user_sessions(self, user_id: str) -> None:
@@ -751,44 +875,102 @@ class UserOrchestrator(Coordinator):
         # Por simplicidade, assumindo que foi atualizado
     
     async def _invalidate_user_tokens(self, user_id: str) -> None:
-        """Invalida todos os tokens do usuário."""
-        update_data = {
-            "active": False,
-            "invalidated_at": datetime.utcnow().isoformat()
-        }
+        """Revoga todos os tokens do usuário emitidos até agora."""
+        now = time.time()
+        expires_at = now + self.token_service.max_token_ttl
         
-        # Atualiza todos os tokens do usuário
-        query = {"user_id": user_id, "active": True}
-        await self.persistence_gateway.mongodb.find_documents(
-            "auth_tokens", query
-        )
-        
-        # Em implementação real, faria update em massa
+        # Local primeiro: vale neste worker mesmo se a gravação falhar
+        self.token_service.revocations.revoke_user(user_id, now, expires_at)
+        await self._save_token_revocation({
+            "user_id": user_id,
+            "revoked_before": now,
+            "expires_at": expires_at,
+            "created_at": now
+        })
     
     async def _invalidate_specific_token(self, access_token: str) -> None:
-        """Invalida token específico."""
-        query = {"access_token": access_token, "active": True}
-        tokens_response = await self.persistence_gateway.mongodb.find_documents(
-            "auth_tokens", query
+        """
+        Revoga a sessão do token: o access token e o refresh token emitidos
+        com ele (e os renovados a partir deste).
+        """
+        try:
+            payload = self.token_service.signer.decode(access_token)
+        except TokenError:
+            return  # inválido ou expirado: não há o que revogar
+        
+        now = time.time()
+        sid = payload.get("sid")
+        if sid:
+            # Vale até expirar o último token que a sessão pode ter emitido
+            expires_at = now + self.token_service.max_token_ttl
+            self.token_service.revocations.revoke_session(sid, expires_at)
+            revocation = {"sid": sid, "user_id": payload["sub"], "expires_at": expires_at, "created_at": now}
+        else:
+            self.token_service.revocations.revoke_token(payload["jti"], payload["exp"])
+            revocation = {"jti": payload["jti"], "user_id": payload["sub"],
+                          "expires_at": payload["exp"], "created_at": now}
+        await self._save_token_revocation(revocation)
+    
+    async def _save_token_revocation(self, revocation: Dict[str, Any]) -> None:
+        """Grava a revogação para os demais workers (ver `load_token_revocations`)."""
+        response = await self.persistence_gateway.mongodb.create_document(
+            TOKEN_REVOCATIONS_COLLECTION, revocation
         )
         
-        if tokens_response.success and tokens_response.data.get("items"):
-            token_doc = tokens_response.data["items"][0]
-            token_id = token_doc.get("_id")
+        if not response.success:
+            raise OrchestrationError(
+                f"Failed to store token revocation: {response.error_message}"
+            )
+    
+    async def load_token_revocations(self, since: float) -> List[Dict[str, Any]]:
+        """
+        Revogações gravadas depois de `since` (epoch, s).
+        
+        Usado pelo sincronismo do TokenService. Na primeira carga
+        (`since == 0`) busca só as revogações ainda em vigor.
+        
+        Args:
+            since: Instante da última sincronização
             
-            if token_id:
-                update_data = {
-                    "active": False,
-                    "invalidated_at": datetime.utcnow().isoformat()
-                }
-                
-                await self.persistence_gateway.mongodb.update_document(
-                    "auth_tokens", token_id, update_data
+        Returns:
+            list: Documentos de revogação, em ordem de criação
+        """
+        if since > 0:
+            query = {"created_at": {"$gt": since}}
+        else:
+            query = {"expires_at": {"$gt": time.time()}}
+        
+        revocations: List[Dict[str, Any]] = []
+        page = 1
+        while True:
+            response = await self.persistence_gateway.mongodb.find_documents(
+                TOKEN_REVOCATIONS_COLLECTION, query,
+                pagination=PaginationParams(page=page, page_size=100),
+                sort={"created_at": 1},
+                fields=["jti", "sid", "user_id", "revoked_before", "expires_at"]
+            )
+            
+            if not response.success:
+                raise OrchestrationError(
+                    f"Failed to load token revocations: {response.error_message}"
                 )
+            
+            items = response.data.get("items", [])
+            revocations.extend(items)
+            if len(items) < 100:
+                return revocations
+            page += 1
     
     async def _invalidate_specific_session(self, user_id: str, access_token: str) -> None:
-        """Invalida sessão específica."""
-        query = {"user_id": user_id, "access_token": access_token, "active": True}
+        """Invalida a sessão do token (pelo `sid`)."""
+        try:
+            session_id = self.token_service.signer.decode(access_token).get("sid")
+        except TokenError:
+            return  # inválido ou expirado: sessão sem como ser identificada
+        if not session_id:
+            return
+        
+        query = {"user_id": user_id, "session_id": session_id, "active": True}
         sessions_response = await self.persistence_gateway.mongodb.find_documents(
             "user_sessions", query
         )
@@ -805,4 +987,16 @@ class UserOrchestrator(Coordinator):
                 
                 await self.persistence_gateway.mongodb.update_document(
                     "user_sessions", session_id, update_data
-                )
\ No newline at end of file
+                )
+    
+    async def close(self) -> None:
+        """Fecha o pool de hashes (se próprio) e os recursos do coordenador."""
+        # Rehashes pendentes ficam para o próximo login
+        for task in list(self._background_tasks):
+            task.cancel()
+        await asyncio.gather(*self._background_tasks, return_exceptions=True)
+        
+        if self._owns_password_hasher:
+            await self.password_hasher.close()
+        
+        await super().close()
@@ -6,15 +6,19 @@ definidos dinamicamente e executados de forma assíncrona.
 """
 
 import asyncio
+import heapq
 import time
 from abc import ABC, abstractmethod
 from typing import Any, Dict, List, Optional, Callable, Union
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from enum import Enum
 from datetime import datetime
 
+from ..gateways.deadline import deadline_scope
 from ..utils import generate_uuid
 from ..utils.logging import setup_logger
+from .executors import ExecutionClass, StepExecutors
+from .state_store import InMemoryWorkflowStateStore, WorkflowStateStore
 
 
 class WorkflowState(str, Enum):
@@ -27,6 +31,9 @@ class WorkflowState(str, Enum):
     PAUSED = "paused"
 
 
+FINISHED_WORKFLOW_STATES = (WorkflowState.COMPLETED, WorkflowState.FAILED, WorkflowState.CANCELLED)
+
+
 class StepState(str, Enum):
     """Estados possíveis de um passo."""
     PENDING = "pending"
@@ -48,10 +55,14 @@ class WorkflowStep:
     kwargs: dict = field(default_factory=dict)
     retry_count: int = 0
     max_retries: int = 3
-    timeout: Optional[int] = None
+    timeout: Optional[float] = None
     depends_on: List[str] = field(default_factory=list)
     can_fail: bool = False  # Se True, falha não interrompe workflow
     condition: Optional[Callable] = None  # Condição para executar passo
+    pass_context: bool = True  # Se False, a função não recebe `context=`
+    priority: int = 0  # Execução paralela: entre os prontos, maior prioridade inicia antes
+    # LOOP: corrotina no event loop; THREAD/PROCESS: função síncrona no executor compartilhado
+    execution: ExecutionClass = ExecutionClass.LOOP
     
     # Estados do passo
     state: StepState = StepState.PENDING
@@ -59,6 +70,7 @@ class WorkflowStep:
     end_time: Optional[float] = None
     result: Optional[Any] = None
     error: Optional[str] = None
+    exception: Optional[BaseException] = None
 
 
 @dataclass
@@ -86,11 +98,37 @@ class WorkflowEngine:
     
     Permite definir e executar workflows com dependências,
     retry automático, execução paralela e tratamento de erros.
+    
+    O estado dos workflows definidos (`define_workflow`) é gravado no
+    `state_store` no início, após cada passo e no fim: o status pode ser
+    consultado por outro worker que use o mesmo store, e uma execução
+    interrompida pode ser retomada a partir dos passos concluídos
+    (`resume_interrupted_workflow`). Workflows ad-hoc ficam só em memória
+    enquanto rodam, pois seus passos não podem ser reconstruídos fora do
+    processo que os criou.
     """
     
-    def __init__(self, name: str = "workflow_engine"):
+    def __init__(self, name: str = "workflow_engine", max_concurrency: Optional[int] = None,
+                 state_store: Optional[WorkflowStateStore] = None,
+                 executors: Optional[StepExecutors] = None):
+        """
+        Inicializa a engine.
+        
+        Args:
+            name: Nome da engine (usado no logger)
+            max_concurrency: Limite padrão de passos simultâneos na execução
+                paralela (None = sem limite)
+            state_store: Onde persistir o estado dos workflows definidos
+                (padrão: memória do processo)
+            executors: Pools para passos `thread`/`process` (padrão: pools
+                próprios, criados no primeiro uso)
+        """
         self.name = name
+        self.max_concurrency = max_concurrency
+        self.state_store = state_store or InMemoryWorkflowStateStore()
+        self.executors = executors or StepExecutors()
         self.logger = setup_logger(f"workflow.{name}")
+        # Workflows em execução neste processo (cancelamento/pausa atuam sobre eles)
         self._active_workflows: Dict[str, WorkflowResult] = {}
         self._workflow_definitions: Dict[str, List[WorkflowStep]] = {}
     
@@ -101,13 +139,19 @@ class WorkflowEngine:
         Args:
             workflow_name: Nome do workflow
             steps: Lista de passos do workflow
+            
+        Raises:
+            ValueError: Se houver nomes repetidos, dependência desconhecida
+                ou ciclo entre os passos
         """
+        validate_workflow_steps(steps)
         self._workflow_definitions[workflow_name] = steps
         self.logger.info(f"Workflow defined: {workflow_name} with {len(steps)} steps")
     
     async def execute_workflow(self, workflow_name: str, 
                              context: Optional[Dict[str, Any]] = None,
-                             parallel_execution: bool = False) -> WorkflowResult:
+                             parallel_execution: bool = False,
+                             max_concurrency: Optional[int] = None) -> WorkflowResult:
         """
         Executa um workflow definido.
         
@@ -115,6 +159,7 @@ class WorkflowEngine:
             workflow_name: Nome do workflow
             context: Contexto/dados compartilhados entre passos
             parallel_execution: Se deve executar passos em paralelo quando possível
+            max_concurrency: Limite de passos simultâneos (padrão da engine)
             
         Returns:
             WorkflowResult: Resultado da execução
@@ -123,15 +168,117 @@ class WorkflowEngine:
             raise ValueError(f"Workflow not defined: {workflow_name}")
         
         workflow_id = generate_uuid()
-        steps = self._workflow_definitions[workflow_name].copy()
+        steps = self._fresh_steps(self._workflow_definitions[workflow_name])
+        
+        return await self._execute_steps(
+            workflow_id, steps, context or {}, parallel_execution, max_concurrency,
+            workflow_name=workflow_name
+        )
+    
+    async def resume_interrupted_workflow(self, workflow_id: str,
+                                          context: Optional[Dict[str, Any]] = None,
+                                          parallel_execution: bool = False,
+                                          max_concurrency: Optional[int] = None) -> WorkflowResult:
+        """
+        Retoma um workflow definido que não terminou com sucesso.
+        
+        Passos já concluídos não são executados de novo: seus resultados
+        gravados voltam para `context["results"]` e os demais passos rodam
+        com o mesmo `workflow_id`.
+        
+        Args:
+            workflow_id: ID do workflow interrompido
+            context: Contexto compartilhado (os dados de entrada não são
+                persistidos e devem ser informados novamente)
+            parallel_execution: Execução paralela
+            max_concurrency: Limite de passos simultâneos (padrão da engine)
+            
+        Returns:
+            WorkflowResult: Resultado da execução retomada
+            
+        Raises:
+            ValueError: Se o estado não existir, o workflow ainda estiver
+                rodando neste processo, já tiver sido concluído ou não for
+                um workflow definido nesta engine
+        """
+        if workflow_id in self._active_workflows:
+            raise ValueError(f"Workflow still running: {workflow_id}")
+        
+        record = await self.state_store.get(workflow_id)
+        if record is None or record.get("engine") != self.name:
+            raise ValueError(f"Workflow state not found: {workflow_id}")
+        if record["status"] == WorkflowState.COMPLETED.value:
+            raise ValueError(f"Workflow already completed: {workflow_id}")
+        
+        workflow_name = record.get("workflow_name")
+        if workflow_name not in self._workflow_definitions:
+            raise ValueError(f"Workflow not defined: {workflow_name}")
+        
+        completed = {
+            name: step_result for name, step_result in record.get("steps_results", {}).items()
+            if step_result.get("success")
+        }
+        context = context or {}
+        context.setdefault("results", {}).update(
+            {name: step_result.get("result") for name, step_result in completed.items()}
+        )
+        steps = [
+            replace(step, depends_on=[dep for dep in step.depends_on if dep not in completed])
+            for step in self._fresh_steps(self._workflow_definitions[workflow_name])
+            if step.name not in completed
+        ]
         
+        self.logger.info(
+            f"Resuming workflow {workflow_id} ({workflow_name}): "
+            f"{len(completed)} steps restored, {len(steps)} to run"
+        )
         return await self._execute_steps(
-            workflow_id, steps, context or {}, parallel_execution
+            workflow_id, steps, context, parallel_execution, max_concurrency,
+            workflow_name=workflow_name, restored_steps=completed
+        )
+    
+    async def list_interrupted_workflows(self, stale_after: float = 300.0,
+                                         limit: Optional[int] = 100) -> List[Dict[str, Any]]:
+        """
+        Workflows definidos desta engine que ficaram em execução sem progresso.
+        
+        Um workflow cujo processo morreu continua `running` no store; sem
+        checkpoint há mais de `stale_after` segundos, ele é considerado
+        interrompido e pode ser retomado.
+        
+        Args:
+            stale_after: Segundos sem atualização para considerar interrompido
+                (deve ser maior que o passo mais longo)
+            limit: Máximo de registros consultados
+            
+        Returns:
+            List[Dict[str, Any]]: Estados gravados dos workflows interrompidos
+        """
+        records = await self.state_store.list_records(
+            statuses=[WorkflowState.RUNNING.value, WorkflowState.PAUSED.value],
+            updated_before=time.time() - stale_after,
+            limit=limit
         )
+        return [
+            record for record in records
+            if record.get("engine") == self.name
+            and record.get("workflow_name")
+            and record["workflow_id"] not in self._active_workflows
+        ]
+    
+    @staticmethod
+    def _fresh_steps(steps: List[WorkflowStep]) -> List[WorkflowStep]:
+        """Cópias dos passos definidos, sem estado de execuções anteriores."""
+        return [
+            replace(step, state=StepState.PENDING, retry_count=0, start_time=None,
+                    end_time=None, result=None, error=None, exception=None)
+            for step in steps
+        ]
     
     async def execute_ad_hoc_workflow(self, steps: List[WorkflowStep],
                                     context: Optional[Dict[str, Any]] = None,
-                                    parallel_execution: bool = False) -> WorkflowResult:
+                                    parallel_execution: bool = False,
+                                    max_concurrency: Optional[int] = None) -> WorkflowResult:
         """
         Executa workflow ad-hoc (não definido previamente).
         
@@ -139,6 +286,7 @@ class WorkflowEngine:
             steps: Lista de passos para executar
             context: Contexto compartilhado
             parallel_execution: Execução paralela
+            max_concurrency: Limite de passos simultâneos (padrão da engine)
             
         Returns:
             WorkflowResult: Resultado da execução
@@ -146,12 +294,15 @@ class WorkflowEngine:
         workflow_id = generate_uuid()
         
         return await self._execute_steps(
-            workflow_id, steps, context or {}, parallel_execution
+            workflow_id, steps, context or {}, parallel_execution, max_concurrency
         )
     
     async def _execute_steps(self, workflow_id: str, steps: List[WorkflowStep],
                            context: Dict[str, Any], 
-                           parallel_execution: bool) -> WorkflowResult:
+                           parallel_execution: bool,
+                           max_concurrency: Optional[int] = None,
+                           workflow_name: Optional[str] = None,
+                           restored_steps: Optional[Dict[str, Any]] = None) -> WorkflowResult:
         """
         Executa lista de passos do workflow.
         
@@ -160,25 +311,34 @@ class WorkflowEngine:
             steps: Passos para executar
             context: Contexto compartilhado
             parallel_execution: Se deve executar em paralelo
+            max_concurrency: Limite de passos simultâneos na execução paralela
+            workflow_name: Nome do workflow definido (None = ad-hoc, sem persistência)
+            restored_steps: Resultados de passos concluídos em uma execução anterior
             
         Returns:
             WorkflowResult: Resultado da execução
         """
         start_time = time.time()
+        restored_steps = restored_steps or {}
         
         # Inicializa resultado do workflow
         workflow_result = WorkflowResult(
             workflow_id=workflow_id,
             state=WorkflowState.RUNNING,
-            steps_results={},
-            total_steps=len(steps),
-            completed_steps=0,
+            steps_results=dict(restored_steps),
+            total_steps=len(steps) + len(restored_steps),
+            completed_steps=len(restored_steps),
             failed_steps=0,
             skipped_steps=0,
             start_time=start_time
         )
+        if workflow_name:
+            workflow_result.metadata["workflow_name"] = workflow_name
+        if restored_steps:
+            workflow_result.metadata["restored_steps"] = list(restored_steps)
         
         self._active_workflows[workflow_id] = workflow_result
+        await self._checkpoint(workflow_result)
         
         self.logger.info(
             f"Starting workflow execution: {workflow_id}",
@@ -191,10 +351,17 @@ class WorkflowEngine:
         
         try:
             if parallel_execution:
-                await self._execute_parallel(workflow_id, steps, context, workflow_result)
+                await self._execute_parallel(workflow_id, steps, context, workflow_result,
+                                             max_concurrency)
             else:
                 await self._execute_sequential(workflow_id, steps, context, workflow_result)
             
+            # Soma dos passos = tempo que a execução sequencial levaria
+            workflow_result.metadata["steps_duration_sum_ms"] = sum(
+                (step.end_time - step.start_time) * 1000
+                for step in steps if step.start_time and step.end_time
+            )
+            
             # Determina estado final
             if workflow_result.failed_steps > 0:
                 # Verifica se todos os passos que falharam podem falhar
@@ -244,8 +411,57 @@ class WorkflowEngine:
             if workflow_id in self._active_workflows:
                 del self._active_workflows[workflow_id]
         
+        await self._checkpoint(workflow_result)
         return workflow_result
     
+    async def _checkpoint(self, workflow_result: WorkflowResult) -> None:
+        """
+        Grava o estado de um workflow definido no `state_store`.
+        
+        Falhas do store são apenas registradas: a execução não depende dele.
+        """
+        workflow_name = workflow_result.metadata.get("workflow_name")
+        if not workflow_name:
+            return
+        
+        record = {
+            "workflow_id": workflow_result.workflow_id,
+            "engine": self.name,
+            "workflow_name": workflow_name,
+            "status": workflow_result.state.value,
+            "steps_results": workflow_result.steps_results,
+            "total_steps": workflow_result.total_steps,
+            "completed_steps": workflow_result.completed_steps,
+            "failed_steps": workflow_result.failed_steps,
+            "skipped_steps": workflow_result.skipped_steps,
+            "start_time": workflow_result.start_time,
+            "end_time": workflow_result.end_time,
+            "duration_ms": workflow_result.duration_ms,
+            "errors": workflow_result.errors,
+        }
+        try:
+            await self.state_store.save(workflow_result.workflow_id, record)
+        except Exception as e:
+            self.logger.warning(f"Failed to persist workflow state {workflow_result.workflow_id}: {e}")
+    
+    @staticmethod
+    def _result_from_record(record: Dict[str, Any]) -> WorkflowResult:
+        """Reconstrói o WorkflowResult a partir do estado gravado."""
+        return WorkflowResult(
+            workflow_id=record["workflow_id"],
+            state=WorkflowState(record["status"]),
+            steps_results=record.get("steps_results", {}),
+            total_steps=record.get("total_steps", 0),
+            completed_steps=record.get("completed_steps", 0),
+            failed_steps=record.get("failed_steps", 0),
+            skipped_steps=record.get("skipped_steps", 0),
+            start_time=record.get("start_time", 0.0),
+            end_time=record.get("end_time"),
+            duration_ms=record.get("duration_ms"),
+            errors=record.get("errors", []),
+            metadata={"workflow_name": record.get("workflow_name"), "persisted": True}
+        )
+    
     async def _execute_sequential(self, workflow_id: str, steps: List[WorkflowStep],
                                 context: Dict[str, Any], 
                                 workflow_result: WorkflowResult) -> None:
@@ -255,6 +471,7 @@ class WorkflowEngine:
                 break
             
             await self._execute_single_step(step, context, workflow_result)
+            await self._checkpoint(workflow_result)
             
             # Para execução se passo crítico falhou
             if step.state == StepState.FAILED and not step.can_fail:
@@ -262,79 +479,96 @@ class WorkflowEngine:
     
     async def _execute_parallel(self, workflow_id: str, steps: List[WorkflowStep],
                               context: Dict[str, Any],
-                              workflow_result: WorkflowResult) -> None:
-        """Executa passos em paralelo respeitando dependências."""
-        completed_steps = set()
-        pending_steps = {step.name: step for step in steps}
-        running_tasks = {}
+                              workflow_result: WorkflowResult,
+                              max_concurrency: Optional[int] = None) -> None:
+        """
+        Executa passos em paralelo respeitando dependências.
+        
+        Passos sem dependência entre si rodam concorrentemente, então a
+        duração total tende ao caminho crítico e não à soma dos passos.
+        Só um passo concluído (COMPLETED) libera seus dependentes: os de um
+        passo que falhou (mesmo opcional) ou foi pulado não rodam e são
+        marcados como pulados (`dependency_failed`). Após a falha de um
+        passo crítico nenhum passo novo é iniciado (`workflow_aborted`).
+        
+        O agendamento usa contagem de dependências pendentes (indegree) e
+        arestas reversas: cada passo concluído só visita os próprios
+        dependentes, e os prontos ficam em um heap por prioridade. O custo
+        total é O((V + E) log V), em vez de reavaliar todos os pendentes a
+        cada passo concluído.
+        """
+        by_name = {step.name: step for step in steps}
+        indegree = {step.name: len(step.depends_on) for step in steps}
+        dependents: Dict[str, List[str]] = {}
+        for step in steps:
+            for dependency in step.depends_on:
+                # Dependência desconhecida nunca é liberada: o passo é pulado
+                dependents.setdefault(dependency, []).append(step.name)
+        
+        # Heap de prontos: maior prioridade primeiro, depois ordem de declaração
+        order = {step.name: index for index, step in enumerate(steps)}
+        ready = [(-step.priority, order[step.name], step.name) for step in steps if not step.depends_on]
+        heapq.heapify(ready)
         
-        while pending_steps or running_tasks:
+        limit = max_concurrency if max_concurrency is not None else self.max_concurrency
+        started = set()
+        running_tasks: Dict[asyncio.Task, str] = {}
+        aborted = False
+        
+        while ready or running_tasks:
             if workflow_result.state == WorkflowState.CANCELLED:
                 # Cancela todas as tasks em execução
-                for task in running_tasks.values():
+                for task in running_tasks:
                     task.cancel()
                 break
             
-            # Inicia passos que podem ser executados
-            ready_steps = self._get_ready_steps(pending_steps, completed_steps)
-            
-            for step_name in ready_steps:
-                step = pending_steps.pop(step_name)
-                
-                # Cria task para execução assíncrona
+            # Inicia passos prontos até o limite de concorrência
+            while ready and not aborted and (limit is None or len(running_tasks) < limit):
+                _, _, step_name = heapq.heappop(ready)
+                started.add(step_name)
                 task = asyncio.create_task(
-                    self._execute_single_step(step, context, workflow_result)
+                    self._execute_single_step(by_name[step_name], context, workflow_result)
                 )
-                running_tasks[step_name] = task
+                running_tasks[task] = step_name
+            
+            if not running_tasks:
+                break
             
             # Aguarda pelo menos uma task completar
-            if running_tasks:
-                done, pending = await asyncio.wait(
-                    running_tasks.values(),
-                    return_when=asyncio.FIRST_COMPLETED
-                )
+            done, _ = await asyncio.wait(running_tasks, return_when=asyncio.FIRST_COMPLETED)
+            
+            for task in done:
+                step = by_name[running_tasks.pop(task)]
+                if step.state == StepState.FAILED and not step.can_fail:
+                    aborted = True
+                if step.state != StepState.COMPLETED:
+                    # Dependentes leem o resultado do passo: sem ele, não rodam
+                    continue
                 
-                # Processa tasks completadas
-                for task in done:
-                    # Encontra qual passo foi completado
-                    for step_name, step_task in list(running_tasks.items()):
-                        if step_task == task:
-                            completed_steps.add(step_name)
-                            del running_tasks[step_name]
-                            break
+                for dependent in dependents.get(step.name, ()):
+                    indegree[dependent] -= 1
+                    if indegree[dependent] == 0:
+                        heapq.heappush(ready, (-by_name[dependent].priority, order[dependent], dependent))
             
-            # Se não há mais passos prontos e nenhum executando, para
-            if not ready_steps and not running_tasks:
-                break
+            await self._checkpoint(workflow_result)
         
         # Aguarda tasks restantes
         if running_tasks:
-            await asyncio.gather(*running_tasks.values(), return_exceptions=True)
-    
-    def _get_ready_steps(self, pending_steps: Dict[str, WorkflowStep],
-                        completed_steps: set) -> List[str]:
-        """
-        Retorna lista de passos prontos para execução.
-        
-        Args:
-            pending_steps: Passos pendentes
-            completed_steps: Passos já completados
-            
-        Returns:
-            List[str]: Nomes dos passos prontos
-        """
-        ready = []
+            await asyncio.gather(*running_tasks, return_exceptions=True)
         
-        for step_name, step in pending_steps.items():
-            # Verifica se todas as dependências foram completadas
-            dependencies_met = all(
-                dep in completed_steps for dep in step.depends_on
-            )
-            
-            if dependencies_met:
-                ready.append(step_name)
-        
-        return ready
+        # Passos que não puderam rodar (dependência não concluída, dependência
+        # desconhecida ou workflow abortado)
+        for step in steps:
+            if step.name not in started:
+                if aborted:
+                    reason = "workflow_aborted"
+                elif all(dependency in by_name for dependency in step.depends_on):
+                    reason = "dependency_failed"
+                else:
+                    reason = "dependency_not_met"
+                step.state = StepState.SKIPPED
+                workflow_result.skipped_steps += 1
+                workflow_result.steps_results[step.name] = {"skipped": True, "reason": reason}
     
     async def _execute_single_step(self, step: WorkflowStep, 
                                  context: Dict[str, Any],
@@ -361,20 +595,22 @@ class WorkflowEngine:
         
         for attempt in range(step.max_retries + 1):
             try:
+                kwargs = dict(step.kwargs, context=context) if step.pass_context else step.kwargs
+                call = self.executors.run(step.execution, step.function, *step.args, **kwargs)
                 if step.timeout:
-                    # Executa com timeout
-                    result = await asyncio.wait_for(
-                        step.function(*step.args, **step.kwargs, context=context),
-                        timeout=step.timeout
-                    )
+                    # Executa com timeout; chamadas ao backend_bd herdam o prazo do passo
+                    with deadline_scope(step.timeout):
+                        result = await asyncio.wait_for(call, timeout=step.timeout)
                 else:
                     # Executa sem timeout
-                    result = await step.function(*step.args, **step.kwargs, context=context)
+                    result = await call
                 
                 # Sucesso
                 step.state = StepState.COMPLETED
                 step.result = result
                 step.end_time = time.time()
+                # Resultado disponível para passos dependentes em context["results"]
+                context.setdefault("results", {})[step.name] = result
                 
                 workflow_result.completed_steps += 1
                 workflow_result.steps_results[step.name] = {
@@ -395,9 +631,10 @@ class WorkflowEngine:
                 
                 return
                 
-            except asyncio.TimeoutError:
+            except asyncio.TimeoutError as e:
                 error_msg = f"Step {step.name} timed out after {step.timeout}s"
                 step.error = error_msg
+                step.exception = e
                 
                 if attempt < step.max_retries:
                     step.state = StepState.RETRYING
@@ -433,6 +670,7 @@ class WorkflowEngine:
             except Exception as e:
                 error_msg = f"Step {step.name} failed: {str(e)}"
                 step.error = error_msg
+                step.exception = e
                 
                 if attempt < step.max_retries:
                     step.state = StepState.RETRYING
@@ -489,9 +727,12 @@ class WorkflowEngine:
             self.logger.warning(f"Error evaluating condition: {str(e)}")
             return False
     
-    def get_workflow_status(self, workflow_id: str) -> Optional[WorkflowResult]:
+    async def get_workflow_status(self, workflow_id: str) -> Optional[WorkflowResult]:
         """
-        Obtém status de workflow ativo.
+        Obtém status de um workflow.
+        
+        Workflows em execução neste processo vêm da memória; os demais
+        (definidos, de qualquer worker, até expirarem) vêm do `state_store`.
         
         Args:
             workflow_id: ID do workflow
@@ -499,7 +740,14 @@ class WorkflowEngine:
         Returns:
             WorkflowResult: Status atual ou None se não encontrado
         """
-        return self._active_workflows.get(workflow_id)
+        workflow_result = self._active_workflows.get(workflow_id)
+        if workflow_result is not None:
+            return workflow_result
+        
+        record = await self.state_store.get(workflow_id)
+        if record is None or record.get("engine") != self.name:
+            return None
+        return self._result_from_record(record)
     
     def cancel_workflow(self, workflow_id: str) -> bool:
         """
@@ -584,7 +832,10 @@ class WorkflowEngine:
     
     async def cleanup_completed_workflows(self, max_age_hours: int = 24) -> int:
         """
-        Remove workflows completados antigos da memória.
+        Remove do `state_store` workflows finalizados antes do TTL.
+        
+        A remoção por TTL já acontece na expiração periódica do store;
+        este método antecipa a limpeza dos finalizados desta engine.
         
         Args:
             max_age_hours: Idade máxima em horas para manter workflows
@@ -592,18 +843,18 @@ class WorkflowEngine:
         Returns:
             int: Número de workflows removidos
         """
-        current_time = time.time()
-        cutoff_time = current_time - (max_age_hours * 3600)
-        
-        workflows_to_remove = []
-        
-        for workflow_id, result in self._active_workflows.items():
-            if (result.state in [WorkflowState.COMPLETED, WorkflowState.FAILED, WorkflowState.CANCELLED] 
-                and result.end_time and result.end_time < cutoff_time):
-                workflows_to_remove.append(workflow_id)
+        cutoff_time = time.time() - (max_age_hours * 3600)
+        records = await self.state_store.list_records(
+            statuses=[state.value for state in FINISHED_WORKFLOW_STATES],
+            updated_before=cutoff_time,
+            limit=None
+        )
         
+        workflows_to_remove = [
+            record["workflow_id"] for record in records if record.get("engine") == self.name
+        ]
         for workflow_id in workflows_to_remove:
-            del self._active_workflows[workflow_id]
+            await self.state_store.delete(workflow_id)
         
         if workflows_to_remove:
             self.logger.info(f"Cleaned up {len(workflows_to_remove)} old workflows")
@@ -613,6 +864,51 @@ class WorkflowEngine:
 
 # === FUNÇÕES UTILITÁRIAS PARA CRIAÇÃO DE WORKFLOWS ===
 
+def validate_workflow_steps(steps: List[WorkflowStep]) -> None:
+    """
+    Valida o grafo de dependências de um workflow.
+    
+    Usa o algoritmo de Kahn (O(V + E)): se sobrarem passos com dependências
+    pendentes depois de remover todos os que podem ser ordenados, há ciclo.
+    
+    Args:
+        steps: Passos do workflow
+        
+    Raises:
+        ValueError: Se houver nomes repetidos, dependência desconhecida, ciclo
+            ou passo `process` que recebe o contexto
+    """
+    names = set()
+    for step in steps:
+        if step.name in names:
+            raise ValueError(f"Duplicate step name: {step.name}")
+        if step.execution == ExecutionClass.PROCESS and step.pass_context:
+            raise ValueError(f"Process step '{step.name}' cannot receive the context (set pass_context=False)")
+        names.add(step.name)
+    
+    indegree = {}
+    dependents: Dict[str, List[str]] = {}
+    for step in steps:
+        unknown = [dependency for dependency in step.depends_on if dependency not in names]
+        if unknown:
+            raise ValueError(f"Step '{step.name}' depends on unknown steps: {', '.join(unknown)}")
+        indegree[step.name] = len(step.depends_on)
+        for dependency in step.depends_on:
+            dependents.setdefault(dependency, []).append(step.name)
+    
+    queue = [name for name, count in indegree.items() if count == 0]
+    while queue:
+        name = queue.pop()
+        for dependent in dependents.get(name, ()):
+            indegree[dependent] -= 1
+            if indegree[dependent] == 0:
+                queue.append(dependent)
+    
+    cyclic = [step.name for step in steps if indegree[step.name] > 0]
+    if cyclic:
+        raise ValueError(f"Dependency cycle between steps: {', '.join(cyclic)}")
+
+
 def create_simple_step(name: str, function: Callable, *args, **kwargs) -> WorkflowStep:
     """
     Cria passo simples de workflow.
@@ -5,14 +5,18 @@ Este módulo centraliza todos os roteadores da aplicação com
 endpoints funcionais que se comunicam com o backend_bd.
 """
 
-from fastapi import APIRouter, HTTPException, status
-import time
+from fastapi import APIRouter, HTTPException, Query, Request, status
 import os
 import sys
+import time
+from typing import Any, Dict, Optional
 
-# Import do cliente backend_bd
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from utils.backend_bd_client import get_backend_bd_client
+# Import do cliente backend_bd (instância única, fechada no lifespan de backend/main.py)
+from ..utils.backend_bd_client import get_backend_bd_client
+from ..utils.helpers import parse_fields
+from ..utils.streaming import accept_encoding, proxy_response
+from ..models.base import PaginationParams
+from .jobs import router as jobs_router
 
 # ===============================================
 # HEALTH ROUTER - Monitoramento e Saúde
@@ -32,7 +36,7 @@ async def health_check():
     }
 
 @health_router.get("/detailed", summary="Health Check Detalhado")
-async def health_detailed():
+async def health_detailed(request: Request):
     """Verificação detalhada com informações do sistema."""
     
     # Testa integração com backend_bd
@@ -53,7 +57,11 @@ async def health_detailed():
                 "url": bd_health.get("url")
             },
             "cache": "not_implemented", 
-            "external_apis": "not_configured"
+            "external_apis": "not_configured",
+            # Fila e ocupação dos executores de passos que usam CPU
+            "step_executors": request.app.state.step_executors.get_stats(),
+            "password_hasher": request.app.state.password_hasher.get_stats(),
+            "auth_tokens": request.app.state.token_service.get_stats()
         },
         "system": {
             "python_version": f"{sys.version_info.major}.{sys.version_info.minor}",
@@ -87,7 +95,7 @@ async def auth_info():
     }
 
 @auth_router.post("/login", summary="Login de Usuário")
-async def login(credentials: dict):
+async def login(credentials: dict, request: Request):
     """
     Endpoint de login com integração real ao backend_bd.
     
@@ -110,10 +118,16 @@ async def login(credentials: dict):
     )
     
     if result.get("success"):
+        user = result.get("user") or {}
+        tokens = request.app.state.token_service.issue_tokens(
+            str(user.get("_id") or user.get("id")),
+            claims={key: user.get(key) for key in ("email", "nome", "tipo_usuario")}
+        )
         return {
             "message": "Login realizado com sucesso",
-            "user": result.get("user"),
-            "token": "jwt_token_placeholder",  # Implementar JWT real
+            "user": user,
+            "token": tokens["access_token"],
+            "expires_in": tokens["expires_in"],
             "status": "authenticated"
         }
     else:
@@ -219,6 +233,7 @@ async def educational_info():
         "available_endpoints": {
             "questions": "GET /educational/questions - Listar perguntas",
             "create_question": "POST /educational/questions - Criar pergunta",
+            "export_questions": "GET /educational/questions/export - Exportar perguntas (streaming)",
             "answers": "GET /educational/answers - Listar respostas",
             "create_answer": "POST /educational/answers - Criar resposta",
             "search": "GET /educational/search - Busca semântica",
@@ -271,6 +286,43 @@ async def get_questions(limit: int = 10, offset: int = 0):
             "message": result.get("message", "Backend_BD não disponível")
         }
 
+@educational_router.get("/questions/export", summary="Exportar Perguntas")
+async def export_questions(
+    request: Request,
+    page: int = Query(1, ge=1, description="Número da página"),
+    page_size: int = Query(1000, ge=1, le=1000, description="Itens por página"),
+    disciplina: Optional[str] = Query(None, description="Filtrar por disciplina"),
+    usuario_id: Optional[str] = Query(None, description="Filtrar por usuário"),
+    fields: Optional[str] = Query(None, description="Campos a retornar, separados por vírgula")
+):
+    """
+    Exporta perguntas no formato do backend_bd (`items`, `total`, `page`, `page_size`).
+    
+    O corpo é repassado em blocos à medida que chega do backend_bd, sem
+    decodificar o JSON (memória constante, menor tempo até o primeiro byte).
+    """
+    query: Dict[str, Any] = {"status": {"$ne": "deleted"}}
+    if disciplina:
+        query["disciplina"] = disciplina
+    if usuario_id:
+        query["usuario_id"] = usuario_id
+    
+    try:
+        upstream = await request.app.state.persistence_gateway.stream_questions(
+            query,
+            # Exportação aceita páginas de até 1000 itens (limite do backend_bd), acima do padrão de listagem
+            PaginationParams.model_construct(page=page, page_size=page_size),
+            fields=parse_fields(fields),
+            headers=accept_encoding(request)
+        )
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Backend_BD unavailable"
+        )
+    
+    return await proxy_response(upstream, error_detail="Failed to export questions")
+
 @educational_router.post("/questions", summary="Criar Pergunta")
 async def create_question(question_data: dict):
     """Cria uma nova pergunta via backend_bd."""
@@ -344,7 +396,8 @@ __all__ = [
     "health_router",
     "auth_router",
     "users_router", 
-    "educational_router"
+    "educational_router",
+    "jobs_router"
 ]
 
 print("✅ Todos os roteadores carregados com integração backend_bd!")
@@ -352,4 +405,5 @@ print("📍 Health: /health")
 print("🔐 Auth: /auth") 
 print("👥 Users: /users")
 print("📚 Educational: /educational")
+print("⏳ Jobs: /jobs")
 print("🔗 Integration: /educational/integration-test")
\ No newline at end of file
@@ -18,6 +18,8 @@ from ..models import (
     SuccessResponse
 )
 from ..orchestration import UserOrchestrator
+from ..dependencies import get_token_service, get_user_orchestrator
+from ..utils import TokenError, TokenService
 from ..utils.logging import setup_logger, RequestLogger
 
 # Configuração do router
@@ -38,6 +40,44 @@ logger = setup_logger("auth_router")
 security = HTTPBearer()
 
 
+# Dependency para validar token e obter usuário atual
+async def get_current_user_dependency(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    token_service: TokenService = Depends(get_token_service)
+) -> Dict[str, Any]:
+    """
+    Dependency para validar token e obter usuário atual.
+    
+    A verificação é local (assinatura, validade e revogações em memória),
+    sem consulta ao banco.
+    
+    Args:
+        credentials: Token de autorização
+        
+    Returns:
+        dict: Dados do usuário autenticado (claims do token)
+        
+    Raises:
+        HTTPException: Se token inválido, expirado ou revogado
+    """
+    try:
+        payload = token_service.verify(credentials.credentials)
+    except TokenError as e:
+        logger.info(f"Token validation failed: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication credentials",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    
+    return {
+        "id": payload["sub"],
+        "email": payload.get("email"),
+        "nome": payload.get("nome"),
+        "tipo_usuario": payload.get("tipo_usuario")
+    }
+
+
 @router.post(
     "/register",
     response_model=UsuarioResponse,
@@ -45,7 +85,10 @@ security = HTTPBearer()
     summary="Registrar Novo Usuário",
     description="Cria uma nova conta de usuário no sistema"
 )
-async def register_user(user_data: UsuarioRequest):
+async def register_user(
+    user_data: UsuarioRequest,
+    user_orchestrator: UserOrchestrator = Depends(get_user_orchestrator)
+):
     """
     Registra um novo usuário no sistema.
     
@@ -68,9 +111,6 @@ async def register_user(user_data: UsuarioRequest):
     """
     async with RequestLogger("register_user") as req_logger:
         try:
-            # Inicializa orquestrador
-            user_orchestrator = UserOrchestrator()
-            
             # Converte para dict e remove senha do log
             user_dict = user_data.model_dump()
             req_logger.add_context(
@@ -110,6 +150,8 @@ async def register_user(user_data: UsuarioRequest):
             # Remove senha dos dados de resposta
             user_data_response = user_response.data.copy()
             user_data_response.pop("senha", None)
+            if result.data.get("job_id"):
+                user_data_response["job_id"] = result.data["job_id"]
             
             logger.info(
                 f"User registered successfully: {user_id}",
@@ -120,8 +162,6 @@ async def register_user(user_data: UsuarioRequest):
                 }
             )
             
-            await user_orchestrator.close()
-            
             return UsuarioResponse(**user_data_response)
             
         except HTTPException:
@@ -140,7 +180,10 @@ async def register_user(user_data: UsuarioRequest):
     summary="Autenticar Usuário",
     description="Autentica usuário e retorna tokens de acesso"
 )
-async def login_user(login_data: LoginRequest):
+async def login_user(
+    login_data: LoginRequest,
+    user_orchestrator: UserOrchestrator = Depends(get_user_orchestrator)
+):
     """
     Autentica usuário no sistema.
     
@@ -162,8 +205,6 @@ async def login_user(login_data: LoginRequest):
     """
     async with RequestLogger("login_user") as req_logger:
         try:
-            user_orchestrator = UserOrchestrator()
-            
             req_logger.add_context(
                 email=login_data.email,
                 remember_me=login_data.lembrar_me
@@ -177,6 +218,13 @@ async def login_user(login_data: LoginRequest):
             )
             
             if not result.success:
+                if result.metadata and result.metadata.get("overloaded"):
+                    raise HTTPException(
+                        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                        detail=result.errors[0],
+                        headers={"Retry-After": "1"}
+                    )
+                
                 logger.warning(
                     f"Authentication failed: {result.errors}",
                     extra={"email": login_data.email}
@@ -206,7 +254,7 @@ async def login_user(login_data: LoginRequest):
             login_response = LoginResponse(
                 access_token=result.data["access_token"],
                 token_type="bearer",
-                expires_in=3600,  # Em implementação real, seria calculado
+                expires_in=result.data["expires_in"],
                 refresh_token=result.data.get("refresh_token"),
                 usuario=UsuarioResponse(**user_data_response)
             )
@@ -220,8 +268,6 @@ async def login_user(login_data: LoginRequest):
                 }
             )
             
-            await user_orchestrator.close()
-            
             return login_response
             
         except HTTPException:
@@ -242,7 +288,9 @@ async def login_user(login_data: LoginRequest):
 )
 async def logout_user(
     logout_all: bool = False,
-    credentials: HTTPAuthorizationCredentials = Depends(security)
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    current_user: Dict[str, Any] = Depends(get_current_user_dependency),
+    user_orchestrator: UserOrchestrator = Depends(get_user_orchestrator)
 ):
     """
     Realiza logout do usuário.
@@ -260,13 +308,7 @@ async def logout_user(
     async with RequestLogger("logout_user") as req_logger:
         try:
             access_token = credentials.credentials
-            
-            # Busca usuário pelo token (implementação simplificada)
-            user_orchestrator = UserOrchestrator()
-            
-            # Em implementação real, validaria token e obteria user_id
-            # Por simplicidade, assumindo que token é válido
-            user_id = "user_id_from_token"  # Placeholder
+            user_id = current_user["id"]
             
             req_logger.add_context(
                 user_id=user_id,
@@ -294,8 +336,6 @@ async def logout_user(
                 }
             )
             
-            await user_orchestrator.close()
-            
             return SuccessResponse(
                 message="Logout realizado com sucesso",
                 data={"logged_out": True, "all_devices": logout_all}
@@ -317,41 +357,42 @@ async def logout_user(
     summary="Renovar Token",
     description="Renova token de acesso usando refresh token"
 )
-async def refresh_token(refresh_token: str):
+async def refresh_token(
+    refresh_token: str,
+    user_orchestrator: UserOrchestrator = Depends(get_user_orchestrator)
+):
     """
-    Renova token de acesso.
+    Renova os tokens da sessão.
+    
+    O refresh token usado é revogado; o cliente deve guardar o novo.
     
     Args:
         refresh_token: Token de renovação
         
     Returns:
-        dict: Novo token de acesso
+        dict: Novos access token e refresh token
         
     Raises:
-        HTTPException: Se refresh token inválido ou expirado
+        HTTPException: Se refresh token inválido, expirado ou revogado
     """
-    async with RequestLogger("refresh_token"):
-        try:
-            # Em implementação real, validaria refresh token
-            # e geraria novo access token
-            
-            # Placeholder - implementação simplificada
-            new_access_token = "new_access_token_here"
-            
-            logger.info("Token refreshed successfully")
-            
-            return {
-                "access_token": new_access_token,
-                "token_type": "bearer",
-                "expires_in": 3600
-            }
-            
-        except Exception as e:
-            logger.error(f"Error refreshing token: {str(e)}", exc_info=e)
+    with RequestLogger("refresh_token"):
+        result = await user_orchestrator.refresh_tokens_flow(refresh_token)
+        
+        if not result.success:
+            logger.warning(f"Token refresh rejected: {result.errors[0] if result.errors else 'unknown'}")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid or expired refresh token"
             )
+        
+        logger.info("Token refreshed successfully")
+        
+        return {
+            "access_token": result.data["access_token"],
+            "refresh_token": result.data["refresh_token"],
+            "token_type": "bearer",
+            "expires_in": result.data["expires_in"]
+        }
 
 
 @router.post(
@@ -363,7 +404,8 @@ async def refresh_token(refresh_token: str):
 async def change_password(
     current_password: str,
     new_password: str,
-    credentials: HTTPAuthorizationCredentials = Depends(security)
+    current_user: Dict[str, Any] = Depends(get_current_user_dependency),
+    user_orchestrator: UserOrchestrator = Depends(get_user_orchestrator)
 ):
     """
     Altera senha do usuário.
@@ -371,7 +413,7 @@ async def change_password(
     Args:
         current_password: Senha atual
         new_password: Nova senha
-        credentials: Token de autorização
+        current_user: Usuário autenticado
         
     Returns:
         SuccessResponse: Confirmação da alteração
@@ -381,15 +423,10 @@ async def change_password(
     """
     async with RequestLogger("change_password") as req_logger:
         try:
-            access_token = credentials.credentials
-            
-            # Em implementação real, extrairia user_id do token
-            user_id = "user_id_from_token"  # Placeholder
+            user_id = current_user["id"]
             
             req_logger.add_context(user_id=user_id)
             
-            user_orchestrator = UserOrchestrator()
-            
             # Executa fluxo de alteração de senha
             result = await user_orchestrator.change_password_flow(
                 user_id=user_id,
@@ -408,8 +445,6 @@ async def change_password(
                 extra={"user_id": user_id}
             )
             
-            await user_orchestrator.close()
-            
             return SuccessResponse(
                 message="Senha alterada com sucesso",
                 data={"password_changed": True}
@@ -431,12 +466,15 @@ async def change_password(
     summary="Dados do Usuário Atual",
     description="Retorna dados do usuário autenticado"
 )
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+async def get_current_user(
+    current_user: Dict[str, Any] = Depends(get_current_user_dependency),
+    user_orchestrator: UserOrchestrator = Depends(get_user_orchestrator)
+):
     """
     Obtém dados do usuário autenticado.
     
     Args:
-        credentials: Token de autorização
+        current_user: Usuário autenticado
         
     Returns:
         UsuarioResponse: Dados do usuário
@@ -446,12 +484,8 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     """
     async with RequestLogger("get_current_user"):
         try:
-            access_token = credentials.credentials
-            
-            # Em implementação real, validaria token e obteria user_id
-            user_id = "user_id_from_token"  # Placeholder
+            user_id = current_user["id"]
             
-            user_orchestrator = UserOrchestrator()
             persistence_gateway = user_orchestrator.persistence_gateway
             
             user_response = await persistence_gateway.get_user(user_id)
@@ -466,8 +500,6 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
             user_data = user_response.data.copy()
             user_data.pop("senha", None)
             
-            await user_orchestrator.close()
-            
             return UsuarioResponse(**user_data)
             
         except HTTPException:
@@ -478,43 +510,3 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Internal error retrieving user data"
             )
-
-
-# Dependency para validar token e obter usuário atual
-async def get_current_user_dependency(
-    credentials: HTTPAuthorizationCredentials = Depends(security)
-) -> Dict[str, Any]:
-    """
-    Dependency para validar token e obter usuário atual.
-    
-    Args:
-        credentials: Token de autorização
-        
-    Returns:
-        dict: Dados do usuário autenticado
-        
-    Raises:
-        HTTPException: Se token inválido
-    """
-    try:
-        access_token = credentials.credentials
-        
-        # Em implementação real, validaria token JWT
-        # e extrairia dados do usuário
-        
-        # Placeholder - implementação simplificada
-        user_data = {
-            "id": "user_id_from_token",
-            "email": "user@example.com",
-            "nome": "Usuário Exemplo",
-            "tipo_usuario": "student"
-        }
-        
-        return user_data
-        
-    except Exception as e:
-        logger.error(f"Token validation failed: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials"
-        )
\ No newline at end of file
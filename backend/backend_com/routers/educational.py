@@ -6,6 +6,7 @@ respostas, avaliações e busca semântica de conteúdo.
 """
 
 from fastapi import APIRouter, HTTPException, Depends, Query, status
+from fastapi.responses import JSONResponse
 from typing import Dict, Any, Optional, List
 
 from ..models import (  # Módulo não existe
@@ -23,8 +24,10 @@ from ..models import (  # Módulo não existe
     ErrorResponse
 )
 from ..orchestration import EducationalOrchestrator
+from ..dependencies import get_educational_orchestrator
 from backend.backend_com.routers.auth import get_current_user_dependency
 from ..utils.logging import setup_logger, RequestLogger
+from ..utils.helpers import parse_fields, format_paginated_response
 
 # Configuração do router
 router = APIRouter(
@@ -55,7 +58,8 @@ async def create_question(
     question_data: PerguntaRequest,
     find_similar: bool = Query(True, description="Buscar perguntas similares"),
     generate_recommendations: bool = Query(True, description="Gerar recomendações de estudo"),
-    current_user: Dict[str, Any] = Depends(get_current_user_dependency)
+    current_user: Dict[str, Any] = Depends(get_current_user_dependency),
+    educational_orchestrator: EducationalOrchestrator = Depends(get_educational_orchestrator)
 ):
     """
     Cria uma nova pergunta no sistema.
@@ -93,8 +97,6 @@ async def create_question(
                 generate_recommendations=generate_recommendations
             )
             
-            educational_orchestrator = EducationalOrchestrator()
-            
             # Executa fluxo de criação de pergunta
             result = await educational_orchestrator.create_question_flow(
                 question_data=question_dict,
@@ -133,6 +135,9 @@ async def create_question(
             if result.data.get("recommendations"):
                 question_data_response["recomendacoes"] = result.data["recommendations"]
             
+            if result.data.get("job_id"):
+                question_data_response["job_id"] = result.data["job_id"]
+            
             logger.info(
                 f"Question created successfully: {question_id}",
                 extra={
@@ -143,8 +148,6 @@ async def create_question(
                 }
             )
             
-            await educational_orchestrator.close()
-            
             return PerguntaResponse(**question_data_response)
             
         except HTTPException:
@@ -166,7 +169,8 @@ async def create_question(
 async def get_question_complete(
     question_id: str,
     include_evaluations: bool = Query(False, description="Incluir avaliações das respostas"),
-    current_user: Dict[str, Any] = Depends(get_current_user_dependency)
+    current_user: Dict[str, Any] = Depends(get_current_user_dependency),
+    educational_orchestrator: EducationalOrchestrator = Depends(get_educational_orchestrator)
 ):
     """
     Busca pergunta completa com respostas e avaliações.
@@ -190,8 +194,6 @@ async def get_question_complete(
                 user_id=current_user["id"]
             )
             
-            educational_orchestrator = EducationalOrchestrator()
-            
             # Busca pergunta completa
             result = await educational_orchestrator.get_question_with_answers(
                 question_id=question_id,
@@ -210,8 +212,6 @@ async def get_question_complete(
                         detail=result.errors[0] if result.errors else "Failed to retrieve question"
                     )
             
-            await educational_orchestrator.close()
-            
             return result.data
             
         except HTTPException:
@@ -237,7 +237,9 @@ async def list_questions(
     nivel_dificuldade: Optional[str] = Query(None, description="Filtrar por nível"),
     tipo_entrada: Optional[str] = Query(None, description="Filtrar por tipo de entrada"),
     usuario_id: Optional[str] = Query(None, description="Filtrar por usuário"),
-    current_user: Dict[str, Any] = Depends(get_current_user_dependency)
+    fields: Optional[str] = Query(None, description="Campos a retornar, separados por vírgula (ex.: _id,titulo)"),
+    current_user: Dict[str, Any] = Depends(get_current_user_dependency),
+    educational_orchestrator: EducationalOrchestrator = Depends(get_educational_orchestrator)
 ):
     """
     Lista perguntas com filtros e paginação.
@@ -249,6 +251,7 @@ async def list_questions(
         nivel_dificuldade: Filtro por nível
         tipo_entrada: Filtro por tipo
         usuario_id: Filtro por usuário
+        fields: Sparse fieldset; com ele os itens retornam apenas esses campos
         current_user: Usuário autenticado
         
     Returns:
@@ -267,7 +270,6 @@ async def list_questions(
                 }
             )
             
-            educational_orchestrator = EducationalOrchestrator()
             persistence_gateway = educational_orchestrator.persistence_gateway
             
             # Monta query de filtros
@@ -287,7 +289,10 @@ async def list_questions(
             
             # Executa busca paginada
             pagination = PaginationParams(page=page, page_size=page_size)
-            questions_response = await persistence_gateway.search_questions(query, pagination)
+            field_list = parse_fields(fields)
+            questions_response = await persistence_gateway.search_questions(
+                query, pagination, fields=field_list
+            )
             
             if not questions_response.success:
                 raise HTTPException(
@@ -296,6 +301,12 @@ async def list_questions(
                 )
             
             questions_data = questions_response.data
+            
+            if field_list:
+                # Itens parciais não passam pelo modelo completo
+                return JSONResponse(format_paginated_response(
+                    questions_data.get("items", []), questions_data.get("total", 0), page, page_size
+                ))
             questions_list = []
             
             # Processa perguntas
@@ -316,8 +327,6 @@ async def list_questions(
                 has_previous=page > 1
             )
             
-            await educational_orchestrator.close()
-            
             return paginated_response
             
         except HTTPException:
@@ -343,7 +352,8 @@ async def create_answer(
     question_id: str,
     answer_data: RespostaRequest,
     calculate_quality: bool = Query(True, description="Calcular score de qualidade"),
-    current_user: Dict[str, Any] = Depends(get_current_user_dependency)
+    current_user: Dict[str, Any] = Depends(get_current_user_dependency),
+    educational_orchestrator: EducationalOrchestrator = Depends(get_educational_orchestrator)
 ):
     """
     Cria nova resposta para uma pergunta.
@@ -378,8 +388,6 @@ async def create_answer(
                 calculate_quality=calculate_quality
             )
             
-            educational_orchestrator = EducationalOrchestrator()
-            
             # Executa fluxo de criação de resposta
             result = await educational_orchestrator.create_answer_flow(
                 answer_data=answer_dict,
@@ -428,8 +436,6 @@ async def create_answer(
                 }
             )
             
-            await educational_orchestrator.close()
-            
             return RespostaResponse(**answer_data_response)
             
         except HTTPException:
@@ -452,7 +458,9 @@ async def list_question_answers(
     question_id: str,
     page: int = Query(1, ge=1, description="Número da página"),
     page_size: int = Query(20, ge=1, le=50, description="Itens por página"),
-    current_user: Dict[str, Any] = Depends(get_current_user_dependency)
+    fields: Optional[str] = Query(None, description="Campos a retornar, separados por vírgula"),
+    current_user: Dict[str, Any] = Depends(get_current_user_dependency),
+    educational_orchestrator: EducationalOrchestrator = Depends(get_educational_orchestrator)
 ):
     """
     Lista respostas de uma pergunta específica.
@@ -461,6 +469,7 @@ async def list_question_answers(
         question_id: ID da pergunta
         page: Número da página
         page_size: Itens por página
+        fields: Sparse fieldset; com ele os itens retornam apenas esses campos
         current_user: Usuário autenticado
         
     Returns:
@@ -474,13 +483,13 @@ async def list_question_answers(
                 page_size=page_size
             )
             
-            educational_orchestrator = EducationalOrchestrator()
             persistence_gateway = educational_orchestrator.persistence_gateway
             
             # Busca respostas da pergunta
             pagination = PaginationParams(page=page, page_size=page_size)
+            field_list = parse_fields(fields)
             answers_response = await persistence_gateway.get_answers_by_question(
-                question_id, pagination
+                question_id, pagination, fields=field_list
             )
             
             if not answers_response.success:
@@ -490,6 +499,12 @@ async def list_question_answers(
                 )
             
             answers_data = answers_response.data
+            
+            if field_list:
+                # Itens parciais não passam pelo modelo completo
+                return JSONResponse(format_paginated_response(
+                    answers_data.get("items", []), answers_data.get("total", 0), page, page_size
+                ))
             answers_list = []
             
             # Processa respostas
@@ -510,8 +525,6 @@ async def list_question_answers(
                 has_previous=page > 1
             )
             
-            await educational_orchestrator.close()
-            
             return paginated_response
             
         except HTTPException:
@@ -538,7 +551,8 @@ async def create_evaluation(
     evaluation_data: AvaliacaoRequest,
     update_user_stats: bool = Query(True, description="Atualizar estatísticas do usuário"),
     generate_feedback: bool = Query(True, description="Gerar feedback personalizado"),
-    current_user: Dict[str, Any] = Depends(get_current_user_dependency)
+    current_user: Dict[str, Any] = Depends(get_current_user_dependency),
+    educational_orchestrator: EducationalOrchestrator = Depends(get_educational_orchestrator)
 ):
     """
     Cria nova avaliação para uma resposta.
@@ -566,8 +580,6 @@ async def create_evaluation(
                 nota=evaluation_dict.get("nota")
             )
             
-            educational_orchestrator = EducationalOrchestrator()
-            
             # Executa fluxo de criação de avaliação
             result = await educational_orchestrator.create_evaluation_flow(
                 evaluation_data=evaluation_dict,
@@ -612,8 +624,6 @@ async def create_evaluation(
                 }
             )
             
-            await educational_orchestrator.close()
-            
             return AvaliacaoResponse(**evaluation_response.data)
             
         except HTTPException:
@@ -636,7 +646,8 @@ async def create_evaluation(
 )
 async def semantic_search(
     search_request: BuscaSemanticaRequest,
-    current_user: Dict[str, Any] = Depends(get_current_user_dependency)
+    current_user: Dict[str, Any] = Depends(get_current_user_dependency),
+    educational_orchestrator: EducationalOrchestrator = Depends(get_educational_orchestrator)
 ):
     """
     Executa busca semântica no conteúdo educacional.
@@ -656,8 +667,6 @@ async def semantic_search(
                 user_id=current_user["id"]
             )
             
-            educational_orchestrator = EducationalOrchestrator()
-            
             # Executa busca semântica
             result = await educational_orchestrator.search_educational_content(
                 query=search_request.query,
@@ -694,8 +703,6 @@ async def semantic_search(
                 }
             )
             
-            await educational_orchestrator.close()
-            
             return search_response
             
         except HTTPException:
@@ -718,7 +725,8 @@ async def find_similar_content(
     content_id: str,
     content_type: str = Query(..., description="Tipo de conteúdo (question ou answer)"),
     limit: int = Query(10, ge=1, le=50, description="Limite de resultados"),
-    current_user: Dict[str, Any] = Depends(get_current_user_dependency)
+    current_user: Dict[str, Any] = Depends(get_current_user_dependency),
+    educational_orchestrator: EducationalOrchestrator = Depends(get_educational_orchestrator)
 ):
     """
     Encontra conteúdo similar a um item específico.
@@ -746,7 +754,6 @@ async def find_similar_content(
                 limit=limit
             )
             
-            educational_orchestrator = EducationalOrchestrator()
             persistence_gateway = educational_orchestrator.persistence_gateway
             
             # Busca conteúdo original
@@ -795,8 +802,6 @@ async def find_similar_content(
             # Limita ao número solicitado
             similar_items = similar_items[:limit]
             
-            await educational_orchestrator.close()
-            
             return similar_items
             
         except HTTPException:
@@ -819,7 +824,8 @@ async def find_similar_content(
 )
 async def get_user_educational_stats(
     user_id: str,
-    current_user: Dict[str, Any] = Depends(get_current_user_dependency)
+    current_user: Dict[str, Any] = Depends(get_current_user_dependency),
+    educational_orchestrator: EducationalOrchestrator = Depends(get_educational_orchestrator)
 ):
     """
     Obtém estatísticas educacionais de um usuário.
@@ -845,60 +851,18 @@ async def get_user_educational_stats(
                 requester_id=current_user["id"]
             )
             
-            educational_orchestrator = EducationalOrchestrator()
             persistence_gateway = educational_orchestrator.persistence_gateway
             
-            # Busca estatísticas básicas
-            stats = {
-                "user_id": user_id,
-                "perguntas": {
-                    "total": 0,
-                    "por_disciplina": {},
-                    "por_dificuldade": {}
-                },
-                "respostas": {
-                    "total": 0,
-                    "media_qualidade": 0,
-                    "total_avaliacoes": 0
-                },
-                "avaliacoes": {
-                    "dadas": 0,
-                    "recebidas": 0,
-                    "nota_media_dada": 0,
-                    "nota_media_recebida": 0
-                }
-            }
+            # Estatísticas calculadas no backend_bd (agregação única)
+            stats_response = await persistence_gateway.get_user_educational_stats(user_id)
             
-            # Conta perguntas do usuário
-            questions_response = await persistence_gateway.search_questions(
-                {"usuario_id": user_id, "status": {"$ne": "deleted"}},
-                PaginationParams(page=1, page_size=1000)  # Limite alto para contar tudo
-            )
+            if not stats_response.success:
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail="Failed to retrieve statistics"
+                )
             
-            if questions_response.success:
-                questions = questions_response.data.get("items", [])
-                stats["perguntas"]["total"] = len(questions)
-                
-                # Agrupa por disciplina
-                for question in questions:
-                    disciplina = question.get("disciplina", "Outras")
-                    stats["perguntas"]["por_disciplina"][disciplina] = stats["perguntas"]["por_disciplina"].get(disciplina, 0) + 1
-                    
-                    nivel = question.get("nivel_dificuldade", "intermediario")
-                    stats["perguntas"]["por_dificuldade"][nivel] = stats["perguntas"]["por_dificuldade"].get(nivel, 0) + 1
-            
-            # Conta respostas do usuário
-            answers_response = await persistence_gateway.mongodb.find_documents(
-                "respostas",
-                {"usuario_id": user_id, "status": {"$ne": "deleted"}},
-                PaginationParams(page=1, page_size=1000)
-            )
-            
-            if answers_response.success:
-                answers = answers_response.data.get("items", [])
-                stats["respostas"]["total"] = len(answers)
-            
-            await educational_orchestrator.close()
+            stats = stats_response.data
             
             return stats
             
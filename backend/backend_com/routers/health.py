@@ -12,7 +12,10 @@ from typing import Dict, Any
 
 from ..models import HealthResponse
 from ..gateways import PersistenceGateway
+from ..dependencies import get_password_hasher, get_persistence_gateway, get_step_executors, get_token_service
+from ..orchestration import PasswordHasher, StepExecutors
 from ..config import get_settings
+from ..utils import TokenService
 from ..utils.logging import setup_logger
 
 # Configuração do router
@@ -74,7 +77,12 @@ async def health_check():
     summary="Health Check Detalhado",
     description="Verifica saúde do serviço e todas as dependências"
 )
-async def detailed_health_check():
+async def detailed_health_check(
+    persistence_gateway: PersistenceGateway = Depends(get_persistence_gateway),
+    step_executors: StepExecutors = Depends(get_step_executors),
+    password_hasher: PasswordHasher = Depends(get_password_hasher),
+    token_service: TokenService = Depends(get_token_service)
+):
     """
     Health check completo incluindo dependências.
     
@@ -114,7 +122,6 @@ async def detailed_health_check():
         
         # Verifica backend_bd (MongoDB + Qdrant)
         try:
-            persistence_gateway = PersistenceGateway()
             bd_health = await persistence_gateway.health_check()
             
             if bd_health.success:
@@ -131,8 +138,6 @@ async def detailed_health_check():
                 }
                 health_status["service"]["status"] = "degraded"
             
-            await persistence_gateway.close()
-            
         except Exception as e:
             health_status["dependencies"]["backend_bd"] = {
                 "status": "unhealthy",
@@ -140,6 +145,20 @@ async def detailed_health_check():
             }
             health_status["service"]["status"] = "degraded"
         
+        # Pool de conexões com o backend_bd (espera no pool x latência upstream)
+        health_status["metrics"]["backend_bd_pool"] = persistence_gateway.http_client.get_pool_stats()
+        
+        # Circuit breaker e limite adaptativo de concorrência do backend_bd
+        resilience = persistence_gateway.http_client.get_resilience_stats()
+        health_status["dependencies"].setdefault("backend_bd", {}).update(resilience)
+        if resilience["circuit_breaker"]["state"] != "closed":
+            health_status["service"]["status"] = "degraded"
+        
+        # Fila e ocupação dos executores de passos que usam CPU
+        health_status["metrics"]["step_executors"] = step_executors.get_stats()
+        health_status["metrics"]["password_hasher"] = password_hasher.get_stats()
+        health_status["metrics"]["auth_tokens"] = token_service.get_stats()
+        
         # Calcula tempo de resposta total
         total_check_time = (time.time() - start_check_time) * 1000
         health_status["metrics"]["response_time_ms"] = round(total_check_time, 2)
@@ -175,7 +194,9 @@ async def detailed_health_check():
     summary="Readiness Check",
     description="Verifica se o serviço está pronto para receber tráfego"
 )
-async def readiness_check():
+async def readiness_check(
+    persistence_gateway: PersistenceGateway = Depends(get_persistence_gateway)
+):
     """
     Readiness check para Kubernetes/orquestradores.
     
@@ -215,7 +236,6 @@ async def readiness_check():
         
         # Testa conectividade básica com backend_bd
         try:
-            persistence_gateway = PersistenceGateway()
             bd_health = await persistence_gateway.health_check()
             
             if bd_health.success:
@@ -230,8 +250,6 @@ async def readiness_check():
                     "reason": bd_health.error_message
                 }
             
-            await persistence_gateway.close()
-            
         except Exception as e:
             readiness_status["ready"] = False
             readiness_status["checks"]["backend_bd_connectivity"] = {
@@ -290,7 +308,9 @@ async def liveness_check():
     summary="Métricas do Sistema",
     description="Retorna métricas básicas para monitoramento"
 )
-async def get_metrics():
+async def get_metrics(step_executors: StepExecutors = Depends(get_step_executors),
+                      password_hasher: PasswordHasher = Depends(get_password_hasher),
+                      token_service: TokenService = Depends(get_token_service)):
     """
     Endpoint de métricas para monitoramento.
     
@@ -317,7 +337,10 @@ async def get_metrics():
             "gauges": {
                 "active_connections": 0,
                 "queue_size": 0
-            }
+            },
+            "step_executors": step_executors.get_stats(),
+            "password_hasher": password_hasher.get_stats(),
+            "auth_tokens": token_service.get_stats()
         }
         
         return metrics
@@ -0,0 +1,85 @@
+"""
+Endpoints de acompanhamento dos jobs em segundo plano.
+
+Fluxos como registro de usuário e criação de pergunta devolvem um
+`job_id` para as etapas adiadas; o cliente consulta o estado aqui, com
+long-polling opcional (`wait`). Os IDs são aleatórios (uuid4) e o
+resultado público não inclui payload nem checkpoints do job.
+"""
+
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from ..dependencies import get_job_queue
+from ..jobs import JobQueue
+
+# Configuração do router
+router = APIRouter(
+    prefix="/jobs",
+    tags=["Jobs"],
+    responses={
+        404: {"description": "Job not found"},
+        503: {"description": "Background jobs disabled"}
+    }
+)
+
+
+def _require_queue(job_queue: Optional[JobQueue]) -> JobQueue:
+    if job_queue is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Background jobs are disabled"
+        )
+    return job_queue
+
+
+@router.get(
+    "/stats",
+    summary="Estatísticas da Fila",
+    description="Contadores da fila e quantidade de jobs por estado (inclui a dead-letter)"
+)
+async def get_jobs_stats(job_queue: Optional[JobQueue] = Depends(get_job_queue)) -> Dict[str, Any]:
+    """
+    Estatísticas da fila de jobs.
+
+    Returns:
+        dict: Contadores deste processo e jobs por estado
+    """
+    return await _require_queue(job_queue).get_stats()
+
+
+@router.get(
+    "/{job_id}",
+    summary="Status do Job",
+    description="Estado e resultado de um job; com `wait`, espera o job terminar (long-polling)"
+)
+async def get_job(
+    job_id: str,
+    wait: float = Query(0, ge=0, le=30, description="Segundos para aguardar o término do job"),
+    job_queue: Optional[JobQueue] = Depends(get_job_queue)
+) -> Dict[str, Any]:
+    """
+    Consulta um job em segundo plano.
+
+    Args:
+        job_id: ID devolvido pelo fluxo que enfileirou o job
+        wait: Tempo máximo de espera pelo término (0 responde na hora)
+
+    Returns:
+        dict: Estado (`pending`, `running`, `succeeded`, `dead`), tentativas,
+        resultado e último erro
+
+    Raises:
+        HTTPException: Se o job não existir ou a fila estiver desativada
+    """
+    queue = _require_queue(job_queue)
+    job = await queue.wait(job_id, wait) if wait else await queue.get(job_id)
+
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+
+    return job.to_dict()
@@ -6,6 +6,7 @@ configurações e informações relacionadas.
 """
 
 from fastapi import APIRouter, HTTPException, Depends, Query, status
+from fastapi.responses import JSONResponse
 from typing import Dict, Any, Optional, List
 
 from ..models import (
@@ -17,8 +18,10 @@ from ..models import (
     ErrorResponse
 )
 from ..orchestration import UserOrchestrator
+from ..dependencies import get_user_orchestrator
 from backend.backend_com.routers.auth import get_current_user_dependency
 from ..utils.logging import setup_logger, RequestLogger
+from ..utils.helpers import parse_fields, format_paginated_response
 
 # Configuração do router
 router = APIRouter(
@@ -43,7 +46,10 @@ logger = setup_logger("users_router")
     summary="Meu Perfil",
     description="Retorna dados do perfil do usuário autenticado"
 )
-async def get_my_profile(current_user: Dict[str, Any] = Depends(get_current_user_dependency)):
+async def get_my_profile(
+    current_user: Dict[str, Any] = Depends(get_current_user_dependency),
+    user_orchestrator: UserOrchestrator = Depends(get_user_orchestrator)
+):
     """
     Obtém dados completos do perfil do usuário autenticado.
     
@@ -61,7 +67,6 @@ async def get_my_profile(current_user: Dict[str, Any] = Depends(get_current_user
             user_id = current_user["id"]
             req_logger.add_context(user_id=user_id)
             
-            user_orchestrator = UserOrchestrator()
             persistence_gateway = user_orchestrator.persistence_gateway
             
             user_response = await persistence_gateway.get_user(user_id)
@@ -76,8 +81,6 @@ async def get_my_profile(current_user: Dict[str, Any] = Depends(get_current_user
             user_data = user_response.data.copy()
             user_data.pop("senha", None)
             
-            await user_orchestrator.close()
-            
             return UsuarioResponse(**user_data)
             
         except HTTPException:
@@ -98,7 +101,8 @@ async def get_my_profile(current_user: Dict[str, Any] = Depends(get_current_user
 )
 async def update_my_profile(
     update_data: Dict[str, Any],
-    current_user: Dict[str, Any] = Depends(get_current_user_dependency)
+    current_user: Dict[str, Any] = Depends(get_current_user_dependency),
+    user_orchestrator: UserOrchestrator = Depends(get_user_orchestrator)
 ):
     """
     Atualiza dados do perfil do usuário autenticado.
@@ -134,8 +138,6 @@ async def update_my_profile(
                     detail="No valid fields to update"
                 )
             
-            user_orchestrator = UserOrchestrator()
-            
             # Executa fluxo de atualização
             result = await user_orchestrator.update_user_profile_flow(
                 user_id=user_id,
@@ -171,8 +173,6 @@ async def update_my_profile(
                 }
             )
             
-            await user_orchestrator.close()
-            
             return UsuarioResponse(**user_data)
             
         except HTTPException:
@@ -193,7 +193,8 @@ async def update_my_profile(
 )
 async def get_user_by_id(
     user_id: str,
-    current_user: Dict[str, Any] = Depends(get_current_user_dependency)
+    current_user: Dict[str, Any] = Depends(get_current_user_dependency),
+    user_orchestrator: UserOrchestrator = Depends(get_user_orchestrator)
 ):
     """
     Busca usuário por ID.
@@ -218,7 +219,6 @@ async def get_user_by_id(
                 requester_id=current_user["id"]
             )
             
-            user_orchestrator = UserOrchestrator()
             persistence_gateway = user_orchestrator.persistence_gateway
             
             user_response = await persistence_gateway.get_user(user_id)
@@ -249,8 +249,6 @@ async def get_user_by_id(
                 # Remove apenas senha
                 user_data.pop("senha", None)
             
-            await user_orchestrator.close()
-            
             return UsuarioResponse(**user_data)
             
         except HTTPException:
@@ -275,7 +273,9 @@ async def list_users(
     tipo_usuario: Optional[str] = Query(None, description="Filtrar por tipo de usuário"),
     status: Optional[str] = Query(None, description="Filtrar por status"),
     search: Optional[str] = Query(None, description="Buscar por nome ou email"),
-    current_user: Dict[str, Any] = Depends(get_current_user_dependency)
+    fields: Optional[str] = Query(None, description="Campos a retornar, separados por vírgula (ex.: _id,nome,email)"),
+    current_user: Dict[str, Any] = Depends(get_current_user_dependency),
+    user_orchestrator: UserOrchestrator = Depends(get_user_orchestrator)
 ):
     """
     Lista usuários com filtros e paginação.
@@ -288,6 +288,7 @@ async def list_users(
         tipo_usuario: Filtro por tipo
         status: Filtro por status
         search: Termo de busca
+        fields: Sparse fieldset; com ele os itens retornam apenas esses campos
         current_user: Usuário autenticado
         
     Returns:
@@ -315,7 +316,6 @@ async def list_users(
                 }
             )
             
-            user_orchestrator = UserOrchestrator()
             persistence_gateway = user_orchestrator.persistence_gateway
             
             # Monta query de filtros
@@ -336,8 +336,9 @@ async def list_users(
             
             # Executa busca paginada
             pagination = PaginationParams(page=page, page_size=page_size)
+            field_list = parse_fields(fields, exclude=["senha"])
             users_response = await persistence_gateway.mongodb.find_documents(
-                "usuarios", query, pagination
+                "usuarios", query, pagination, fields=field_list
             )
             
             if not users_response.success:
@@ -347,6 +348,12 @@ async def list_users(
                 )
             
             users_data = users_response.data
+            
+            if field_list:
+                # Itens parciais não passam pelo modelo completo
+                return JSONResponse(format_paginated_response(
+                    users_data.get("items", []), users_data.get("total", 0), page, page_size
+                ))
             users_list = []
             
             # Remove senhas e processa usuários
@@ -369,8 +376,6 @@ async def list_users(
                 has_previous=page > 1
             )
             
-            await user_orchestrator.close()
-            
             return paginated_response
             
         except HTTPException:
@@ -392,7 +397,8 @@ async def list_users(
 async def update_user_status(
     user_id: str,
     new_status: str,
-    current_user: Dict[str, Any] = Depends(get_current_user_dependency)
+    current_user: Dict[str, Any] = Depends(get_current_user_dependency),
+    user_orchestrator: UserOrchestrator = Depends(get_user_orchestrator)
 ):
     """
     Altera status de um usuário.
@@ -434,8 +440,6 @@ async def update_user_status(
                 admin_user_id=current_user["id"]
             )
             
-            user_orchestrator = UserOrchestrator()
-            
             # Atualiza status
             result = await user_orchestrator.update_user_profile_flow(
                 user_id=user_id,
@@ -464,8 +468,6 @@ async def update_user_status(
                 }
             )
             
-            await user_orchestrator.close()
-            
             return SuccessResponse(
                 message=f"User status updated to {new_status}",
                 data={"user_id": user_id, "new_status": new_status}
@@ -487,7 +489,10 @@ async def update_user_status(
     summary="Minhas Configurações",
     description="Retorna configurações pessoais do usuário"
 )
-async def get_my_settings(current_user: Dict[str, Any] = Depends(get_current_user_dependency)):
+async def get_my_settings(
+    current_user: Dict[str, Any] = Depends(get_current_user_dependency),
+    user_orchestrator: UserOrchestrator = Depends(get_user_orchestrator)
+):
     """
     Obtém configurações pessoais do usuário autenticado.
     
@@ -505,7 +510,6 @@ async def get_my_settings(current_user: Dict[str, Any] = Depends(get_current_use
             user_id = current_user["id"]
             req_logger.add_context(user_id=user_id)
             
-            user_orchestrator = UserOrchestrator()
             persistence_gateway = user_orchestrator.persistence_gateway
             
             # Busca configurações do usuário
@@ -525,7 +529,6 @@ async def get_my_settings(current_user: Dict[str, Any] = Depends(get_current_use
                 return {"configuracoes": default_settings}
             
             settings_data = settings_response.data["items"][0]
-            await user_orchestrator.close()
             
             return settings_data.get("configuracoes", {})
             
@@ -547,7 +550,8 @@ async def get_my_settings(current_user: Dict[str, Any] = Depends(get_current_use
 )
 async def update_my_settings(
     settings: Dict[str, Any],
-    current_user: Dict[str, Any] = Depends(get_current_user_dependency)
+    current_user: Dict[str, Any] = Depends(get_current_user_dependency),
+    user_orchestrator: UserOrchestrator = Depends(get_user_orchestrator)
 ):
     """
     Atualiza configurações pessoais do usuário.
@@ -567,7 +571,6 @@ async def update_my_settings(
             user_id = current_user["id"]
             req_logger.add_context(user_id=user_id, settings_keys=list(settings.keys()))
             
-            user_orchestrator = UserOrchestrator()
             persistence_gateway = user_orchestrator.persistence_gateway
             
             # Busca configurações existentes
@@ -607,8 +610,6 @@ async def update_my_settings(
                 extra={"user_id": user_id}
             )
             
-            await user_orchestrator.close()
-            
             return SuccessResponse(
                 message="Configurações atualizadas com sucesso",
                 data={"updated": True}
@@ -0,0 +1,127 @@
+"""
+Testes do SQLiteJobStore (banco em memória): reserva, retry, dead-letter,
+fencing por tentativa e remoção dos jobs finalizados.
+"""
+
+import asyncio
+import time
+
+from backend.backend_com.jobs import Job, JobState, SQLiteJobStore
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+async def _store_with(*jobs: Job) -> SQLiteJobStore:
+    store = SQLiteJobStore(":memory:")
+    for job in jobs:
+        await store.add(job)
+    return store
+
+
+def test_claim_reserves_ready_jobs_once():
+    async def scenario():
+        store = await _store_with(
+            Job(id="ready", type="t", payload={"n": 1}),
+            Job(id="later", type="t", payload={}, run_at=time.time() + 60),
+        )
+        claimed = await store.claim(10, lease_seconds=30)
+        assert [job.id for job in claimed] == ["ready"]
+        assert claimed[0].state == JobState.RUNNING
+        assert claimed[0].attempts == 1
+        assert claimed[0].payload == {"n": 1}
+        # Já reservado e com lease válido: não é entregue de novo
+        assert await store.claim(10, lease_seconds=30) == []
+    run(scenario())
+
+
+def test_claim_takes_back_jobs_with_expired_lease():
+    async def scenario():
+        store = await _store_with(Job(id="j", type="t", payload={}))
+        await store.claim(1, lease_seconds=0)
+        reclaimed = await store.claim(1, lease_seconds=30)
+        assert [job.attempts for job in reclaimed] == [2]
+    run(scenario())
+
+
+def test_retry_returns_job_to_queue_with_progress():
+    async def scenario():
+        store = await _store_with(Job(id="j", type="t", payload={}))
+        job = (await store.claim(1, lease_seconds=30))[0]
+        assert await store.retry(job.id, "boom", time.time(), {"step": 1}, job.attempts)
+
+        stored = await store.get("j")
+        assert stored.state == JobState.PENDING
+        assert stored.error == "boom"
+        assert stored.progress == {"step": 1}
+        assert stored.locked_until is None
+        assert [job.attempts for job in await store.claim(1, lease_seconds=30)] == [2]
+    run(scenario())
+
+
+def test_dead_letter_is_final():
+    async def scenario():
+        store = await _store_with(Job(id="j", type="t", payload={}, max_attempts=1))
+        job = (await store.claim(1, lease_seconds=30))[0]
+        assert await store.dead_letter(job.id, "boom", {}, job.attempts)
+
+        stored = await store.get("j")
+        assert stored.state == JobState.DEAD
+        assert stored.finished
+        assert await store.claim(1, lease_seconds=0) == []
+        assert await store.count_by_state() == {"dead": 1}
+    run(scenario())
+
+
+def test_outcome_of_a_lost_lease_is_discarded():
+    async def scenario():
+        store = await _store_with(Job(id="j", type="t", payload={}))
+        stale = (await store.claim(1, lease_seconds=0))[0]
+        current = (await store.claim(1, lease_seconds=30))[0]
+
+        # O worker antigo termina depois que outro reservou o job
+        assert not await store.complete(stale.id, {"ok": "stale"}, stale.attempts)
+        assert not await store.retry(stale.id, "late", time.time(), {}, stale.attempts)
+        assert not await store.dead_letter(stale.id, "late", {}, stale.attempts)
+        assert (await store.get("j")).state == JobState.RUNNING
+
+        assert await store.complete(current.id, {"ok": "current"}, current.attempts)
+        stored = await store.get("j")
+        assert stored.state == JobState.SUCCEEDED
+        assert stored.result == {"ok": "current"}
+        # Desfecho repetido da mesma execução também não sobrescreve
+        assert not await store.dead_letter(current.id, "late", {}, current.attempts)
+    run(scenario())
+
+
+def test_release_does_not_consume_an_attempt():
+    async def scenario():
+        store = await _store_with(Job(id="j", type="t", payload={}))
+        job = (await store.claim(1, lease_seconds=30))[0]
+        assert await store.release(job.id, {"step": 2}, job.attempts)
+
+        stored = await store.get("j")
+        assert stored.state == JobState.PENDING
+        assert stored.attempts == 0
+        assert stored.progress == {"step": 2}
+    run(scenario())
+
+
+def test_purge_removes_only_old_finished_jobs():
+    async def scenario():
+        store = await _store_with(
+            Job(id="done", type="t", payload={}),
+            Job(id="dead", type="t", payload={}),
+            Job(id="pending", type="t", payload={}, run_at=time.time() + 60),
+        )
+        done, dead = await store.claim(2, lease_seconds=30)
+        await store.complete(done.id, None, done.attempts)
+        await store.dead_letter(dead.id, "boom", {}, dead.attempts)
+
+        assert await store.purge(time.time() - 60) == 0
+        assert await store.purge(time.time() + 1) == 2
+        assert await store.get("done") is None
+        assert await store.get("dead") is None
+        assert (await store.get("pending")).state == JobState.PENDING
+    run(scenario())
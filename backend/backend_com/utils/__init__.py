@@ -23,6 +23,7 @@ from .helpers import (
     format_error_response,
     format_success_response,
     format_paginated_response,
+    parse_fields,
     
     # Funções de conversão
     dict_to_object,
@@ -64,6 +65,15 @@ from .security import (
     check_rate_limit,
 )
 
+from .tokens import (
+    # Tokens de acesso assinados
+    TokenError,
+    TokenSigner,
+    RevocationSet,
+    TokenVerifier,
+    TokenService,
+)
+
 # Importa funções de logging diretamente
 from .logging import (
     # Utilitários de logging
@@ -89,6 +99,7 @@ __all__ = [
     "format_error_response",
     "format_success_response", 
     "format_paginated_response",
+    "parse_fields",
     "dict_to_object",
     "object_to_dict",
     "flatten_dict",
@@ -119,6 +130,13 @@ __all__ = [
     "validate_file_security",
     "check_rate_limit",
     
+    # Tokens
+    "TokenError",
+    "TokenSigner",
+    "RevocationSet",
+    "TokenVerifier",
+    "TokenService",
+    
     # Logging
     "setup_logger",
     "configure_structured_logging",
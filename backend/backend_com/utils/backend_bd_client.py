@@ -8,7 +8,9 @@ com o serviço de persistência do V-LABS.
 import httpx
 import time
 from typing import Dict, Any, Optional, List
-from backend_com.config import get_settings
+from ..config import get_settings
+from ..gateways.http_client import http2_disponivel
+from ..gateways.inprocess import transport_from_settings
 
 
 class BackendBDClient:
@@ -22,8 +24,43 @@ class BackendBDClient:
     def __init__(self):
         """Inicializa cliente com configurações do sistema."""
         self.settings = get_settings()
-        self.base_url = self.settings.backend_bd_url
+        self.base_url = str(self.settings.backend_bd_url).rstrip("/")
         self.timeout = self.settings.backend_bd_timeout
+        self._client: Optional[httpx.AsyncClient] = None
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """
+        Retorna o AsyncClient compartilhado (conexões keep-alive reaproveitadas).
+        
+        Returns:
+            httpx.AsyncClient: Cliente HTTP do processo
+        """
+        if self._client is None or self._client.is_closed:
+            transport = transport_from_settings(self.settings)
+            if transport is not None:
+                # Modo in-process: backend_mq montado no mesmo processo
+                self._client = httpx.AsyncClient(timeout=self.timeout, transport=transport)
+                return self._client
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(
+                    self.timeout,
+                    connect=self.settings.backend_bd_connect_timeout,
+                    pool=self.settings.backend_bd_pool_timeout
+                ),
+                limits=httpx.Limits(
+                    max_connections=self.settings.backend_bd_max_connections,
+                    max_keepalive_connections=self.settings.backend_bd_max_keepalive_connections,
+                    keepalive_expiry=self.settings.backend_bd_keepalive_expiry
+                ),
+                http2=self.settings.backend_bd_http2 and http2_disponivel()
+            )
+        return self._client
+    
+    async def close(self) -> None:
+        """Fecha o AsyncClient compartilhado."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
         
     async def health_check(self) -> Dict[str, Any]:
         """
@@ -33,19 +70,19 @@ class BackendBDClient:
             dict: Status de saúde e informações do serviço
         """
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                start_time = time.time()
-                response = await client.get(f"{self.base_url}/health")
-                response_time = (time.time() - start_time) * 1000
+            client = self._get_client()
+            start_time = time.time()
+            response = await client.get(f"{self.base_url}/health")
+            response_time = (time.time() - start_time) * 1000
                 
-                response.raise_for_status()
+            response.raise_for_status()
                 
-                return {
-                    "status": "healthy",
-                    "response_time_ms": round(response_time, 2),
-                    "data": response.json(),
-                    "url": f"{self.base_url}/health"
-                }
+            return {
+                "status": "healthy",
+                "response_time_ms": round(response_time, 2),
+                "data": response.json(),
+                "url": f"{self.base_url}/health"
+            }
                 
         except httpx.TimeoutException:
             return {
@@ -79,22 +116,22 @@ class BackendBDClient:
             dict: Lista de perguntas ou erro
         """
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(
-                    f"{self.base_url}/questions",
-                    params={"limit": limit, "offset": offset}
-                )
-                response.raise_for_status()
+            client = self._get_client()
+            response = await client.get(
+                f"{self.base_url}/questions",
+                params={"limit": limit, "offset": offset}
+            )
+            response.raise_for_status()
                 
-                data = response.json()
-                return {
-                    "success": True,
-                    "questions": data.get("questions", []),
-                    "total": data.get("total", 0),
-                    "limit": limit,
-                    "offset": offset,
-                    "source": "backend_bd"
-                }
+            data = response.json()
+            return {
+                "success": True,
+                "questions": data.get("questions", []),
+                "total": data.get("total", 0),
+                "limit": limit,
+                "offset": offset,
+                "source": "backend_bd"
+            }
                 
         except Exception as e:
             return {
@@ -116,18 +153,18 @@ class BackendBDClient:
             dict: Pergunta criada ou erro
         """
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    f"{self.base_url}/questions",
-                    json=question_data
-                )
-                response.raise_for_status()
+            client = self._get_client()
+            response = await client.post(
+                f"{self.base_url}/questions",
+                json=question_data
+            )
+            response.raise_for_status()
                 
-                return {
-                    "success": True,
-                    "question": response.json(),
-                    "message": "Pergunta criada com sucesso"
-                }
+            return {
+                "success": True,
+                "question": response.json(),
+                "message": "Pergunta criada com sucesso"
+            }
                 
         except Exception as e:
             return {
@@ -147,20 +184,20 @@ class BackendBDClient:
             dict: Lista de usuários ou erro
         """
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(
-                    f"{self.base_url}/users",
-                    params={"limit": limit}
-                )
-                response.raise_for_status()
+            client = self._get_client()
+            response = await client.get(
+                f"{self.base_url}/users",
+                params={"limit": limit}
+            )
+            response.raise_for_status()
                 
-                data = response.json()
-                return {
-                    "success": True,
-                    "users": data.get("users", []),
-                    "total": data.get("total", 0),
-                    "source": "backend_bd"
-                }
+            data = response.json()
+            return {
+                "success": True,
+                "users": data.get("users", []),
+                "total": data.get("total", 0),
+                "source": "backend_bd"
+            }
                 
         except Exception as e:
             return {
@@ -183,18 +220,18 @@ class BackendBDClient:
             dict: Dados do usuário autenticado ou erro
         """
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    f"{self.base_url}/auth/login",
-                    json={"email": email, "password": password}
-                )
-                response.raise_for_status()
+            client = self._get_client()
+            response = await client.post(
+                f"{self.base_url}/auth/login",
+                json={"email": email, "password": password}
+            )
+            response.raise_for_status()
                 
-                return {
-                    "success": True,
-                    "user": response.json(),
-                    "message": "Usuário autenticado com sucesso"
-                }
+            return {
+                "success": True,
+                "user": response.json(),
+                "message": "Usuário autenticado com sucesso"
+            }
                 
         except httpx.HTTPStatusError as e:
             if e.response.status_code == 401:
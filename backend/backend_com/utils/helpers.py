@@ -84,17 +84,18 @@ def validate_email_format(email: str) -> bool:
         return False
 
 
-def hash_password(password: str) -> str:
+def hash_password(password: str, rounds: Optional[int] = None) -> str:
     """
     Gera hash seguro da senha usando bcrypt.
     
     Args:
         password: Senha em texto plano
+        rounds: Custo do bcrypt (log2 das iterações; padrão da biblioteca: 12)
         
     Returns:
         str: Hash da senha
     """
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds) if rounds else bcrypt.gensalt()
     hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
     return hashed.decode('utf-8')
 
@@ -239,6 +240,27 @@ def format_paginated_response(items: List[Any], total: int, page: int,
     }
 
 
+def parse_fields(fields: Optional[str], exclude: Optional[List[str]] = None) -> Optional[List[str]]:
+    """
+    Converte o parâmetro `fields` ("a,b,c") em lista de campos (sparse fieldset).
+    
+    Args:
+        fields: Campos separados por vírgula
+        exclude: Campos que nunca podem ser solicitados (ex.: senha)
+        
+    Returns:
+        list: Campos solicitados ou None para documento completo
+    """
+    if not fields:
+        return None
+    
+    excluded = set(exclude or [])
+    parsed = [f.strip() for f in fields.split(",") if f.strip()]
+    parsed = [f for f in parsed if f.split(".")[0] not in excluded]
+    
+    return parsed or None
+
+
 def dict_to_object(data: Dict[str, Any]) -> Any:
     """
     Converte dicionário para objeto com notação de ponto.
@@ -0,0 +1,78 @@
+"""
+Repasse de respostas do backend_bd em streaming (modo pass-through).
+
+Usado por rotas que apenas encaminham listas/exportações: os bytes do
+backend_bd seguem para o cliente em blocos, sem `response.json()` nem
+reconstrução de modelos Pydantic.
+"""
+
+from typing import Optional
+
+from fastapi import HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+
+from ..gateways.http_client import StreamingHTTPResponse
+
+# Tamanho dos blocos lidos do upstream (bytes)
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def accept_encoding(request: Request) -> dict:
+    """
+    Header para pedir ao backend_bd a mesma codificação aceita pelo cliente.
+
+    Como o corpo é repassado sem descomprimir, o upstream só pode
+    comprimir se o cliente final souber descomprimir.
+
+    Args:
+        request: Requisição do cliente
+
+    Returns:
+        dict: Header Accept-Encoding para `HTTPClient.stream`
+    """
+    return {"Accept-Encoding": request.headers.get("accept-encoding", "identity")}
+
+
+async def proxy_response(upstream: StreamingHTTPResponse,
+                         error_detail: str = "Upstream request failed",
+                         chunk_size: Optional[int] = STREAM_CHUNK_SIZE) -> StreamingResponse:
+    """
+    Converte a resposta do backend_bd em StreamingResponse.
+
+    A conexão com o upstream é fechada ao fim do envio ou se o cliente
+    desconectar. Respostas de erro não são repassadas: viram HTTPException
+    (502 para erros 5xx do upstream).
+
+    Args:
+        upstream: Resposta aberta por `HTTPClient.stream`
+        error_detail: Mensagem para respostas de erro do upstream
+        chunk_size: Tamanho dos blocos repassados
+
+    Returns:
+        StreamingResponse: Resposta que repassa o corpo do upstream
+
+    Raises:
+        HTTPException: Se o backend_bd respondeu com erro
+    """
+    if not upstream.is_success:
+        await upstream.aclose()
+        raise HTTPException(
+            status_code=upstream.status_code if upstream.status_code < 500 else status.HTTP_502_BAD_GATEWAY,
+            detail=error_detail
+        )
+
+    async def body():
+        try:
+            async for chunk in upstream.aiter_bytes(chunk_size):
+                yield chunk
+        finally:
+            await upstream.aclose()
+
+    return StreamingResponse(
+        body(),
+        status_code=upstream.status_code,
+        headers=upstream.forward_headers(),
+        media_type=upstream.media_type,
+        background=BackgroundTask(upstream.aclose)
+    )
@@ -0,0 +1,370 @@
+"""
+Tokens de acesso assinados (JWT HS256) verificados sem I/O.
+
+O token carrega o usuário (`sub`, email, nome, tipo) e a validade; a
+assinatura HMAC-SHA256 com o segredo da aplicação dispensa a consulta ao
+MongoDB a cada requisição. Tokens já verificados ficam em um LRU, então a
+verificação repetida custa uma busca em dicionário.
+
+Cada login abre uma sessão (`sid`), compartilhada pelo access token e pelo
+refresh token; a renovação mantém o `sid` e troca o refresh token (o
+anterior é revogado).
+
+Revogações (logout) ficam em memória em `RevocationSet`:
+- por token: `jti` -> expiração do token, descartado quando o token expira;
+- por sessão (logout do dispositivo): `sid`, derruba access e refresh tokens
+  da sessão, inclusive os emitidos por renovações;
+- por usuário ("sair de todos os dispositivos"): instante de corte; tokens
+  emitidos antes dele deixam de valer.
+
+O conjunto só guarda revogações de tokens ainda válidos, então fica
+pequeno; é exato (um filtro de Bloom recusaria tokens válidos nos falsos
+positivos). Outros workers recebem as revogações pelo sincronismo
+periódico de `TokenService` com o MongoDB.
+"""
+
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import math
+import secrets
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+ACCESS_TOKEN = "access"
+REFRESH_TOKEN = "refresh"
+
+_HEADER = {"alg": "HS256", "typ": "JWT"}
+
+
+class TokenError(Exception):
+    """Token inválido, expirado ou revogado."""
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+class TokenSigner:
+    """Emite e decodifica tokens JWT assinados com HMAC-SHA256."""
+
+    def __init__(self, secret: str, issuer: str = "vlabs-backend-com"):
+        """
+        Args:
+            secret: Segredo compartilhado por todos os workers
+            issuer: Valor do claim `iss`
+        """
+        self._key = secret.encode("utf-8")
+        self.issuer = issuer
+        self._encoded_header = _b64encode(json.dumps(_HEADER, separators=(",", ":")).encode())
+
+    def _sign(self, signing_input: str) -> bytes:
+        return hmac.new(self._key, signing_input.encode("ascii"), hashlib.sha256).digest()
+
+    def issue(self, subject: str, ttl_seconds: float, token_type: str = ACCESS_TOKEN,
+              claims: Optional[Dict[str, Any]] = None) -> Tuple[str, Dict[str, Any]]:
+        """
+        Emite um token.
+
+        Args:
+            subject: ID do usuário (`sub`)
+            ttl_seconds: Validade (s)
+            token_type: `access` ou `refresh` (`typ`)
+            claims: Claims adicionais (ex.: email, tipo_usuario)
+
+        Returns:
+            tuple: (token, payload)
+        """
+        # `iat` em milissegundos (truncado): um login logo após "sair de todos
+        # os dispositivos" não cai no corte de revogação do mesmo segundo
+        now = time.time()
+        payload = {
+            **(claims or {}),
+            "iss": self.issuer,
+            "sub": subject,
+            "typ": token_type,
+            "iat": math.floor(now * 1000) / 1000,
+            "exp": int(now + ttl_seconds),
+            "jti": secrets.token_hex(12),
+        }
+        encoded_payload = _b64encode(json.dumps(payload, separators=(",", ":")).encode())
+        signing_input = f"{self._encoded_header}.{encoded_payload}"
+        return f"{signing_input}.{_b64encode(self._sign(signing_input))}", payload
+
+    def decode(self, token: str) -> Dict[str, Any]:
+        """
+        Verifica assinatura, emissor e validade.
+
+        Returns:
+            dict: Payload do token
+
+        Raises:
+            TokenError: Se o token for malformado, adulterado ou expirado
+        """
+        try:
+            encoded_header, encoded_payload, encoded_signature = token.split(".")
+            signature = _b64decode(encoded_signature)
+        except (AttributeError, ValueError):
+            raise TokenError("Malformed token")
+
+        # Só o header emitido aqui é aceito: impede troca de algoritmo ("none")
+        if encoded_header != self._encoded_header:
+            raise TokenError("Unsupported token header")
+        if not hmac.compare_digest(signature, self._sign(f"{encoded_header}.{encoded_payload}")):
+            raise TokenError("Invalid token signature")
+
+        try:
+            payload = json.loads(_b64decode(encoded_payload))
+        except ValueError:
+            raise TokenError("Malformed token")
+        if payload.get("iss") != self.issuer:
+            raise TokenError("Invalid token issuer")
+        if payload.get("exp", 0) <= time.time():
+            raise TokenError("Token expired")
+        return payload
+
+
+class RevocationSet:
+    """Revogações em memória: por `jti`, por sessão (`sid`) e por corte de emissão por usuário."""
+
+    def __init__(self):
+        self._tokens: Dict[str, float] = {}                      # jti -> exp do token
+        self._sessions: Dict[str, float] = {}                    # sid -> expiração da regra
+        self._users: Dict[str, Tuple[float, float]] = {}         # user_id -> (corte, expiração da regra)
+
+    def revoke_token(self, jti: str, expires_at: float) -> None:
+        """Revoga um token até a sua expiração."""
+        self._tokens[jti] = expires_at
+
+    def revoke_session(self, sid: str, expires_at: float) -> None:
+        """Revoga todos os tokens da sessão (access e refresh)."""
+        self._sessions[sid] = max(expires_at, self._sessions.get(sid, 0.0))
+
+    def revoke_user(self, user_id: str, issued_before: float, expires_at: float) -> None:
+        """Revoga os tokens do usuário emitidos até `issued_before`."""
+        current = self._users.get(user_id)
+        if current is None or current[0] < issued_before:
+            self._users[user_id] = (issued_before, expires_at)
+
+    def is_revoked(self, payload: Dict[str, Any]) -> bool:
+        """Indica se o token (payload já verificado) foi revogado."""
+        if payload.get("jti") in self._tokens:
+            return True
+        if payload.get("sid") in self._sessions:
+            return True
+        rule = self._users.get(payload.get("sub"))
+        return rule is not None and payload.get("iat", 0) <= rule[0]
+
+    def load(self, records: Iterable[Dict[str, Any]]) -> int:
+        """
+        Aplica revogações no formato gravado no MongoDB.
+
+        Args:
+            records: Documentos com `expires_at` e `jti`, `sid` ou `user_id` + `revoked_before`
+
+        Returns:
+            int: Quantidade de registros aplicados
+        """
+        count = 0
+        for record in records:
+            if record.get("jti"):
+                self.revoke_token(record["jti"], record["expires_at"])
+            elif record.get("sid"):
+                self.revoke_session(record["sid"], record["expires_at"])
+            elif record.get("user_id") and record.get("revoked_before") is not None:
+                self.revoke_user(record["user_id"], record["revoked_before"], record["expires_at"])
+            else:
+                continue
+            count += 1
+        return count
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """Remove revogações de tokens que já expiraram de qualquer forma."""
+        now = now if now is not None else time.time()
+        expired_tokens = [jti for jti, exp in self._tokens.items() if exp <= now]
+        expired_sessions = [sid for sid, exp in self._sessions.items() if exp <= now]
+        expired_users = [user for user, (_, exp) in self._users.items() if exp <= now]
+        for jti in expired_tokens:
+            del self._tokens[jti]
+        for sid in expired_sessions:
+            del self._sessions[sid]
+        for user in expired_users:
+            del self._users[user]
+        return len(expired_tokens) + len(expired_sessions) + len(expired_users)
+
+    def __len__(self) -> int:
+        return len(self._tokens) + len(self._sessions) + len(self._users)
+
+
+class TokenVerifier:
+    """Verificação com LRU dos tokens já validados."""
+
+    def __init__(self, signer: TokenSigner, revocations: RevocationSet, cache_size: int = 4096):
+        self.signer = signer
+        self.revocations = revocations
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._stats = {"hits": 0, "misses": 0, "rejected": 0}
+
+    def verify(self, token: str, token_type: str = ACCESS_TOKEN) -> Dict[str, Any]:
+        """
+        Valida o token sem I/O.
+
+        A revogação é conferida a cada chamada (inclusive em acertos do
+        cache), então um logout vale imediatamente.
+
+        Returns:
+            dict: Payload do token
+
+        Raises:
+            TokenError: Se inválido, expirado, revogado ou de outro tipo
+        """
+        payload = self._cache.get(token)
+        if payload is not None:
+            self._stats["hits"] += 1
+            self._cache.move_to_end(token)
+            if payload["exp"] <= time.time():
+                del self._cache[token]
+                self._stats["rejected"] += 1
+                raise TokenError("Token expired")
+        else:
+            self._stats["misses"] += 1
+            try:
+                payload = self.signer.decode(token)
+            except TokenError:
+                self._stats["rejected"] += 1
+                raise
+            self._cache[token] = payload
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+        if payload.get("typ") != token_type:
+            self._stats["rejected"] += 1
+            raise TokenError("Wrong token type")
+        if self.revocations.is_revoked(payload):
+            self._stats["rejected"] += 1
+            raise TokenError("Token revoked")
+        return payload
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Acertos do cache e tokens recusados."""
+        return {**self._stats, "cached": len(self._cache), "revocations": len(self.revocations)}
+
+
+RevocationFetcher = Callable[[float], Awaitable[List[Dict[str, Any]]]]
+
+
+class TokenService:
+    """
+    Emissão, verificação e revogação de tokens com sincronismo das revogações.
+
+    A gravação das revogações no MongoDB é de quem revoga (UserOrchestrator);
+    aqui ficam o estado local e a task que busca, a cada `sync_interval`,
+    as revogações feitas por outros workers (`fetch_revocations(desde)`).
+    """
+
+    def __init__(self, secret: str, access_ttl: float = 7200.0, remember_me_access_ttl: float = 86400.0,
+                 refresh_ttl: float = 30 * 86400.0, cache_size: int = 4096):
+        self.signer = TokenSigner(secret)
+        self.revocations = RevocationSet()
+        self.verifier = TokenVerifier(self.signer, self.revocations, cache_size)
+        self.access_ttl = access_ttl
+        self.remember_me_access_ttl = remember_me_access_ttl
+        self.refresh_ttl = refresh_ttl
+        self._sync_task: Optional[asyncio.Task] = None
+        self._synced_until = 0.0
+
+    @property
+    def max_token_ttl(self) -> float:
+        """Maior validade emitida: por quanto tempo uma revogação precisa existir."""
+        return max(self.access_ttl, self.remember_me_access_ttl, self.refresh_ttl)
+
+    def issue_tokens(self, user_id: str, remember_me: bool = False,
+                     claims: Optional[Dict[str, Any]] = None,
+                     session_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Emite o access token (e o refresh token se `remember_me`) de uma sessão.
+
+        Args:
+            user_id: ID do usuário
+            remember_me: Emite também o refresh token
+            claims: Claims adicionais
+            session_id: Sessão existente (renovação); None abre uma nova
+
+        Returns:
+            dict: access_token, refresh_token (ou None), expires_in e session_id
+        """
+        session_id = session_id or secrets.token_hex(12)
+        claims = {**(claims or {}), "sid": session_id}
+        access_ttl = self.remember_me_access_ttl if remember_me else self.access_ttl
+        access_token, _ = self.signer.issue(user_id, access_ttl, ACCESS_TOKEN, claims)
+        refresh_token = None
+        if remember_me:
+            refresh_token, _ = self.signer.issue(user_id, self.refresh_ttl, REFRESH_TOKEN, claims)
+        return {
+            "access_token": access_token,
+            "refresh_token": refresh_token,
+            "expires_in": int(access_ttl),
+            "session_id": session_id,
+        }
+
+    def verify(self, token: str, token_type: str = ACCESS_TOKEN) -> Dict[str, Any]:
+        """Valida o token localmente (ver `TokenVerifier.verify`)."""
+        return self.verifier.verify(token, token_type)
+
+    def start_sync(self, fetch_revocations: RevocationFetcher, interval: float = 30.0) -> None:
+        """
+        Inicia o sincronismo periódico das revogações.
+
+        Args:
+            fetch_revocations: Corrotina que retorna as revogações criadas desde o instante dado
+            interval: Intervalo entre sincronismos (s)
+        """
+        if self._sync_task is None:
+            self._sync_task = asyncio.create_task(self._sync_loop(fetch_revocations, interval))
+
+    async def sync(self, fetch_revocations: RevocationFetcher) -> int:
+        """
+        Busca e aplica revogações novas.
+
+        A janela recua alguns segundos para cobrir gravações concorrentes;
+        reaplicar uma revogação não tem efeito.
+
+        Returns:
+            int: Registros aplicados
+        """
+        started_at = time.time()
+        records = await fetch_revocations(max(self._synced_until - 5.0, 0.0))
+        applied = self.revocations.load(records)
+        self._synced_until = started_at
+        self.revocations.prune()
+        return applied
+
+    async def _sync_loop(self, fetch_revocations: RevocationFetcher, interval: float) -> None:
+        while True:
+            try:
+                await self.sync(fetch_revocations)
+            except Exception as e:
+                logger.warning(f"Token revocation sync failed: {e}")
+            await asyncio.sleep(interval)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Métricas do verificador e do sincronismo."""
+        return {**self.verifier.get_stats(), "synced_until": self._synced_until}
+
+    async def close(self) -> None:
+        """Para o sincronismo."""
+        if self._sync_task is not None:
+            self._sync_task.cancel()
+            await asyncio.gather(self._sync_task, return_exceptions=True)
+            self._sync_task = None
@@ -31,7 +31,6 @@ import time
 from contextlib import asynccontextmanager
 from typing import Any, Dict, Iterable
 
-import httpx
 from fastapi import FastAPI, HTTPException, Request, status
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
@@ -43,6 +42,7 @@ from fastapi.responses import JSONResponse
 # ──────────────────────────────────────────────────────────────────────────────
 from backend.backend_com.config import Settings, get_cors_config, get_settings
 from backend.backend_com import routers               # routers.__all__ = [...]
+from backend.backend_com.dependencies import close_app_resources, create_app_resources
 from backend.backend_com.utils import (
     configure_structured_logging,
     setup_logger,
@@ -55,25 +55,24 @@ configure_structured_logging()
 logger = setup_logger("backend.main")
 
 app_start_time = time.time()
-http_client: httpx.AsyncClient | None = None
 
 # ╔═══════════════════════════════════════════════════════════════════════════╗
 # ║ Ciclo de vida (startup / shutdown)                                        ║
 # ╚═══════════════════════════════════════════════════════════════════════════╝
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global http_client
     s: Settings = get_settings()
 
     logger.info("🏁 Iniciando %s v%s (%s)", s.app_name, s.app_version, s.environment)
-    http_client = httpx.AsyncClient(timeout=s.backend_bd_timeout)
+    # Gateway, HTTPClient (pool keep-alive) e orquestradores: um por aplicação,
+    # injetados nos handlers via backend_com.dependencies
+    await create_app_resources(app)
 
     try:
         yield
     finally:
         logger.info("🔻 Encerrando serviço %s …", s.app_name)
-        if http_client:
-            await http_client.aclose()
+        await close_app_resources(app)
 
 # ╔═══════════════════════════════════════════════════════════════════════════╗
 # ║ Fábrica da aplicação                                                      ║
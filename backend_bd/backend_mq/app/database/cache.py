@@ -0,0 +1,238 @@
+# app/database/cache.py
+"""
+Cache read-through para leituras de documento único por id.
+
+Por padrão o cache é local ao processo (LRU limitado por tamanho, com TTL).
+Definindo CACHE_REDIS_URL, passa a ser compartilhado entre workers via Redis;
+os documentos são armazenados em BSON para preservar ObjectId e datetime.
+
+As rotas de atualização/exclusão devem chamar `invalidar` explicitamente.
+Uma carga que começou antes de uma invalidação da mesma chave não é gravada
+(senão o documento antigo, lido antes do update, voltaria ao cache até o
+TTL). Esse controle é por processo; com Redis, invalidações feitas por
+outros workers ainda dependem do TTL nessa janela.
+
+Variáveis de ambiente:
+    CACHE_TTL_SEGUNDOS  (padrão 300)
+    CACHE_MAX_ITENS     (padrão 1024, apenas no cache local)
+    CACHE_REDIS_URL     (ex.: redis://localhost:6379/0)
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+import bson
+
+logger = logging.getLogger(__name__)
+
+CACHE_TTL_SEGUNDOS = float(os.getenv("CACHE_TTL_SEGUNDOS", "300"))
+CACHE_MAX_ITENS = int(os.getenv("CACHE_MAX_ITENS", "1024"))
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL")
+
+# Invalidações recentes lembradas para descartar cargas concorrentes
+MAX_INVALIDACOES_RECENTES = 4096
+
+
+class CacheLocal:
+    """LRU com TTL, seguro para as rotas síncronas (executadas em threadpool)."""
+
+    def __init__(self, max_itens: int = CACHE_MAX_ITENS, ttl: float = CACHE_TTL_SEGUNDOS):
+        self.max_itens = max_itens
+        self.ttl = ttl
+        self._itens: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obter(self, chave: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None:
+                return None
+            expira_em, doc = item
+            if expira_em < time.monotonic():
+                del self._itens[chave]
+                return None
+            self._itens.move_to_end(chave)
+            return doc
+
+    def definir(self, chave: str, doc: Dict[str, Any]) -> None:
+        with self._lock:
+            self._itens[chave] = (time.monotonic() + self.ttl, doc)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+
+    def remover(self, chave: str) -> None:
+        with self._lock:
+            self._itens.pop(chave, None)
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._itens.clear()
+
+    def tamanho(self) -> int:
+        return len(self._itens)
+
+
+class CacheRedis:
+    """Cache compartilhado entre processos; expiração delegada ao Redis."""
+
+    PREFIXO = "vlabs:doc:"
+
+    def __init__(self, url: str, ttl: float = CACHE_TTL_SEGUNDOS):
+        import redis
+
+        self.ttl = int(ttl)
+        self._redis = redis.Redis.from_url(url)
+
+    def obter(self, chave: str) -> Optional[Dict[str, Any]]:
+        dados = self._redis.get(self.PREFIXO + chave)
+        return bson.decode(dados) if dados else None
+
+    def definir(self, chave: str, doc: Dict[str, Any]) -> None:
+        self._redis.set(self.PREFIXO + chave, bson.encode(doc), ex=self.ttl)
+
+    def remover(self, chave: str) -> None:
+        self._redis.delete(self.PREFIXO + chave)
+
+    def limpar(self) -> None:
+        for chave in self._redis.scan_iter(self.PREFIXO + "*"):
+            self._redis.delete(chave)
+
+    def tamanho(self) -> int:
+        return sum(1 for _ in self._redis.scan_iter(self.PREFIXO + "*"))
+
+
+def _criar_backend():
+    if CACHE_REDIS_URL:
+        try:
+            backend = CacheRedis(CACHE_REDIS_URL)
+            backend._redis.ping()
+            logger.info("Cache de documentos: Redis (compartilhado)")
+            return backend
+        except Exception as e:
+            logger.warning(f"Redis indisponível ({e}); usando cache local")
+    return CacheLocal()
+
+
+class CacheDocumentos:
+    """Fachada read-through com contadores de acerto/erro."""
+
+    def __init__(self, backend=None):
+        self.backend = backend or _criar_backend()
+        self.hits = 0
+        self.misses = 0
+        self.cargas_descartadas = 0
+        self._lock = threading.Lock()
+        self._sequencia = 0
+        self._invalidacoes: "OrderedDict[str, int]" = OrderedDict()  # chave -> sequência da invalidação
+        self._esquecidas_ate = 0  # maior sequência removida de `_invalidacoes`
+
+    @staticmethod
+    def chave(colecao: str, doc_id: str) -> str:
+        return f"{colecao}:{doc_id}"
+
+    def marca(self) -> int:
+        """Marca tomada antes de ler do banco; ver `armazenar(..., desde=)`."""
+        with self._lock:
+            return self._sequencia
+
+    def _pode_gravar(self, chave: str, desde: int) -> bool:
+        with self._lock:
+            if self._esquecidas_ate > desde:
+                # Não dá para saber se esta chave foi invalidada: não grava
+                return False
+            return self._invalidacoes.get(chave, 0) <= desde
+
+    def _gravar(self, chave: str, doc: Dict[str, Any], desde: Optional[int]) -> None:
+        if desde is not None and not self._pode_gravar(chave, desde):
+            self.cargas_descartadas += 1
+            return
+        try:
+            self.backend.definir(chave, doc)
+        except Exception as e:
+            logger.warning(f"Falha ao gravar cache ({chave}): {e}")
+
+    def obter_ou_carregar(self, colecao: str, doc_id: str,
+                          carregar: Callable[[], Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        """
+        Retorna o documento do cache ou o carrega com `carregar` e armazena.
+
+        Retorna sempre uma cópia rasa, para que o chamador possa alterar
+        o documento (ex.: trocar `_id` por `id`) sem corromper o cache.
+        Documentos inexistentes não são armazenados.
+        """
+        chave = self.chave(colecao, doc_id)
+        try:
+            doc = self.backend.obter(chave)
+        except Exception as e:
+            logger.warning(f"Falha ao ler cache ({chave}): {e}")
+            doc = None
+
+        if doc is not None:
+            self.hits += 1
+            return dict(doc)
+
+        self.misses += 1
+        desde = self.marca()
+        doc = carregar()
+        if doc is not None:
+            self._gravar(chave, doc, desde)
+            return dict(doc)
+        return None
+
+    def obter_varios(self, colecao: str, doc_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Retorna cópias dos documentos já em cache (apenas os acertos)."""
+        encontrados = {}
+        for doc_id in doc_ids:
+            chave = self.chave(colecao, doc_id)
+            try:
+                doc = self.backend.obter(chave)
+            except Exception as e:
+                logger.warning(f"Falha ao ler cache ({chave}): {e}")
+                doc = None
+            if doc is not None:
+                encontrados[doc_id] = dict(doc)
+        self.hits += len(encontrados)
+        self.misses += len(doc_ids) - len(encontrados)
+        return encontrados
+
+    def armazenar(self, colecao: str, doc_id: str, doc: Dict[str, Any], desde: Optional[int] = None) -> None:
+        """
+        Grava um documento carregado fora de `obter_ou_carregar` (ex.: em lote).
+
+        Com `desde` (valor de `marca()` tomado antes da leitura), a gravação é
+        ignorada se a chave foi invalidada durante a leitura.
+        """
+        self._gravar(self.chave(colecao, doc_id), doc, desde)
+
+    def invalidar(self, colecao: str, doc_id: str) -> None:
+        chave = self.chave(colecao, str(doc_id))
+        with self._lock:
+            self._sequencia += 1
+            self._invalidacoes[chave] = self._sequencia
+            self._invalidacoes.move_to_end(chave)
+            while len(self._invalidacoes) > MAX_INVALIDACOES_RECENTES:
+                _, sequencia = self._invalidacoes.popitem(last=False)
+                self._esquecidas_ate = max(self._esquecidas_ate, sequencia)
+        try:
+            self.backend.remover(chave)
+        except Exception as e:
+            logger.warning(f"Falha ao invalidar cache ({chave}): {e}")
+
+    def estatisticas(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "itens": self.backend.tamanho(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "cargas_descartadas": self.cargas_descartadas,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+
+cache_documentos = CacheDocumentos()
@@ -54,6 +54,9 @@ except Exception as e:
 
 # === Compatibilidade com routers ===
 from typing import Optional, Dict, Any, List
+import re
+
+_CAMPO_VALIDO = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z0-9_]+)*$")
 
 # Coleção de conversas (segue o padrão das demais coleções no módulo)
 try:
@@ -70,12 +73,182 @@ def salvar_interacao(dados: Dict[str, Any]):
     res = db.interacoes.insert_one(dados)
     return res.inserted_id
 
-def obter_interacoes(filtro: Optional[Dict[str, Any]] = None, limite: int = 100) -> List[Dict[str, Any]]:
+def obter_interacoes(filtro: Optional[Dict[str, Any]] = None, limite: int = 100,
+                     id_como_string: bool = False,
+                     projecao: Optional[Dict[str, int]] = None) -> List[Dict[str, Any]]:
     """
     Retorna lista de interações de acordo com o filtro (opcional).
+
+    Com `id_como_string=True`, o próprio MongoDB substitui `_id` por `id`
+    (string), e os documentos podem ir direto para a resposta sem cópia.
+    `projecao` (ver `projecao_de_campos`) limita os campos lidos.
     """
     if db is None:
         raise RuntimeError("MongoDB não inicializado")
     filtro = filtro or {}
-    cur = db.interacoes.find(filtro).limit(limite)
+    if id_como_string:
+        pipeline = [{"$match": filtro}, {"$limit": limite}]
+        if projecao:
+            pipeline.append({"$project": projecao})
+        pipeline += [
+            {"$set": {"id": {"$toString": "$_id"}}},
+            {"$unset": "_id"},
+        ]
+        return list(db.interacoes.aggregate(pipeline, **opcoes_agregacao()))
+    cur = db.interacoes.find(filtro, projecao, max_time_ms=max_time_ms()).limit(limite)
     return list(cur)
+
+def projecao_de_campos(campos: Optional[str]) -> Optional[Dict[str, int]]:
+    """
+    Converte o parâmetro `fields` ("a,b,c.d") em projeção do MongoDB.
+
+    `id` é tratado como `_id`, que é sempre incluído. Caminhos cobertos por um
+    campo pai são descartados (o MongoDB rejeita "a" junto com "a.b").
+
+    Raises:
+        ValueError: Se algum nome de campo for inválido
+    """
+    if not campos:
+        return None
+    nomes = set()
+    for nome in (c.strip() for c in campos.split(",")):
+        if not nome:
+            continue
+        if not _CAMPO_VALIDO.match(nome):
+            raise ValueError(f"Campo inválido: {nome}")
+        nomes.add("_id" if nome == "id" else nome)
+    nomes = {n for n in nomes if not any(n.startswith(p + ".") for p in nomes)}
+    if not nomes:
+        return None
+    return {"_id": 1, **{n: 1 for n in sorted(nomes)}}
+
+def buscar_interacao_por_id(interacao_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Retorna uma interação pelo ObjectId (string) ou None (via cache).
+    """
+    return buscar_documento_por_id("interacoes", interacao_id)
+
+def excluir_interacao_por_id(interacao_id: str) -> bool:
+    """
+    Remove uma interação e invalida o cache. Retorna True se removida.
+    """
+    return excluir_documento_por_id("interacoes", interacao_id)
+
+
+# === Leitura por id com cache (read-through) ===
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+from app.database.cache import cache_documentos
+from app.etag import CAMPOS_VERSAO
+from app.prazo import max_time_ms, opcoes_agregacao
+
+def filtro_por_id(doc_id: str) -> Dict[str, Any]:
+    """Filtro por `_id`, aceitando ObjectId (hex) ou ids string."""
+    return {"_id": ObjectId(doc_id) if ObjectId.is_valid(doc_id) else doc_id}
+
+def buscar_documento_por_id(colecao: str, doc_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Busca um documento por id passando pelo cache de documentos.
+
+    O documento retornado é uma cópia e pode ser alterado pelo chamador.
+    Atualizações e exclusões devem chamar `invalidar_documento`.
+    """
+    if db is None:
+        raise RuntimeError("MongoDB não inicializado")
+    return cache_documentos.obter_ou_carregar(
+        colecao, doc_id, lambda: db[colecao].find_one(filtro_por_id(doc_id), max_time_ms=max_time_ms())
+    )
+
+def buscar_documentos_por_ids(colecao: str, doc_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Busca vários documentos por id: acertos vêm do cache e os demais de um
+    único `find` com `$in`, que também alimenta o cache.
+
+    Returns:
+        Dict id -> documento (ids inexistentes ficam de fora)
+    """
+    if db is None:
+        raise RuntimeError("MongoDB não inicializado")
+    ids = list(dict.fromkeys(str(i) for i in doc_ids))
+    encontrados = cache_documentos.obter_varios(colecao, ids)
+    faltantes = [i for i in ids if i not in encontrados]
+    if faltantes:
+        desde = cache_documentos.marca()
+        valores = [filtro_por_id(i)["_id"] for i in faltantes]
+        for doc in db[colecao].find({"_id": {"$in": valores}}, max_time_ms=max_time_ms()):
+            doc_id = str(doc["_id"])
+            cache_documentos.armazenar(colecao, doc_id, doc, desde=desde)
+            encontrados[doc_id] = dict(doc)
+    return encontrados
+
+def resumo_de_versoes(colecao: str, filtro: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Resumo dos documentos selecionados por `filtro` em uma única agregação:
+    `total`, `max_id` e, para cada campo de `CAMPOS_VERSAO`, o máximo (a soma
+    para `versao`, que é um contador por documento). Base de `etag_de_lista`.
+    """
+    if db is None:
+        raise RuntimeError("MongoDB não inicializado")
+    grupo: Dict[str, Any] = {"_id": None, "total": {"$sum": 1}, "max_id": {"$max": "$_id"}}
+    for campo in CAMPOS_VERSAO:
+        grupo[campo] = {"$sum" if campo == "versao" else "$max": f"${campo}"}
+    resultado = list(db[colecao].aggregate([{"$match": filtro}, {"$group": grupo}], **opcoes_agregacao()))
+    if not resultado:
+        return {"total": 0}
+    resumo = resultado[0]
+    resumo.pop("_id", None)
+    if resumo.get("versao") == 0:
+        # `$sum` de um campo ausente em todos os documentos
+        resumo["versao"] = None
+    return resumo
+
+def invalidar_documento(colecao: str, doc_id: str) -> None:
+    """Remove o documento do cache (chamar após update/delete)."""
+    cache_documentos.invalidar(colecao, doc_id)
+
+def com_versao(operadores: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Acrescenta `$inc: {versao: 1}` aos operadores de uma atualização.
+
+    Toda escrita do servidor muda a versão do documento, então os ETags
+    (app/etag.py) mudam sem depender de o chamador enviar `updated_at`.
+    Se a própria atualização já mexe em `versao`, ela é mantida como está.
+    """
+    for campos in operadores.values():
+        if isinstance(campos, dict) and any(c == "versao" or c.startswith("versao.") for c in campos):
+            return operadores
+    return {**operadores, "$inc": {**operadores.get("$inc", {}), "versao": 1}}
+
+def atualizar_documento_por_id(colecao: str, doc_id: str, dados: Dict[str, Any]):
+    """Aplica `$set` no documento (incrementando `versao`) e invalida o cache. Retorna o UpdateResult."""
+    if db is None:
+        raise RuntimeError("MongoDB não inicializado")
+    resultado = db[colecao].update_one(filtro_por_id(doc_id), com_versao({"$set": dados}))
+    invalidar_documento(colecao, doc_id)
+    return resultado
+
+def aplicar_operadores_por_id(colecao: str, doc_id: str, operadores: Dict[str, Any],
+                              upsert: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    Aplica operadores de atualização (`$inc`, `$set`, `$push`) em uma única
+    operação atômica no servidor (incrementando `versao`) e invalida o cache.
+
+    Retorna o documento já atualizado, ou None se não existir (sem `upsert`).
+    """
+    if db is None:
+        raise RuntimeError("MongoDB não inicializado")
+    documento = db[colecao].find_one_and_update(
+        filtro_por_id(doc_id), com_versao(operadores),
+        upsert=upsert, return_document=ReturnDocument.AFTER
+    )
+    invalidar_documento(colecao, doc_id)
+    return documento
+
+def excluir_documento_por_id(colecao: str, doc_id: str) -> bool:
+    """Remove o documento e invalida o cache. Retorna True se removido."""
+    if db is None:
+        raise RuntimeError("MongoDB não inicializado")
+    resultado = db[colecao].delete_one(filtro_por_id(doc_id))
+    invalidar_documento(colecao, doc_id)
+    return resultado.deleted_count > 0
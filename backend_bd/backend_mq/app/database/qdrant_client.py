@@ -1,9 +1,14 @@
 import os
 import logging
+from typing import Optional
 from dotenv import load_dotenv
 from qdrant_client import QdrantClient
 from qdrant_client.http.exceptions import UnexpectedResponse
-from qdrant_client.http.models import PointStruct, VectorParams, Distance
+from qdrant_client.http.models import (
+    Distance, FieldCondition, Filter, MatchValue, PointIdsList, PointStruct, VectorParams
+)
+
+from app.prazo import timeout_qdrant, verificar_prazo
 
 # =============================================================================
 # Configuração
@@ -61,14 +66,22 @@ def garantir_colecao():
 # Funções de indexação e busca
 # =============================================================================
 
-def indexar_documento(doc_id: str, vetor: list[float], payload: dict):
+def indexar_documento(colecao: str, doc_id: str, vetor: list[float], payload: dict):
     """
     Indexa um documento (ponto) na coleção Qdrant.
+
+    Todas as coleções de origem dividem `QDRANT_COLLECTION`; a origem vai no
+    payload (`colecao`) e o id do ponto é o mesmo do vector_sync_worker, de
+    modo que os dois caminhos de indexação se sobrescrevem em vez de duplicar.
     """
+    from app.services.vector_sync_worker import ponto_id
+
+    verificar_prazo("qdrant")
+    payload = {**payload, "mongo_id": str(doc_id), "colecao": colecao}
     try:
         qdrant.upsert(
             collection_name=QDRANT_COLLECTION,
-            points=[PointStruct(id=doc_id, vector=vetor, payload=payload)]
+            points=[PointStruct(id=ponto_id(doc_id), vector=vetor, payload=payload)]
         )
         logger.info(f"Documento {doc_id} indexado na coleção {QDRANT_COLLECTION}.")
     except UnexpectedResponse as e:
@@ -78,20 +91,45 @@ def indexar_documento(doc_id: str, vetor: list[float], payload: dict):
         logger.error(f"Erro inesperado ao indexar documento {doc_id}: {e}")
         raise
 
-def buscar_por_texto(vetor: list[float], limit: int = 5):
+def remover_documento(doc_id: str):
+    """Remove o ponto de um documento (mesmo id de `indexar_documento`)."""
+    from app.services.vector_sync_worker import ponto_id
+
+    verificar_prazo("qdrant")
+    qdrant.delete(
+        collection_name=QDRANT_COLLECTION,
+        points_selector=PointIdsList(points=[ponto_id(doc_id)])
+    )
+    logger.info(f"Documento {doc_id} removido da coleção {QDRANT_COLLECTION}.")
+
+def buscar_por_texto(colecao: Optional[str], vetor: list[float], limit: int = 5,
+                     filtros: Optional[dict] = None, score_minimo: Optional[float] = None):
     """
     Realiza busca por similaridade com base em vetor.
+    `colecao` restringe aos pontos de uma coleção de origem (None para todas);
+    `filtros` exige igualdade nos demais campos do payload.
+    O timeout segue o prazo da requisição, se houver.
     """
+    timeout = timeout_qdrant()
+    condicoes = [
+        FieldCondition(key=campo, match=MatchValue(value=valor))
+        for campo, valor in {**(filtros or {}), **({"colecao": colecao} if colecao else {})}.items()
+    ]
+    filtro = Filter(must=condicoes) if condicoes else None
     try:
         resultados = qdrant.search(
             collection_name=QDRANT_COLLECTION,
             query_vector=vetor,
+            query_filter=filtro,
             limit=limit,
-            with_payload=True
+            score_threshold=score_minimo,
+            with_payload=True,
+            timeout=timeout
         )
         return [
             {
                 "id": r.id,
+                "mongo_id": r.payload.get("mongo_id"),
                 "score": r.score,
                 "texto": r.payload.get("texto"),
                 "categoria": r.payload.get("categoria")
@@ -0,0 +1,139 @@
+# app/etag.py
+"""
+GET condicional (ETag / If-None-Match) para as rotas de leitura.
+
+`ETagMiddleware` atua sobre respostas GET/HEAD 200 em JSON:
+  - se a rota já definiu um `ETag` (derivado da versão do documento, ver
+    `etag_de_documento`, ou do resumo de versões de uma consulta, ver
+    `etag_de_lista`), ele é usado;
+  - caso contrário o ETag é o hash do corpo serializado.
+Quando o `If-None-Match` do cliente coincide, responde 304 sem corpo.
+
+Nas rotas que derivam o ETag, o 304 sai antes de a consulta ser executada
+e o corpo serializado; o hash do corpo fica para as demais rotas, onde o
+ganho está só em não retransmitir (nem re-decodificar no cliente).
+"""
+
+import hashlib
+from typing import Any, Dict, Iterable, Optional
+
+# Campos que indicam a versão/última modificação de um documento, em ordem de preferência
+CAMPOS_VERSAO = ("versao", "updated_at", "atualizado_em", "data_ultima_interacao")
+
+# Clientes podem guardar a resposta, mas devem revalidar antes de reutilizá-la
+CACHE_CONTROL = "private, no-cache"
+
+
+def _hash(dados: bytes) -> str:
+    return '"' + hashlib.blake2b(dados, digest_size=16).hexdigest() + '"'
+
+
+def etag_de_documento(colecao: str, documento: Dict[str, Any], variante: str = "") -> Optional[str]:
+    """
+    ETag derivado da versão do documento, sem serializar o corpo.
+
+    `variante` distingue representações do mesmo documento (ex.: projeção
+    de `fields`). Retorna None se o documento não tiver campo de versão.
+    """
+    for campo in CAMPOS_VERSAO:
+        valor = documento.get(campo)
+        if valor is not None:
+            chave = f"{colecao}:{documento.get('_id')}:{campo}={valor}:{variante}"
+            return _hash(chave.encode("utf-8"))
+    return None
+
+
+def etag_de_lista(colecao: str, resumo: Dict[str, Any], variante: str = "") -> Optional[str]:
+    """
+    ETag de uma consulta derivado do resumo de versões dos documentos que ela
+    seleciona (ver `resumo_de_versoes` em app/database/mongo.py): total,
+    maior `_id` e o máximo (ou a soma, para `versao`) dos campos de versão.
+
+    Inserções e exclusões mudam o total/maior `_id`; atualizações mudam
+    `versao` (as escritas do servidor passam por `com_versao`). `variante`
+    distingue filtro, ordenação, página e projeção. Retorna None se nenhum
+    documento selecionado tiver campo de versão.
+    """
+    if resumo.get("total") and all(resumo.get(campo) is None for campo in CAMPOS_VERSAO):
+        return None
+    partes = [f"{campo}={resumo.get(campo)!r}" for campo in ("total", "max_id", *CAMPOS_VERSAO)]
+    chave = f"{colecao}:lista:{':'.join(partes)}:{variante}"
+    return _hash(chave.encode("utf-8"))
+
+
+def etag_corresponde(if_none_match: Optional[str], etag: str) -> bool:
+    """Compara `If-None-Match` com o ETag (comparação fraca, aceita lista e `*`)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    alvo = etag[2:] if etag.startswith("W/") else etag
+    for candidato in if_none_match.split(","):
+        candidato = candidato.strip()
+        if candidato.startswith("W/"):
+            candidato = candidato[2:]
+        if candidato == alvo:
+            return True
+    return False
+
+
+def _header(headers: Iterable, nome: bytes) -> Optional[str]:
+    for chave, valor in headers:
+        if chave.lower() == nome:
+            return valor.decode("latin-1")
+    return None
+
+
+class ETagMiddleware:
+    """Middleware ASGI que adiciona ETag e responde 304 a GETs condicionais."""
+
+    def __init__(self, app, cache_control: str = CACHE_CONTROL):
+        self.app = app
+        self.cache_control = cache_control
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = _header(scope["headers"], b"if-none-match")
+        inicio: Dict[str, Any] = {}
+        partes = []
+
+        async def enviar(mensagem):
+            if mensagem["type"] == "http.response.start":
+                tipo = _header(mensagem.get("headers", []), b"content-type") or ""
+                if mensagem["status"] != 200 or "application/json" not in tipo:
+                    inicio["passthrough"] = True
+                    await send(mensagem)
+                    return
+                inicio.update(mensagem)
+                return
+
+            if inicio.get("passthrough"):
+                await send(mensagem)
+                return
+
+            partes.append(mensagem.get("body", b""))
+            if mensagem.get("more_body", False):
+                return
+
+            corpo = b"".join(partes)
+            headers = [
+                (k, v) for k, v in inicio.get("headers", [])
+                if k.lower() not in (b"content-length", b"etag", b"cache-control")
+            ]
+            etag = _header(inicio.get("headers", []), b"etag") or _hash(corpo)
+            headers.append((b"etag", etag.encode("latin-1")))
+            headers.append((b"cache-control", self.cache_control.encode("latin-1")))
+
+            if etag_corresponde(if_none_match, etag):
+                await send({"type": "http.response.start", "status": 304, "headers": headers})
+                await send({"type": "http.response.body", "body": b""})
+                return
+
+            headers.append((b"content-length", str(len(corpo)).encode("latin-1")))
+            await send({"type": "http.response.start", "status": 200, "headers": headers})
+            await send({"type": "http.response.body", "body": corpo})
+
+        await self.app(scope, receive, enviar)
@@ -0,0 +1,261 @@
+# app/idempotencia.py
+"""
+Deduplicação de escritas pelo header `Idempotency-Key`.
+
+O gateway (backend_com/gateways/http_client.py) só repete um POST após
+falha se ele levar `Idempotency-Key`; este middleware garante que a
+repetição não crie um segundo documento:
+
+  - primeira requisição com a chave: registra `processando`, executa a rota
+    e guarda status + corpo da resposta;
+  - repetição com o mesmo método, caminho, query string e corpo: devolve a
+    resposta guardada (header `Idempotent-Replayed: true`) sem executar a
+    rota;
+  - repetição enquanto a original ainda executa: 409 com
+    `Idempotency-Status: in-progress` e `Retry-After` (o gateway espera e
+    repete dentro do prazo);
+  - mesma chave com outra requisição: 422.
+
+Respostas 5xx não são guardadas, e a chave também é liberada se a rota
+levantar exceção ou for cancelada (cliente desconectou). Se o processo cair
+no meio da requisição, o registro `processando` fica órfão: passado
+`IDEMPOTENCIA_LEASE_SEGUNDOS`, uma nova requisição pode reservá-lo. Cada
+reserva tem um token próprio, e só o dono da reserva grava ou libera a chave.
+As chaves expiram após `IDEMPOTENCIA_TTL_SEGUNDOS` (índice TTL do MongoDB).
+"""
+
+import hashlib
+import json
+import logging
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+import anyio
+from pymongo.errors import DuplicateKeyError
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCIA_TTL_SEGUNDOS = int(os.getenv("IDEMPOTENCIA_TTL_SEGUNDOS", "86400"))
+# Tempo máximo em `processando` antes de a chave poder ser reservada de novo
+IDEMPOTENCIA_LEASE_SEGUNDOS = int(os.getenv("IDEMPOTENCIA_LEASE_SEGUNDOS", "120"))
+COLECAO_IDEMPOTENCIA = "idempotency_keys"
+METODOS_ESCRITA = ("POST", "PUT", "PATCH", "DELETE")
+MAX_TAMANHO_CHAVE = 255
+# Chave que expira ou é liberada entre o insert e a leitura é reservada de novo
+TENTATIVAS_RESERVA = 3
+
+
+def _header(headers, nome: bytes) -> Optional[str]:
+    for chave, valor in headers:
+        if chave.lower() == nome:
+            return valor.decode("latin-1")
+    return None
+
+
+def _como_utc(instante: datetime) -> datetime:
+    """Datas lidas do MongoDB vêm sem fuso (UTC implícito)."""
+    return instante if instante.tzinfo else instante.replace(tzinfo=timezone.utc)
+
+
+def _resposta_json(status: int, dados: Dict[str, Any], headers: Optional[List] = None) -> Dict[str, Any]:
+    return {
+        "status": status,
+        "headers": [(b"content-type", b"application/json")] + (headers or []),
+        "body": json.dumps(dados, ensure_ascii=False).encode("utf-8"),
+    }
+
+
+class IdempotencyMiddleware:
+    """Middleware ASGI que deduplica escritas com `Idempotency-Key`."""
+
+    def __init__(self, app, ttl_segundos: int = IDEMPOTENCIA_TTL_SEGUNDOS,
+                 lease_segundos: int = IDEMPOTENCIA_LEASE_SEGUNDOS):
+        self.app = app
+        self.ttl_segundos = ttl_segundos
+        self.lease_segundos = lease_segundos
+        self._indice_criado = False
+
+    def _colecao(self):
+        from app.database.mongo import db
+        if db is None:
+            return None
+        colecao = db[COLECAO_IDEMPOTENCIA]
+        if not self._indice_criado:
+            colecao.create_index("criado_em", expireAfterSeconds=self.ttl_segundos)
+            self._indice_criado = True
+        return colecao
+
+    def _reservar(self, chave: str, registro: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Reserva a chave; retorna o registro existente se ela já foi usada.
+
+        Registro `processando` com lease vencido (processo que caiu no meio da
+        requisição) é substituído pela nova reserva, comparando o token da
+        reserva antiga para que só uma requisição o assuma.
+        """
+        colecao = self._colecao()
+        if colecao is None:
+            return None
+        for _ in range(TENTATIVAS_RESERVA):
+            try:
+                colecao.insert_one({"_id": chave, **registro})
+                return None
+            except DuplicateKeyError:
+                existente = colecao.find_one({"_id": chave})
+                if existente is None:
+                    # Expirou (TTL) ou foi liberada após um 5xx: tenta reservar de novo
+                    continue
+                if not self._lease_vencido(existente):
+                    return existente
+                assumido = colecao.find_one_and_replace(
+                    {"_id": chave, "estado": "processando", "reserva": existente.get("reserva")},
+                    registro,
+                )
+                if assumido is not None:
+                    logger.warning(f"Idempotency-Key '{chave}' reservada de novo após lease vencido")
+                    return None
+        # Outra requisição reserva e libera a chave sem parar: trata como em andamento
+        return {**registro, "estado": "processando"}
+
+    def _lease_vencido(self, existente: Dict[str, Any]) -> bool:
+        if existente.get("estado") != "processando" or not isinstance(existente.get("criado_em"), datetime):
+            return False
+        limite = datetime.now(timezone.utc) - timedelta(seconds=self.lease_segundos)
+        return _como_utc(existente["criado_em"]) < limite
+
+    def _concluir(self, chave: str, reserva: str, status: int, content_type: Optional[str],
+                  corpo: bytes) -> None:
+        colecao = self._colecao()
+        if colecao is None:
+            return
+        if status >= 500:
+            colecao.delete_one({"_id": chave, "reserva": reserva})
+            return
+        colecao.update_one({"_id": chave, "reserva": reserva}, {"$set": {
+            "estado": "concluido",
+            "status": status,
+            "content_type": content_type,
+            "corpo": corpo,
+        }})
+
+    def _liberar(self, chave: str, reserva: str) -> None:
+        colecao = self._colecao()
+        if colecao is not None:
+            colecao.delete_one({"_id": chave, "reserva": reserva})
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in METODOS_ESCRITA:
+            await self.app(scope, receive, send)
+            return
+
+        chave = _header(scope["headers"], b"idempotency-key")
+        if not chave:
+            await self.app(scope, receive, send)
+            return
+
+        if len(chave) > MAX_TAMANHO_CHAVE:
+            await self._enviar(send, _resposta_json(400, {"detail": "Idempotency-Key muito longa"}))
+            return
+
+        # Lê o corpo inteiro para compará-lo com o da requisição original
+        partes: List[bytes] = []
+        while True:
+            mensagem = await receive()
+            if mensagem["type"] != "http.request":
+                break
+            partes.append(mensagem.get("body", b""))
+            if not mensagem.get("more_body", False):
+                break
+        corpo_requisicao = b"".join(partes)
+
+        registro = {
+            "estado": "processando",
+            "metodo": scope["method"],
+            "caminho": scope["path"],
+            "consulta": scope.get("query_string", b"").decode("latin-1"),
+            "hash_corpo": hashlib.blake2b(corpo_requisicao, digest_size=16).hexdigest(),
+            "criado_em": datetime.now(timezone.utc),
+            "reserva": uuid.uuid4().hex,
+        }
+        try:
+            existente = await run_in_threadpool(self._reservar, chave, registro)
+        except Exception as e:
+            # Falha no armazenamento de chaves não deve bloquear a escrita
+            logger.warning(f"Idempotência indisponível, seguindo sem deduplicação: {e}")
+            existente = None
+            chave = None
+
+        if existente is not None:
+            await self._enviar(send, self._resposta_existente(existente, registro))
+            return
+
+        enviado = False
+
+        async def receber():
+            nonlocal enviado
+            if not enviado:
+                enviado = True
+                return {"type": "http.request", "body": corpo_requisicao, "more_body": False}
+            return await receive()
+
+        if chave is None:
+            await self.app(scope, receber, send)
+            return
+
+        inicio: Dict[str, Any] = {}
+        corpo_resposta: List[bytes] = []
+
+        async def enviar(mensagem):
+            if mensagem["type"] == "http.response.start":
+                inicio.update(mensagem)
+            elif mensagem["type"] == "http.response.body":
+                corpo_resposta.append(mensagem.get("body", b""))
+            await send(mensagem)
+
+        try:
+            await self.app(scope, receber, enviar)
+        except BaseException:
+            # Inclui CancelledError: a chave não pode ficar presa em `processando`.
+            # Blindado porque o escopo já cancelado cancelaria também a liberação.
+            with anyio.CancelScope(shield=True):
+                try:
+                    await run_in_threadpool(self._liberar, chave, registro["reserva"])
+                except Exception as e:
+                    logger.warning(f"Falha ao liberar Idempotency-Key '{chave}': {e}")
+            raise
+
+        status = inicio.get("status", 500)
+        content_type = _header(inicio.get("headers", []), b"content-type")
+        try:
+            await run_in_threadpool(self._concluir, chave, registro["reserva"], status, content_type,
+                                    b"".join(corpo_resposta))
+        except Exception as e:
+            logger.warning(f"Falha ao registrar resposta idempotente '{chave}': {e}")
+
+    @staticmethod
+    def _resposta_existente(existente: Dict[str, Any], registro: Dict[str, Any]) -> Dict[str, Any]:
+        mesma_requisicao = all(
+            existente.get(campo) == registro[campo] for campo in ("metodo", "caminho", "consulta", "hash_corpo")
+        )
+        if not mesma_requisicao:
+            return _resposta_json(422, {"detail": "Idempotency-Key já usada com outra requisição"})
+        if existente.get("estado") != "concluido":
+            return _resposta_json(
+                409, {"detail": "Requisição com esta Idempotency-Key ainda em processamento"},
+                headers=[(b"idempotency-status", b"in-progress"), (b"retry-after", b"1")]
+            )
+
+        headers = [(b"idempotent-replayed", b"true")]
+        if existente.get("content_type"):
+            headers.append((b"content-type", existente["content_type"].encode("latin-1")))
+        return {"status": existente["status"], "headers": headers, "body": bytes(existente.get("corpo") or b"")}
+
+    @staticmethod
+    async def _enviar(send, resposta: Dict[str, Any]) -> None:
+        corpo = resposta["body"]
+        headers = resposta["headers"] + [(b"content-length", str(len(corpo)).encode("latin-1"))]
+        await send({"type": "http.response.start", "status": resposta["status"], "headers": headers})
+        await send({"type": "http.response.body", "body": corpo})
@@ -1,6 +1,12 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 import logging
+from app.responses import BSONJSONResponse
+from app.database.cache import cache_documentos
+from app.etag import ETagMiddleware
+from app.idempotencia import IdempotencyMiddleware
+from app.prazo import PrazoExcedido, PrazoMiddleware
+from pymongo.errors import ExecutionTimeout
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
@@ -14,7 +20,8 @@ app = FastAPI(
     contact={
         "name": "Equipe V-LABS",
         "email": "contato@vlabs.ai"
-    }
+    },
+    default_response_class=BSONJSONResponse
 )
 
 # Configurar CORS
@@ -24,8 +31,26 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Idempotent-Replayed"],
 )
 
+# ETag + 304 para GETs condicionais (listas e documentos)
+app.add_middleware(ETagMiddleware)
+
+# Escritas repetidas com o mesmo Idempotency-Key devolvem a resposta original
+app.add_middleware(IdempotencyMiddleware)
+
+# Prazo do gateway (X-Request-Deadline-Ms) -> maxTimeMS / timeout do Qdrant
+app.add_middleware(PrazoMiddleware)
+
+
+@app.exception_handler(PrazoExcedido)
+@app.exception_handler(ExecutionTimeout)
+async def prazo_esgotado(request: Request, exc: Exception):
+    """Consulta interrompida pelo prazo: o chamador já não espera a resposta."""
+    logger.warning(f"Prazo esgotado em {request.url.path}: {exc}")
+    return BSONJSONResponse({"detail": "Prazo da requisição esgotado"}, status_code=504)
+
 # Lista para rastrear routers carregados
 routers_loaded = []
 routers_failed = []
@@ -54,6 +79,15 @@ def load_router(router_name, prefix, tags):
         elif router_name == "interacoes":
             from app.routers import interacoes
             app.include_router(interacoes.router, prefix=prefix, tags=tags)
+        elif router_name == "estatisticas":
+            from app.routers import estatisticas
+            app.include_router(estatisticas.router, prefix=prefix, tags=tags)
+        elif router_name == "mongodb":
+            from app.routers import mongodb
+            app.include_router(mongodb.router, prefix=prefix, tags=tags)
+        elif router_name == "qdrant":
+            from app.routers import qdrant
+            app.include_router(qdrant.router, prefix=prefix, tags=tags)
         
         routers_loaded.append(router_name)
         logger.info(f"✅ Router {router_name} carregado com sucesso")
@@ -72,7 +106,10 @@ routers_config = [
     ("embeddings", "/api/embeddings", ["embeddings"]),
     ("avaliacoes", "/api/avaliacoes", ["avaliacoes"]),
     ("logs", "/api/logs", ["logs"]),
-    ("interacoes", "/api/interacoes", ["interacoes"])
+    ("interacoes", "/api/interacoes", ["interacoes"]),
+    ("estatisticas", "/api/estatisticas", ["estatisticas"]),
+    ("mongodb", "/mongodb", ["mongodb"]),
+    ("qdrant", "/qdrant", ["qdrant"])
 ]
 
 # Carregar todos os routers
@@ -106,7 +143,8 @@ def health_check():
         "services": {
             "database": "connected",
             "api": "running"
-        }
+        },
+        "cache": cache_documentos.estatisticas()
     }
 
 @app.get("/routers", tags=["debug"])
@@ -0,0 +1,132 @@
+# app/prazo.py
+"""
+Prazo da requisição informado pelo gateway (header `X-Request-Deadline-Ms`).
+
+O header traz os milissegundos que o chamador ainda vai esperar. O
+`PrazoMiddleware` o converte em um instante absoluto (relógio monotônico)
+guardado em uma ContextVar, visível também nas rotas síncronas executadas no
+threadpool. A partir dele:
+  - `max_time_ms()` vira `maxTimeMS` das consultas ao MongoDB
+    (`opcoes_agregacao()` nas agregações);
+  - `timeout_qdrant()` vira o `timeout` das buscas no Qdrant;
+  - `verificar_prazo()` interrompe cedo trabalho caro (ex.: embeddings)
+    quando o chamador já desistiu.
+
+Prazo esgotado responde 504 (`PrazoExcedido` / `ExecutionTimeout`).
+"""
+
+import math
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+CABECALHO_PRAZO = b"x-request-deadline-ms"
+
+# Folga para a resposta voltar ao gateway antes de ele desistir
+MARGEM_MS = 50
+
+_prazo: ContextVar[Optional[float]] = ContextVar("prazo_requisicao", default=None)
+
+
+class PrazoExcedido(Exception):
+    """O chamador não espera mais pela resposta."""
+
+    def __init__(self, etapa: str = ""):
+        super().__init__(f"Prazo da requisição esgotado{f' ({etapa})' if etapa else ''}")
+        self.etapa = etapa
+
+
+def tempo_restante_ms() -> Optional[float]:
+    """Milissegundos até o prazo (None se a requisição não tiver prazo)."""
+    prazo = _prazo.get()
+    if prazo is None:
+        return None
+    return (prazo - time.monotonic()) * 1000
+
+
+def verificar_prazo(etapa: str = "") -> None:
+    """Levanta `PrazoExcedido` se o prazo já passou."""
+    restante = tempo_restante_ms()
+    if restante is not None and restante <= 0:
+        raise PrazoExcedido(etapa)
+
+
+def max_time_ms(padrao: Optional[int] = None) -> Optional[int]:
+    """
+    Valor para `maxTimeMS` do MongoDB.
+
+    Args:
+        padrao: Limite usado quando a requisição não tem prazo
+
+    Returns:
+        int: Milissegundos (mínimo 1), ou `padrao`
+
+    Raises:
+        PrazoExcedido: Se o prazo já passou
+    """
+    restante = tempo_restante_ms()
+    if restante is None:
+        return padrao
+    verificar_prazo("mongodb")
+    return max(int(restante), 1)
+
+
+def opcoes_agregacao() -> Dict[str, int]:
+    """Opções de `aggregate` com o `maxTimeMS` do prazo (vazio se não houver prazo)."""
+    limite_ms = max_time_ms()
+    return {"maxTimeMS": limite_ms} if limite_ms is not None else {}
+
+
+def timeout_qdrant(padrao: Optional[int] = None) -> Optional[int]:
+    """Timeout (segundos inteiros, mínimo 1) para chamadas ao Qdrant."""
+    restante = tempo_restante_ms()
+    if restante is None:
+        return padrao
+    verificar_prazo("qdrant")
+    return max(math.ceil(restante / 1000), 1)
+
+
+class PrazoMiddleware:
+    """Middleware ASGI que lê o prazo do gateway e rejeita requisições já expiradas."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        valor = None
+        for chave, conteudo in scope["headers"]:
+            if chave.lower() == CABECALHO_PRAZO:
+                valor = conteudo
+                break
+
+        try:
+            restante_ms = float(valor) if valor is not None else None
+        except ValueError:
+            restante_ms = None
+        if restante_ms is not None and not math.isfinite(restante_ms):
+            # "nan"/"inf" passam pelo float() mas quebrariam o maxTimeMS: tratados como inválidos
+            restante_ms = None
+
+        if restante_ms is None:
+            await self.app(scope, receive, send)
+            return
+
+        restante_ms -= MARGEM_MS
+        if restante_ms <= 0:
+            corpo = b'{"detail":"Prazo da requisi\\u00e7\\u00e3o esgotado"}'
+            await send({"type": "http.response.start", "status": 504, "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(corpo)).encode("latin-1")),
+            ]})
+            await send({"type": "http.response.body", "body": corpo})
+            return
+
+        token = _prazo.set(time.monotonic() + restante_ms / 1000)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _prazo.reset(token)
@@ -0,0 +1,61 @@
+# app/responses.py
+"""
+Resposta JSON rápida e compatível com tipos BSON.
+
+`BSONJSONResponse` serializa com orjson, tratando nativamente `datetime` e
+arrays NumPy, e converte `ObjectId`/`Decimal128` sem cópia dos documentos.
+É a classe de resposta padrão da aplicação (ver app/main.py).
+
+Observação: o FastAPI só dispensa o `jsonable_encoder` quando a rota retorna
+a própria instância de Response. Rotas com listas grandes devem, portanto,
+retornar `BSONJSONResponse(docs)` diretamente com os documentos do cursor.
+"""
+
+import json
+from datetime import date, datetime
+from typing import Any
+
+from bson import Decimal128, ObjectId
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - fallback para ambientes sem orjson
+    orjson = None
+
+
+def _bson_default(obj: Any) -> Any:
+    """Converte tipos que o orjson não serializa nativamente."""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, Decimal128):
+        return float(obj.to_decimal())
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if hasattr(obj, "tolist"):  # numpy (fallback sem orjson / dtypes não suportados)
+        return obj.tolist()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, bytes):
+        return obj.decode("utf-8", errors="replace")
+    raise TypeError(f"Tipo não serializável: {type(obj).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """Serializa conteúdo (incluindo documentos do MongoDB) em JSON."""
+    if orjson is not None:
+        return orjson.dumps(
+            content,
+            default=_bson_default,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+        )
+    return json.dumps(
+        content, default=_bson_default, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class BSONJSONResponse(JSONResponse):
+    """JSONResponse baseada em orjson com suporte a ObjectId, datetime e NumPy."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -1,18 +1,22 @@
 # app/routers/avaliacoes.py
 
 from fastapi import APIRouter, HTTPException
+import logging
 from pydantic import BaseModel
 from typing import Optional, List
 from bson import ObjectId
-from app.database.mongo import colecao_avaliacoes  # conexão à coleção "avaliacoes"
+from app.database.mongo import colecao_avaliacoes, colecao_respostas, com_versao, invalidar_documento  # conexão à coleção "avaliacoes"
+from app.services.user_stats_service import registrar_avaliacao
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 # Modelos de entrada e saída
 class Avaliacao(BaseModel):
     usuario_id: int
     pergunta_id: int
     nota: float
+    resposta_id: Optional[str] = None
 
 class AvaliacaoOut(Avaliacao):
     id: str
@@ -37,14 +41,28 @@ def listar():
 @router.post("/avaliacoes", response_model=AvaliacaoOut)
 def criar(avaliacao: Avaliacao):
     result = colecao_avaliacoes.insert_one(avaliacao.dict())
+
+    # Estatísticas do avaliador e do autor da resposta avaliada
+    try:
+        autor = None
+        if avaliacao.resposta_id and ObjectId.is_valid(avaliacao.resposta_id):
+            resposta = colecao_respostas.find_one(
+                {"_id": ObjectId(avaliacao.resposta_id)}, {"usuario_id": 1}
+            )
+            autor = resposta.get("usuario_id") if resposta else None
+        registrar_avaliacao(str(avaliacao.usuario_id), avaliacao.nota, autor)
+    except Exception as e:
+        logger.warning(f"Falha ao atualizar user_stats: {e}")
+
     return {**avaliacao.dict(), "id": str(result.inserted_id)}
 
 @router.put("/avaliacoes/{avaliacao_id}")
 def atualizar(avaliacao_id: str, avaliacao: Avaliacao):
     result = colecao_avaliacoes.update_one(
         {"_id": ObjectId(avaliacao_id)},
-        {"$set": avaliacao.dict()}
+        com_versao({"$set": avaliacao.dict()})
     )
+    invalidar_documento("avaliacoes", avaliacao_id)
     if result.modified_count == 0:
         raise HTTPException(status_code=404, detail="Avaliação não encontrada")
     return {"mensagem": "Avaliação atualizada"}
@@ -52,6 +70,7 @@ def atualizar(avaliacao_id: str, avaliacao: Avaliacao):
 @router.delete("/avaliacoes/{avaliacao_id}")
 def deletar(avaliacao_id: str):
     result = colecao_avaliacoes.delete_one({"_id": ObjectId(avaliacao_id)})
+    invalidar_documento("avaliacoes", avaliacao_id)
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Avaliação não encontrada")
     return {"mensagem": "Avaliação deletada"}
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, HTTPException
 from app.models.conversa import ConversaModel, MensagemModel
-from app.database.mongo import colecao_conversas
+from app.database.mongo import colecao_conversas, buscar_documento_por_id, com_versao, invalidar_documento
 from datetime import datetime
 from bson import ObjectId
 
@@ -20,7 +20,7 @@ async def criar_conversa(conversa: ConversaModel):
 @router.get("/conversas/{conversa_id}")
 async def obter_conversa(conversa_id: str):
     """Obtém conversa por ID."""
-    conversa = colecao_conversas.find_one({"_id": ObjectId(conversa_id)})
+    conversa = buscar_documento_por_id("conversas", conversa_id)
     if not conversa:
         raise HTTPException(status_code=404, detail="Conversa não encontrada")
     
@@ -36,12 +36,13 @@ async def adicionar_mensagem(conversa_id: str, mensagem: MensagemModel):
     
     resultado = colecao_conversas.update_one(
         {"_id": ObjectId(conversa_id)},
-        {
+        com_versao({
             "$push": {"mensagens": mensagem_dict},
             "$set": {"data_ultima_interacao": datetime.now()}
-        }
+        })
     )
     
+    invalidar_documento("conversas", conversa_id)
     if resultado.matched_count == 0:
         raise HTTPException(status_code=404, detail="Conversa não encontrada")
     
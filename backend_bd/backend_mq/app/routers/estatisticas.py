@@ -0,0 +1,61 @@
+# app/routers/estatisticas.py
+
+from fastapi import APIRouter, HTTPException, Query
+import logging
+from pymongo.errors import ExecutionTimeout
+from app.services.user_stats_service import (
+    obter_ou_criar_user_stats,
+    listar_user_stats,
+    reconciliar_user_stats,
+)
+from app.prazo import PrazoExcedido
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+@router.get("/ping")
+def ping():
+    return {"mensagem": "Ping Estatisticas"}
+
+@router.get("/usuarios")
+def listar_estatisticas(limite: int = Query(50, ge=1, le=500), pular: int = Query(0, ge=0)):
+    """Lista os documentos de 'user_stats' (tabela de alunos do dashboard)."""
+    try:
+        return listar_user_stats(limite, pular)
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+@router.get("/usuarios/{user_id}")
+def estatisticas_usuario(user_id: str):
+    """
+    Estatísticas educacionais de um usuário (interações, perguntas, respostas e avaliações).
+
+    Lê o documento mantido incrementalmente em 'user_stats'. Se ainda não
+    existir (usuário anterior à coleção), reconstrói uma única vez a partir
+    das coleções de origem e persiste o resultado — zerado para ids sem
+    nenhum dado, que nas leituras seguintes não disparam nova reconstrução.
+    """
+    user_id = user_id.strip()
+    if not user_id:
+        raise HTTPException(status_code=400, detail="user_id é obrigatório")
+
+    try:
+        return obter_ou_criar_user_stats(user_id)
+    except (PrazoExcedido, ExecutionTimeout):
+        raise
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        logger.exception(f"Erro ao calcular estatísticas de {user_id}: {e}")
+        raise HTTPException(status_code=500, detail="Erro ao calcular estatísticas")
+
+@router.post("/reconciliar")
+def reconciliar(user_id: str = None):
+    """Reconstrói 'user_stats' a partir das coleções de origem (todos ou um usuário)."""
+    try:
+        return reconciliar_user_stats(user_id)
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        logger.exception(f"Erro na reconciliação de user_stats: {e}")
+        raise HTTPException(status_code=500, detail="Erro na reconciliação")
@@ -1,10 +1,15 @@
 from fastapi import APIRouter, HTTPException, Query, status
 from app.schemas import InteractionCreate
-from app.database.mongo import salvar_interacao, obter_interacoes
+from app.database.mongo import salvar_interacao, obter_interacoes, projecao_de_campos
+from app.responses import BSONJSONResponse
+from app.services.user_stats_service import registrar_interacao
+from app.services.vector_sync_worker import INDEXACAO_INLINE
+from app.prazo import PrazoExcedido, verificar_prazo
 from datetime import datetime
 import logging
 from typing import List, Dict, Optional, Protocol
 from bson import ObjectId
+from pymongo.errors import ExecutionTimeout
 
 # === CONFIGURAÇÃO DO ROUTER ===
 router = APIRouter(prefix="/interacoes", tags=["interacoes"])
@@ -24,45 +29,31 @@ def _setup_embedding_services() -> tuple[EmbeddingModel, bool, callable]:
     """
     Configura serviços de embedding com fallback robusto.
     
+    O modelo é o encoder compartilhado (app/services/embedding_service.py),
+    o mesmo das rotas de perguntas/respostas, da busca e do vector_sync_worker.
+    
     Returns:
         tuple: (modelo, disponibilidade, função_indexar)
     """
-    try:
-        from sentence_transformers import SentenceTransformer
-        from app.database.qdrant_client import indexar_documento
-        
-        # Inicializar modelo de embeddings
-        model = SentenceTransformer("all-MiniLM-L6-v2")
-        logger.info("✅ Sentence Transformers e Qdrant disponíveis")
-        
-        return model, True, indexar_documento
-        
-    except ImportError as e:
-        logger.warning(f"⚠️ Embeddings não disponíveis: {e}")
-        logger.info("🔄 Usando implementação mock para desenvolvimento")
-        
-        # Mock melhorado com comportamento determinístico
-        class MockSentenceTransformer:
-            def __init__(self, model_name: str):
-                self.model_name = f"mock-{model_name}"
-            
-            def encode(self, texts: str, **kwargs) -> List[float]:
-                """Gera embedding mock determinístico baseado no hash do texto."""
-                import hashlib
-                import numpy as np
-                
-                # Seed determinístico baseado no conteúdo
-                seed = int(hashlib.md5(texts.encode()).hexdigest()[:8], 16) % (2**32)
-                np.random.seed(seed)
-                return np.random.rand(384).tolist()
-        
-        def mock_indexar_documento(*args, **kwargs) -> str:
-            """Mock para indexação no Qdrant."""
-            logger.debug("Mock: Documento 'indexado' (Qdrant não disponível)")
-            return f"mock_index_{datetime.utcnow().timestamp()}"
-        
-        model = MockSentenceTransformer("all-MiniLM-L6-v2")
-        return model, False, mock_indexar_documento
+    from app.services.embedding_service import ModeloEmbedding, embeddings_reais
+    
+    model = ModeloEmbedding()
+    if embeddings_reais():
+        try:
+            from app.database.qdrant_client import indexar_documento
+            logger.info("✅ Sentence Transformers e Qdrant disponíveis")
+            return model, True, indexar_documento
+        except ImportError as e:
+            logger.warning(f"⚠️ Qdrant não disponível: {e}")
+    
+    logger.info("🔄 Usando implementação mock para desenvolvimento")
+    
+    def mock_indexar_documento(*args, **kwargs) -> str:
+        """Mock para indexação no Qdrant."""
+        logger.debug("Mock: Documento 'indexado' (Qdrant não disponível)")
+        return f"mock_index_{datetime.utcnow().timestamp()}"
+    
+    return model, False, mock_indexar_documento
 
 # Configurar serviços uma única vez na inicialização
 model, EMBEDDINGS_AVAILABLE, indexar_documento = _setup_embedding_services()
@@ -73,6 +64,7 @@ DEFAULT_LIMIT = 50
 MAX_LIMIT = 200
 EMBEDDING_DIMENSION = 384
 MAX_TEXT_LENGTH = 500  # Para payload Qdrant
+CAMPOS_CHAT = {"_id": 1, "pergunta": 1, "resposta": 1, "timestamp": 1, "complexidade": 1, "analise": 1}
 
 # === FUNÇÕES AUXILIARES MELHORADAS ===
 def gerar_embedding(texto: str) -> List[float]:
@@ -293,30 +285,43 @@ def criar_interacao(interacao: InteractionCreate):
             )
         
         logger.info(f"Interação salva no MongoDB com ID: {mongo_id}")
-        
-        # 4. Processamento de embeddings 
-        embedding_status = "skipped"
+
+        # Estatísticas do usuário (falha aqui não invalida a criação)
         try:
-            logger.info("Gerando embedding da pergunta...")
-            vetor = gerar_embedding(interacao.pergunta)
+            registrar_interacao(dados_mongo["user_id"], dados_mongo["complexidade"])
+        except Exception as e:
+            logger.warning(f"Falha ao atualizar user_stats: {e}")
+        
+        # 4. Processamento de embeddings (com o worker ativo, fica a cargo do change stream)
+        embedding_status = "skipped" if INDEXACAO_INLINE else "deferred"
+        if INDEXACAO_INLINE:
+            try:
+                # Chamador já desistiu: não gasta CPU com o embedding
+                verificar_prazo("embedding")
+                logger.info("Gerando embedding da pergunta...")
+                vetor = gerar_embedding(interacao.pergunta)
             
-            if any(v != 0.0 for v in vetor):  # Verificar se não é vetor zero
-                payload_qdrant = preparar_payload_qdrant(interacao, mongo_id, timestamp)
+                if any(v != 0.0 for v in vetor):  # Verificar se não é vetor zero
+                    payload_qdrant = preparar_payload_qdrant(interacao, mongo_id, timestamp)
                 
-                logger.info("Indexando no Qdrant...")
-                # Chamar função de indexação (funciona para mock e real)
-                index_result = indexar_documento(COLLECTION_NAME, str(mongo_id), vetor, payload_qdrant)
+                    verificar_prazo("indexação")
+                    logger.info("Indexando no Qdrant...")
+                    # Chamar função de indexação (funciona para mock e real)
+                    index_result = indexar_documento(COLLECTION_NAME, str(mongo_id), vetor, payload_qdrant)
                 
-                embedding_status = "success" if EMBEDDINGS_AVAILABLE else "mock"
-                logger.info(f"Embedding indexado: {embedding_status} (result: {index_result})")
-            else:
-                embedding_status = "zero_vector"
-                logger.warning("Vetor zero gerado - indexação pulada")
+                    embedding_status = "success" if EMBEDDINGS_AVAILABLE else "mock"
+                    logger.info(f"Embedding indexado: {embedding_status} (result: {index_result})")
+                else:
+                    embedding_status = "zero_vector"
+                    logger.warning("Vetor zero gerado - indexação pulada")
                 
-        except Exception as e:
-            embedding_status = "failed"
-            logger.error(f"Erro no processamento de embeddings: {e}")
-            # Não falhar a requisição por problemas de embedding
+            except PrazoExcedido as e:
+                embedding_status = "deadline_exceeded"
+                logger.warning(f"Embedding não processado: {e}")
+            except Exception as e:
+                embedding_status = "failed"
+                logger.error(f"Erro no processamento de embeddings: {e}")
+                # Não falhar a requisição por problemas de embedding
         
         return {
             "status": "sucesso",
@@ -342,7 +347,8 @@ def criar_interacao(interacao: InteractionCreate):
 def listar_interacoes(
     user_id: str = Query(..., description="ID do usuário", min_length=1),
     limite: int = Query(DEFAULT_LIMIT, description="Número máximo de interações", ge=1, le=MAX_LIMIT),
-    formato: str = Query("chat", description="Formato de resposta: 'chat' ou 'raw'", regex="^(chat|raw)$")
+    formato: str = Query("chat", description="Formato de resposta: 'chat' ou 'raw'", regex="^(chat|raw)$"),
+    fields: Optional[str] = Query(None, description="Campos a retornar no formato 'raw', separados por vírgula (ex.: id,pergunta,timestamp)")
 ) -> List[Dict]:
     """
     Lista interações de um usuário específico.
@@ -351,6 +357,7 @@ def listar_interacoes(
         user_id: ID do usuário
         limite: Número máximo de interações a retornar
         formato: Formato da resposta ('chat' para UI, 'raw' para dados brutos)
+        fields: Projeção de campos (apenas no formato 'raw')
         
     Returns:
         Lista de interações formatadas
@@ -368,56 +375,63 @@ def listar_interacoes(
         
         logger.info(f"Buscando interações para user_id: {user_id_clean}, limite: {limite}")
         
-        # Buscar interações do banco
-        interacoes_raw = obter_interacoes(user_id_clean, limite)
+        # Projeção: campos pedidos no 'raw'; no 'chat', apenas os usados na interface
+        try:
+            projecao = projecao_de_campos(fields) if formato == "raw" else CAMPOS_CHAT
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        
+        # Buscar interações do banco (_id já convertido em 'id' pelo MongoDB)
+        interacoes_raw = obter_interacoes(
+            {"user_id": user_id_clean}, limite, id_como_string=True, projecao=projecao
+        )
         
         if not interacoes_raw:
             logger.info(f"Nenhuma interação encontrada para user_id: {user_id_clean}")
-            return []
+            return BSONJSONResponse([])
         
         if formato == "raw":
-            # Retornar dados brutos (apenas converter ObjectId)
-            return [converter_object_id(doc) for doc in interacoes_raw]
+            # Documentos do cursor direto para a resposta (sem cópia nem jsonable_encoder)
+            return BSONJSONResponse(interacoes_raw)
         
         # Formato 'chat' - preparar para interface
         mensagens = []
         
         for doc in interacoes_raw:
             try:
-                doc_convertido = converter_object_id(doc)
                 timestamp = processar_timestamp(doc.get("timestamp"))
                 
                 # Mensagem do usuário
                 mensagens.append({
-                    "id": f"{doc_convertido['id']}-user",
+                    "id": f"{doc['id']}-user",
                     "text": doc.get("pergunta", "").strip(),
                     "sender": "user", 
                     "timestamp": timestamp.isoformat(),
                     "complexidade": doc.get("complexidade"),
-                    "interacao_id": doc_convertido['id']
+                    "interacao_id": doc['id']
                 })
                 
                 # Resposta do assistente
                 mensagens.append({
-                    "id": f"{doc_convertido['id']}-assistant",
+                    "id": f"{doc['id']}-assistant",
                     "text": doc.get("resposta", "").strip(),
                     "sender": "assistant",
                     "timestamp": timestamp.isoformat(),
                     "analise": doc.get("analise"),
-                    "interacao_id": doc_convertido['id']
+                    "interacao_id": doc['id']
                 })
                 
             except Exception as e:
-                logger.warning(f"Erro ao processar documento {doc.get('_id')}: {e}")
+                logger.warning(f"Erro ao processar documento {doc.get('id')}: {e}")
                 continue
         
         # Ordenar por timestamp
         mensagens.sort(key=lambda m: m["timestamp"])
         
         logger.info(f"Retornando {len(mensagens)} mensagens para {len(interacoes_raw)} interações")
-        return mensagens
+        return BSONJSONResponse(mensagens)
         
-    except HTTPException:
+    except (HTTPException, PrazoExcedido, ExecutionTimeout):
         raise
     except Exception as e:
         logger.exception(f"Erro ao listar interações para user_id={user_id}: {e}")
@@ -467,7 +481,7 @@ def obter_interacao_por_id(interacao_id: str):
                 detail="Interação não encontrada"
             )
         
-        return converter_object_id(interacao)
+        return BSONJSONResponse(converter_object_id(interacao))
         
     except HTTPException:
         raise
@@ -504,17 +518,17 @@ def excluir_interacao(interacao_id: str):
                 detail="Formato de ID inválido"
             )
         
-        from app.database.mongo import colecao_logs_interacao
+        from app.database.mongo import excluir_interacao_por_id
         
-        if not colecao_logs_interacao:
+        try:
+            removida = excluir_interacao_por_id(interacao_id)
+        except RuntimeError:
             raise HTTPException(
                 status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
                 detail="Serviço de banco de dados indisponível"
             )
         
-        resultado = colecao_logs_interacao.delete_one({"_id": ObjectId(interacao_id)})
-        
-        if resultado.deleted_count == 0:
+        if not removida:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Interação não encontrada"
@@ -5,7 +5,7 @@ from pydantic import BaseModel
 from typing import Optional, List
 from datetime import datetime
 from bson import ObjectId
-from app.database.mongo import colecao_logs  # conexão à coleção "logs"
+from app.database.mongo import colecao_logs, com_versao, invalidar_documento  # conexão à coleção "logs"
 
 router = APIRouter()
 
@@ -38,8 +38,9 @@ def criar(log: Log):
 def atualizar(log_id: str, log: Log):
     result = colecao_logs.update_one(
         {"_id": ObjectId(log_id)},
-        {"$set": log.dict()}
+        com_versao({"$set": log.dict()})
     )
+    invalidar_documento("logs", log_id)
     if result.modified_count == 0:
         raise HTTPException(status_code=404, detail="Log não encontrado")
     return {"mensagem": "Log atualizado"}
@@ -47,6 +48,7 @@ def atualizar(log_id: str, log: Log):
 @router.delete("/logs/{log_id}")
 def deletar(log_id: str):
     result = colecao_logs.delete_one({"_id": ObjectId(log_id)})
+    invalidar_documento("logs", log_id)
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Log não encontrado")
     return {"mensagem": "Log deletado"}
@@ -0,0 +1,376 @@
+# app/routers/mongodb.py
+"""
+Operações genéricas de documentos, no formato usado pelo gateway
+(backend_com/gateways/persistence_gateway.py -> MongoDBOperations).
+
+Leituras por id passam pelo cache de documentos; atualizações e exclusões
+invalidam a entrada correspondente. `fields=a,b` vira projeção do MongoDB.
+
+A rota `{doc_id}/atomic` aplica `$inc`/`$set`/`$push` em uma única operação
+no servidor: contadores não passam por leitura + escrita no cliente (que
+perde incrementos concorrentes).
+
+As rotas `by-ids` e `by-field` resolvem lotes de buscas com um único `$in`
+(usadas pelo DataLoader do gateway, backend_com/gateways/dataloader.py).
+
+Consultas usam o prazo informado pelo gateway como `maxTimeMS` (app/prazo.py).
+
+Hash de senha e tokens (`CAMPOS_SECRETOS`) nunca saem pelas rotas genéricas,
+nem podem aparecer em filtros ou ordenações; a verificação de senha do
+gateway lê o hash por `POST /usuarios/credenciais`.
+"""
+
+from fastapi import APIRouter, Body, HTTPException, Query, Request, Response, status
+import json
+import logging
+from typing import Any, Dict, List, Optional
+
+from pymongo.errors import ExecutionTimeout, OperationFailure
+
+from app.database.mongo import (
+    db,
+    filtro_por_id,
+    projecao_de_campos,
+    buscar_documento_por_id,
+    buscar_documentos_por_ids,
+    resumo_de_versoes,
+    atualizar_documento_por_id,
+    aplicar_operadores_por_id,
+    excluir_documento_por_id,
+)
+from app.etag import CACHE_CONTROL, etag_corresponde, etag_de_documento, etag_de_lista
+from app.prazo import max_time_ms, opcoes_agregacao
+from app.responses import BSONJSONResponse
+from app.services.user_stats_service import registrar_criacao
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+COLECOES_PERMITIDAS = {
+    "usuarios", "perguntas", "respostas", "avaliacoes",
+    "logs", "interacoes", "conversas",
+    "token_revocations",  # logouts de tokens ainda válidos (backend_com)
+    # Gravadas pelo UserOrchestrator/rotas de usuário do backend_com
+    "configuracoes_usuario", "user_sessions", "user_messages", "email_verifications",
+}
+
+MAX_ITENS_LOTE = 1000
+
+CAMPOS_SECRETOS = ("senha", "access_token", "refresh_token")
+SEM_SEGREDOS = {campo: 0 for campo in CAMPOS_SECRETOS}
+
+OPERADORES_ATOMICOS = {"$inc", "$set", "$push"}
+
+
+def _validar_colecao(colecao: str) -> None:
+    if colecao not in COLECOES_PERMITIDAS:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Coleção '{colecao}' não disponível")
+    if db is None:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="MongoDB não inicializado")
+
+
+def _projecao(fields: Optional[str]) -> Optional[Dict[str, int]]:
+    """Projeção de `fields` sem os campos secretos (None = documento completo)."""
+    try:
+        projecao = projecao_de_campos(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if projecao:
+        projecao = {c: v for c, v in projecao.items() if not _campo_secreto(c)}
+    return projecao
+
+
+def _campo_secreto(campo: str) -> bool:
+    return any(campo == s or campo.startswith(s + ".") for s in CAMPOS_SECRETOS)
+
+
+def _referencia_segredo(valor: Any) -> bool:
+    """True se o filtro/ordenação usa um campo secreto (ex.: regex sobre `senha`)."""
+    if isinstance(valor, dict):
+        return any(_campo_secreto(k) or _referencia_segredo(v) for k, v in valor.items())
+    if isinstance(valor, list):
+        return any(_referencia_segredo(v) for v in valor)
+    return isinstance(valor, str) and valor.startswith("$") and _campo_secreto(valor[1:])
+
+
+def _sem_segredos(documento: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Remove os campos secretos de um documento lido pelo cache ou retornado em escrita."""
+    if documento is not None:
+        for campo in CAMPOS_SECRETOS:
+            documento.pop(campo, None)
+    return documento
+
+
+def _json_param(valor: Optional[str], nome: str) -> Dict[str, Any]:
+    if not valor:
+        return {}
+    try:
+        dados = json.loads(valor)
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"'{nome}' deve ser um objeto JSON")
+    if not isinstance(dados, dict):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"'{nome}' deve ser um objeto JSON")
+    if _contem_operador_proibido(dados):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Operador não permitido em '{nome}'")
+    if _referencia_segredo(dados):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Campo não permitido em '{nome}'")
+    return dados
+
+
+def _validar_lote(valores: List[Any]) -> None:
+    if len(valores) > MAX_ITENS_LOTE:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"Máximo de {MAX_ITENS_LOTE} itens por lote")
+
+
+def _contem_operador_proibido(valor: Any) -> bool:
+    """Bloqueia operadores que executam JavaScript no servidor."""
+    if isinstance(valor, dict):
+        return any(k in ("$where", "$function", "$accumulator") or _contem_operador_proibido(v)
+                   for k, v in valor.items())
+    if isinstance(valor, list):
+        return any(_contem_operador_proibido(v) for v in valor)
+    return False
+
+
+def _validar_operadores(operadores: Dict[str, Any]) -> None:
+    """
+    Aceita só `$inc`/`$set`/`$push`, cada campo em um único operador.
+
+    Campos em que um é prefixo pontuado do outro (`a` e `a.b`) também são
+    recusados: o MongoDB rejeita o conflito de caminhos na atualização.
+    """
+    if not operadores:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Nenhum operador informado")
+    campos_usados = set()
+    for operador, campos in operadores.items():
+        if operador not in OPERADORES_ATOMICOS:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                                detail=f"Operador '{operador}' não suportado (use $inc, $set ou $push)")
+        if not isinstance(campos, dict) or not campos:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                                detail=f"'{operador}' deve ser um objeto com ao menos um campo")
+        for campo, valor in campos.items():
+            if campo == "_id" or campo.startswith("$"):
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Campo '{campo}' não pode ser alterado")
+            if campo in campos_usados:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                                    detail=f"Campo '{campo}' usado em mais de um operador")
+            campos_usados.add(campo)
+            if operador == "$inc" and (isinstance(valor, bool) or not isinstance(valor, (int, float))):
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"'$inc' em '{campo}' exige número")
+    for campo in campos_usados:
+        for outro in campos_usados:
+            if outro.startswith(campo + "."):
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                                    detail=f"Campos '{campo}' e '{outro}' conflitam na mesma atualização")
+    if _contem_operador_proibido(operadores):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Operador não permitido")
+
+
+@router.post("/usuarios/credenciais")
+def obter_credenciais_usuario(
+    email: Optional[str] = Body(None, embed=True),
+    user_id: Optional[str] = Body(None, embed=True),
+):
+    """
+    Usuário com o hash de senha, por `email` (contas não excluídas) ou `user_id`.
+
+    Única leitura que devolve `senha`: usada pela verificação de senha do
+    gateway (login e troca de senha). Não passa pelo cache de documentos.
+    """
+    _validar_colecao("usuarios")
+    if (email is None) == (user_id is None):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Informe 'email' ou 'user_id'")
+    filtro = {"email": email, "status": {"$ne": "deleted"}} if email is not None else filtro_por_id(user_id)
+    projecao = {"access_token": 0, "refresh_token": 0}
+    usuario = db["usuarios"].find_one(filtro, projecao, max_time_ms=max_time_ms())
+    if usuario is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Usuário não encontrado")
+    return BSONJSONResponse(usuario)
+
+
+@router.post("/{colecao}", status_code=status.HTTP_201_CREATED)
+def criar_documento(colecao: str, documento: Dict[str, Any] = Body(...)):
+    _validar_colecao(colecao)
+    documento.pop("_id", None)
+    db[colecao].insert_one(documento)
+
+    # Caminho de criação do gateway: mantém user_stats como as rotas dedicadas
+    try:
+        registrar_criacao(colecao, documento)
+    except Exception as e:
+        logger.warning(f"Falha ao atualizar user_stats: {e}")
+    return BSONJSONResponse(_sem_segredos(documento), status_code=status.HTTP_201_CREATED)
+
+
+@router.get("/{colecao}/search")
+def buscar_documentos(
+    colecao: str,
+    request: Request,
+    query: Optional[str] = Query(None, description="Filtro MongoDB em JSON"),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=1000),
+    sort: Optional[str] = Query(None, description='Ordenação em JSON, ex.: {"created_at": -1}'),
+    fields: Optional[str] = Query(None, description="Campos a retornar, separados por vírgula"),
+):
+    _validar_colecao(colecao)
+    filtro = _json_param(query, "query")
+    ordenacao = _json_param(sort, "sort")
+    projecao = _projecao(fields)
+
+    # ETag do resumo de versões (que também dá o total): 304 antes de buscar a página
+    resumo = resumo_de_versoes(colecao, filtro)
+    etag = etag_de_lista(colecao, resumo, variante=str(request.url.query))
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL} if etag else None
+    if etag and etag_corresponde(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    # maxTimeMS recalculado: a página só usa o que sobrou do prazo
+    cursor = db[colecao].find(filtro, projecao or dict(SEM_SEGREDOS), max_time_ms=max_time_ms())
+    cursor = cursor.skip((page - 1) * page_size).limit(page_size)
+    if ordenacao:
+        cursor = cursor.sort(list(ordenacao.items()))
+
+    return BSONJSONResponse({
+        "items": list(cursor),
+        "total": resumo["total"],
+        "page": page,
+        "page_size": page_size,
+    }, headers=headers)
+
+
+@router.post("/{colecao}/by-ids")
+def obter_documentos_por_ids(
+    colecao: str,
+    ids: List[str] = Body(..., embed=True),
+    fields: Optional[str] = Body(None, embed=True),
+):
+    """Vários documentos por id em uma chamada: `{"items": {id: doc}, "missing": [ids]}`."""
+    _validar_colecao(colecao)
+    _validar_lote(ids)
+    projecao = _projecao(fields)
+
+    if projecao:
+        valores = [filtro_por_id(i)["_id"] for i in dict.fromkeys(ids)]
+        encontrados = {
+            str(d["_id"]): d
+            for d in db[colecao].find({"_id": {"$in": valores}}, projecao, max_time_ms=max_time_ms())
+        }
+    else:
+        encontrados = {i: _sem_segredos(d) for i, d in buscar_documentos_por_ids(colecao, ids).items()}
+
+    return BSONJSONResponse({
+        "items": encontrados,
+        "missing": [i for i in dict.fromkeys(ids) if i not in encontrados],
+    })
+
+
+@router.post("/{colecao}/by-field")
+def buscar_documentos_por_campo(
+    colecao: str,
+    field: str = Body(..., embed=True),
+    values: List[Any] = Body(..., embed=True),
+    query: Dict[str, Any] = Body(default_factory=dict, embed=True),
+    sort: Dict[str, int] = Body(default_factory=dict, embed=True),
+    fields: Optional[str] = Body(None, embed=True),
+    limit_per_value: int = Body(100, embed=True, ge=1, le=MAX_ITENS_LOTE),
+):
+    """
+    Documentos cujo `field` está em `values`, agrupados por valor:
+    `{"groups": {valor: [docs]}}` (ex.: avaliações de várias respostas).
+    """
+    _validar_colecao(colecao)
+    _validar_lote(values)
+    if field.startswith("$") or _contem_operador_proibido(query):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Operador não permitido")
+    if _campo_secreto(field) or _referencia_segredo(query) or _referencia_segredo(sort):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Campo não permitido")
+    projecao = _projecao(fields)
+    if projecao:
+        projecao.setdefault(field, 1)
+
+    # Agrupamento e limite por valor no próprio MongoDB: só os primeiros
+    # `limit_per_value` documentos de cada grupo trafegam até aqui
+    pipeline: List[Dict[str, Any]] = [{"$match": {**query, field: {"$in": values}}}]
+    if sort:
+        pipeline.append({"$sort": sort})
+    pipeline.append({"$project": projecao or dict(SEM_SEGREDOS)})
+    pipeline += [
+        {"$group": {"_id": f"${field}", "docs": {"$push": "$$ROOT"}}},
+        {"$project": {"docs": {"$slice": ["$docs", limit_per_value]}}},
+    ]
+
+    grupos: Dict[str, List[Dict[str, Any]]] = {str(v): [] for v in values}
+    for grupo in db[colecao].aggregate(pipeline, **opcoes_agregacao()):
+        chave = str(grupo["_id"])
+        if chave in grupos:
+            grupos[chave] = grupo["docs"]
+
+    return BSONJSONResponse({"groups": grupos})
+
+
+@router.get("/{colecao}/{doc_id}")
+def obter_documento(colecao: str, doc_id: str, request: Request,
+                    fields: Optional[str] = Query(None, description="Campos a retornar, separados por vírgula")):
+    _validar_colecao(colecao)
+    projecao = _projecao(fields)
+    if projecao:
+        # Leitura parcial vai direto ao MongoDB (o cache guarda documentos completos)
+        documento = db[colecao].find_one(filtro_por_id(doc_id), projecao, max_time_ms=max_time_ms())
+    else:
+        documento = _sem_segredos(buscar_documento_por_id(colecao, doc_id))
+    if documento is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Documento não encontrado")
+
+    # Documento com campo de versão: ETag sem serializar; 304 antes de montar o corpo
+    etag = etag_de_documento(colecao, documento, variante=fields or "")
+    if etag is None:
+        return BSONJSONResponse(documento)
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if etag_corresponde(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return BSONJSONResponse(documento, headers=headers)
+
+
+@router.put("/{colecao}/{doc_id}")
+def atualizar_documento(colecao: str, doc_id: str, dados: Dict[str, Any] = Body(...)):
+    _validar_colecao(colecao)
+    dados.pop("_id", None)
+    resultado = atualizar_documento_por_id(colecao, doc_id, dados)
+    if resultado.matched_count == 0:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Documento não encontrado")
+    return BSONJSONResponse(_sem_segredos(buscar_documento_por_id(colecao, doc_id)))
+
+
+@router.post("/{colecao}/{doc_id}/atomic")
+def atualizar_documento_atomico(colecao: str, doc_id: str,
+                                operadores: Dict[str, Any] = Body(...),
+                                upsert: bool = Query(False, description="Cria o documento se não existir")):
+    """
+    Atualização atômica com `$inc`, `$set` e `$push`; retorna o documento atualizado.
+
+    Repetições do gateway levam `Idempotency-Key` (app/idempotencia.py), então
+    um `$inc` repetido após falha de rede não é aplicado duas vezes.
+    """
+    _validar_colecao(colecao)
+    _validar_operadores(operadores)
+    try:
+        documento = aplicar_operadores_por_id(colecao, doc_id, operadores, upsert=upsert)
+    except ExecutionTimeout:
+        raise
+    except OperationFailure as e:
+        # Ex.: `$inc` em campo não numérico ou `$push` em campo que não é lista
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"Atualização rejeitada pelo MongoDB: {e.details.get('errmsg') if e.details else e}")
+    if documento is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Documento não encontrado")
+    return BSONJSONResponse(_sem_segredos(documento))
+
+
+@router.delete("/{colecao}/{doc_id}")
+def excluir_documento(colecao: str, doc_id: str):
+    _validar_colecao(colecao)
+    if not excluir_documento_por_id(colecao, doc_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Documento não encontrado")
+    return {"status": "sucesso", "_id": doc_id}
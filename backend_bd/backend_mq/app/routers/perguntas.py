@@ -1,17 +1,25 @@
 from fastapi import APIRouter, HTTPException
+import logging
 from pydantic import BaseModel
 from typing import Optional, List
 from bson import ObjectId
-from app.database.mongo import colecao_perguntas
+from app.database.mongo import colecao_perguntas, com_versao, invalidar_documento
 from app.database.qdrant_client import indexar_documento, buscar_por_texto
 
 from app.services.embedding_service import gerar_vetor
+from app.services.user_stats_service import registrar_pergunta
+from app.services.vector_sync_worker import INDEXACAO_INLINE
+from app.prazo import PrazoExcedido, verificar_prazo
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 class Pergunta(BaseModel):
     texto: str
     categoria: Optional[str] = None
+    usuario_id: Optional[str] = None
+    disciplina: Optional[str] = None
+    nivel_dificuldade: Optional[str] = None
 
 class PerguntaOut(Pergunta):
     id: str
@@ -38,11 +46,20 @@ def criar(pergunta: Pergunta):
         # Inserir no MongoDB
         result = colecao_perguntas.insert_one(pergunta.dict())
         pergunta_id = str(result.inserted_id)
+
+        # Estatísticas do usuário logo após a inserção: falha na indexação
+        # não pode deixar o documento criado fora de user_stats
+        if pergunta.usuario_id:
+            try:
+                registrar_pergunta(pergunta.usuario_id, pergunta.disciplina, pergunta.nivel_dificuldade)
+            except Exception as e:
+                logger.warning(f"Falha ao atualizar user_stats: {e}")
         
-        # Gerar vetor e indexar no Qdrant
-        vetor = gerar_vetor(pergunta.texto)
-        payload = {**pergunta.dict(), "id": pergunta_id}
-        indexar_documento("perguntas", pergunta_id, vetor, payload)
+        # Gerar vetor e indexar no Qdrant (ou deixar para o vector_sync_worker)
+        if INDEXACAO_INLINE:
+            vetor = gerar_vetor(pergunta.texto)
+            payload = {**pergunta.dict(), "id": pergunta_id}
+            indexar_documento("perguntas", pergunta_id, vetor, payload)
         
         return {**pergunta.dict(), "id": pergunta_id}
     except Exception as e:
@@ -51,9 +68,12 @@ def criar(pergunta: Pergunta):
 @router.get("/perguntas/similar")
 def buscar_similares(texto: str, limite: int = 5):
     try:
+        verificar_prazo("embedding")
         vetor = gerar_vetor(texto)
         resultados = buscar_por_texto("perguntas", vetor, limite)
         return {"resultados": resultados}
+    except PrazoExcedido:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro na busca: {str(e)}")
 
@@ -62,8 +82,9 @@ def atualizar(pergunta_id: str, pergunta: Pergunta):
     try:
         result = colecao_perguntas.update_one(
             {"_id": ObjectId(pergunta_id)},
-            {"$set": pergunta.dict()}
+            com_versao({"$set": pergunta.dict()})
         )
+        invalidar_documento("perguntas", pergunta_id)
         if result.modified_count == 0:
             raise HTTPException(status_code=404, detail="Pergunta não encontrada")
             
@@ -81,6 +102,7 @@ def atualizar(pergunta_id: str, pergunta: Pergunta):
 @router.delete("/perguntas/{pergunta_id}")
 def deletar(pergunta_id: str):
     result = colecao_perguntas.delete_one({"_id": ObjectId(pergunta_id)})
+    invalidar_documento("perguntas", pergunta_id)
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Pergunta não encontrada")
     return {"mensagem": "Pergunta deletada"}
@@ -0,0 +1,127 @@
+# app/routers/qdrant.py
+"""
+Operações vetoriais no formato usado pelo gateway
+(backend_com/gateways/persistence_gateway.py -> QdrantOperations).
+
+`POST /embeddings` com `store=false` só calcula e devolve o vetor; o gateway
+o reutiliza em `POST /search` (campo `vector`) e `POST /vectors`, de modo que
+cada pergunta/resposta custa uma única inferência.
+
+Os pontos ficam na coleção única do Qdrant (`QDRANT_COLLECTION`), com o id de
+`ponto_id` e a coleção de origem no payload — os mesmos das rotas de
+perguntas/respostas e do vector_sync_worker. O `type` do gateway
+("question"/"answer") define a coleção de origem.
+"""
+
+from fastapi import APIRouter, HTTPException, status
+import logging
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+from app.database.qdrant_client import (
+    VECTOR_SIZE,
+    buscar_por_texto,
+    indexar_documento,
+    remover_documento,
+)
+from app.prazo import verificar_prazo
+from app.services.embedding_service import gerar_vetor
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# type do gateway -> coleção de origem no payload
+COLECOES_POR_TIPO = {
+    "question": "perguntas",
+    "answer": "respostas",
+    "interaction": "interacoes",
+}
+
+# campos de metadados com o id do documento indexado
+CAMPOS_ID = ("id", "question_id", "answer_id", "mongo_id")
+
+
+class EmbeddingRequest(BaseModel):
+    text: str = Field(..., min_length=1)
+    metadata: Dict[str, Any] = Field(default_factory=dict)
+    store: bool = True
+
+
+class SearchRequest(BaseModel):
+    query: Optional[str] = None
+    vector: Optional[List[float]] = None
+    limit: int = Field(10, ge=1, le=100)
+    score_threshold: Optional[float] = None
+    filters: Dict[str, Any] = Field(default_factory=dict)
+
+
+class VectorRequest(BaseModel):
+    id: str
+    vector: List[float]
+    payload: Dict[str, Any] = Field(default_factory=dict)
+
+
+def _colecao(dados: Dict[str, Any]) -> Optional[str]:
+    tipo = dados.get("type")
+    if tipo is None:
+        return dados.get("colecao")
+    if tipo not in COLECOES_POR_TIPO:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Tipo '{tipo}' não suportado")
+    return COLECOES_POR_TIPO[tipo]
+
+
+def _validar_vetor(vetor: List[float]) -> None:
+    if len(vetor) != VECTOR_SIZE:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"Vetor deve ter {VECTOR_SIZE} dimensões (recebido: {len(vetor)})")
+
+
+@router.post("/embeddings")
+def criar_embedding(dados: EmbeddingRequest):
+    """Gera o vetor do texto; com `store=true`, indexa sob o id dos metadados."""
+    verificar_prazo("embedding")
+    vetor = gerar_vetor(dados.text)
+
+    doc_id = None
+    if dados.store:
+        doc_id = next((str(dados.metadata[c]) for c in CAMPOS_ID if dados.metadata.get(c)), None)
+        if doc_id is None:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                                detail="Metadados sem id do documento (use store=false para só gerar o vetor)")
+        colecao = _colecao(dados.metadata)
+        indexar_documento(colecao, doc_id, vetor, {**dados.metadata, "texto": dados.text})
+
+    return {"vector": vetor, "dimension": len(vetor), "stored": dados.store, "id": doc_id}
+
+
+@router.post("/search")
+def buscar(dados: SearchRequest):
+    """Busca por similaridade a partir de `vector` (sem nova inferência) ou de `query`."""
+    if dados.vector is not None:
+        _validar_vetor(dados.vector)
+        vetor = dados.vector
+    elif dados.query:
+        verificar_prazo("embedding")
+        vetor = gerar_vetor(dados.query)
+    else:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Informe 'query' ou 'vector'")
+
+    filtros = {k: v for k, v in dados.filters.items() if k not in ("type", "colecao") and v is not None}
+    resultados = buscar_por_texto(_colecao(dados.filters), vetor, dados.limit,
+                                  filtros=filtros, score_minimo=dados.score_threshold)
+    return {"resultados": resultados, "total": len(resultados)}
+
+
+@router.post("/vectors")
+def armazenar_vetor(dados: VectorRequest):
+    """Indexa um vetor já calculado (upsert pelo id: repetir não duplica)."""
+    _validar_vetor(dados.vector)
+    indexar_documento(_colecao(dados.payload), dados.id, dados.vector, dados.payload)
+    return {"id": dados.id, "stored": True}
+
+
+@router.delete("/vectors/{vector_id}")
+def excluir_vetor(vector_id: str):
+    remover_documento(vector_id)
+    return {"id": vector_id, "deleted": True}
@@ -1,17 +1,23 @@
 from fastapi import APIRouter, HTTPException
+import logging
 from pydantic import BaseModel
 from typing import Optional, List
 from bson import ObjectId
-from app.database.mongo import colecao_respostas
+from app.database.mongo import colecao_respostas, com_versao, invalidar_documento
 from app.database.qdrant_client import indexar_documento
 
 from app.services.embedding_service import gerar_vetor
+from app.services.user_stats_service import registrar_resposta
+from app.services.vector_sync_worker import INDEXACAO_INLINE
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 class Resposta(BaseModel):
     texto: str
     pergunta_id: str
+    usuario_id: Optional[str] = None
+    quality_score: Optional[float] = None
 
 class RespostaOut(Resposta):
     id: str
@@ -38,11 +44,20 @@ def criar(resposta: Resposta):
         # Inserir no MongoDB
         result = colecao_respostas.insert_one(resposta.dict())
         resposta_id = str(result.inserted_id)
+
+        # Estatísticas do usuário logo após a inserção: falha na indexação
+        # não pode deixar o documento criado fora de user_stats
+        if resposta.usuario_id:
+            try:
+                registrar_resposta(resposta.usuario_id, resposta.quality_score)
+            except Exception as e:
+                logger.warning(f"Falha ao atualizar user_stats: {e}")
         
-        # Gerar vetor e indexar no Qdrant
-        vetor = gerar_vetor(resposta.texto)
-        payload = {**resposta.dict(), "id": resposta_id}
-        indexar_documento("respostas", resposta_id, vetor, payload)
+        # Gerar vetor e indexar no Qdrant (ou deixar para o vector_sync_worker)
+        if INDEXACAO_INLINE:
+            vetor = gerar_vetor(resposta.texto)
+            payload = {**resposta.dict(), "id": resposta_id}
+            indexar_documento("respostas", resposta_id, vetor, payload)
         
         return {**resposta.dict(), "id": resposta_id}
     except Exception as e:
@@ -53,15 +68,17 @@ def atualizar(resposta_id: str, resposta: Resposta):
     try:
         result = colecao_respostas.update_one(
             {"_id": ObjectId(resposta_id)},
-            {"$set": resposta.dict()}
+            com_versao({"$set": resposta.dict()})
         )
+        invalidar_documento("respostas", resposta_id)
         if result.modified_count == 0:
             raise HTTPException(status_code=404, detail="Resposta não encontrada")
             
         # Atualizar índice no Qdrant
-        vetor = gerar_vetor(resposta.texto)
-        payload = {**resposta.dict(), "id": resposta_id}
-        indexar_documento("respostas", resposta_id, vetor, payload)
+        if INDEXACAO_INLINE:
+            vetor = gerar_vetor(resposta.texto)
+            payload = {**resposta.dict(), "id": resposta_id}
+            indexar_documento("respostas", resposta_id, vetor, payload)
         
         return {"mensagem": "Resposta atualizada"}
     except HTTPException:
@@ -72,6 +89,7 @@ def atualizar(resposta_id: str, resposta: Resposta):
 @router.delete("/respostas/{resposta_id}")
 def deletar(resposta_id: str):
     result = colecao_respostas.delete_one({"_id": ObjectId(resposta_id)})
+    invalidar_documento("respostas", resposta_id)
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Resposta não encontrada")
     return {"mensagem": "Resposta deletada"}
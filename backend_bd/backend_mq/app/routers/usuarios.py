@@ -4,7 +4,7 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, EmailStr
 from typing import Optional, List
 from bson import ObjectId
-from app.database.mongo import colecao_usuarios
+from app.database.mongo import colecao_usuarios, com_versao, invalidar_documento
 
 router = APIRouter()
 
@@ -41,8 +41,9 @@ def listar_usuarios():
 def atualizar_usuario(usuario_id: str, usuario: Usuario):
     result = colecao_usuarios.update_one(
         {"_id": ObjectId(usuario_id)},
-        {"$set": usuario.dict()}
+        com_versao({"$set": usuario.dict()})
     )
+    invalidar_documento("usuarios", usuario_id)
     if result.modified_count == 0:
         raise HTTPException(status_code=404, detail="Usuário não encontrado")
     return {"mensagem": "Usuário atualizado"}
@@ -51,6 +52,7 @@ def atualizar_usuario(usuario_id: str, usuario: Usuario):
 @router.delete("/usuarios/{usuario_id}")
 def deletar_usuario(usuario_id: str):
     result = colecao_usuarios.delete_one({"_id": ObjectId(usuario_id)})
+    invalidar_documento("usuarios", usuario_id)
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Usuário não encontrado")
     return {"mensagem": "Usuário deletado"}
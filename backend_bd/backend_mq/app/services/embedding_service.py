@@ -1,12 +1,76 @@
-# Embedding service - versão mock para desenvolvimento rápido
-import numpy as np
+# app/services/embedding_service.py
+"""
+Embeddings de texto compartilhados por todo o backend_mq.
+
+Rotas (perguntas, respostas, interacoes, /qdrant), busca por similaridade e
+vector_sync_worker vetorizam pelo mesmo `gerar_vetores`, então vetores
+indexados e vetores de consulta ficam no mesmo espaço da coleção do Qdrant.
+
+Com sentence-transformers instalado usa all-MiniLM-L6-v2; sem ele, um vetor
+mock semeado por um digest SHA-256 do texto, igual em qualquer processo
+(`hash()` é aleatorizado por processo e divergiria entre API e worker).
+"""
+
+import hashlib
+import logging
 import random
+from functools import lru_cache
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MODELO = "all-MiniLM-L6-v2"
+DIMENSAO = 384  # padrão do all-MiniLM-L6-v2
+MAX_CARACTERES = 1000
+TAMANHO_LOTE = 64
+
+
+@lru_cache(maxsize=1)
+def _modelo():
+    """SentenceTransformer carregado uma vez por processo (None sem a dependência)."""
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError:
+        logger.warning("sentence_transformers não instalado - usando vetores mock "
+                       "(para produção: pip install sentence-transformers)")
+        return None
+    logger.info(f"Encoder: sentence-transformers {MODELO}")
+    return SentenceTransformer(MODELO)
+
+
+def embeddings_reais() -> bool:
+    """True se os vetores vêm do modelo (e não do mock)."""
+    return _modelo() is not None
+
+
+def nome_modelo() -> str:
+    return MODELO if embeddings_reais() else f"mock-{MODELO}"
+
+
+def _normalizar(texto: str) -> str:
+    return texto.strip()[:MAX_CARACTERES]
+
+
+def _vetor_mock(texto: str) -> List[float]:
+    semente = int.from_bytes(hashlib.sha256(texto.encode("utf-8")).digest()[:8], "big")
+    return np.random.default_rng(semente).random(DIMENSAO).tolist()
+
+
+def gerar_vetores(textos: Sequence[str]) -> List[List[float]]:
+    """Vetoriza vários textos em lote."""
+    textos = [_normalizar(t) for t in textos]
+    modelo = _modelo()
+    if modelo is None:
+        return [_vetor_mock(t) for t in textos]
+    return [v.tolist() for v in modelo.encode(textos, batch_size=TAMANHO_LOTE)]
+
+
+def gerar_vetor(texto: str) -> List[float]:
+    """Vetoriza um texto (mesmo resultado de `gerar_vetores([texto])[0]`)."""
+    return gerar_vetores([texto])[0]
 
-def gerar_vetor(texto: str) -> list:
-    """Gera vetor mock para desenvolvimento - compatível com sentence-transformers."""
-    # Mock vector de 384 dimensões (padrão do all-MiniLM-L6-v2)
-    np.random.seed(hash(texto) % 2**32)  # Determinístico baseado no texto
-    return np.random.rand(384).tolist()
 
 def buscar_similares(vetor: list, limite: int = 5) -> list:
     """Busca mock para desenvolvimento."""
@@ -20,16 +84,14 @@ def buscar_similares(vetor: list, limite: int = 5) -> list:
         })
     return mock_results
 
-class MockSentenceTransformer:
-    """Mock da classe SentenceTransformer."""
-    def __init__(self, model_name: str = "mock"):
-        self.model_name = model_name
-        
+
+class ModeloEmbedding:
+    """Interface `encode` no estilo SentenceTransformer sobre `gerar_vetores`."""
+
+    def __init__(self, model_name: Optional[str] = None):
+        self.model_name = model_name or nome_modelo()
+
     def encode(self, texts, **kwargs):
-        """Mock do método encode."""
         if isinstance(texts, str):
             return gerar_vetor(texts)
-        return [gerar_vetor(text) for text in texts]
-
-print("⚠️ Usando embedding service MOCK - sentence_transformers não instalado")
-print("✅ Para produção, instale: pip install sentence-transformers")
+        return gerar_vetores(texts)
@@ -0,0 +1,428 @@
+# app/services/user_stats_service.py
+"""
+Estatísticas por usuário mantidas incrementalmente na coleção 'user_stats'.
+
+Cada criação de interação, pergunta, resposta ou avaliação aplica um
+`update_one` com `$inc`/`$set` (upsert) no documento do usuário, de modo que
+o dashboard lê um único documento em vez de recalcular a partir das coleções
+de origem. Médias são guardadas como soma + contagem e calculadas na leitura.
+
+`registrar_criacao` aplica o incremento certo para um documento recém-criado
+em qualquer coleção de origem (usada pela rota genérica POST /mongodb/{colecao},
+por onde o gateway cria perguntas, respostas e avaliações).
+
+A função `reconciliar_user_stats` reconstrói a coleção a partir das coleções
+de origem e corrige eventuais divergências (falhas parciais, exclusões). Cada
+incremento também soma 1 em `versao`; a reconciliação só grava o documento
+recalculado se `versao` não mudou durante o recálculo (senão recalcula o
+usuário de novo), então não apaga incrementos concorrentes.
+
+`obter_ou_criar_user_stats` (leitura do dashboard) reconstrói um usuário
+ausente uma única vez: se não houver dados de origem, grava um documento
+zerado, e leituras seguintes de ids novos ou inexistentes custam um
+`find_one`. Os próximos incrementos partem desse documento; a reconciliação
+completa remove os que continuarem sem dados de origem.
+Execução manual:
+
+    python -m app.services.user_stats_service
+"""
+
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from app.database.mongo import db, filtro_por_id
+from app.prazo import max_time_ms, opcoes_agregacao
+
+logger = logging.getLogger(__name__)
+
+COLECAO_USER_STATS = "user_stats"
+LOTE_RECONCILIACAO = 500
+TENTATIVAS_RECONCILIACAO = 3
+
+
+def _colecao():
+    if db is None:
+        raise RuntimeError("MongoDB não inicializado")
+    return db[COLECAO_USER_STATS]
+
+
+def _chave_segura(nome: Optional[str], padrao: str) -> str:
+    """Converte um valor livre em nome de campo válido para o MongoDB."""
+    chave = str(nome).strip() if nome else padrao
+    return chave.replace(".", "_").lstrip("$") or padrao
+
+
+def _aplicar(user_id: str, incrementos: Dict[str, Any]) -> None:
+    """Aplica os incrementos no documento do usuário (atômico, com upsert)."""
+    _colecao().update_one(
+        {"_id": str(user_id)},
+        {"$inc": {**incrementos, "versao": 1}, "$set": {"atualizado_em": datetime.utcnow()}},
+        upsert=True,
+    )
+
+
+# === ATUALIZAÇÕES INCREMENTAIS ===
+
+def registrar_interacao(user_id: str, complexidade: Optional[float] = None) -> None:
+    incrementos: Dict[str, Any] = {"interacoes.total": 1}
+    if isinstance(complexidade, (int, float)):
+        incrementos["interacoes.soma_complexidade"] = complexidade
+        incrementos["interacoes.n_complexidade"] = 1
+    _aplicar(user_id, incrementos)
+
+
+def registrar_pergunta(user_id: str, disciplina: Optional[str] = None,
+                       nivel_dificuldade: Optional[str] = None) -> None:
+    _aplicar(user_id, {
+        "perguntas.total": 1,
+        f"perguntas.por_disciplina.{_chave_segura(disciplina, 'Outras')}": 1,
+        f"perguntas.por_dificuldade.{_chave_segura(nivel_dificuldade, 'intermediario')}": 1,
+    })
+
+
+def registrar_resposta(user_id: str, quality_score: Optional[float] = None) -> None:
+    incrementos: Dict[str, Any] = {"respostas.total": 1}
+    if isinstance(quality_score, (int, float)):
+        incrementos["respostas.soma_qualidade"] = quality_score
+        incrementos["respostas.n_qualidade"] = 1
+    _aplicar(user_id, incrementos)
+
+
+def registrar_avaliacao(avaliador_id: str, nota: float,
+                        autor_resposta_id: Optional[str] = None) -> None:
+    _aplicar(avaliador_id, {"avaliacoes.dadas": 1, "avaliacoes.soma_notas_dadas": nota})
+    if autor_resposta_id:
+        _aplicar(autor_resposta_id, {
+            "respostas.avaliacoes_recebidas": 1,
+            "respostas.soma_notas_recebidas": nota,
+        })
+
+
+def registrar_criacao(colecao: str, documento: Dict[str, Any]) -> None:
+    """
+    Aplica o incremento correspondente a um documento recém-criado.
+
+    Aceita os nomes de campo do gateway e dos routers do backend_mq
+    (`usuario_id`/`user_id`, `avaliador_id`/`usuario_id`). Coleções sem
+    estatísticas e documentos sem usuário são ignorados.
+    """
+    if colecao == "interacoes":
+        if documento.get("user_id"):
+            registrar_interacao(str(documento["user_id"]), documento.get("complexidade"))
+    elif colecao == "perguntas":
+        if documento.get("usuario_id"):
+            registrar_pergunta(str(documento["usuario_id"]), documento.get("disciplina"),
+                               documento.get("nivel_dificuldade"))
+    elif colecao == "respostas":
+        if documento.get("usuario_id"):
+            registrar_resposta(str(documento["usuario_id"]), documento.get("quality_score"))
+    elif colecao == "avaliacoes":
+        avaliador = documento.get("avaliador_id") or documento.get("usuario_id")
+        nota = documento.get("nota")
+        if avaliador and isinstance(nota, (int, float)):
+            autor = None
+            if documento.get("resposta_id"):
+                resposta = db.respostas.find_one(filtro_por_id(str(documento["resposta_id"])),
+                                                 {"usuario_id": 1})
+                autor = resposta.get("usuario_id") if resposta else None
+            registrar_avaliacao(str(avaliador), nota, str(autor) if autor else None)
+
+
+# === LEITURA ===
+
+def _media(soma: float, n: int) -> float:
+    return soma / n if n else 0
+
+
+def formatar_user_stats(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Converte o documento de contadores no formato consumido pelo dashboard."""
+    interacoes = doc.get("interacoes", {})
+    perguntas = doc.get("perguntas", {})
+    respostas = doc.get("respostas", {})
+    avaliacoes = doc.get("avaliacoes", {})
+    recebidas = respostas.get("avaliacoes_recebidas", 0)
+
+    return {
+        "user_id": doc["_id"],
+        "interacoes": {
+            "total": interacoes.get("total", 0),
+            "media_complexidade": _media(interacoes.get("soma_complexidade", 0),
+                                         interacoes.get("n_complexidade", 0)),
+        },
+        "perguntas": {
+            "total": perguntas.get("total", 0),
+            "por_disciplina": perguntas.get("por_disciplina", {}),
+            "por_dificuldade": perguntas.get("por_dificuldade", {}),
+        },
+        "respostas": {
+            "total": respostas.get("total", 0),
+            "media_qualidade": _media(respostas.get("soma_qualidade", 0),
+                                      respostas.get("n_qualidade", 0)),
+            "total_avaliacoes": recebidas,
+        },
+        "avaliacoes": {
+            "dadas": avaliacoes.get("dadas", 0),
+            "recebidas": recebidas,
+            "nota_media_dada": _media(avaliacoes.get("soma_notas_dadas", 0),
+                                      avaliacoes.get("dadas", 0)),
+            "nota_media_recebida": _media(respostas.get("soma_notas_recebidas", 0), recebidas),
+        },
+        "atualizado_em": doc.get("atualizado_em"),
+    }
+
+
+def obter_user_stats(user_id: str) -> Optional[Dict[str, Any]]:
+    """Leitura de documento único; retorna None se o usuário não tem estatísticas."""
+    doc = _colecao().find_one({"_id": str(user_id)}, max_time_ms=max_time_ms())
+    return formatar_user_stats(doc) if doc else None
+
+
+def obter_ou_criar_user_stats(user_id: str) -> Dict[str, Any]:
+    """
+    Estatísticas de um usuário, sempre no formato de `formatar_user_stats`.
+
+    Usuário sem documento é reconstruído a partir das coleções de origem (ou
+    recebe um documento zerado), de modo que a reconstrução não se repete a
+    cada leitura.
+    """
+    stats = obter_user_stats(user_id)
+    if stats is not None:
+        return stats
+    _reconciliar_usuario(str(user_id), datetime.utcnow(), criar_vazio=True)
+    return obter_user_stats(user_id) or formatar_user_stats(_documento_vazio(user_id))
+
+
+def listar_user_stats(limite: int = 50, pular: int = 0) -> List[Dict[str, Any]]:
+    cursor = _colecao().find().sort("_id", 1).skip(pular).limit(limite)
+    return [formatar_user_stats(doc) for doc in cursor]
+
+
+# === RECONCILIAÇÃO ===
+
+_TIPOS_NUMERICOS = ["int", "long", "double", "decimal"]
+
+
+def _conta_se_numero(campo: str) -> Dict[str, Any]:
+    return {"$cond": [{"$in": [{"$type": campo}, _TIPOS_NUMERICOS]}, 1, 0]}
+
+
+def _documento_vazio(uid: Any) -> Dict[str, Any]:
+    """Documento de contadores zerados de um usuário."""
+    return {
+        "_id": str(uid),
+        "interacoes": {"total": 0, "soma_complexidade": 0, "n_complexidade": 0},
+        "perguntas": {"total": 0, "por_disciplina": {}, "por_dificuldade": {}},
+        "respostas": {"total": 0, "soma_qualidade": 0, "n_qualidade": 0,
+                      "avaliacoes_recebidas": 0, "soma_notas_recebidas": 0},
+        "avaliacoes": {"dadas": 0, "soma_notas_dadas": 0},
+    }
+
+
+def _agregar_por_usuario(user_id: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Recalcula os contadores a partir das coleções de origem.
+
+    Args:
+        user_id: Restringe a um usuário (None para todos)
+
+    Returns:
+        dict: user_id -> documento de contadores
+    """
+    nao_deletado = {"status": {"$ne": "deleted"}}
+    docs: Dict[str, Dict[str, Any]] = {}
+
+    def doc(uid) -> Dict[str, Any]:
+        if str(uid) not in docs:
+            docs[str(uid)] = _documento_vazio(uid)
+        return docs[str(uid)]
+
+    def por_usuario(campo: str) -> Dict[str, Any]:
+        return {campo: user_id if user_id else {"$exists": True, "$ne": None}}
+
+    for g in db.interacoes.aggregate([
+        {"$match": por_usuario("user_id")},
+        {"$group": {
+            "_id": "$user_id",
+            "total": {"$sum": 1},
+            "soma": {"$sum": "$complexidade"},
+            "n": {"$sum": _conta_se_numero("$complexidade")},
+        }},
+    ], **opcoes_agregacao()):
+        doc(g["_id"])["interacoes"].update(
+            total=g["total"], soma_complexidade=g["soma"], n_complexidade=g["n"]
+        )
+
+    for g in db.perguntas.aggregate([
+        {"$match": {**por_usuario("usuario_id"), **nao_deletado}},
+        {"$group": {
+            "_id": {
+                "u": "$usuario_id",
+                "d": {"$ifNull": ["$disciplina", "Outras"]},
+                "n": {"$ifNull": ["$nivel_dificuldade", "intermediario"]},
+            },
+            "total": {"$sum": 1},
+        }},
+    ], **opcoes_agregacao()):
+        p = doc(g["_id"]["u"])["perguntas"]
+        disciplina = _chave_segura(g["_id"]["d"], "Outras")
+        nivel = _chave_segura(g["_id"]["n"], "intermediario")
+        p["total"] += g["total"]
+        p["por_disciplina"][disciplina] = p["por_disciplina"].get(disciplina, 0) + g["total"]
+        p["por_dificuldade"][nivel] = p["por_dificuldade"].get(nivel, 0) + g["total"]
+
+    for g in db.respostas.aggregate([
+        {"$match": {**por_usuario("usuario_id"), **nao_deletado}},
+        {"$lookup": {
+            "from": "avaliacoes",
+            "let": {"rid": {"$toString": "$_id"}},
+            "pipeline": [
+                {"$match": {"$expr": {"$eq": ["$resposta_id", "$$rid"]}, **nao_deletado}},
+                {"$project": {"_id": 0, "nota": 1}},
+            ],
+            "as": "avaliacoes",
+        }},
+        {"$group": {
+            "_id": "$usuario_id",
+            "total": {"$sum": 1},
+            "soma_qualidade": {"$sum": "$quality_score"},
+            "n_qualidade": {"$sum": _conta_se_numero("$quality_score")},
+            "recebidas": {"$sum": {"$size": "$avaliacoes"}},
+            "soma_notas": {"$sum": {"$sum": "$avaliacoes.nota"}},
+        }},
+    ], **opcoes_agregacao()):
+        doc(g["_id"])["respostas"].update(
+            total=g["total"], soma_qualidade=g["soma_qualidade"],
+            n_qualidade=g["n_qualidade"], avaliacoes_recebidas=g["recebidas"],
+            soma_notas_recebidas=g["soma_notas"]
+        )
+
+    # Avaliações do gateway usam 'avaliador_id'; as do backend_mq, 'usuario_id'
+    for g in db.avaliacoes.aggregate([
+        {"$match": nao_deletado},
+        {"$addFields": {"_avaliador": {"$toString": {"$ifNull": ["$avaliador_id", "$usuario_id"]}}}},
+        {"$match": {"_avaliador": str(user_id) if user_id else {"$ne": None}}},
+        {"$group": {"_id": "$_avaliador", "dadas": {"$sum": 1}, "soma": {"$sum": "$nota"}}},
+    ], **opcoes_agregacao()):
+        doc(g["_id"])["avaliacoes"].update(dadas=g["dadas"], soma_notas_dadas=g["soma"])
+
+    return docs
+
+
+def _versoes(ids: Optional[List[str]] = None) -> Dict[str, Optional[int]]:
+    """
+    Versão atual dos documentos (todos, ou só os de `ids`).
+
+    Documento sem `versao` fica com None (e não 0): `{"versao": 0}` não casa
+    com um campo ausente, então a gravação condicional nunca aconteceria.
+    """
+    filtro = {"_id": {"$in": ids}} if ids is not None else {}
+    return {doc["_id"]: doc.get("versao") for doc in _colecao().find(filtro, {"versao": 1}, max_time_ms=max_time_ms())}
+
+
+def _gravar_se_versao(doc: Dict[str, Any], versao: Optional[int]) -> Dict[str, Any]:
+    """
+    Argumentos de `update_one` que gravam o documento recalculado só se
+    `versao` não mudou desde a leitura.
+
+    Documento inexistente (ou sem `versao`) na leitura: upsert condicionado a
+    continuar sem `versao` (um incremento concorrente cria o documento e a
+    gravação falha). O documento gravado passa a ter `versao: 0`, que as
+    próximas reconciliações comparam normalmente.
+    """
+    campos = {k: v for k, v in doc.items() if k != "_id"}
+    if versao is None:
+        return {"filter": {"_id": doc["_id"], "versao": {"$exists": False}},
+                "update": {"$set": {**campos, "versao": 0}}, "upsert": True}
+    return {"filter": {"_id": doc["_id"], "versao": versao}, "update": {"$set": campos}}
+
+
+def _reconciliar_usuario(user_id: str, inicio: datetime, criar_vazio: bool = False) -> bool:
+    """
+    Recalcula um usuário até gravar sem conflito de versão.
+
+    Com `criar_vazio`, usuário sem dados de origem recebe um documento zerado.
+    """
+    for _ in range(TENTATIVAS_RECONCILIACAO):
+        versao = _versoes([user_id]).get(user_id)
+        doc = _agregar_por_usuario(user_id).get(user_id)
+        if doc is None:
+            if not criar_vazio:
+                return True
+            doc = _documento_vazio(user_id)
+        doc["atualizado_em"] = inicio
+        doc["reconciliado_em"] = inicio
+        try:
+            resultado = _colecao().update_one(**_gravar_se_versao(doc, versao))
+        except DuplicateKeyError:
+            continue
+        if resultado.matched_count or resultado.upserted_id is not None:
+            return True
+    logger.warning(f"user_stats de {user_id} não reconciliado: incrementos concorrentes")
+    return False
+
+
+def reconciliar_user_stats(user_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Reconstrói 'user_stats' a partir das coleções de origem.
+
+    A gravação é condicionada à `versao` lida antes do recálculo: usuários
+    que receberam incrementos nesse meio tempo são recalculados de novo.
+
+    Args:
+        user_id: Reconstrói apenas este usuário (None para todos)
+
+    Returns:
+        dict: Resumo da reconciliação
+    """
+    colecao = _colecao()
+    inicio = datetime.utcnow()
+
+    if user_id is not None:
+        _reconciliar_usuario(str(user_id), inicio)
+        return {"usuarios": 1, "removidos": 0, "conflitos": 0, "reconciliado_em": inicio.isoformat()}
+
+    # Versões lidas antes da agregação: incremento posterior invalida a gravação
+    versoes = _versoes()
+    docs = _agregar_por_usuario(None)
+
+    operacoes = []
+    for doc in docs.values():
+        doc["atualizado_em"] = inicio
+        doc["reconciliado_em"] = inicio
+        operacoes.append(UpdateOne(**_gravar_se_versao(doc, versoes.get(doc["_id"]))))
+
+    for i in range(0, len(operacoes), LOTE_RECONCILIACAO):
+        try:
+            colecao.bulk_write(operacoes[i:i + LOTE_RECONCILIACAO], ordered=False)
+        except BulkWriteError as e:
+            # Upsert que colidiu com documento criado por incremento: tratado como conflito
+            if any(erro.get("code") != 11000 for erro in e.details.get("writeErrors", [])):
+                raise
+
+    # Sem `reconciliado_em == inicio`: versão mudou durante o recálculo
+    conflitos = [doc["_id"] for doc in colecao.find(
+        {"_id": {"$in": list(docs)}, "reconciliado_em": {"$ne": inicio}}, {"_id": 1}
+    )]
+    for uid in conflitos:
+        _reconciliar_usuario(uid, inicio)
+
+    # Usuários sem nenhum documento de origem restante (preserva os que
+    # receberam incrementos durante a reconciliação)
+    removidos = colecao.delete_many({
+        "atualizado_em": {"$lt": inicio},
+        "$or": [{"reconciliado_em": {"$lt": inicio}},
+                {"reconciliado_em": {"$exists": False}}],
+    }).deleted_count
+
+    logger.info(f"user_stats reconciliado: {len(docs)} usuários, {len(conflitos)} conflitos, {removidos} removidos")
+    return {"usuarios": len(docs), "removidos": removidos, "conflitos": len(conflitos),
+            "reconciliado_em": inicio.isoformat()}
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print(reconciliar_user_stats())
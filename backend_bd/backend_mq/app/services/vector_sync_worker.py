@@ -0,0 +1,280 @@
+# app/services/vector_sync_worker.py
+"""
+Worker de sincronização MongoDB -> Qdrant baseado em change streams.
+
+Acompanha as coleções de conteúdo (interacoes, perguntas, respostas), gera os
+embeddings dos documentos alterados em lote e faz upsert/remoção em massa dos
+pontos no Qdrant. Todos os pontos ficam na coleção Qdrant consultada pela
+busca (`QDRANT_COLLECTION`), com a coleção de origem no payload (`colecao`)
+e o id de `ponto_id` — o mesmo da indexação síncrona das rotas. Os vetores
+vêm de `embedding_service.gerar_vetores`, o mesmo encoder das rotas e da
+busca.
+
+O resume token é persistido na coleção 'sync_state' após cada lote
+aplicado, de modo que o worker reinicia sem lacunas (entrega "pelo menos
+uma vez"; upserts são idempotentes).
+
+Com o worker ativo, a indexação síncrona nas rotas pode ser desligada com
+INDEXACAO_INLINE=false.
+
+Change streams exigem replica set. Para testes locais, um nó basta:
+
+    mongod --replSet rs0 --dbpath ./data
+    mongosh --eval "rs.initiate()"
+
+Execução:
+
+    python -m app.services.vector_sync_worker [--backfill]
+"""
+
+import argparse
+import logging
+import os
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from pymongo.errors import PyMongoError
+
+from app.database.mongo import db
+from app.services.embedding_service import gerar_vetores
+
+logger = logging.getLogger(__name__)
+
+# Rotas indexam de forma síncrona enquanto o worker não estiver em uso
+INDEXACAO_INLINE = os.getenv("INDEXACAO_INLINE", "true").lower() in ("1", "true", "yes")
+
+COLECAO_ESTADO = "sync_state"
+ID_ESTADO = "vector_sync"
+TAMANHO_LOTE = int(os.getenv("VECTOR_SYNC_BATCH", "64"))
+ESPERA_MAXIMA_MS = int(os.getenv("VECTOR_SYNC_MAX_WAIT_MS", "1000"))
+VECTOR_SIZE = 384
+MAX_TEXT_LENGTH = 500
+
+# coleção Mongo -> campo com o texto a vetorizar
+CAMPOS_TEXTO = {
+    "interacoes": "pergunta",
+    "perguntas": "texto",
+    "respostas": "texto",
+}
+
+
+# === QDRANT ===
+
+def ponto_id(mongo_id: Any) -> str:
+    """
+    Converte o ObjectId (24 hex) em UUID determinístico, já que o Qdrant só
+    aceita inteiros ou UUIDs como id de ponto. Ids que não são hex (ex.: ids
+    string) viram UUID5 do próprio id.
+
+    Usado pelo worker e pela indexação síncrona (qdrant_client.indexar_documento).
+    """
+    texto = str(mongo_id)
+    try:
+        return str(uuid.UUID(texto.rjust(32, "0")))
+    except ValueError:
+        return str(uuid.uuid5(uuid.NAMESPACE_OID, texto))
+
+
+def _garantir_colecao(qdrant, nome: str) -> None:
+    from qdrant_client.http.models import Distance, VectorParams
+
+    existentes = {c.name for c in qdrant.get_collections().collections}
+    if nome not in existentes:
+        qdrant.create_collection(
+            collection_name=nome,
+            vectors_config=VectorParams(size=VECTOR_SIZE, distance=Distance.COSINE),
+        )
+        logger.info(f"Coleção Qdrant '{nome}' criada")
+
+
+def _payload(colecao: str, doc: Dict[str, Any]) -> Dict[str, Any]:
+    payload = {"mongo_id": str(doc["_id"]), "colecao": colecao}
+    for campo, valor in doc.items():
+        if campo == "_id" or isinstance(valor, (dict, list)):
+            continue
+        if isinstance(valor, datetime):
+            valor = valor.isoformat()
+        elif isinstance(valor, str):
+            valor = valor[:MAX_TEXT_LENGTH]
+        elif not isinstance(valor, (int, float, bool)) and valor is not None:
+            valor = str(valor)
+        payload[campo] = valor
+    return payload
+
+
+# === WORKER ===
+
+class VectorSyncWorker:
+    """Consome o change stream e aplica as alterações no Qdrant em lote."""
+
+    def __init__(self, qdrant=None, encoder=None, colecao_qdrant: Optional[str] = None):
+        if db is None:
+            raise RuntimeError("MongoDB não inicializado")
+        if qdrant is None:
+            from app.database.qdrant_client import qdrant
+        if colecao_qdrant is None:
+            from app.database.qdrant_client import QDRANT_COLLECTION as colecao_qdrant
+        self.qdrant = qdrant
+        self.colecao_qdrant = colecao_qdrant
+        self.encoder = encoder or gerar_vetores
+        self.estado = db[COLECAO_ESTADO]
+        self.processados = 0
+
+    # --- resume token ---
+
+    def carregar_token(self) -> Optional[Dict[str, Any]]:
+        doc = self.estado.find_one({"_id": ID_ESTADO})
+        return doc.get("resume_token") if doc else None
+
+    def salvar_token(self, token: Dict[str, Any]) -> None:
+        self.estado.update_one(
+            {"_id": ID_ESTADO},
+            {"$set": {"resume_token": token, "atualizado_em": datetime.utcnow()},
+             "$inc": {"processados": self.processados}},
+            upsert=True,
+        )
+        self.processados = 0
+
+    # --- aplicação de lotes ---
+
+    def aplicar_lote(self, upserts: Dict[str, Dict[str, Dict]], remocoes: Dict[str, set]) -> None:
+        """
+        Args:
+            upserts: coleção -> {mongo_id: documento}
+            remocoes: coleção -> {mongo_id}
+        """
+        from qdrant_client.http.models import PointIdsList, PointStruct
+
+        for colecao, docs in upserts.items():
+            campo = CAMPOS_TEXTO[colecao]
+            docs = [d for d in docs.values() if isinstance(d.get(campo), str) and d[campo].strip()]
+            if not docs:
+                continue
+            vetores = self.encoder([d[campo] for d in docs])
+            self.qdrant.upsert(
+                collection_name=self.colecao_qdrant,
+                points=[
+                    PointStruct(id=ponto_id(d["_id"]), vector=v, payload=_payload(colecao, d))
+                    for d, v in zip(docs, vetores)
+                ],
+            )
+            self.processados += len(docs)
+
+        for colecao, ids in remocoes.items():
+            if ids:
+                self.qdrant.delete(
+                    collection_name=self.colecao_qdrant,
+                    points_selector=PointIdsList(points=[ponto_id(i) for i in ids]),
+                )
+                self.processados += len(ids)
+
+    def _aplicar_com_retry(self, upserts, remocoes, tentativas: int = 5) -> None:
+        for tentativa in range(1, tentativas + 1):
+            try:
+                self.aplicar_lote(upserts, remocoes)
+                return
+            except Exception as e:
+                if tentativa == tentativas:
+                    raise
+                espera = min(2 ** tentativa, 30)
+                logger.warning(f"Falha ao aplicar lote ({e}); nova tentativa em {espera}s")
+                time.sleep(espera)
+
+    # --- backfill ---
+
+    def backfill(self) -> int:
+        """Indexa todos os documentos existentes (idempotente)."""
+        total = 0
+        for colecao in CAMPOS_TEXTO:
+            lote: Dict[str, Dict] = {}
+            for doc in db[colecao].find({"status": {"$ne": "deleted"}}):
+                lote[str(doc["_id"])] = doc
+                if len(lote) >= TAMANHO_LOTE:
+                    self._aplicar_com_retry({colecao: lote}, {})
+                    total += len(lote)
+                    lote = {}
+            if lote:
+                self._aplicar_com_retry({colecao: lote}, {})
+                total += len(lote)
+        logger.info(f"Backfill concluído: {total} documentos")
+        return total
+
+    # --- loop principal ---
+
+    def _abrir_stream(self, token, inicio=None):
+        pipeline = [{"$match": {
+            "ns.coll": {"$in": list(CAMPOS_TEXTO)},
+            "operationType": {"$in": ["insert", "update", "replace", "delete"]},
+        }}]
+        return db.watch(
+            pipeline,
+            full_document="updateLookup",
+            resume_after=token,
+            start_at_operation_time=inicio if token is None else None,
+            max_await_time_ms=ESPERA_MAXIMA_MS,
+        )
+
+    def executar(self, backfill: bool = False) -> None:
+        token = self.carregar_token()
+        inicio = None
+        _garantir_colecao(self.qdrant, self.colecao_qdrant)
+
+        if backfill or token is None:
+            # Marca o instante antes do backfill para não perder eventos concorrentes
+            inicio = db.client.admin.command("hello").get("operationTime")
+            self.backfill()
+
+        logger.info(f"Vector sync iniciado ({'retomando' if token else 'do início'})")
+        while True:
+            try:
+                with self._abrir_stream(token, inicio) as stream:
+                    while stream.alive:
+                        upserts: Dict[str, Dict[str, Dict]] = {}
+                        remocoes: Dict[str, set] = {}
+                        limite = time.monotonic() + ESPERA_MAXIMA_MS / 1000
+                        n = 0
+
+                        while n < TAMANHO_LOTE and time.monotonic() < limite:
+                            evento = stream.try_next()
+                            if evento is None:
+                                break
+                            n += 1
+                            self._acumular(evento, upserts, remocoes)
+
+                        if n:
+                            self._aplicar_com_retry(upserts, remocoes)
+                        if stream.resume_token is not None and (n or token is None):
+                            token = stream.resume_token
+                            self.salvar_token(token)
+                        inicio = None
+            except PyMongoError as e:
+                logger.error(f"Change stream interrompido: {e}; reabrindo em 5s")
+                time.sleep(5)
+
+    @staticmethod
+    def _acumular(evento, upserts, remocoes) -> None:
+        colecao = evento["ns"]["coll"]
+        mongo_id = str(evento["documentKey"]["_id"])
+        doc = evento.get("fullDocument")
+
+        upserts.setdefault(colecao, {})
+        remocoes.setdefault(colecao, set())
+
+        # Documento removido (ou soft delete): último evento prevalece
+        if evento["operationType"] == "delete" or not doc or doc.get("status") == "deleted":
+            upserts[colecao].pop(mongo_id, None)
+            remocoes[colecao].add(mongo_id)
+        else:
+            remocoes[colecao].discard(mongo_id)
+            upserts[colecao][mongo_id] = doc
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sincroniza MongoDB -> Qdrant via change streams")
+    parser.add_argument("--backfill", action="store_true", help="reindexa os documentos existentes antes de acompanhar o stream")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    VectorSyncWorker().executar(backfill=args.backfill)
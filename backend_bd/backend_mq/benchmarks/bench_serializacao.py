@@ -0,0 +1,103 @@
+"""
+Benchmark de serialização de respostas do backend_mq.
+
+Compara, para um histórico de 200 interações:
+  - antes: converter_object_id (cópia por documento) + jsonable_encoder + JSONResponse (json stdlib)
+  - depois: BSONJSONResponse (orjson) direto sobre os documentos do cursor,
+    já no formato do pipeline de `obter_interacoes(id_como_string=True)`
+    (`_id` substituído por `id` pelo MongoDB)
+
+As duas saídas são comparadas antes da medição: o benchmark aborta se o
+JSON produzido não for o mesmo.
+
+Execução (a partir de backend_bd/backend_mq):
+
+    python benchmarks/bench_serializacao.py [n_docs] [repeticoes]
+"""
+
+import json
+import os
+import sys
+import timeit
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.responses import BSONJSONResponse
+
+
+def gerar_documentos(n: int):
+    base = datetime(2024, 1, 1)
+    return [
+        {
+            "_id": ObjectId(),
+            "user_id": "usuario_teste",
+            "pergunta": f"Como resolver a equação de segundo grau número {i}? " * 3,
+            "resposta": f"Use a fórmula de Bhaskara: x = (-b ± √Δ) / 2a. Exemplo {i}. " * 8,
+            "complexidade": i % 5,
+            "timestamp": base + timedelta(minutes=i),
+            "created_at": base + timedelta(minutes=i, seconds=1),
+            "metadata": {"embedding_model": "all-MiniLM-L6-v2", "qdrant_available": True, "api_version": "v1.0"},
+            "analise": {
+                "pontos_fortes": ["clareza", "exemplos"],
+                "aspectos_melhorar": ["notação"],
+                "passos_recomendados": ["praticar", "revisar", "aplicar"],
+            },
+        }
+        for i in range(n)
+    ]
+
+
+def converter_object_id(doc):
+    """Cópia da implementação anterior em app/routers/interacoes.py."""
+    doc_copy = doc.copy()
+    if "_id" in doc_copy:
+        doc_copy["id"] = str(doc_copy["_id"])
+        del doc_copy["_id"]
+    return doc_copy
+
+
+def como_cursor(docs):
+    """Documentos como o pipeline de `obter_interacoes(id_como_string=True)` os entrega."""
+    return [{**{k: v for k, v in d.items() if k != "_id"}, "id": str(d["_id"])} for d in docs]
+
+
+def antes(docs):
+    conteudo = jsonable_encoder([converter_object_id(d) for d in docs])
+    return JSONResponse(conteudo).body
+
+
+def depois(docs):
+    return BSONJSONResponse(docs).body
+
+
+def verificar_equivalencia(docs, docs_cursor):
+    """Garante que as duas implementações produzem o mesmo JSON."""
+    saida_antes = json.loads(antes(docs))
+    saida_depois = json.loads(depois(docs_cursor))
+    if saida_antes != saida_depois:
+        raise SystemExit("Saídas diferentes: o benchmark não compara a mesma resposta")
+
+
+def medir(nome, func, docs, repeticoes):
+    tempos = timeit.repeat(lambda: func(docs), number=repeticoes, repeat=5)
+    por_chamada = min(tempos) / repeticoes * 1000
+    print(f"{nome:<8} {por_chamada:8.3f} ms/resposta  ({len(func(docs)) / 1024:.1f} KiB)")
+    return por_chamada
+
+
+if __name__ == "__main__":
+    n_docs = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    repeticoes = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    docs = gerar_documentos(n_docs)
+    docs_cursor = como_cursor(docs)
+    verificar_equivalencia(docs, docs_cursor)
+
+    print(f"{n_docs} documentos, {repeticoes} repetições (melhor de 5)")
+    t_antes = medir("antes", antes, docs, repeticoes)
+    t_depois = medir("depois", depois, docs_cursor, repeticoes)
+    print(f"speedup  {t_antes / t_depois:8.1f}x")
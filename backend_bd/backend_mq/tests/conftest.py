@@ -0,0 +1,38 @@
+"""
+Testes do backend_mq sobre um MongoDB em memória (mongomock).
+
+O `MongoClient` é trocado antes de importar `app.database.mongo`, que
+conecta na importação; sem mongomock instalado os testes são pulados.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+mongomock = pytest.importorskip("mongomock")
+
+import pymongo  # noqa: E402
+
+# backend_bd/backend_mq no sys.path: os módulos importam `app.*`
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ["MONGODB_URI"] = "mongodb://localhost:27017"
+os.environ["MONGODB_DATABASE"] = "vlabs_teste"
+pymongo.MongoClient = mongomock.MongoClient
+
+# pymongo >= 4.11 passa `sort` a add_update; o mongomock ainda não o aceita
+_add_update = mongomock.collection.BulkOperationBuilder.add_update
+mongomock.collection.BulkOperationBuilder.add_update = (
+    lambda self, *args, sort=None, **kwargs: _add_update(self, *args, **kwargs)
+)
+
+from app.database import mongo  # noqa: E402
+
+
+@pytest.fixture
+def db():
+    """Banco limpo a cada teste."""
+    for nome in mongo.db.list_collection_names():
+        mongo.db.drop_collection(nome)
+    return mongo.db
@@ -0,0 +1,64 @@
+"""
+Testes das rotas genéricas de /mongodb: hash de senha e tokens não saem
+pelas leituras genéricas, só por `POST /usuarios/credenciais`.
+"""
+
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.database.cache import cache_documentos
+from app.routers import mongodb
+
+
+@pytest.fixture
+def cliente(db):
+    cache_documentos.backend.limpar()
+    app = FastAPI()
+    app.include_router(mongodb.router, prefix="/mongodb")
+    return TestClient(app)
+
+
+@pytest.fixture
+def usuario(db):
+    db.usuarios.insert_one({"_id": "u1", "nome": "Ana", "email": "ana@exemplo.com", "senha": "$2b$12$hash"})
+    db.user_sessions.insert_one({"_id": "s1", "user_id": "u1", "access_token": "tok", "refresh_token": "ref"})
+    return "u1"
+
+
+def _sem_segredos(doc):
+    return not {"senha", "access_token", "refresh_token"} & set(doc)
+
+
+def test_generic_reads_never_return_secrets(cliente, usuario):
+    respostas = [
+        cliente.get("/mongodb/usuarios/u1").json(),
+        cliente.get("/mongodb/usuarios/u1", params={"fields": "nome,senha"}).json(),
+        *cliente.get("/mongodb/usuarios/search").json()["items"],
+        *cliente.get("/mongodb/user_sessions/search").json()["items"],
+        *cliente.post("/mongodb/usuarios/by-ids", json={"ids": ["u1"]}).json()["items"].values(),
+        *cliente.post("/mongodb/user_sessions/by-field",
+                      json={"field": "user_id", "values": ["u1"]}).json()["groups"]["u1"],
+    ]
+
+    assert all(_sem_segredos(doc) for doc in respostas)
+    assert respostas[0]["nome"] == "Ana"
+
+
+def test_filters_on_secret_fields_are_rejected(cliente, usuario):
+    filtro = json.dumps({"senha": {"$regex": "^\\$2b"}})
+
+    assert cliente.get("/mongodb/usuarios/search", params={"query": filtro}).status_code == 400
+    assert cliente.post("/mongodb/user_sessions/by-field",
+                        json={"field": "access_token", "values": ["tok"]}).status_code == 400
+
+
+def test_credentials_endpoint_returns_password_hash(cliente, usuario):
+    por_email = cliente.post("/mongodb/usuarios/credenciais", json={"email": "ana@exemplo.com"})
+    por_id = cliente.post("/mongodb/usuarios/credenciais", json={"user_id": "u1"})
+
+    assert por_email.json()["senha"] == por_id.json()["senha"] == "$2b$12$hash"
+    assert cliente.post("/mongodb/usuarios/credenciais", json={"email": "x@exemplo.com"}).status_code == 404
+    assert cliente.post("/mongodb/usuarios/credenciais", json={}).status_code == 400
@@ -0,0 +1,71 @@
+"""
+Testes da reconciliação de 'user_stats': gravação condicionada à `versao`
+e remoção só dos usuários sem dados de origem.
+
+O recálculo (`_agregar_por_usuario`) é substituído por contadores fixos:
+as agregações usam operadores que o mongomock não implementa.
+"""
+
+import pytest
+
+from app.services import user_stats_service
+
+
+@pytest.fixture
+def origem(monkeypatch):
+    """Contadores 'de origem' devolvidos pelo recálculo, por usuário."""
+    docs = {}
+
+    def agregar(user_id=None):
+        selecionados = docs if user_id is None else {k: v for k, v in docs.items() if k == user_id}
+        return {uid: {**user_stats_service._documento_vazio(uid), "perguntas": {
+            "total": total, "por_disciplina": {"Outras": total}, "por_dificuldade": {}
+        }} for uid, total in selecionados.items()}
+
+    monkeypatch.setattr(user_stats_service, "_agregar_por_usuario", agregar)
+    return docs
+
+
+def test_second_full_reconciliation_keeps_users(db, origem):
+    origem.update({"u1": 2, "u2": 1})
+
+    primeira = user_stats_service.reconciliar_user_stats()
+    segunda = user_stats_service.reconciliar_user_stats()
+
+    assert primeira["usuarios"] == segunda["usuarios"] == 2
+    assert segunda["conflitos"] == 0
+    assert segunda["removidos"] == 0
+    assert {d["_id"]: d["perguntas"]["total"] for d in db.user_stats.find()} == {"u1": 2, "u2": 1}
+
+
+def test_reconciliation_fixes_documents_written_without_versao(db, origem):
+    # Documento gravado por uma reconciliação anterior à `versao: 0`
+    db.user_stats.insert_one({**user_stats_service._documento_vazio("u1"), "perguntas": {"total": 9}})
+    origem["u1"] = 3
+
+    resumo = user_stats_service.reconciliar_user_stats()
+
+    assert resumo["conflitos"] == 0 and resumo["removidos"] == 0
+    doc = db.user_stats.find_one({"_id": "u1"})
+    assert doc["perguntas"]["total"] == 3
+    assert doc["versao"] == 0
+
+
+def test_increment_after_reconciliation_is_kept(db, origem):
+    origem["u1"] = 1
+    user_stats_service.reconciliar_user_stats()
+
+    user_stats_service.registrar_pergunta("u1", "Física")
+
+    doc = db.user_stats.find_one({"_id": "u1"})
+    assert doc["versao"] == 1
+    assert doc["perguntas"]["total"] == 2
+    assert user_stats_service.reconciliar_user_stats("u1")["usuarios"] == 1
+
+
+def test_unknown_user_gets_a_zeroed_document_once(db, origem):
+    stats = user_stats_service.obter_ou_criar_user_stats("novo")
+
+    assert stats["perguntas"]["total"] == 0
+    assert "interacoes" in stats
+    assert db.user_stats.find_one({"_id": "novo"})["versao"] == 0